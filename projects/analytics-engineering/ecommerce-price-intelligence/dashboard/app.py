@@ -4,17 +4,21 @@ Real-time price tracking and comparison for Kenya
 
 Run with: streamlit run dashboard/app.py
 """
+import sys
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import json
 from pathlib import Path
 
 # Data directory
 DATA_DIR = Path(__file__).parent.parent / "data" / "processed"
 SCRAPED_DIR = Path(__file__).parent.parent / "data" / "scraped"
+JOURNAL_DIR = SCRAPED_DIR / "journal"
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from pipeline.analysis.price_queries import PriceQueries
 
 # Page config
 st.set_page_config(
@@ -87,40 +91,18 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-@st.cache_data(ttl=300)
+@st.cache_resource
+def price_queries():
+    """DuckDB query layer over the products and price history, opened once per process"""
+    return PriceQueries(DATA_DIR / "products.json", JOURNAL_DIR)
+
+
 def load_data():
-    """Load all data from JSON files"""
-    data = {}
-    
+    """Load the products and price history into DuckDB if their files changed"""
     try:
-        # Load products
-        products_file = DATA_DIR / "products.json"
-        if not products_file.exists():
-            products_file = SCRAPED_DIR / "products_latest.json"
-        
-        if products_file.exists():
-            with open(products_file) as f:
-                data['products'] = json.load(f)
-        else:
-            data['products'] = []
-        
-        # Load stats
-        stats_file = DATA_DIR / "stats.json"
-        if stats_file.exists():
-            with open(stats_file) as f:
-                data['stats'] = json.load(f)
-        else:
-            data['stats'] = {}
-        
-        # Load price history
-        history_file = SCRAPED_DIR / "price_history_latest.json"
-        if history_file.exists():
-            with open(history_file) as f:
-                data['history'] = json.load(f)
-        else:
-            data['history'] = []
-        
-        return data
+        queries = price_queries()
+        queries.refresh()
+        return queries
         
     except Exception as e:
         st.error(f"Error loading data: {e}")
@@ -150,16 +132,13 @@ def main():
     """, unsafe_allow_html=True)
     
     # Load data
-    data = load_data()
-    if not data or not data.get('products'):
+    queries = load_data()
+    overview = queries.overview() if queries else None
+    if not overview or not overview['products']:
         st.warning("⚠️ No product data available. Run the scraper first:")
         st.code("python3 scripts/scrape_prices.py", language="bash")
         return
     
-    products = data['products']
-    stats = data.get('stats', {})
-    history = data.get('history', [])
-    
     # Sidebar
     with st.sidebar:
         st.image("https://upload.wikimedia.org/wikipedia/commons/thumb/4/49/Flag_of_Kenya.svg/200px-Flag_of_Kenya.svg.png", width=80)
@@ -172,17 +151,17 @@ def main():
         st.markdown("---")
         
         # Category filter
-        categories = ['All'] + sorted(set(p.get('category', 'Other') for p in products))
+        categories = ['All'] + queries.options('category')
         selected_category = st.selectbox("📁 Category", categories)
         
         # Source filter
-        sources = ['All'] + sorted(set(p.get('source', 'unknown') for p in products))
+        sources = ['All'] + queries.options('source')
         selected_source = st.selectbox("🏪 Source", sources)
         
         # Price range
-        prices = [p['current_price'] for p in products if p.get('current_price')]
-        min_price = min(prices) if prices else 0
-        max_price = max(prices) if prices else 500000
+        min_price, max_price = queries.price_bounds()
+        if min_price is None:
+            min_price, max_price = 0, 500000
         
         price_range = st.slider(
             "💰 Price Range (KES)",
@@ -199,22 +178,9 @@ def main():
         st.markdown("### 📊 About")
         st.info("Track prices across Kenyan e-commerce platforms. Get alerts for price drops!")
     
-    # Apply filters
-    filtered_products = products
-    
-    if selected_category != 'All':
-        filtered_products = [p for p in filtered_products if p.get('category') == selected_category]
-    
-    if selected_source != 'All':
-        filtered_products = [p for p in filtered_products if p.get('source') == selected_source]
-    
-    filtered_products = [
-        p for p in filtered_products
-        if price_range[0] <= (p.get('current_price') or 0) <= price_range[1]
-    ]
-    
-    if show_deals:
-        filtered_products = [p for p in filtered_products if p.get('discount_percent')]
+    # Apply filters (used by the product table query)
+    selected = {'category': selected_category, 'source': selected_source}
+    filters = {column: value for column, value in selected.items() if value != 'All'}
     
     # Key Metrics
     st.markdown("## 📈 Market Overview")
@@ -224,39 +190,35 @@ def main():
     with col1:
         st.metric(
             label="Total Products",
-            value=f"{len(products):,}",
+            value=f"{overview['products']:,}",
             delta=f"Tracking"
         )
     
     with col2:
-        num_deals = len([p for p in products if p.get('discount_percent')])
         st.metric(
             label="🔥 Active Deals",
-            value=f"{num_deals}",
+            value=f"{overview['deals']}",
             delta="With discounts"
         )
     
     with col3:
-        avg_price = sum(p['current_price'] for p in products if p.get('current_price')) / max(len(products), 1)
         st.metric(
             label="Avg Price",
-            value=format_price(avg_price),
+            value=format_price(overview['avg_price']),
             delta="Across all"
         )
     
     with col4:
-        categories_count = len(set(p.get('category', 'Other') for p in products))
         st.metric(
             label="Categories",
-            value=categories_count,
+            value=overview['categories'],
             delta="Tracked"
         )
     
     with col5:
-        sources_count = len(set(p.get('source', 'unknown') for p in products))
         st.metric(
             label="Sources",
-            value=sources_count,
+            value=overview['sources'],
             delta="Platforms"
         )
     
@@ -267,15 +229,7 @@ def main():
     
     with col1:
         st.markdown("### 📊 Products by Category")
-        category_data = {}
-        for p in products:
-            cat = p.get('category', 'Other')
-            category_data[cat] = category_data.get(cat, 0) + 1
-        
-        df_cat = pd.DataFrame([
-            {'Category': k, 'Count': v}
-            for k, v in sorted(category_data.items(), key=lambda x: -x[1])
-        ])
+        df_cat = queries.category_counts()
         
         fig = px.bar(
             df_cat,
@@ -290,15 +244,8 @@ def main():
     
     with col2:
         st.markdown("### 🏪 Products by Source")
-        source_data = {}
-        for p in products:
-            src = p.get('source', 'unknown').title()
-            source_data[src] = source_data.get(src, 0) + 1
-        
-        df_src = pd.DataFrame([
-            {'Source': k, 'Count': v}
-            for k, v in source_data.items()
-        ])
+        df_src = queries.source_counts()
+        df_src['Source'] = df_src['Source'].str.title()
         
         fig = px.pie(
             df_src,
@@ -313,20 +260,7 @@ def main():
     # Average Price by Category
     st.markdown("### 💰 Average Price by Category")
     
-    avg_by_cat = {}
-    for p in products:
-        cat = p.get('category', 'Other')
-        if cat not in avg_by_cat:
-            avg_by_cat[cat] = []
-        if p.get('current_price'):
-            avg_by_cat[cat].append(p['current_price'])
-    
-    avg_prices = [
-        {'Category': k, 'Average Price': sum(v)/len(v) if v else 0}
-        for k, v in avg_by_cat.items()
-    ]
-    df_avg = pd.DataFrame(avg_prices)
-    df_avg = df_avg.sort_values('Average Price', ascending=True)
+    df_avg = queries.average_price_by_category()
     
     fig = px.bar(
         df_avg,
@@ -342,25 +276,21 @@ def main():
     st.plotly_chart(fig, use_container_width=True)
     
     # Price History Chart (if available)
-    if history:
+    if queries.has_history():
         st.markdown("---")
         st.markdown("### 📈 Price History Trends")
         
         # Get unique products with history
-        product_names = list(set(h.get('name', 'Unknown')[:50] for h in history))[:10]
+        product_names = queries.history_products(limit=10)
         
         selected_product = st.selectbox(
             "Select product to view price history:",
             product_names
         )
         
-        product_history = [h for h in history if h.get('name', '').startswith(selected_product[:30])]
+        df_history = queries.product_history(selected_product)
         
-        if product_history:
-            df_history = pd.DataFrame(product_history)
-            df_history['date'] = pd.to_datetime(df_history['date'])
-            df_history = df_history.sort_values('date')
-            
+        if not df_history.empty:
             fig = go.Figure()
             fig.add_trace(go.Scatter(
                 x=df_history['date'],
@@ -386,11 +316,7 @@ def main():
     st.markdown("---")
     st.markdown("## 🔥 Best Deals Right Now")
     
-    deals = sorted(
-        [p for p in products if p.get('discount_percent')],
-        key=lambda x: x.get('discount_percent', 0),
-        reverse=True
-    )[:12]
+    deals = queries.best_deals(limit=12)
     
     if deals:
         cols = st.columns(4)
@@ -423,13 +349,9 @@ def main():
     # Search
     search_term = st.text_input("🔍 Search products by name", "")
     
-    display_products = filtered_products
-    if search_term:
-        search_lower = search_term.lower()
-        display_products = [
-            p for p in filtered_products
-            if search_lower in p.get('name', '').lower()
-        ]
+    display_products, total_products = queries.products(
+        filters, price_range, deals_only=show_deals, search=search_term, limit=100
+    )
     
     # Format for display
     df_display = pd.DataFrame([
@@ -443,7 +365,7 @@ def main():
             'Category': p.get('category', 'Other'),
             'Source': p.get('source', 'unknown').title(),
         }
-        for p in display_products[:100]
+        for p in display_products
     ])
     
     st.dataframe(
@@ -452,7 +374,7 @@ def main():
         height=400
     )
     
-    st.markdown(f"**Showing {len(df_display)} of {len(filtered_products)} products**")
+    st.markdown(f"**Showing {len(df_display)} of {total_products:,} products**")
     
     # Footer
     st.markdown("---")
@@ -18,6 +18,33 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+def load_price_history(db, product_id: int, days: int = 365) -> List[Dict]:
+    """
+    A product's recorded prices of the last `days` days, oldest first
+    
+    The recorded_at bound limits the scan to the price_history partitions
+    of those months, where the (product_id, recorded_at) index finds the
+    product's rows. Prices past retention only remain as daily summaries
+    in price_history_daily.
+    
+    Args:
+        db: Database session
+        product_id: Product database ID
+        days: Days of history
+        
+    Returns:
+        List of dicts with 'date' and 'price' keys, as forecast_product_price() takes
+    """
+    from ..database.models import PriceHistory
+    
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    rows = db.query(PriceHistory.recorded_at, PriceHistory.price).filter(
+        PriceHistory.product_id == product_id,
+        PriceHistory.recorded_at >= cutoff
+    ).order_by(PriceHistory.recorded_at).all()
+    return [{'date': recorded_at, 'price': float(price)} for recorded_at, price in rows]
+
+
 class PriceForecaster:
     """Forecast future prices using Facebook Prophet"""
     
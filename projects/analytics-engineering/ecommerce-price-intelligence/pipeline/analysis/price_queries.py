@@ -0,0 +1,282 @@
+"""
+DuckDB queries behind the price dashboard
+
+The dashboard used to load every product and every daily price into
+Python lists and filter, count and search them with loops on every
+rerun, which slows down with the size of the price history. The queries
+here run against an embedded DuckDB database instead: refresh() reads the
+products file and the scrape journals (gzipped NDJSON, read directly by
+DuckDB) into two tables once per data version, and every filter,
+aggregation and search after that is one SQL statement.
+
+Journals are folded as Journal.latest() does: the newest version of each
+product (by product_id) and of each daily price (by product_id and date)
+wins, later segments over the compacted state, and within one file the
+latest scraped_at.
+
+One PriceQueries object is meant to be shared by a whole process (the
+dashboard keeps it in st.cache_resource); queries run on their own
+cursors.
+
+Usage:
+    queries = PriceQueries('data/processed/products.json', 'data/scraped/journal')
+    queries.refresh()
+    deals = queries.best_deals(limit=12)
+"""
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+from ..storage.journal import Journal
+
+PRODUCT_TYPES = {
+    'product_id': 'VARCHAR',
+    'source': 'VARCHAR',
+    'name': 'VARCHAR',
+    'url': 'VARCHAR',
+    'current_price': 'DOUBLE',
+    'old_price': 'DOUBLE',
+    'discount_percent': 'DOUBLE',
+    'currency': 'VARCHAR',
+    'rating': 'DOUBLE',
+    'review_count': 'BIGINT',
+    'image_url': 'VARCHAR',
+    'in_stock': 'BOOLEAN',
+    'category': 'VARCHAR',
+    'scraped_at': 'VARCHAR',
+}
+
+HISTORY_TYPES = {
+    'product_id': 'VARCHAR',
+    'name': 'VARCHAR',
+    'date': 'VARCHAR',
+    'price': 'DOUBLE',
+    'source': 'VARCHAR',
+}
+
+# The dashboard's defaults for missing values
+PRODUCT_DEFAULTS = {
+    'category': "'Other'",
+    'source': "'unknown'",
+    'name': "''",
+    'review_count': '0',
+}
+
+FILTER_COLUMNS = ['category', 'source']
+
+
+def _columns_parameter(types: Dict[str, str]) -> str:
+    return '{' + ', '.join(f"'{name}': '{type_}'" for name, type_ in types.items()) + '}'
+
+
+class PriceQueries:
+    """Dashboard queries over the products and price history, run by an embedded DuckDB"""
+
+    def __init__(self, products_file: Union[str, Path], journal_dir: Union[str, Path], connection=None):
+        """
+        Args:
+            products_file: Processed products JSON (used instead of the
+                products journal when it exists)
+            journal_dir: Directory holding the products and price_history journals
+            connection: DuckDB connection to use (default: a new in-memory database)
+        """
+        if not DUCKDB_AVAILABLE:
+            raise ImportError("duckdb is required for the dashboard queries: pip install duckdb")
+        self.products_file = Path(products_file)
+        self.products_journal = Journal(journal_dir, 'products', key='product_id')
+        self.history_journal = Journal(journal_dir, 'price_history', key=('product_id', 'date'), time_field='date')
+        self.connection = connection or duckdb.connect()
+        self.version = None
+        self._lock = threading.Lock()
+
+    # Loading
+
+    def _product_files(self) -> List[Path]:
+        if self.products_file.exists():
+            return [self.products_file]
+        return self._journal_files(self.products_journal)
+
+    @staticmethod
+    def _journal_files(journal: Journal) -> List[Path]:
+        """State first, then segments oldest first: later files hold newer versions"""
+        state = [journal.state_path] if journal.state_path.exists() else []
+        return state + journal.segments()
+
+    def _data_version(self) -> Tuple:
+        """Identifies the files' contents (writers replace or append to them)"""
+        version = []
+        for path in self._product_files() + self._journal_files(self.history_journal):
+            stat = path.stat()
+            version.append((str(path), stat.st_mtime_ns, stat.st_size))
+        return tuple(version)
+
+    def _load(self, table: str, files: List[Path], types: Dict[str, str], key: Sequence[str],
+              time_field: str, json_format: str):
+        columns = ', '.join(f"coalesce({name}, {PRODUCT_DEFAULTS[name]}) AS {name}"
+                            if table == 'products' and name in PRODUCT_DEFAULTS else name
+                            for name in types)
+        if not files:
+            empty = ', '.join(f"CAST(NULL AS {type_}) AS {name}" for name, type_ in types.items())
+            self.connection.execute(f"CREATE OR REPLACE TABLE {table} AS SELECT {empty} LIMIT 0")
+            return
+
+        compression = ", compression = 'gzip'" if json_format == 'newline_delimited' else ''
+        self.connection.execute(f"""
+            CREATE OR REPLACE TABLE {table} AS
+            SELECT {columns} FROM (
+                SELECT *, list_position(?, filename) AS file_rank
+                FROM read_json(?, format = '{json_format}'{compression},
+                               columns = {_columns_parameter(types)}, filename = true)
+            )
+            QUALIFY row_number() OVER (
+                PARTITION BY {', '.join(key)} ORDER BY file_rank DESC, {time_field} DESC
+            ) = 1
+        """, [[str(path) for path in files]] * 2)
+
+    def refresh(self) -> bool:
+        """
+        Load the products and price history into DuckDB if their files changed
+
+        Returns:
+            Whether the tables were reloaded
+        """
+        with self._lock:
+            version = self._data_version()
+            if version == self.version:
+                return False
+            products = self._product_files()
+            json_format = 'array' if products == [self.products_file] else 'newline_delimited'
+            self._load('products', products, PRODUCT_TYPES, ['product_id'], 'scraped_at', json_format)
+            self._load('history', self._journal_files(self.history_journal), HISTORY_TYPES,
+                       ['product_id', 'date'], 'date', 'newline_delimited')
+            self.version = version
+            return True
+
+    # Query building
+
+    def _query(self, sql: str, parameters: Optional[List] = None):
+        return self.connection.cursor().execute(sql, parameters or [])
+
+    @staticmethod
+    def _where(filters: Optional[Dict[str, str]] = None, price_range: Optional[Tuple[float, float]] = None,
+               deals_only: bool = False, search: Optional[str] = None) -> Tuple[str, List]:
+        """
+        WHERE clause and its parameters
+
+        Args:
+            filters: Column -> value to match exactly (see FILTER_COLUMNS)
+            price_range: (lowest, highest) current price, missing prices counting as 0
+            deals_only: Only discounted products
+            search: Case-insensitive substring of the name
+        """
+        conditions, parameters = [], []
+        for column, value in (filters or {}).items():
+            if column not in FILTER_COLUMNS:
+                raise ValueError(f"Can't filter on {column}, expected one of {FILTER_COLUMNS}")
+            conditions.append(f"{column} = ?")
+            parameters.append(value)
+        if price_range:
+            conditions.append('coalesce(current_price, 0) BETWEEN ? AND ?')
+            parameters.extend(price_range)
+        if deals_only:
+            conditions.append('discount_percent > 0')
+        if search:
+            conditions.append('contains(lower(name), ?)')
+            parameters.append(search.lower())
+        clause = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        return clause, parameters
+
+    # Queries
+
+    def options(self, column: str) -> List[str]:
+        """Distinct values of a filter column, sorted"""
+        if column not in FILTER_COLUMNS:
+            raise ValueError(f"No options for {column}, expected one of {FILTER_COLUMNS}")
+        return [row[0] for row in self._query(f"SELECT DISTINCT {column} FROM products ORDER BY 1").fetchall()]
+
+    def price_bounds(self) -> Tuple[float, float]:
+        """Lowest and highest known current price"""
+        return self._query("SELECT min(current_price), max(current_price) FROM products WHERE current_price > 0").fetchone()
+
+    def overview(self) -> Dict:
+        """Product, deal, category and source counts and the average price (over all products)"""
+        products, deals, total_price, categories, sources = self._query("""
+            SELECT count(*), count(*) FILTER (WHERE discount_percent > 0), coalesce(sum(current_price), 0),
+                   count(DISTINCT category), count(DISTINCT source)
+            FROM products
+        """).fetchone()
+        return {
+            'products': products,
+            'deals': deals,
+            'avg_price': total_price / max(products, 1),
+            'categories': categories,
+            'sources': sources,
+        }
+
+    def category_counts(self):
+        """DataFrame of (Category, Count), largest first"""
+        return self._query("""
+            SELECT category AS "Category", count(*) AS "Count"
+            FROM products GROUP BY 1 ORDER BY 2 DESC, 1
+        """).df()
+
+    def source_counts(self):
+        """DataFrame of (Source, Count)"""
+        return self._query("""
+            SELECT source AS "Source", count(*) AS "Count"
+            FROM products GROUP BY 1 ORDER BY 2 DESC, 1
+        """).df()
+
+    def average_price_by_category(self):
+        """DataFrame of (Category, Average Price), cheapest first; 0 without known prices"""
+        return self._query("""
+            SELECT category AS "Category", coalesce(avg(nullif(current_price, 0)), 0) AS "Average Price"
+            FROM products GROUP BY 1 ORDER BY 2, 1
+        """).df()
+
+    def has_history(self) -> bool:
+        return self._query("SELECT count(*) FROM (SELECT 1 FROM history LIMIT 1)").fetchone()[0] > 0
+
+    def history_products(self, limit: int = 10) -> List[str]:
+        """Names (up to 50 characters) of products with price history"""
+        rows = self._query(f"""
+            SELECT DISTINCT left(coalesce(name, 'Unknown'), 50) AS name
+            FROM history ORDER BY 1 LIMIT {int(limit)}
+        """).fetchall()
+        return [row[0] for row in rows]
+
+    def product_history(self, name: str):
+        """DataFrame of (date, price) of the products whose name starts like `name`, oldest first"""
+        return self._query("""
+            SELECT CAST(date AS DATE) AS date, price
+            FROM history WHERE starts_with(name, ?)
+            ORDER BY date
+        """, [name[:30]]).df()
+
+    def best_deals(self, limit: int = 12) -> List[Dict]:
+        """Products with the highest discounts"""
+        return self.products(deals_only=True, order='discount_percent DESC', limit=limit)[0]
+
+    def products(self, filters: Optional[Dict[str, str]] = None, price_range: Optional[Tuple[float, float]] = None,
+                 deals_only: bool = False, search: str = '', order: str = 'scraped_at DESC, product_id',
+                 limit: int = 100) -> Tuple[List[Dict], int]:
+        """
+        Products matching the filters and a search term
+
+        Returns:
+            (up to `limit` products as dicts, number of products matching without the search)
+        """
+        where, parameters = self._where(filters, price_range, deals_only, search)
+        rows = self._query(f"SELECT * FROM products {where} ORDER BY {order} LIMIT {int(limit)}", parameters)
+        names = [column[0] for column in rows.description]
+        products = [dict(zip(names, row)) for row in rows.fetchall()]
+
+        where, parameters = self._where(filters, price_range, deals_only)
+        total = self._query(f"SELECT count(*) FROM products {where}", parameters).fetchone()[0]
+        return products, total
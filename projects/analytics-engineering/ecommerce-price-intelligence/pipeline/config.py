@@ -12,6 +12,31 @@ DATABASE_URL = os.getenv(
     'postgresql://localhost:5432/ecommerce_price_db'
 )
 
+# Connection pooling (DB_POOL_CLASS=null for serverless / short-lived processes)
+DATABASE_POOL_CONFIG = {
+    'pool_class': os.getenv('DB_POOL_CLASS', 'queue'),  # queue, null or static
+    'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+    'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+    'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+    'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+    'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true',
+    'bulk_fetch_size': int(os.getenv('DB_BULK_FETCH_SIZE', 1000)),
+    'bulk_commit_every': int(os.getenv('DB_BULK_COMMIT_EVERY', 500)),
+}
+
+# Monthly partitions of time-series tables (see pipeline.database.partitions)
+PARTITION_CONFIG = {
+    'months_ahead': int(os.getenv('PARTITION_MONTHS_AHEAD', 3)),  # future months created in advance
+    'drop_expired': os.getenv('PARTITION_DROP_EXPIRED', 'false').lower() == 'true',  # else only detach
+    'tables': {
+        'price_history': {
+            'column': 'recorded_at',
+            'retention_months': int(os.getenv('PRICE_HISTORY_RETENTION_MONTHS', 12)),
+            'downsample': True,  # keep daily summaries in price_history_daily
+        },
+    },
+}
+
 # Scraping Configuration
 SCRAPING_CONFIG = {
     'user_agent': 'PriceIntelligence/1.0 (Educational Project; contact@example.com)',
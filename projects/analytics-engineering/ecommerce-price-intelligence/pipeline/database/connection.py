@@ -1,31 +1,69 @@
 """
 Database connection management
+
+The engine's pool comes from DATABASE_POOL_CONFIG (QueuePool unless
+DB_POOL_CLASS=null for serverless runs); bulk_session() keeps one
+connection for a whole pipeline stage.
 """
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
-from sqlalchemy.pool import NullPool
+from sqlalchemy.orm import Query, sessionmaker, scoped_session
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
 from contextlib import contextmanager
+from typing import Iterator, Optional
 import logging
 
 from .models import Base
-from ..config import DATABASE_URL
+from .partitions import ensure_all_partitions
+from ..config import DATABASE_URL, DATABASE_POOL_CONFIG
 
 logger = logging.getLogger(__name__)
 
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=NullPool,
-    echo=False,
-)
+POOL_CLASSES = {
+    'queue': QueuePool,
+    'null': NullPool,
+    'static': StaticPool,
+}
+
+
+def create_db_engine(url: str = DATABASE_URL, **settings):
+    """
+    Engine with the configured connection pool
+
+    Args:
+        url: Database URL
+        settings: Overrides of DATABASE_POOL_CONFIG entries
+    """
+    config = {**DATABASE_POOL_CONFIG, **settings}
+    if config['pool_class'] not in POOL_CLASSES:
+        raise ValueError(f"Unknown pool class {config['pool_class']!r}, expected one of {list(POOL_CLASSES)}")
+    
+    options = {
+        'poolclass': POOL_CLASSES[config['pool_class']],
+        'pool_pre_ping': config['pool_pre_ping'],
+        'echo': False,
+    }
+    if options['poolclass'] is QueuePool:
+        options.update(
+            pool_size=config['pool_size'],
+            max_overflow=config['max_overflow'],
+            pool_timeout=config['pool_timeout'],
+            pool_recycle=config['pool_recycle'],
+        )
+    return create_engine(url, **options)
+
+
+engine = create_db_engine()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Session = scoped_session(SessionLocal)
 
 
 def init_db():
-    """Initialize database (create tables)"""
+    """Initialize database (create tables and their monthly partitions)"""
     try:
         Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            ensure_all_partitions(connection)
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
@@ -52,7 +90,109 @@ def get_session():
     return SessionLocal()
 
 
+class BulkSession:
+    """
+    A session that commits every `commit_every` units of work
+
+    Use through bulk_session(). Call done() after each unit (a job, a
+    user, ...); the session commits once enough have accumulated, so a
+    failure loses at most one batch. stream() reads large results through
+    a server-side cursor. Committing would close that cursor, so while a
+    stream is open the session only flushes, and the commit happens when
+    the stream is exhausted.
+    """
+
+    def __init__(self, session, commit_every: int, fetch_size: int):
+        self.session = session
+        self.commit_every = commit_every
+        self.fetch_size = fetch_size
+        self.pending = 0
+        self.commits = 0
+        self._streams = 0
+
+    def stream(self, query, fetch_size: Optional[int] = None) -> Iterator:
+        """
+        Iterate a query's results `fetch_size` rows at a time
+
+        Args:
+            query: ORM Query (yields entities) or select() statement (yields rows)
+            fetch_size: Rows per fetch (default: the session's)
+        """
+        fetch_size = fetch_size or self.fetch_size
+        self._streams += 1
+        try:
+            if isinstance(query, Query):
+                yield from query.yield_per(fetch_size)
+            else:
+                yield from self.session.execute(query, execution_options={'yield_per': fetch_size})
+        finally:
+            self._streams -= 1
+        if self.pending >= self.commit_every:
+            self.commit()
+
+    def done(self, count: int = 1):
+        """Record finished units of work, committing every `commit_every`"""
+        self.pending += count
+        if self.pending >= self.commit_every:
+            self.commit()
+
+    def commit(self):
+        """Commit the pending work (only flush while a stream is open)"""
+        if self._streams:
+            self.session.flush()
+            return
+        self.session.commit()
+        self.commits += 1
+        self.pending = 0
 
 
+@contextmanager
+def bulk_session(commit_every: Optional[int] = None, fetch_size: Optional[int] = None):
+    """
+    One session on one connection for a whole pipeline stage
+    
+    Objects stay loaded after commits (expire_on_commit=False), so
+    committing doesn't reload every object touched so far.
+    
+    Args:
+        commit_every: Units of work per commit (default: DB_BULK_COMMIT_EVERY)
+        fetch_size: Rows per server-side cursor fetch (default: DB_BULK_FETCH_SIZE)
+    
+    Usage:
+        with bulk_session(commit_every=500) as bulk:
+            for job in bulk.stream(bulk.session.query(Job)):
+                process(job, bulk.session)
+                bulk.done()
+    """
+    db = SessionLocal(expire_on_commit=False)
+    bulk = BulkSession(
+        db,
+        commit_every or DATABASE_POOL_CONFIG['bulk_commit_every'],
+        fetch_size or DATABASE_POOL_CONFIG['bulk_fetch_size'],
+    )
+    try:
+        yield bulk
+        bulk.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Database error after {bulk.commits} bulk commits: {e}")
+        raise
+    finally:
+        db.close()
 
 
+@contextmanager
+def use_db(db=None):
+    """
+    The given session, or a new get_db() session when None
+    
+    Lets a function that normally opens its own session run inside a
+    caller's bulk session instead. There its work runs in a savepoint, so
+    a failing unit is rolled back alone and the rest of the batch goes on.
+    """
+    if db is not None:
+        with db.begin_nested():
+            yield db
+    else:
+        with get_db() as db:
+            yield db
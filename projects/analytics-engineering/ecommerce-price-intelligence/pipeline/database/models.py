@@ -4,7 +4,7 @@ SQLAlchemy ORM models for E-commerce Price Intelligence
 from datetime import datetime
 from sqlalchemy import (
     Column, Integer, String, Text, Boolean, DateTime, DECIMAL,
-    ForeignKey, JSON, UniqueConstraint, Index, Date
+    ForeignKey, JSON, UniqueConstraint, Index, Date, text
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -100,7 +100,9 @@ class Product(Base):
 class PriceHistory(Base):
     __tablename__ = 'price_history'
     
-    id = Column(Integer, primary_key=True)
+    # Partitioned by month of recorded_at (see pipeline.database.partitions), so
+    # the primary key includes it
+    id = Column(Integer, primary_key=True, autoincrement=True)
     product_id = Column(Integer, ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
     
     price = Column(DECIMAL(12, 2), nullable=False)
@@ -113,9 +115,30 @@ class PriceHistory(Base):
     in_stock = Column(Boolean, default=True)
     stock_count = Column(Integer)
     
-    recorded_at = Column(DateTime, default=datetime.utcnow)
+    recorded_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
     
     product = relationship('Product', back_populates='price_history')
+    
+    __table_args__ = (
+        Index('idx_price_history_product_recorded', 'product_id', text('recorded_at DESC')),
+        Index('idx_price_history_recorded', 'recorded_at', postgresql_using='brin'),
+        {'postgresql_partition_by': 'RANGE (recorded_at)'},
+    )
+
+
+class PriceHistoryDaily(Base):
+    """Daily price summary of price_history rows past retention"""
+    __tablename__ = 'price_history_daily'
+    
+    product_id = Column(Integer, ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+    day = Column(Date, primary_key=True)
+    
+    open_price = Column(DECIMAL(12, 2))
+    low_price = Column(DECIMAL(12, 2))
+    high_price = Column(DECIMAL(12, 2))
+    close_price = Column(DECIMAL(12, 2))
+    avg_price = Column(DECIMAL(12, 2))
+    samples = Column(Integer)
 
 
 class Review(Base):
@@ -237,7 +260,8 @@ class ScrapingLog(Base):
     prices_recorded = Column(Integer, default=0)
     
     error_message = Column(Text)
-    metadata = Column(JSON)
+    # 'metadata' is reserved on declarative classes, so map the column under another attribute
+    extra_metadata = Column('metadata', JSON)
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
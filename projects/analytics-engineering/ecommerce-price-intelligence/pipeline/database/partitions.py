@@ -0,0 +1,204 @@
+"""
+Monthly range partitions of the price_history table
+
+price_history is declared PARTITION BY RANGE (recorded_at) with one
+partition per month, plus a default partition for rows outside every
+month:
+
+    price_history
+        price_history_y2025m11    FOR VALUES FROM ('2025-11-01') TO ('2025-12-01')
+        price_history_y2025m12    FOR VALUES FROM ('2025-12-01') TO ('2026-01-01')
+        price_history_default     DEFAULT
+
+Indexes declared on price_history apply to every partition: a BRIN on
+recorded_at, a few pages per partition since prices are recorded in time
+order, and (product_id, recorded_at DESC) for one product's latest
+prices. Queries with a recorded_at condition only scan the partitions in
+range (partition pruning), and old months leave the table by detaching
+their partition instead of a DELETE that bloats the indexes and leaves
+dead rows to vacuum.
+
+ensure_partitions() creates the partitions of the current month and the
+next PARTITION_CONFIG['months_ahead']; init_db() and
+scripts/manage_partitions.py (scheduled daily) call it. Rows that landed
+in the default partition before their month existed are moved when it is
+created. apply_retention() detaches the partitions older than each
+table's retention_months, first summarizing their prices per product and
+day into price_history_daily for tables with 'downsample' set, and drops
+them when PARTITION_CONFIG['drop_expired'] is set (otherwise they stay
+behind as standalone tables to archive).
+"""
+import re
+import logging
+from datetime import date
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from ..config import PARTITION_CONFIG
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PATTERN = re.compile(r'_y(\d{4})m(\d{2})$')
+
+# Open, low, high, close and average price per product and day
+DOWNSAMPLE_SQL = """
+    INSERT INTO price_history_daily
+        (product_id, day, open_price, low_price, high_price, close_price, avg_price, samples)
+    SELECT product_id, recorded_at::DATE,
+           (array_agg(price ORDER BY recorded_at))[1], min(price), max(price),
+           (array_agg(price ORDER BY recorded_at DESC))[1], round(avg(price), 2), count(*)
+    FROM {partition}
+    GROUP BY 1, 2
+    ON CONFLICT (product_id, day) DO NOTHING
+"""
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def default_partition(table: str) -> str:
+    return f"{table}_default"
+
+
+def partitions(connection, table: str) -> Dict[str, Optional[date]]:
+    """Attached partitions of a table: name -> first day of its month (None for the default)"""
+    names = connection.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :table
+    """), {'table': table}).scalars()
+    result = {}
+    for name in names:
+        match = PARTITION_PATTERN.search(name)
+        result[name] = date(int(match[1]), int(match[2]), 1) if match else None
+    return result
+
+
+def create_partition(connection, table: str, column: str, month: date) -> str:
+    """
+    Create the partition of one month
+
+    PostgreSQL refuses to create a partition while the default partition
+    holds rows of its range, so those are moved: the default partition is
+    detached, the new one created, the rows re-inserted through the parent
+    and the default attached again, all in the caller's transaction.
+    """
+    name = partition_name(table, month)
+    default = default_partition(table)
+    bounds = {'lower': month, 'upper': add_months(month, 1)}
+    in_range = f"{column} >= :lower AND {column} < :upper"
+    stranded = connection.execute(text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})"), bounds).scalar()
+
+    if stranded:
+        connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    connection.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{bounds['lower']}') TO ('{bounds['upper']}')"
+    ))
+    if stranded:
+        moved = connection.execute(text(f"""
+            WITH moved AS (DELETE FROM {default} WHERE {in_range} RETURNING *)
+            INSERT INTO {table} SELECT * FROM moved
+        """), bounds).rowcount
+        connection.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+        logger.info(f"Moved {moved} rows of {month:%Y-%m} from {default} to {name}")
+    return name
+
+
+def ensure_partitions(connection, table: str, column: str, months_ahead: Optional[int] = None,
+                      months_back: int = 0, today: Optional[date] = None) -> List[str]:
+    """
+    Create the missing default and monthly partitions of a table
+
+    Args:
+        connection: SQLAlchemy connection (inside a transaction)
+        table: Partitioned table
+        column: Its partition column
+        months_ahead: Months after the current one (default: PARTITION_CONFIG['months_ahead'])
+        months_back: Months before the current one, e.g. to backfill history
+        today: Reference date (default: today)
+
+    Returns:
+        Names of the partitions created
+    """
+    if months_ahead is None:
+        months_ahead = PARTITION_CONFIG['months_ahead']
+    existing = partitions(connection, table)
+    created = []
+    if default_partition(table) not in existing:
+        connection.execute(text(f"CREATE TABLE {default_partition(table)} PARTITION OF {table} DEFAULT"))
+        created.append(default_partition(table))
+
+    first = add_months(month_start(today or date.today()), -months_back)
+    for offset in range(months_back + months_ahead + 1):
+        month = add_months(first, offset)
+        if partition_name(table, month) not in existing:
+            created.append(create_partition(connection, table, column, month))
+    return created
+
+
+def ensure_all_partitions(connection, months_back: int = 0, today: Optional[date] = None) -> List[str]:
+    """ensure_partitions() for every table in PARTITION_CONFIG['tables']"""
+    created = []
+    for table, settings in PARTITION_CONFIG['tables'].items():
+        created += ensure_partitions(connection, table, settings['column'], months_back=months_back, today=today)
+    if created:
+        logger.info(f"Created partitions {', '.join(created)}")
+    return created
+
+
+def expired_partitions(connection, table: str, retention_months: int, today: Optional[date] = None) -> List[str]:
+    """Monthly partitions that end before the last `retention_months` months, oldest first"""
+    cutoff = add_months(month_start(today or date.today()), -retention_months)
+    return sorted(name for name, month in partitions(connection, table).items()
+                  if month is not None and add_months(month, 1) <= cutoff)
+
+
+def downsample_partition(connection, name: str) -> int:
+    """Summarize a price_history partition into price_history_daily; returns the rows written"""
+    return connection.execute(text(DOWNSAMPLE_SQL.format(partition=name))).rowcount
+
+
+def detach_partition(connection, table: str, name: str, drop: bool = False):
+    """Detach (and drop) a partition"""
+    connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+    if drop:
+        connection.execute(text(f"DROP TABLE {name}"))
+
+
+def apply_retention(connection, drop: Optional[bool] = None, today: Optional[date] = None) -> List[str]:
+    """
+    Detach the partitions past each table's retention_months
+
+    Args:
+        connection: SQLAlchemy connection (inside a transaction)
+        drop: Drop them too (default: PARTITION_CONFIG['drop_expired'])
+        today: Reference date (default: today)
+
+    Returns:
+        Names of the partitions detached
+    """
+    if drop is None:
+        drop = PARTITION_CONFIG['drop_expired']
+    detached = []
+    for table, settings in PARTITION_CONFIG['tables'].items():
+        for name in expired_partitions(connection, table, settings['retention_months'], today):
+            if settings.get('downsample'):
+                logger.info(f"Summarized {name} into {downsample_partition(connection, name)} daily prices")
+            detach_partition(connection, table, name, drop)
+            logger.info(f"{'Dropped' if drop else 'Detached'} {name} (older than {settings['retention_months']} months)")
+            detached.append(name)
+    return detached
@@ -8,6 +8,7 @@ DROP TABLE IF EXISTS price_alerts CASCADE;
 DROP TABLE IF EXISTS user_watchlists CASCADE;
 DROP TABLE IF EXISTS reviews CASCADE;
 DROP TABLE IF EXISTS price_forecasts CASCADE;
+DROP TABLE IF EXISTS price_history_daily CASCADE;
 DROP TABLE IF EXISTS price_history CASCADE;
 DROP TABLE IF EXISTS products CASCADE;
 DROP TABLE IF EXISTS categories CASCADE;
@@ -99,10 +100,11 @@ CREATE INDEX idx_products_brand ON products(brand);
 CREATE INDEX idx_products_price ON products(current_price);
 CREATE INDEX idx_products_active ON products(is_active);
 
--- Price history table
+-- Price history table, partitioned by month of recorded_at (see
+-- pipeline/database/partitions.py). The primary key must include it.
 CREATE TABLE price_history (
-    id SERIAL PRIMARY KEY,
-    product_id INTEGER REFERENCES products(id) ON DELETE CASCADE,
+    id SERIAL,
+    product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
     
     price DECIMAL(12, 2) NOT NULL,
     currency VARCHAR(10) DEFAULT 'KES',
@@ -115,11 +117,48 @@ CREATE TABLE price_history (
     in_stock BOOLEAN DEFAULT TRUE,
     stock_count INTEGER,
     
-    recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    recorded_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    
+    PRIMARY KEY (id, recorded_at)
+) PARTITION BY RANGE (recorded_at);
+
+-- Rows outside every monthly partition
+CREATE TABLE price_history_default PARTITION OF price_history DEFAULT;
 
-CREATE INDEX idx_price_history_product ON price_history(product_id);
-CREATE INDEX idx_price_history_recorded ON price_history(recorded_at DESC);
+-- Partitions of the current and next 3 months; scripts/manage_partitions.py
+-- creates later ones and detaches the expired ones
+DO $$
+DECLARE
+    month DATE;
+BEGIN
+    FOR i IN 0..3 LOOP
+        month := date_trunc('month', CURRENT_DATE)::DATE + make_interval(months => i);
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF price_history FOR VALUES FROM (%L) TO (%L)',
+            'price_history_' || to_char(month, '"y"YYYY"m"MM'), month, month + INTERVAL '1 month'
+        );
+    END LOOP;
+END $$;
+
+-- A product's latest prices; the BRIN stays a few pages per partition
+-- because prices are recorded in time order
+CREATE INDEX idx_price_history_product_recorded ON price_history(product_id, recorded_at DESC);
+CREATE INDEX idx_price_history_recorded ON price_history USING BRIN (recorded_at);
+
+-- Daily summaries of price_history partitions past retention
+CREATE TABLE price_history_daily (
+    product_id INTEGER REFERENCES products(id) ON DELETE CASCADE,
+    day DATE,
+    
+    open_price DECIMAL(12, 2),
+    low_price DECIMAL(12, 2),
+    high_price DECIMAL(12, 2),
+    close_price DECIMAL(12, 2),
+    avg_price DECIMAL(12, 2),
+    samples INTEGER,
+    
+    PRIMARY KEY (product_id, day)
+);
 
 -- Reviews table
 CREATE TABLE reviews (
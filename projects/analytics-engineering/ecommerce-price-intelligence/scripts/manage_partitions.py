@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Create upcoming monthly partitions and apply the retention policy
+
+Creates the partitions of the current month and the next few (see
+PARTITION_CONFIG) and detaches the ones older than each table's
+retention. Schedule it daily so inserts never wait on a missing month.
+
+Usage:
+    python3 scripts/manage_partitions.py
+    python3 scripts/manage_partitions.py --months-back 6 --no-retention
+    python3 scripts/manage_partitions.py --drop
+    python3 scripts/manage_partitions.py --status
+"""
+import sys
+import logging
+import argparse
+from pathlib import Path
+
+from sqlalchemy import text
+
+# Add pipeline to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline.config import PARTITION_CONFIG
+from pipeline.database.connection import engine
+from pipeline.database.partitions import apply_retention, ensure_all_partitions, partitions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Maintain the monthly partitions of time-series tables')
+    parser.add_argument('--months-back', type=int, default=0,
+                        help='Also create partitions for this many past months (backfills)')
+    parser.add_argument('--no-retention', action='store_true', help='Only create partitions')
+    parser.add_argument('--drop', action='store_true', help='Drop expired partitions instead of detaching them')
+    parser.add_argument('--status', action='store_true', help='Only list the partitions and their row estimates')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.status:
+        with engine.connect() as connection:
+            for table in PARTITION_CONFIG['tables']:
+                for name in sorted(partitions(connection, table)):
+                    rows = connection.execute(
+                        text("SELECT reltuples::BIGINT FROM pg_class WHERE relname = :name"), {'name': name}).scalar()
+                    print(f"{name:<24}{max(rows, 0):>10} rows")
+        return
+
+    with engine.begin() as connection:
+        created = ensure_all_partitions(connection, months_back=args.months_back)
+    print(f"✅ Created {len(created)} partitions")
+
+    if not args.no_retention:
+        drop = args.drop or PARTITION_CONFIG['drop_expired']
+        with engine.begin() as connection:
+            detached = apply_retention(connection, drop=drop)
+        print(f"✅ {'Dropped' if drop else 'Detached'} {len(detached)} expired partitions")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ This version uses requests + BeautifulSoup for speed and cloud compatibility.
 Usage:
     python3 scripts/scrape_prices.py
 """
+import sys
 import json
 import re
 import time
@@ -26,6 +27,11 @@ from urllib.parse import quote_plus
 import requests
 from bs4 import BeautifulSoup
 
+# Add pipeline to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline.storage.journal import DEFAULT_RETENTION_DAYS, Journal
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -37,6 +43,10 @@ logger = logging.getLogger(__name__)
 PROJECT_DIR = Path(__file__).parent.parent
 SCRAPED_DIR = PROJECT_DIR / "data" / "scraped"
 PROCESSED_DIR = PROJECT_DIR / "data" / "processed"
+JOURNAL_DIR = SCRAPED_DIR / "journal"
+
+# Days of price history kept in the journal's latest state
+HISTORY_RETENTION_DAYS = 90
 
 SCRAPED_DIR.mkdir(parents=True, exist_ok=True)
 PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
@@ -61,6 +71,16 @@ def generate_product_id(source: str, identifier: str) -> str:
     return hashlib.md5(f"{source}:{identifier}".encode()).hexdigest()[:16]
 
 
+def products_journal() -> Journal:
+    """Journal of scraped products, newest version per product"""
+    return Journal(JOURNAL_DIR, 'products', key='product_id', time_field='scraped_at')
+
+
+def history_journal() -> Journal:
+    """Journal of daily prices, newest price per product and day"""
+    return Journal(JOURNAL_DIR, 'price_history', key=('product_id', 'date'), time_field='date')
+
+
 class JumiaKenyaScraper:
     """Scraper for Jumia Kenya using requests (no Selenium)"""
     
@@ -217,8 +237,8 @@ class JumiaKenyaScraper:
             return 'Tablets'
         return 'Electronics'
     
-    def scrape_categories(self, max_per_category: int = 15) -> List[Dict]:
-        """Scrape multiple product categories"""
+    def scrape_categories(self, max_per_category: int = 15, journal=None) -> List[Dict]:
+        """Scrape multiple product categories, appending each new product to `journal` if given"""
         categories = [
             'laptop', 'smartphone', 'headphones', 'smart tv',
             'smartwatch', 'tablet', 'power bank', 'earbuds'
@@ -233,6 +253,8 @@ class JumiaKenyaScraper:
                 if p['product_id'] not in seen_ids:
                     seen_ids.add(p['product_id'])
                     all_products.append(p)
+                    if journal is not None:
+                        journal.write(p)
             time.sleep(2)  # Rate limiting
         
         return all_products
@@ -369,25 +391,28 @@ class DemoDataGenerator:
 def scrape_all_sources() -> tuple:
     """Run all scrapers and return products + history"""
     all_products = []
-    
-    # Try Jumia first
-    jumia = JumiaKenyaScraper()
-    try:
-        products = jumia.scrape_categories(max_per_category=10)
-        all_products.extend(products)
-        logger.info(f"Jumia: {len(products)} products")
-    except Exception as e:
-        logger.warning(f"Jumia scraping failed: {e}")
-    
-    time.sleep(1)
-    
-    # Generate demo data to ensure we have enough products
     demo = DemoDataGenerator()
-    demo_products = demo.generate_products(100)
     
-    # Add demo products only if we don't have enough real ones
-    if len(all_products) < 50:
-        all_products.extend(demo_products)
+    # Products are journaled as they are scraped, so an interrupted run keeps them
+    with products_journal().writer() as journal:
+        # Try Jumia first
+        jumia = JumiaKenyaScraper()
+        try:
+            products = jumia.scrape_categories(max_per_category=10, journal=journal)
+            all_products.extend(products)
+            logger.info(f"Jumia: {len(products)} products")
+        except Exception as e:
+            logger.warning(f"Jumia scraping failed: {e}")
+        
+        time.sleep(1)
+        
+        # Generate demo data to ensure we have enough products
+        demo_products = demo.generate_products(100)
+        
+        # Add demo products only if we don't have enough real ones
+        if len(all_products) < 50:
+            all_products.extend(demo_products)
+            journal.write_many(demo_products)
     
     # Remove duplicates
     seen = set()
@@ -404,30 +429,25 @@ def scrape_all_sources() -> tuple:
 
 
 def save_data(products: List[Dict], history: List[Dict]):
-    """Save scraped data to files"""
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    
-    # Save products
-    products_file = SCRAPED_DIR / f"products_{timestamp}.json"
-    with open(products_file, 'w') as f:
-        json.dump(products, f, indent=2, default=str)
+    """
+    Journal the price history and fold this run into the latest state
     
-    latest_products = SCRAPED_DIR / "products_latest.json"
-    with open(latest_products, 'w') as f:
-        json.dump(products, f, indent=2, default=str)
+    Products were journaled while scraping; compaction keeps the newest
+    version of each product and the newest price per product and day.
+    """
+    products_log = products_journal()
+    history_log = history_journal()
     
-    # Save price history
-    history_file = SCRAPED_DIR / f"price_history_{timestamp}.json"
-    with open(history_file, 'w') as f:
-        json.dump(history, f, indent=2, default=str)
+    with history_log.writer() as journal:
+        journal.write_many(history)
     
-    latest_history = SCRAPED_DIR / "price_history_latest.json"
-    with open(latest_history, 'w') as f:
-        json.dump(history, f, indent=2, default=str)
+    product_count = products_log.compact(DEFAULT_RETENTION_DAYS)
+    history_count = history_log.compact(HISTORY_RETENTION_DAYS)
     
-    logger.info(f"💾 Saved {len(products)} products and {len(history)} history records")
+    logger.info(f"💾 Saved {len(products)} products and {len(history)} history records "
+                f"(latest state: {product_count} products, {history_count} history records)")
     
-    return products_file, history_file
+    return products_log.state_path, history_log.state_path
 
 
 def generate_stats(products: List[Dict]) -> Dict:
@@ -9,12 +9,25 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline.analysis.job_queries import JobQueries
+from pipeline.storage.snapshot import current_version, load_snapshot
+
 # Data directory
 DATA_DIR = Path(__file__).parent.parent / "data" / "processed"
 
+# Scrape-date windows offered in the sidebar (days, None = everything)
+HISTORY_WINDOWS = {
+    'Last 30 days': 30,
+    'Last 90 days': 90,
+    'Last year': 365,
+    'All time': None,
+}
+
 # Page config
 st.set_page_config(
     page_title="🎯 Kenya Job Market Intelligence",
@@ -76,38 +89,16 @@ st.markdown("""
 
 
 @st.cache_data(ttl=60)
-def load_data():
-    """Load all demo data from JSON files"""
-    data = {}
-    
+def snapshot_version():
+    """Version of the published data; checking it is one small read"""
+    return current_version(DATA_DIR)
+
+
+@st.cache_data
+def load_data(version):
+    """Load the dashboard data of one published snapshot (cached per version)"""
     try:
-        # Load jobs
-        with open(DATA_DIR / "jobs.json", "r") as f:
-            data['jobs'] = json.load(f)
-        
-        # Load statistics
-        with open(DATA_DIR / "skill_stats.json", "r") as f:
-            data['skill_stats'] = json.load(f)
-        
-        with open(DATA_DIR / "company_stats.json", "r") as f:
-            data['company_stats'] = json.load(f)
-        
-        with open(DATA_DIR / "source_stats.json", "r") as f:
-            data['source_stats'] = json.load(f)
-        
-        with open(DATA_DIR / "location_stats.json", "r") as f:
-            data['location_stats'] = json.load(f)
-        
-        with open(DATA_DIR / "summary.json", "r") as f:
-            data['summary'] = json.load(f)
-        
-        with open(DATA_DIR / "companies.json", "r") as f:
-            data['companies'] = json.load(f)
-        
-        with open(DATA_DIR / "skills.json", "r") as f:
-            data['skills'] = json.load(f)
-        
-        return data
+        return load_snapshot(DATA_DIR, version)
         
     except Exception as e:
         st.error(f"Error loading data: {e}")
@@ -115,6 +106,12 @@ def load_data():
         return None
 
 
+@st.cache_resource
+def job_queries():
+    """DuckDB query layer over the job store, opened once per process"""
+    return JobQueries(DATA_DIR / "jobs")
+
+
 def format_salary(amount: int, currency: str = "USD") -> str:
     """Format salary with K suffix"""
     if not amount:
@@ -142,10 +139,15 @@ def main():
     """, unsafe_allow_html=True)
     
     # Load data
-    data = load_data()
+    version = snapshot_version()
+    data = load_data(version)
     if not data:
         return
     
+    # The jobs of the store version the snapshot's stats were computed from
+    queries = job_queries()
+    queries.refresh(data.get('job_store'))
+    
     # Sidebar
     with st.sidebar:
         st.image("https://upload.wikimedia.org/wikipedia/commons/thumb/4/49/Flag_of_Kenya.svg/200px-Flag_of_Kenya.svg.png", width=100)
@@ -160,16 +162,24 @@ def main():
         # Filters
         st.subheader("📍 Filters")
         
+        # Period filter: jobs scraped within the window
+        period = st.selectbox("Scraped Within", list(HISTORY_WINDOWS), index=1)
+        days = HISTORY_WINDOWS[period]
+        if days is not None and not queries.metrics(days)['jobs']:
+            # Nothing scraped that recently (e.g. a stale store): show everything
+            st.caption(f"No jobs scraped in the {period.lower()} - showing all time")
+            days = None
+        
         # Location filter
-        locations = ['All'] + sorted(set(j['location'] for j in data['jobs']))
+        locations = ['All'] + queries.options('location', days)
         selected_location = st.selectbox("Location", locations)
         
         # Experience filter
-        exp_levels = ['All'] + sorted(set(j['experience_level'] for j in data['jobs']))
+        exp_levels = ['All'] + queries.options('experience_level', days)
         selected_exp = st.selectbox("Experience Level", exp_levels)
         
         # Source filter
-        sources = ['All'] + sorted(set(j['source'] for j in data['jobs']))
+        sources = ['All'] + queries.options('source', days)
         selected_source = st.selectbox("Job Source", sources)
         
         st.markdown("---")
@@ -188,14 +198,10 @@ def main():
         - BrighterMonday
         """)
     
-    # Apply filters
-    filtered_jobs = data['jobs']
-    if selected_location != 'All':
-        filtered_jobs = [j for j in filtered_jobs if j['location'] == selected_location]
-    if selected_exp != 'All':
-        filtered_jobs = [j for j in filtered_jobs if j['experience_level'] == selected_exp]
-    if selected_source != 'All':
-        filtered_jobs = [j for j in filtered_jobs if j['source'] == selected_source]
+    # Apply filters (each chart below is one query with them)
+    selected = {'location': selected_location, 'experience_level': selected_exp, 'source': selected_source}
+    filters = {column: value for column, value in selected.items() if value != 'All'}
+    metrics = queries.metrics(days, filters)
     
     summary = data['summary']
     
@@ -206,7 +212,7 @@ def main():
     with col1:
         st.metric(
             label="Total Active Jobs",
-            value=f"{len(filtered_jobs):,}",
+            value=f"{metrics['jobs']:,}",
             delta=f"+{summary['recent_jobs_7_days']} this week"
         )
     
@@ -218,18 +224,16 @@ def main():
         )
     
     with col3:
-        avg_min = sum(j['salary_min'] for j in filtered_jobs if j.get('salary_min')) / max(len(filtered_jobs), 1)
         st.metric(
             label="Avg Min Salary",
-            value=format_salary(int(avg_min)),
+            value=format_salary(int(metrics['avg_salary_min'])),
             delta="Monthly"
         )
     
     with col4:
-        avg_max = sum(j['salary_max'] for j in filtered_jobs if j.get('salary_max')) / max(len(filtered_jobs), 1)
         st.metric(
             label="Avg Max Salary",
-            value=format_salary(int(avg_max)),
+            value=format_salary(int(metrics['avg_salary_max'])),
             delta="Monthly"
         )
     
@@ -302,14 +306,7 @@ def main():
     
     with col2:
         st.markdown("### 📊 Experience Level Distribution")
-        exp_counts = {}
-        for job in filtered_jobs:
-            exp = job.get('experience_level', 'Unknown')
-            exp_counts[exp] = exp_counts.get(exp, 0) + 1
-        
-        df_exp = pd.DataFrame([
-            {'level': k, 'count': v} for k, v in exp_counts.items()
-        ])
+        df_exp = queries.experience_counts(days, filters)
         fig = px.pie(
             df_exp,
             values='count',
@@ -373,27 +370,9 @@ def main():
     
     with col1:
         st.markdown("### Salary Range by Experience Level")
-        salary_by_exp = {}
-        for job in filtered_jobs:
-            exp = job.get('experience_level', 'Unknown')
-            if exp not in salary_by_exp:
-                salary_by_exp[exp] = {'min': [], 'max': []}
-            if job.get('salary_min'):
-                salary_by_exp[exp]['min'].append(job['salary_min'])
-            if job.get('salary_max'):
-                salary_by_exp[exp]['max'].append(job['salary_max'])
-        
-        salary_data = []
-        for exp, salaries in salary_by_exp.items():
-            if salaries['min'] and salaries['max']:
-                salary_data.append({
-                    'Experience Level': exp,
-                    'Avg Min Salary': sum(salaries['min']) / len(salaries['min']),
-                    'Avg Max Salary': sum(salaries['max']) / len(salaries['max'])
-                })
+        df_salary = queries.salary_by_experience(days, filters)
         
-        if salary_data:
-            df_salary = pd.DataFrame(salary_data)
+        if not df_salary.empty:
             fig = go.Figure()
             fig.add_trace(go.Bar(
                 name='Min Salary',
@@ -417,7 +396,7 @@ def main():
     
     with col2:
         st.markdown("### Salary Distribution")
-        salaries = [j['salary_max'] for j in filtered_jobs if j.get('salary_max')]
+        salaries = queries.salaries(days, filters)
         if salaries:
             fig = px.histogram(
                 x=salaries,
@@ -435,16 +414,8 @@ def main():
     # Search
     search_term = st.text_input("🔍 Search jobs by title, company, or skills", "")
     
-    # Filter by search
-    display_jobs = filtered_jobs
-    if search_term:
-        search_lower = search_term.lower()
-        display_jobs = [
-            j for j in filtered_jobs
-            if search_lower in j['title'].lower()
-            or search_lower in j['company_name'].lower()
-            or any(search_lower in s.lower() for s in j.get('skills', []))
-        ]
+    # Filter by search (the first 100 matches, newest first)
+    display_jobs, total_jobs = queries.search(search_term, days, filters, limit=100)
     
     # Format for display
     df_display = pd.DataFrame([
@@ -458,7 +429,7 @@ def main():
             'Posted': str(j.get('posted_date', ''))[:10] if j.get('posted_date') else 'N/A',
             'Skills': ', '.join(j.get('skills', [])[:5]),
         }
-        for j in display_jobs[:100]
+        for j in display_jobs
     ])
     
     st.dataframe(
@@ -473,7 +444,7 @@ def main():
         }
     )
     
-    st.markdown(f"**Showing {len(df_display)} of {len(filtered_jobs)} jobs matching your criteria**")
+    st.markdown(f"**Showing {len(df_display)} of {total_jobs:,} jobs matching your criteria**")
     
     # Footer
     st.markdown("---")
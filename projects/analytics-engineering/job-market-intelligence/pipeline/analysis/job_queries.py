@@ -0,0 +1,243 @@
+"""
+DuckDB queries behind the dashboard
+
+The dashboard used to load every job in the selected window as a list of
+dicts and filter, count and search it with Python loops on every rerun,
+so each interaction cost time proportional to the number of jobs. The
+queries here are run by an embedded DuckDB instead, straight over the job
+store's Parquet files: each query reads only the files of the selected
+scrape-date window (picked from the store's manifest, like
+JobStore.read) and only the displayed columns (descriptions are never
+read), and filters, aggregations and searches are one SQL statement each.
+Nothing is materialized, so memory doesn't grow with the history and a
+90-day view costs the same however much older data the store holds.
+
+One JobQueries object is meant to be shared by a whole process (the
+dashboard keeps it in st.cache_resource). Queries run on their own
+cursors, so concurrent sessions don't share a connection, and refresh()
+swaps in a changed manifest in one assignment while they run. The
+dashboard passes refresh() the manifest recorded in its snapshot (see
+pipeline.storage.snapshot), so the jobs it lists match its statistics.
+
+Usage:
+    queries = JobQueries('data/processed/jobs')
+    queries.refresh()
+    counts = queries.experience_counts(days=90, filters={'source': 'remoteok'})
+    rows, total = queries.search('python', days=90)
+"""
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+from ..storage.job_store import MANIFEST_NAME, SCHEMA, JobStore
+
+# Columns read from the Parquet files, with the dashboard's defaults for missing values
+JOB_COLUMNS = {
+    'job_id': 'job_id',
+    'title': "coalesce(title, '')",
+    'company_name': "coalesce(company_name, '')",
+    'location': "coalesce(location, 'Unknown')",
+    'experience_level': "coalesce(experience_level, 'Unknown')",
+    'source': "coalesce(source, '')",
+    'salary_min': 'salary_min',
+    'salary_max': 'salary_max',
+    'posted_date': 'posted_date',
+    'skills': "coalesce(skills, [])",
+}
+
+SELECT_COLUMNS = ', '.join(f"{expression} AS {name}" for name, expression in JOB_COLUMNS.items())
+
+# Columns the dashboard filters on
+FILTER_COLUMNS = ['location', 'experience_level', 'source']
+
+
+class JobQueries:
+    """Dashboard queries over the job store, run by an embedded DuckDB"""
+
+    def __init__(self, root: Union[str, Path], connection=None):
+        """
+        Args:
+            root: Job store directory
+            connection: DuckDB connection to use (default: a new in-memory database)
+        """
+        if not DUCKDB_AVAILABLE:
+            raise ImportError("duckdb is required for the dashboard queries: pip install duckdb")
+        self.root = Path(root)
+        self.connection = connection or duckdb.connect()
+        self.store = JobStore(self.root)
+        self.version = None
+        self._lock = threading.Lock()
+
+        # Stands in for the files when a window has none
+        self.connection.register('empty_jobs', SCHEMA.empty_table())
+        self.connection.execute(f"""
+            CREATE OR REPLACE TABLE no_jobs AS
+            SELECT {SELECT_COLUMNS}, CAST(NULL AS VARCHAR) AS scrape_date FROM empty_jobs
+        """)
+        self.connection.unregister('empty_jobs')
+
+    def _store_version(self) -> Optional[Tuple[int, int]]:
+        """Identifies the manifest's contents; the store rewrites it on every change"""
+        try:
+            stat = (self.root / MANIFEST_NAME).stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def refresh(self, manifest: Optional[Dict] = None) -> bool:
+        """
+        Re-read the job store's manifest if it changed since the last call
+
+        Args:
+            manifest: A recorded manifest to query instead of the current one,
+                e.g. the 'job_store' entry of a dashboard snapshot
+
+        Returns:
+            Whether the queries switched manifests
+        """
+        with self._lock:
+            if manifest is not None:
+                version = ('recorded', manifest.get('version'), manifest.get('updated_at'))
+            else:
+                version = self._store_version()
+            if version == self.version and version is not None:
+                return False
+            self.store = JobStore(self.root, manifest)
+            self.version = version
+            return True
+
+    # Query building
+
+    def paths(self, days: Optional[int] = None) -> List[str]:
+        """Parquet files of the jobs scraped in the last `days` days"""
+        return [str(self.root / entry['path']) for entry in self.store.files(days=days)]
+
+    def _jobs(self, days: Optional[int] = None, filters: Optional[Dict[str, str]] = None,
+              search: Optional[str] = None) -> Tuple[str, List]:
+        """FROM item and WHERE clause over the window's files, with their parameters"""
+        paths = self.paths(days)
+        where, parameters = self._where(days, filters, search)
+        if not paths:
+            return f"no_jobs AS jobs {where}", parameters
+        source = (
+            f"(SELECT {SELECT_COLUMNS}, regexp_extract(filename, 'scrape_date=([0-9-]+)', 1) AS scrape_date"
+            f" FROM read_parquet(?, filename = true, union_by_name = true)) AS jobs"
+        )
+        return f"{source} {where}", [paths] + parameters
+
+    def _select(self, sql: str, days: Optional[int] = None, filters: Optional[Dict[str, str]] = None,
+                search: Optional[str] = None):
+        """
+        Run a query whose {jobs} stands for the matching jobs (see _where())
+
+        A compaction may delete files of the manifest read last; the query is
+        then rerun once over the store's current manifest.
+        """
+        for attempt in range(2):
+            jobs, parameters = self._jobs(days, filters, search)
+            try:
+                return self.connection.cursor().execute(sql.format(jobs=jobs), parameters)
+            except duckdb.IOException:
+                if attempt or not self.refresh():
+                    raise
+
+    @staticmethod
+    def _where(days: Optional[int] = None, filters: Optional[Dict[str, str]] = None,
+               search: Optional[str] = None) -> Tuple[str, List]:
+        """
+        WHERE clause and its parameters
+
+        Args:
+            days: Only jobs scraped in the last `days` days (None = everything)
+            filters: Column -> value to match exactly (see FILTER_COLUMNS)
+            search: Case-insensitive substring of the title, company or a skill
+        """
+        conditions, parameters = [], []
+        if days is not None:
+            conditions.append('scrape_date >= ?')
+            parameters.append((date.today() - timedelta(days=days)).isoformat())
+        for column, value in (filters or {}).items():
+            if column not in FILTER_COLUMNS:
+                raise ValueError(f"Can't filter on {column}, expected one of {FILTER_COLUMNS}")
+            conditions.append(f"{column} = ?")
+            parameters.append(value)
+        if search:
+            conditions.append(
+                "(contains(lower(title), ?) OR contains(lower(company_name), ?)"
+                " OR len(list_filter(skills, s -> contains(lower(s), ?))) > 0)"
+            )
+            parameters.extend([search.lower()] * 3)
+        clause = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        return clause, parameters
+
+    # Queries
+
+    def options(self, column: str, days: Optional[int] = None) -> List[str]:
+        """Distinct values of a filter column, sorted"""
+        if column not in FILTER_COLUMNS:
+            raise ValueError(f"No options for {column}, expected one of {FILTER_COLUMNS}")
+        rows = self._select(f"SELECT DISTINCT {column} FROM {{jobs}} ORDER BY 1", days).fetchall()
+        return [row[0] for row in rows]
+
+    def metrics(self, days: Optional[int] = None, filters: Optional[Dict[str, str]] = None) -> Dict:
+        """Job count and salary averages (salary totals over all matching jobs)"""
+        jobs, salary_min, salary_max = self._select("""
+            SELECT count(*), coalesce(sum(salary_min), 0), coalesce(sum(salary_max), 0)
+            FROM {jobs}
+        """, days, filters).fetchone()
+        return {
+            'jobs': jobs,
+            'avg_salary_min': salary_min / max(jobs, 1),
+            'avg_salary_max': salary_max / max(jobs, 1),
+        }
+
+    def experience_counts(self, days: Optional[int] = None, filters: Optional[Dict[str, str]] = None):
+        """DataFrame of (level, count)"""
+        return self._select("""
+            SELECT experience_level AS level, count(*) AS count
+            FROM {jobs}
+            GROUP BY 1 ORDER BY 2 DESC
+        """, days, filters).df()
+
+    def salary_by_experience(self, days: Optional[int] = None, filters: Optional[Dict[str, str]] = None):
+        """DataFrame of average min and max salary per experience level with both known"""
+        return self._select("""
+            SELECT experience_level AS "Experience Level",
+                   avg(nullif(salary_min, 0)) AS "Avg Min Salary",
+                   avg(nullif(salary_max, 0)) AS "Avg Max Salary"
+            FROM {jobs}
+            GROUP BY 1
+            HAVING "Avg Min Salary" IS NOT NULL AND "Avg Max Salary" IS NOT NULL
+            ORDER BY 1
+        """, days, filters).df()
+
+    def salaries(self, days: Optional[int] = None, filters: Optional[Dict[str, str]] = None) -> List[int]:
+        """Known maximum salaries"""
+        rows = self._select("SELECT salary FROM (SELECT salary_max AS salary FROM {jobs}) WHERE salary > 0",
+                            days, filters)
+        return [row[0] for row in rows.fetchall()]
+
+    def search(self, term: str = '', days: Optional[int] = None, filters: Optional[Dict[str, str]] = None,
+               limit: int = 100) -> Tuple[List[Dict], int]:
+        """
+        Jobs matching the filters and a search term
+
+        Returns:
+            (up to `limit` jobs as dicts, number of jobs matching the filters alone)
+        """
+        rows = self._select(f"""
+            SELECT * EXCLUDE (scrape_date) FROM {{jobs}}
+            ORDER BY scrape_date DESC, job_id
+            LIMIT {int(limit)}
+        """, days, filters, term)
+        names = [column[0] for column in rows.description]
+        jobs = [dict(zip(names, row)) for row in rows.fetchall()]
+        total = self.metrics(days, filters)['jobs']
+        return jobs, total
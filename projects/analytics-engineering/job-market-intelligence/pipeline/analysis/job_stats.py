@@ -0,0 +1,114 @@
+"""
+Vectorized job statistics
+
+Computes every dashboard aggregate (skill, company, location, source,
+experience and scrape date counts, salary sums) from a columnar Arrow
+table with pyarrow compute kernels instead of walking job dicts one by
+one. Skills are exploded from their list column with the index of the job
+they belong to, so a skill listed twice in one job still counts once.
+
+The result is an aggregate state in the format of
+pipeline.storage.aggregates, so a full computation and the incremental
+updates share one set of rules and stats() formats both the same way.
+Tables read from the job store are used as they are; lists of job dicts
+are converted once with job_table().
+"""
+from typing import Dict, Iterable
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from ..storage.aggregates import AGGREGATE_COLUMNS, LOCATION_LENGTH, SALARY_FIELDS, _empty_state
+from ..storage.job_store import SCHEMA, _to_int, _to_string, _to_timestamp
+
+STATS_SCHEMA = pa.schema([SCHEMA.field(name) for name in AGGREGATE_COLUMNS])
+
+
+def job_table(jobs: Iterable[Dict]) -> pa.Table:
+    """Arrow table of the fields the statistics read"""
+    rows = []
+    for job in jobs:
+        skills = job.get('skills')
+        rows.append({
+            'skills': [str(skill) for skill in skills] if isinstance(skills, (list, tuple)) else [],
+            'company_name': _to_string(job.get('company_name')),
+            'location': _to_string(job.get('location')),
+            'source': _to_string(job.get('source')),
+            'experience_level': _to_string(job.get('experience_level')),
+            'salary_min': _to_int(job.get('salary_min')),
+            'salary_max': _to_int(job.get('salary_max')),
+            'scraped_at': _to_timestamp(job.get('scraped_at')),
+        })
+    return pa.Table.from_pylist(rows, schema=STATS_SCHEMA)
+
+
+def _strings(table: pa.Table, name: str) -> pa.Array:
+    column = table.column(name).combine_chunks()
+    if pa.types.is_dictionary(column.type):
+        column = column.dictionary_decode()
+    return column
+
+
+def _or_default(array: pa.Array, default: str) -> pa.Array:
+    """Nulls and empty strings replaced by a default"""
+    blank = pc.or_kleene(pc.is_null(array), pc.equal(array, ''))
+    return pc.if_else(blank, default, array)
+
+
+def _counts(array: pa.Array) -> Dict[str, int]:
+    counts = pc.value_counts(array.drop_null())
+    return dict(zip(counts.field('values').to_pylist(), counts.field('counts').to_pylist()))
+
+
+def skill_counts(table: pa.Table) -> Dict[str, int]:
+    """Jobs per skill, counting each skill once per job"""
+    skills = table.column('skills').combine_chunks()
+    encoded = pc.dictionary_encode(pc.list_flatten(skills))
+    names = encoded.dictionary
+    if not len(names):
+        return {}
+
+    # Skills are hashed once into codes; the rest works on integers
+    codes = pc.cast(encoded.indices, pa.int64())
+    jobs = pc.cast(pc.list_parent_indices(skills), pa.int64())
+    valid = pc.fill_null(pc.greater(pc.utf8_length(names), 1), False)
+    kept = pc.fill_null(pc.take(valid, codes), False)
+    codes, jobs = codes.filter(kept), jobs.filter(kept)
+
+    # One (job, skill) pair per job that lists a skill, however often
+    pairs = pc.unique(pc.add(pc.multiply(jobs, len(names)), codes))
+    counts = pc.value_counts(pc.subtract(pairs, pc.multiply(pc.divide(pairs, len(names)), len(names))))
+    return dict(zip(pc.take(names, counts.field('values')).to_pylist(), counts.field('counts').to_pylist()))
+
+
+def compute_state(table: pa.Table) -> Dict:
+    """
+    Aggregate state of every job in a table
+
+    Args:
+        table: Jobs with (at least) the AGGREGATE_COLUMNS
+    """
+    state = _empty_state()
+    state['jobs'] = table.num_rows
+    if not table.num_rows:
+        return state
+
+    company = _strings(table, 'company_name')
+    known_company = pc.fill_null(pc.and_(pc.not_equal(company, ''), pc.not_equal(company, 'Unknown')), False)
+    scraped_at = _strings(table, 'scraped_at')
+
+    counters = state['counters']
+    counters['skill'] = skill_counts(table)
+    counters['company'] = _counts(company.filter(known_company))
+    counters['location'] = _counts(pc.utf8_slice_codeunits(
+        _or_default(_strings(table, 'location'), 'Unknown'), 0, LOCATION_LENGTH))
+    counters['source'] = _counts(_or_default(_strings(table, 'source'), 'unknown'))
+    counters['experience'] = _counts(_or_default(_strings(table, 'experience_level'), 'Unknown'))
+    counters['scrape_date'] = _counts(pc.utf8_slice_codeunits(
+        scraped_at.filter(pc.fill_null(pc.not_equal(scraped_at, ''), False)), 0, 10))
+
+    for field in SALARY_FIELDS:
+        salary = table.column(field)
+        paid = salary.filter(pc.fill_null(pc.not_equal(salary, 0), False))
+        state['salary'][field] = {'sum': pc.sum(paid).as_py() or 0, 'count': len(paid)}
+    return state
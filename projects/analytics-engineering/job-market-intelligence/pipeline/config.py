@@ -2,10 +2,13 @@
 Configuration for Job Market Intelligence Platform
 """
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
 
+PROJECT_DIR = Path(__file__).parent.parent
+
 # Database Configuration
 DATABASE_CONFIG = {
     'host': os.getenv('DB_HOST', 'localhost'),
@@ -21,13 +24,62 @@ DATABASE_URL = os.getenv(
     f"{DATABASE_CONFIG['host']}:{DATABASE_CONFIG['port']}/{DATABASE_CONFIG['database']}"
 )
 
+# Connection pooling: batch workers keep connections open between sessions;
+# DB_POOL_CLASS=null opens one per session (serverless / short-lived processes)
+DATABASE_POOL_CONFIG = {
+    'pool_class': os.getenv('DB_POOL_CLASS', 'queue'),  # queue, null or static
+    'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+    'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+    'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),  # seconds to wait for a free connection
+    'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),  # seconds before a connection is replaced
+    'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true',  # test connections on checkout
+    # Bulk sessions (whole pipeline stages on one connection)
+    'bulk_fetch_size': int(os.getenv('DB_BULK_FETCH_SIZE', 1000)),  # rows per server-side cursor fetch
+    'bulk_commit_every': int(os.getenv('DB_BULK_COMMIT_EVERY', 500)),  # units of work per commit
+}
+
+# Monthly partitions of time-series tables (see pipeline.database.partitions)
+PARTITION_CONFIG = {
+    'months_ahead': int(os.getenv('PARTITION_MONTHS_AHEAD', 3)),  # future months created in advance
+    'drop_expired': os.getenv('PARTITION_DROP_EXPIRED', 'false').lower() == 'true',  # else only detach
+    'tables': {
+        'jobs': {
+            'column': 'scraped_at',
+            'retention_months': int(os.getenv('JOBS_RETENTION_MONTHS', 24)),
+        },
+    },
+}
+
 # Scraping Configuration
 SCRAPING_CONFIG = {
     'user_agent': 'JobMarketIntelligence/1.0 (Educational Project; contact@example.com)',
-    'rate_limit_delay': 2,  # seconds between requests
+    'rate_limit_delay': 2,  # starting delay between requests to a site; adapts to its responses
+    'min_request_delay': float(os.getenv('MIN_REQUEST_DELAY', 0.5)),  # fastest pacing for a healthy site
+    'max_request_delay': float(os.getenv('MAX_REQUEST_DELAY', 60)),  # slowest pacing for a struggling site
+    'circuit_failure_threshold': 5,  # consecutive failures before a site is skipped
+    'circuit_cooldown': 120,  # seconds before a skipped site is tried again
     'max_concurrent_requests': 2,
     'timeout': 30,
     'retry_times': 3,
+    'db_batch_size': 500,  # jobs per upsert statement
+    'http_cache_enabled': os.getenv('HTTP_CACHE_ENABLED', 'true').lower() == 'true',
+    'http_cache_path': os.getenv('HTTP_CACHE_PATH', str(PROJECT_DIR / 'data' / 'cache' / 'http_cache.sqlite')),
+    'html_parser': os.getenv('HTML_PARSER', 'lxml'),  # html.parser, lxml or selectolax
+    'selector_profile_path': os.getenv('SELECTOR_PROFILE_PATH', str(PROJECT_DIR / 'data' / 'cache' / 'selector_profiles.json')),
+    # Stop paginating a search after this many consecutive pages without new jobs
+    'incremental_crawl': os.getenv('INCREMENTAL_CRAWL', 'true').lower() == 'true',
+    'incremental_stale_pages': int(os.getenv('INCREMENTAL_STALE_PAGES', 1)),
+    # Every Nth run of a source crawls all pages so missed jobs are counted (0: only --full-crawl)
+    'full_crawl_every': int(os.getenv('FULL_CRAWL_EVERY', 4)),
+    # Expire jobs missing from this many consecutive complete runs of their source
+    'liveness_tracking': os.getenv('LIVENESS_TRACKING', 'true').lower() == 'true',
+    'expire_after_missed_runs': int(os.getenv('EXPIRE_AFTER_MISSED_RUNS', 3)),
+    'liveness_min_seen_ratio': float(os.getenv('LIVENESS_MIN_SEEN_RATIO', 0.5)),  # else the run counts no misses
+    # Fetch each job's detail page for the full description
+    'detail_enrichment': os.getenv('DETAIL_ENRICHMENT', 'true').lower() == 'true',
+    'detail_workers': int(os.getenv('DETAIL_WORKERS', 8)),  # detail pages in flight or buffered
+    # Recorded responses for offline runs (scripts/benchmark_scrapers.py)
+    'fixtures_dir': os.getenv('FIXTURES_DIR', str(PROJECT_DIR / 'data' / 'fixtures')),
 }
 
 # Job Boards to Scrape
@@ -0,0 +1,83 @@
+"""
+Run-scoped company name -> id resolution with bulk get-or-create
+"""
+import logging
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from .connection import get_db
+from .models import Company
+
+logger = logging.getLogger(__name__)
+
+
+class CompanyResolver:
+    """
+    Resolve company names to ids with an in-memory cache
+
+    The cache is preloaded from `companies` on first use. Unseen names are
+    created with one multi-row INSERT ... ON CONFLICT (name) DO NOTHING
+    RETURNING, followed by one SELECT for names another writer created
+    concurrently.
+
+    Usage:
+        resolver = CompanyResolver()
+        ids = resolver.resolve_many(['Safaricom', 'KCB Group'])
+    """
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.loaded = False
+
+    def load(self):
+        """Preload every known company"""
+        with get_db() as db:
+            self.ids = dict(db.execute(select(Company.name, Company.id)).all())
+        self.loaded = True
+        logger.info(f"Loaded {len(self.ids)} companies")
+
+    def resolve(self, name: str) -> Optional[int]:
+        """Resolve a single company name"""
+        return self.resolve_many([name]).get(name)
+
+    def resolve_many(self, names: Iterable[str]) -> Dict[str, int]:
+        """
+        Resolve company names, creating the missing ones
+
+        Args:
+            names: Company names (duplicates and empty names are ignored)
+
+        Returns:
+            Dict mapping each name to its company id
+        """
+        if not self.loaded:
+            self.load()
+
+        names = {name for name in names if name}
+        missing = sorted(names - self.ids.keys())
+
+        if missing:
+            table = Company.__table__
+            with get_db() as db:
+                stmt = insert(table).values(
+                    [{'name': name} for name in missing]
+                ).on_conflict_do_nothing(
+                    index_elements=['name']
+                ).returning(table.c.name, table.c.id)
+
+                created = dict(db.execute(stmt).all())
+                self.ids.update(created)
+
+                existing = [name for name in missing if name not in created]
+                if existing:
+                    rows = db.execute(
+                        select(table.c.name, table.c.id).where(table.c.name.in_(existing))
+                    ).all()
+                    self.ids.update(dict(rows))
+
+            if created:
+                logger.info(f"Created {len(created)} new companies")
+
+        return {name: self.ids[name] for name in names if name in self.ids}
@@ -1,23 +1,69 @@
 """
 Database connection management
+
+The engine pools connections (QueuePool by default), so the many short
+get_db() sessions of a batch run reuse open connections instead of paying
+for a TCP connect, TLS handshake and authentication each time. The pool
+is configured through the environment (see DATABASE_POOL_CONFIG);
+DB_POOL_CLASS=null switches to one connection per session for serverless
+or short-lived processes, where idle pooled connections would be cut.
+
+Whole pipeline stages can instead run in one bulk_session(): one session
+on one connection, large reads paged by key and a commit every
+`commit_every` units of work.
 """
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
-from sqlalchemy.pool import NullPool
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Query, sessionmaker, scoped_session
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
 from contextlib import contextmanager
+from typing import Iterator, Optional
 import logging
 
 from .models import Base
-from ..config import DATABASE_URL
+from .partitions import ensure_all_partitions
+from .integrity import create_integrity_triggers, drop_integrity_functions
+from .stats_views import create_stats_views, drop_stats_views
+from ..config import DATABASE_URL, DATABASE_POOL_CONFIG
 
 logger = logging.getLogger(__name__)
 
+POOL_CLASSES = {
+    'queue': QueuePool,
+    'null': NullPool,
+    'static': StaticPool,
+}
+
+
+def create_db_engine(url: str = DATABASE_URL, **settings):
+    """
+    Engine with the configured connection pool
+
+    Args:
+        url: Database URL
+        settings: Overrides of DATABASE_POOL_CONFIG entries
+    """
+    config = {**DATABASE_POOL_CONFIG, **settings}
+    if config['pool_class'] not in POOL_CLASSES:
+        raise ValueError(f"Unknown pool class {config['pool_class']!r}, expected one of {list(POOL_CLASSES)}")
+    
+    options = {
+        'poolclass': POOL_CLASSES[config['pool_class']],
+        'pool_pre_ping': config['pool_pre_ping'],
+        'echo': False,  # Set to True for SQL query logging
+    }
+    if options['poolclass'] is QueuePool:
+        options.update(
+            pool_size=config['pool_size'],
+            max_overflow=config['max_overflow'],
+            pool_timeout=config['pool_timeout'],
+            pool_recycle=config['pool_recycle'],
+        )
+    return create_engine(url, **options)
+
+
 # Create engine
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=NullPool,  # Use NullPool for serverless/short-lived connections
-    echo=False,  # Set to True for SQL query logging
-)
+engine = create_db_engine()
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -27,9 +73,13 @@ Session = scoped_session(SessionLocal)
 
 
 def init_db():
-    """Initialize database (create tables)"""
+    """Initialize database (create tables, their monthly partitions, integrity triggers and the stats views)"""
     try:
         Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            ensure_all_partitions(connection)
+            create_integrity_triggers(connection)
+            create_stats_views(connection)
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
@@ -39,7 +89,11 @@ def init_db():
 def drop_db():
     """Drop all tables (use with caution!)"""
     try:
+        with engine.begin() as connection:
+            drop_stats_views(connection)
         Base.metadata.drop_all(bind=engine)
+        with engine.begin() as connection:
+            drop_integrity_functions(connection)
         logger.info("Database tables dropped successfully")
     except Exception as e:
         logger.error(f"Error dropping database tables: {e}")
@@ -72,3 +126,128 @@ def get_session():
     return SessionLocal()
 
 
+class BulkSession:
+    """
+    A session that commits every `commit_every` units of work
+
+    Use through bulk_session(). Call done() after each unit (a job, a
+    user, ...); the session commits once enough have accumulated, so a
+    failure loses at most one batch. stream() reads large results in
+    pages ordered by a unique key, each page a short query for the rows
+    after the last key seen. No cursor stays open between pages, so the
+    commits happen on schedule while a stream is being consumed.
+    """
+
+    def __init__(self, session, commit_every: int, fetch_size: int):
+        self.session = session
+        self.commit_every = commit_every
+        self.fetch_size = fetch_size
+        self.pending = 0
+        self.commits = 0
+
+    def stream(self, query, key=None, fetch_size: Optional[int] = None) -> Iterator:
+        """
+        Iterate a query's results `fetch_size` rows at a time
+
+        Rows inserted behind the last key read, after the stream started,
+        are not returned.
+
+        Args:
+            query: ORM Query or select() statement, without an ORDER BY or
+                LIMIT of its own; yields what the query yields
+            key: Unique column to page by, selected by the query (default:
+                the primary key of the query's first entity)
+            fetch_size: Rows per page (default: the session's)
+        """
+        fetch_size = fetch_size or self.fetch_size
+        if key is None:
+            key = _primary_key(query)
+        last = None
+        while True:
+            page = query if last is None else query.filter(key > last)
+            page = page.order_by(None).order_by(key).limit(fetch_size)
+            rows = page.all() if isinstance(page, Query) else self.session.execute(page).all()
+            yield from rows
+            if len(rows) < fetch_size:
+                return
+            last = _key_value(rows[-1], key)
+
+    def done(self, count: int = 1):
+        """Record finished units of work, committing every `commit_every`"""
+        self.pending += count
+        if self.pending >= self.commit_every:
+            self.commit()
+
+    def commit(self):
+        """Commit the pending work"""
+        self.session.commit()
+        self.commits += 1
+        self.pending = 0
+
+
+def _primary_key(query):
+    """Single-column primary key of a query's first entity"""
+    entity = query.column_descriptions[0]['entity']
+    mapper = inspect(entity)
+    if len(mapper.primary_key) != 1:
+        raise ValueError(f"{entity.__name__} has a composite primary key; pass stream() a key")
+    return getattr(entity, mapper.get_property_by_column(mapper.primary_key[0]).key)
+
+
+def _key_value(result, key):
+    """Value of the paging key in one result (a row, or an entity)"""
+    if isinstance(result, Row):
+        return result._mapping[key]
+    return getattr(result, key.key)
+
+
+@contextmanager
+def bulk_session(commit_every: Optional[int] = None, fetch_size: Optional[int] = None):
+    """
+    One session on one connection for a whole pipeline stage
+    
+    Objects stay loaded after commits (expire_on_commit=False), so
+    committing doesn't reload every object touched so far.
+    
+    Args:
+        commit_every: Units of work per commit (default: DB_BULK_COMMIT_EVERY)
+        fetch_size: Rows per stream() page (default: DB_BULK_FETCH_SIZE)
+    
+    Usage:
+        with bulk_session(commit_every=500) as bulk:
+            for job in bulk.stream(bulk.session.query(Job), key=Job.id):
+                process(job, bulk.session)
+                bulk.done()
+    """
+    db = SessionLocal(expire_on_commit=False)
+    bulk = BulkSession(
+        db,
+        commit_every or DATABASE_POOL_CONFIG['bulk_commit_every'],
+        fetch_size or DATABASE_POOL_CONFIG['bulk_fetch_size'],
+    )
+    try:
+        yield bulk
+        bulk.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Database error after {bulk.commits} bulk commits: {e}")
+        raise
+    finally:
+        db.close()
+
+
+@contextmanager
+def use_db(db=None):
+    """
+    The given session, or a new get_db() session when None
+    
+    Lets a function that normally opens its own session run inside a
+    caller's bulk session instead. There its work runs in a savepoint, so
+    a failing unit is rolled back alone and the rest of the batch goes on.
+    """
+    if db is not None:
+        with db.begin_nested():
+            yield db
+    else:
+        with get_db() as db:
+            yield db
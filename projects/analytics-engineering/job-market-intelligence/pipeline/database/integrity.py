@@ -0,0 +1,125 @@
+"""
+Uniqueness and references the partitioned jobs table can't declare
+
+A partitioned table's unique constraints must include the partition
+column, so jobs can only declare (job_id, scraped_at) unique, and other
+tables can't reference jobs.id with a foreign key. Triggers stand in for
+both:
+
+    job_keys        one row per job_id with its first-seen scraped_at (a plain
+                    table, so job_id is its primary key). Inserting a job whose
+                    job_id is stored under another scraped_at fails with a
+                    unique violation, and updates can't change job_id or
+                    scraped_at, so a job never gets a second row in a later
+                    partition. JobBatchWriter reads first-seen times from it.
+    job_skills,     inserting or repointing a row at a jobs.id that doesn't
+    job_alerts,     exist fails with a foreign key violation, and deleting a
+    job_applications  job deletes its rows (ON DELETE CASCADE)
+
+Detaching a partition fires no delete triggers, so
+pipeline.database.partitions deletes the job_keys and child rows of its
+jobs first. delete_orphans() removes child rows left without a job by
+anything else (e.g. a partition dropped by hand); scripts/manage_partitions.py
+runs it after the retention policy.
+"""
+import logging
+from typing import Dict
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# (table, column) holding a jobs.id
+CHILD_TABLES = [('job_skills', 'job_id'), ('job_alerts', 'job_id'), ('job_applications', 'job_id')]
+
+JOB_KEY_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION jobs_register_key() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO job_keys (job_id, scraped_at) VALUES (NEW.job_id, NEW.scraped_at)
+    ON CONFLICT (job_id) DO NOTHING;
+    IF NOT FOUND AND NOT EXISTS (
+        SELECT 1 FROM job_keys WHERE job_id = NEW.job_id AND scraped_at = NEW.scraped_at
+    ) THEN
+        RAISE EXCEPTION 'job_id % is already stored with another scraped_at', NEW.job_id
+            USING ERRCODE = 'unique_violation', HINT = 'Insert it with its first-seen scraped_at from job_keys';
+    END IF;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION jobs_pin_key() RETURNS trigger AS $$
+BEGIN
+    IF NEW.job_id IS DISTINCT FROM OLD.job_id OR NEW.scraped_at IS DISTINCT FROM OLD.scraped_at THEN
+        RAISE EXCEPTION 'job_id and scraped_at of job % cannot change', OLD.job_id
+            USING ERRCODE = 'integrity_constraint_violation';
+    END IF;
+    RETURN NEW;
+END $$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION jobs_delete_dependents() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM job_keys WHERE job_id = OLD.job_id AND scraped_at = OLD.scraped_at;
+    DELETE FROM job_skills WHERE job_id = OLD.id;
+    DELETE FROM job_alerts WHERE job_id = OLD.id;
+    DELETE FROM job_applications WHERE job_id = OLD.id;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION jobs_check_reference() RETURNS trigger AS $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM jobs WHERE id = NEW.job_id) THEN
+        RAISE EXCEPTION '% row references job % that does not exist', TG_TABLE_NAME, NEW.job_id
+            USING ERRCODE = 'foreign_key_violation';
+    END IF;
+    RETURN NEW;
+END $$ LANGUAGE plpgsql;
+"""
+
+TRIGGERS = [
+    ('jobs_register_key', 'jobs', 'AFTER INSERT', 'jobs_register_key'),
+    ('jobs_pin_key', 'jobs', 'BEFORE UPDATE OF job_id, scraped_at', 'jobs_pin_key'),
+    ('jobs_delete_dependents', 'jobs', 'AFTER DELETE', 'jobs_delete_dependents'),
+] + [
+    (f'{table}_check_job', table, f'BEFORE INSERT OR UPDATE OF {column}', 'jobs_check_reference')
+    for table, column in CHILD_TABLES
+]
+
+FUNCTIONS = ['jobs_register_key', 'jobs_pin_key', 'jobs_delete_dependents', 'jobs_check_reference']
+
+
+def create_integrity_triggers(connection):
+    """Create the trigger functions and (re)create the triggers; registers jobs missing from job_keys"""
+    connection.execute(text(JOB_KEY_FUNCTIONS))
+    for name, table, timing, function in TRIGGERS:
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {name} ON {table}"))
+        connection.execute(text(f"CREATE TRIGGER {name} {timing} ON {table} FOR EACH ROW EXECUTE FUNCTION {function}()"))
+    registered = connection.execute(text("""
+        INSERT INTO job_keys (job_id, scraped_at)
+        SELECT job_id, min(scraped_at) FROM jobs GROUP BY job_id
+        ON CONFLICT (job_id) DO NOTHING
+    """)).rowcount
+    if registered:
+        logger.info(f"Registered {registered} stored jobs in job_keys")
+
+
+def drop_integrity_functions(connection):
+    """Drop the trigger functions (dropping the tables drops the triggers)"""
+    for function in FUNCTIONS:
+        connection.execute(text(f"DROP FUNCTION IF EXISTS {function}() CASCADE"))
+
+
+def delete_orphans(connection) -> Dict[str, int]:
+    """
+    Delete child rows whose job no longer exists
+
+    Returns:
+        Rows deleted per table
+    """
+    deleted = {}
+    for table, column in CHILD_TABLES:
+        deleted[table] = connection.execute(text(f"""
+            DELETE FROM {table} child
+            WHERE NOT EXISTS (SELECT 1 FROM jobs WHERE jobs.id = child.{column})
+        """)).rowcount
+        if deleted[table]:
+            logger.info(f"Deleted {deleted[table]} {table} rows of missing jobs")
+    return deleted
@@ -0,0 +1,114 @@
+"""
+Ranked full-text and fuzzy search over the jobs table
+
+jobs carries a generated search_vector (title weighted A, company B,
+description C) with a GIN index, and pg_trgm GIN indexes on title and
+employment_type. search_jobs() matches a query as full text (web search
+syntax: "quoted phrases", or, -excluded words) or as a fuzzy title
+(trigram similarity, which tolerates typos), ranks matches by ts_rank_cd
+plus title similarity and returns one page of them with the total count.
+Every condition is answered from an index instead of a scan of the job
+descriptions, and with `days` the scraped_at bound also skips the
+monthly partitions outside the window.
+
+Usage:
+    page = search_jobs('python data engineer', filters={'source': 'brightermonday'}, page=2)
+    for job in page['results']:
+        print(job['rank'], job['title'], job['snippet'])
+"""
+import math
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import func, literal, or_, select
+
+from .connection import use_db
+from .models import Job, SEARCH_CONFIG
+
+logger = logging.getLogger(__name__)
+
+RESULT_COLUMNS = [
+    Job.id, Job.job_id, Job.title, Job.company_name, Job.location, Job.remote_type,
+    Job.employment_type, Job.experience_level, Job.salary_min, Job.salary_max,
+    Job.salary_currency, Job.posted_date, Job.source, Job.source_url,
+]
+
+# Filters matched exactly, and those matched as case-insensitive substrings
+# (ILIKE '%value%', served by their trigram index)
+FILTER_COLUMNS = ['location', 'experience_level', 'source', 'remote_type']
+SUBSTRING_COLUMNS = ['title', 'employment_type']
+
+MAX_PER_PAGE = 100
+
+SNIPPET_OPTIONS = 'MaxWords=35, MinWords=15, MaxFragments=2'
+
+
+def contains_pattern(value: str) -> str:
+    """ILIKE pattern matching `value` anywhere, with its wildcards escaped"""
+    escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+def search_jobs(query: str = '', filters: Optional[Dict[str, str]] = None, days: Optional[int] = None,
+                active_only: bool = True, page: int = 1, per_page: int = 20, db=None) -> Dict:
+    """
+    One page of jobs matching a search, best matches first
+
+    Args:
+        query: Search terms (empty: every job, newest first)
+        filters: Column -> value (see FILTER_COLUMNS and SUBSTRING_COLUMNS)
+        days: Only jobs scraped in the last `days` days
+        active_only: Skip inactive jobs
+        page: Page number, from 1
+        per_page: Results per page (at most MAX_PER_PAGE)
+        db: Session to use (default: a new one)
+
+    Returns:
+        Dict with 'results' (job dicts with 'rank' and, for a query,
+        'snippet'), 'total', 'page', 'per_page' and 'pages'
+    """
+    page = max(page, 1)
+    per_page = min(max(per_page, 1), MAX_PER_PAGE)
+    query = query.strip()
+
+    conditions = []
+    if active_only:
+        conditions.append(Job.is_active == True)
+    if days is not None:
+        conditions.append(Job.scraped_at >= datetime.utcnow() - timedelta(days=days))
+    for column, value in (filters or {}).items():
+        if column in SUBSTRING_COLUMNS:
+            conditions.append(getattr(Job, column).ilike(contains_pattern(value), escape='\\'))
+        elif column in FILTER_COLUMNS:
+            conditions.append(getattr(Job, column) == value)
+        else:
+            raise ValueError(f"Can't filter on {column}, expected one of {FILTER_COLUMNS + SUBSTRING_COLUMNS}")
+
+    columns = list(RESULT_COLUMNS)
+    if query:
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+        conditions.append(or_(Job.search_vector.op('@@')(ts_query), Job.title.op('%')(query)))
+        rank = func.ts_rank_cd(Job.search_vector, ts_query) + func.similarity(Job.title, query)
+        snippet = func.ts_headline(SEARCH_CONFIG, func.coalesce(Job.description, ''), ts_query, SNIPPET_OPTIONS)
+        columns += [rank.label('rank'), snippet.label('snippet')]
+        order = [rank.desc(), Job.posted_date.desc().nulls_last(), Job.id]
+    else:
+        columns.append(literal(0.0).label('rank'))
+        order = [Job.posted_date.desc().nulls_last(), Job.id]
+
+    with use_db(db) as db:
+        total = db.execute(select(func.count()).select_from(Job).where(*conditions)).scalar()
+        rows = db.execute(
+            select(*columns).where(*conditions).order_by(*order)
+            .limit(per_page).offset((page - 1) * per_page)
+        ).mappings().all()
+
+    logger.info(f"Search {query!r} matched {total} jobs")
+    return {
+        'results': [dict(row) for row in rows],
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'pages': math.ceil(total / per_page),
+    }
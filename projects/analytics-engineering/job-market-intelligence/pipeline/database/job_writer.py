@@ -0,0 +1,143 @@
+"""
+Batched job writer using PostgreSQL INSERT ... ON CONFLICT
+"""
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+
+from .connection import get_db
+from .models import Job, JobKey
+from .company_resolver import CompanyResolver
+from ..nlp.dedup import DedupIndex
+
+logger = logging.getLogger(__name__)
+
+JOB_COLUMNS = {column.name for column in Job.__table__.columns} - {'id', 'created_at', 'search_vector'}
+
+UNIQUE_VIOLATION = '23505'
+# Times a statement is retried after another writer registered one of its jobs first
+KEY_RACE_RETRIES = 2
+
+
+class JobBatchWriter:
+    """
+    Collect parsed jobs and upsert them in chunks
+
+    Each flush issues one INSERT ... ON CONFLICT (job_id, scraped_at) DO
+    UPDATE per distinct set of fields. jobs is partitioned by scraped_at,
+    so its unique key includes it: each row's scraped_at is resolved in the
+    statement itself, to the first-seen time in job_keys (see
+    pipeline.database.integrity) or now, so a known job's upsert hits its
+    existing row. If another writer registers one of the jobs between the
+    statement's snapshot and its insert, job_keys rejects the row with a
+    unique violation; the statement is rolled back to a savepoint and
+    rerun, and then finds the key. New and updated jobs are counted from
+    the rows the statement returns: an inserted row has created_at = now.
+    Jobs without a company_id get one from the
+    company resolver, which looks up all new names in the batch at once,
+    and a dedup index gives each job its MinHash fingerprint and
+    near-duplicate cluster as it is queued.
+
+    Usage:
+        writer = JobBatchWriter(batch_size=500)
+        for job_data in jobs:
+            writer.add(job_data)
+        writer.flush()
+        print(writer.jobs_new, writer.jobs_updated)
+    """
+
+    def __init__(self, batch_size: int = 500, company_resolver: Optional[CompanyResolver] = None,
+                 dedup_index: Optional[DedupIndex] = None):
+        self.batch_size = batch_size
+        self.company_resolver = company_resolver
+        self.dedup_index = dedup_index
+        self.pending: List[Dict] = []
+        self.jobs_written = 0
+        self.jobs_new = 0
+        self.jobs_updated = 0
+
+    def add(self, job_data: Dict):
+        """Queue a job, flushing once the batch is full"""
+        if self.dedup_index is not None:
+            self.dedup_index.add(job_data)
+        self.pending.append(job_data)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def add_many(self, jobs: Iterable[Dict]):
+        """Queue several jobs"""
+        for job_data in jobs:
+            self.add(job_data)
+
+    def flush(self) -> Tuple[int, int]:
+        """
+        Write all queued jobs
+
+        Returns:
+            Tuple of (new, updated) counts for this flush
+        """
+        if not self.pending:
+            return 0, 0
+
+        # A single statement cannot touch the same row twice, so keep the
+        # last version of each job_id
+        rows = {}
+        for job_data in self.pending:
+            rows[job_data['job_id']] = {k: v for k, v in job_data.items() if k in JOB_COLUMNS}
+        self.pending = []
+
+        if self.company_resolver:
+            unresolved = [row for row in rows.values() if not row.get('company_id') and row.get('company_name')]
+            company_ids = self.company_resolver.resolve_many(row['company_name'] for row in unresolved)
+            for row in unresolved:
+                row['company_id'] = company_ids.get(row['company_name'])
+
+        now = datetime.utcnow()
+        for job_id, row in rows.items():
+            row['scraped_at'] = func.coalesce(
+                select(JobKey.scraped_at).where(JobKey.job_id == job_id).scalar_subquery(), now
+            )
+            row['created_at'] = now
+
+        # Multi-row VALUES needs identical keys; group rows by their field set
+        # so jobs missing a field don't overwrite it with NULL on update
+        groups: Dict[frozenset, List[Dict]] = {}
+        for row in rows.values():
+            groups.setdefault(frozenset(row), []).append(row)
+
+        new = 0
+        with get_db() as db:
+            for keys, group in groups.items():
+                stmt = insert(Job.__table__).values(group)
+                update_cols = {key: stmt.excluded[key] for key in keys
+                               if key not in ('job_id', 'scraped_at', 'created_at')}
+                update_cols['updated_at'] = now
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['job_id', 'scraped_at'],
+                    set_=update_cols,
+                ).returning(Job.__table__.c.created_at == now)
+                new += sum(self._execute(db, stmt))
+
+        updated = len(rows) - new
+
+        self.jobs_written += new + updated
+        self.jobs_new += new
+        self.jobs_updated += updated
+        logger.info(f"Upserted {new + updated} jobs ({new} new, {updated} updated)")
+        return new, updated
+
+    @staticmethod
+    def _execute(db, stmt) -> List[bool]:
+        """Run an upsert, rerunning it if a concurrent writer registered one of its jobs first"""
+        for attempt in range(KEY_RACE_RETRIES + 1):
+            try:
+                with db.begin_nested():
+                    return [bool(inserted) for inserted, in db.execute(stmt)]
+            except IntegrityError as e:
+                if getattr(e.orig, 'pgcode', None) != UNIQUE_VIOLATION or attempt == KEY_RACE_RETRIES:
+                    raise
+                logger.info(f"Job registered by another writer, retrying upsert: {e.orig}")
@@ -0,0 +1,112 @@
+"""
+Job expiry from the set of jobs each scraper run saw
+
+A posting that disappears from its job board is not deleted there in a
+way a scraper can observe; it just stops showing up. After each completed
+run, track_liveness() loads the job_ids the run saw into a temporary
+table (dropped at commit, so pooled connections don't keep it) and, per
+source:
+
+    1. marks the seen jobs live (last_seen_at, missed_runs = 0, reactivated
+       if they had expired)
+    2. counts a miss for every active job of the source the run did not see,
+       with one anti-join (NOT EXISTS against the seen set), and in the same
+       statement expires those reaching SCRAPING_CONFIG['expire_after_missed_runs']
+       consecutive misses (is_active = FALSE, expires_at = now)
+
+Both are single set-based UPDATEs instead of a query and an update per job.
+A miss only counts when the run could have seen every live job: not when
+an incremental crawl stopped paginating early (see
+pipeline.scrapers.incremental), and not when the run saw fewer than
+SCRAPING_CONFIG['liveness_min_seen_ratio'] of the source's active jobs,
+which points at a broken scraper or a narrower search rather than a wave
+of expired postings. With incremental crawling on, every
+SCRAPING_CONFIG['full_crawl_every']-th run of a source is a full crawl
+(see BaseScraper.full_crawl_due), so misses are still counted.
+"""
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import text
+
+from .connection import use_db
+from ..config import SCRAPING_CONFIG
+
+logger = logging.getLogger(__name__)
+
+MARK_SEEN_SQL = """
+    UPDATE jobs j
+    SET last_seen_at = :now, missed_runs = 0, is_active = TRUE,
+        expires_at = CASE WHEN j.is_active THEN j.expires_at END
+    FROM seen_jobs s
+    WHERE j.job_id = s.job_id AND j.source = :source
+"""
+
+COUNT_MISSES_SQL = """
+    WITH missed AS (
+        UPDATE jobs j
+        SET missed_runs = j.missed_runs + 1,
+            is_active = j.missed_runs + 1 < :expire_after,
+            expires_at = CASE WHEN j.missed_runs + 1 >= :expire_after THEN :now ELSE j.expires_at END
+        WHERE j.source = :source AND j.is_active
+          AND NOT EXISTS (SELECT 1 FROM seen_jobs s WHERE s.job_id = j.job_id)
+        RETURNING j.is_active
+    )
+    SELECT count(*) AS missed, count(*) FILTER (WHERE NOT is_active) AS expired FROM missed
+"""
+
+
+def track_liveness(source: str, job_ids: Iterable[str], complete: bool = True,
+                   expire_after: Optional[int] = None, db=None) -> Dict:
+    """
+    Record the jobs a run saw and expire those missed too many runs in a row
+
+    Args:
+        source: Source the run scraped
+        job_ids: job_ids of every job the run saw
+        complete: Whether the run fetched every results page (False counts no misses)
+        expire_after: Consecutive misses before a job expires
+            (default: SCRAPING_CONFIG['expire_after_missed_runs'])
+        db: Session to use (default: a new one)
+
+    Returns:
+        Dict with seen, active, missed and expired counts and whether
+        misses were counted
+    """
+    if expire_after is None:
+        expire_after = SCRAPING_CONFIG['expire_after_missed_runs']
+    job_ids = sorted(set(job_ids))
+    now = datetime.utcnow()
+    stats = {'seen': 0, 'active': 0, 'missed': 0, 'expired': 0, 'misses_counted': False}
+
+    with use_db(db) as db:
+        stats['active'] = db.execute(
+            text("SELECT count(*) FROM jobs WHERE source = :source AND is_active"), {'source': source}
+        ).scalar()
+
+        # ON COMMIT DROP: a failed run rolls the table back with its
+        # transaction, a successful one drops it at commit. A caller's
+        # transaction may already hold it from an earlier call, so empty it
+        db.execute(text("CREATE TEMP TABLE IF NOT EXISTS seen_jobs (job_id VARCHAR(255) PRIMARY KEY) ON COMMIT DROP"))
+        db.execute(text("TRUNCATE seen_jobs"))
+        db.execute(text("INSERT INTO seen_jobs SELECT unnest(CAST(:job_ids AS VARCHAR[]))"), {'job_ids': job_ids})
+        db.execute(text("ANALYZE seen_jobs"))
+        stats['seen'] = db.execute(text(MARK_SEEN_SQL), {'source': source, 'now': now}).rowcount
+
+        # A run that saw only a small share of the source's active jobs more
+        # likely failed to parse the rest than watched them all expire
+        enough_seen = stats['seen'] >= stats['active'] * SCRAPING_CONFIG['liveness_min_seen_ratio']
+        if complete and stats['seen'] and enough_seen:
+            missed = db.execute(text(COUNT_MISSES_SQL), {
+                'source': source, 'now': now, 'expire_after': expire_after,
+            }).one()
+            stats.update(missed=missed.missed, expired=missed.expired, misses_counted=True)
+        elif not complete:
+            logger.info(f"Crawl of {source} stopped early - not counting missed jobs")
+        else:
+            logger.warning(f"Run saw {stats['seen']} of {stats['active']} active {source} jobs - "
+                           f"not counting missed jobs")
+
+    logger.info(f"Liveness of {source}: {stats['seen']} seen, {stats['missed']} missed, {stats['expired']} expired")
+    return stats
@@ -4,15 +4,28 @@ SQLAlchemy ORM models for Job Market Intelligence
 from datetime import datetime
 from sqlalchemy import (
     Column, Integer, String, Text, Boolean, DateTime, DECIMAL,
-    ForeignKey, ARRAY, JSON, UniqueConstraint, Index
+    ForeignKey, ARRAY, JSON, UniqueConstraint, Index, Computed, DDL, event
 )
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship, foreign
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 import uuid
 
 Base = declarative_base()
 
+# Trigram indexes (fuzzy and ILIKE matching) need pg_trgm
+event.listen(Base.metadata, 'before_create', DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+
+# Text search configuration of jobs.search_vector; queries must use the same
+SEARCH_CONFIG = 'english'
+
+# Title weighs most in the ranking, then company, then description
+SEARCH_VECTOR = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(company_name, '')), 'B') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'C')"
+)
+
 
 class Company(Base):
     __tablename__ = 'companies'
@@ -38,8 +51,11 @@ class Company(Base):
 class Job(Base):
     __tablename__ = 'jobs'
     
-    id = Column(Integer, primary_key=True)
-    job_id = Column(String(255), unique=True, nullable=False)
+    # Partitioned by month of scraped_at (see pipeline.database.partitions), so
+    # the primary key and unique constraints include it; job_keys keeps job_id
+    # unique across partitions (see pipeline.database.integrity)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String(255), nullable=False)
     source = Column(String(50), nullable=False)
     source_url = Column(String(1000), nullable=False)
     
@@ -71,39 +87,74 @@ class Job(Base):
     
     # Dates
     posted_date = Column(DateTime)
-    scraped_at = Column(DateTime, default=datetime.utcnow)
+    scraped_at = Column(DateTime, primary_key=True, default=datetime.utcnow)  # first seen, never updated
     expires_at = Column(DateTime)
     
     # Status
     is_active = Column(Boolean, default=True)
     applications_count = Column(Integer, default=0)
     
+    # Liveness (see pipeline.database.liveness)
+    last_seen_at = Column(DateTime)  # last run that saw the job
+    missed_runs = Column(Integer, default=0)  # consecutive complete runs that did not
+    
     # Metadata
-    metadata = Column(JSON)
+    # 'metadata' is reserved on declarative classes, so map the column under another attribute
+    extra_metadata = Column('metadata', JSON)
+    
+    # Near-duplicate detection (see pipeline.nlp.dedup)
+    minhash = Column(String(512))
+    cluster_id = Column(String(255))  # job_id of the first posting in the cluster
+    
+    # Full-text search (see pipeline.database.job_search)
+    search_vector = Column(TSVECTOR, Computed(SEARCH_VECTOR, persisted=True))
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     company = relationship('Company', back_populates='jobs')
-    skills = relationship('JobSkill', back_populates='job', cascade='all, delete-orphan')
-    alerts = relationship('JobAlert', back_populates='job', cascade='all, delete-orphan')
-    applications = relationship('JobApplication', back_populates='job', cascade='all, delete-orphan')
+    skills = relationship('JobSkill', back_populates='job', cascade='all, delete-orphan',
+                          primaryjoin='Job.id == foreign(JobSkill.job_id)')
+    alerts = relationship('JobAlert', back_populates='job', cascade='all, delete-orphan',
+                          primaryjoin='Job.id == foreign(JobAlert.job_id)')
+    applications = relationship('JobApplication', back_populates='job', cascade='all, delete-orphan',
+                                primaryjoin='Job.id == foreign(JobApplication.job_id)')
     
     # Indexes
     __table_args__ = (
+        UniqueConstraint('job_id', 'scraped_at', name='uq_jobs_job_id'),
         Index('idx_jobs_title', 'title'),
+        Index('idx_jobs_search', 'search_vector', postgresql_using='gin'),
+        Index('idx_jobs_title_trgm', 'title', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}),
+        Index('idx_jobs_employment_type_trgm', 'employment_type', postgresql_using='gin',
+              postgresql_ops={'employment_type': 'gin_trgm_ops'}),
         Index('idx_jobs_company', 'company_id'),
         Index('idx_jobs_location', 'location'),
-        Index('idx_jobs_posted_date', 'posted_date'),
+        Index('idx_jobs_posted_date', 'posted_date', postgresql_using='brin'),
+        Index('idx_jobs_scraped_at', 'scraped_at', postgresql_using='brin'),
         Index('idx_jobs_source', 'source'),
         Index('idx_jobs_active', 'is_active'),
+        Index('idx_jobs_cluster', 'cluster_id'),
+        {'postgresql_partition_by': 'RANGE (scraped_at)'},
     )
     
     def __repr__(self):
         return f"<Job(id={self.id}, title='{self.title}', company='{self.company_name}')>"
 
 
+class JobKey(Base):
+    __tablename__ = 'job_keys'
+    
+    # One row per job_id, kept by triggers on jobs, which can't declare job_id
+    # unique on its own (see pipeline.database.integrity)
+    job_id = Column(String(255), primary_key=True)
+    scraped_at = Column(DateTime, nullable=False)  # first seen; the job's partition
+    
+    def __repr__(self):
+        return f"<JobKey(job_id='{self.job_id}', scraped_at={self.scraped_at})>"
+
+
 class Skill(Base):
     __tablename__ = 'skills'
     
@@ -123,14 +174,14 @@ class JobSkill(Base):
     __tablename__ = 'job_skills'
     
     id = Column(Integer, primary_key=True)
-    job_id = Column(Integer, ForeignKey('jobs.id', ondelete='CASCADE'), nullable=False)
+    job_id = Column(Integer, nullable=False)  # jobs.id; partitioned, so no foreign key
     skill_id = Column(Integer, ForeignKey('skills.id', ondelete='CASCADE'), nullable=False)
     is_required = Column(Boolean, default=False)
     years_required = Column(Integer)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
-    job = relationship('Job', back_populates='skills')
+    job = relationship('Job', back_populates='skills', primaryjoin='Job.id == foreign(JobSkill.job_id)')
     skill = relationship('Skill', back_populates='job_skills')
     
     # Constraints
@@ -188,7 +239,7 @@ class JobAlert(Base):
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('user_profiles.id', ondelete='CASCADE'), nullable=False)
-    job_id = Column(Integer, ForeignKey('jobs.id', ondelete='CASCADE'), nullable=False)
+    job_id = Column(Integer, nullable=False)  # jobs.id; partitioned, so no foreign key
     
     match_score = Column(DECIMAL(5, 2))
     match_reasons = Column(ARRAY(Text))
@@ -202,7 +253,7 @@ class JobAlert(Base):
     
     # Relationships
     user = relationship('UserProfile', back_populates='alerts')
-    job = relationship('Job', back_populates='alerts')
+    job = relationship('Job', back_populates='alerts', primaryjoin='Job.id == foreign(JobAlert.job_id)')
     
     def __repr__(self):
         return f"<JobAlert(id={self.id}, user_id={self.user_id}, job_id={self.job_id})>"
@@ -213,7 +264,7 @@ class JobApplication(Base):
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('user_profiles.id', ondelete='CASCADE'), nullable=False)
-    job_id = Column(Integer, ForeignKey('jobs.id', ondelete='CASCADE'), nullable=False)
+    job_id = Column(Integer, nullable=False)  # jobs.id; partitioned, so no foreign key
     
     applied_at = Column(DateTime, default=datetime.utcnow)
     status = Column(String(50), default='applied')
@@ -224,7 +275,8 @@ class JobApplication(Base):
     
     # Relationships
     user = relationship('UserProfile', back_populates='applications')
-    job = relationship('Job', back_populates='applications')
+    job = relationship('Job', back_populates='applications',
+                       primaryjoin='Job.id == foreign(JobApplication.job_id)')
     
     # Constraints
     __table_args__ = (
@@ -249,7 +301,8 @@ class ScrapingLog(Base):
     jobs_updated = Column(Integer, default=0)
     
     error_message = Column(Text)
-    metadata = Column(JSON)
+    # 'metadata' is reserved on declarative classes, so map the column under another attribute
+    extra_metadata = Column('metadata', JSON)
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
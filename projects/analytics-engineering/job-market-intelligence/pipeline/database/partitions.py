@@ -0,0 +1,230 @@
+"""
+Monthly range partitions of the jobs table
+
+jobs is declared PARTITION BY RANGE (scraped_at) with one partition per
+month, plus a default partition for rows outside every month:
+
+    jobs
+        jobs_y2025m11    FOR VALUES FROM ('2025-11-01') TO ('2025-12-01')
+        jobs_y2025m12    FOR VALUES FROM ('2025-12-01') TO ('2026-01-01')
+        jobs_default     DEFAULT
+
+Indexes declared on jobs apply to every partition. The scraped_at and
+posted_date ones are BRIN: rows arrive in time order, so a few pages per
+partition summarize them. Queries with a scraped_at condition only scan
+the partitions in range (partition pruning), and old months leave the
+table by detaching their partition instead of a DELETE that bloats the
+indexes and leaves dead rows to vacuum. A detach fires no triggers, so
+the job_keys rows of the partition's jobs are deleted with it (see
+pipeline.database.integrity).
+
+ensure_partitions() creates the partitions of the current month and the
+next PARTITION_CONFIG['months_ahead']; init_db() and
+scripts/manage_partitions.py (scheduled daily) call it. Rows that landed
+in the default partition before their month existed are moved when it is
+created. apply_retention() detaches the partitions older than each
+table's retention_months, after deleting the job_keys, job_skills,
+job_alerts and job_applications rows of their jobs, and drops them when
+PARTITION_CONFIG['drop_expired'] is set (otherwise they stay behind as
+standalone tables to archive).
+
+A jobs partition holds the jobs first seen in its month, however long
+they stay posted, so one is only expired once none of its jobs is still
+live (active, or seen by a scraper within the retention period). A
+partition kept for a few long-running postings is expired by a later run,
+after liveness tracking (pipeline.database.liveness) expires them.
+"""
+import re
+import logging
+from datetime import date
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from .integrity import CHILD_TABLES
+from ..config import PARTITION_CONFIG
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PATTERN = re.compile(r'_y(\d{4})m(\d{2})$')
+
+# (table, column, key) of rows pointing at a partitioned table's rows by
+# `key`. A foreign key can't reference a partitioned table by id alone, so
+# these rows are deleted here when their partition expires.
+DEPENDENT_TABLES = {
+    'jobs': [('job_keys', 'job_id', 'job_id')] + [(table, column, 'id') for table, column in CHILD_TABLES],
+}
+
+# Condition on a partitioned table's rows that keeps their partition
+# attached past retention (:cutoff is the start of the retention period)
+LIVE_ROWS = {
+    'jobs': "is_active OR last_seen_at >= :cutoff",
+}
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def default_partition(table: str) -> str:
+    return f"{table}_default"
+
+
+def partitions(connection, table: str) -> Dict[str, Optional[date]]:
+    """Attached partitions of a table: name -> first day of its month (None for the default)"""
+    names = connection.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :table
+    """), {'table': table}).scalars()
+    result = {}
+    for name in names:
+        match = PARTITION_PATTERN.search(name)
+        result[name] = date(int(match[1]), int(match[2]), 1) if match else None
+    return result
+
+
+def create_partition(connection, table: str, column: str, month: date) -> str:
+    """
+    Create the partition of one month
+
+    PostgreSQL refuses to create a partition while the default partition
+    holds rows of its range, so those are moved: the default partition is
+    detached, the new one created, the rows re-inserted through the parent
+    and the default attached again, all in the caller's transaction.
+    """
+    name = partition_name(table, month)
+    default = default_partition(table)
+    bounds = {'lower': month, 'upper': add_months(month, 1)}
+    in_range = f"{column} >= :lower AND {column} < :upper"
+    stranded = connection.execute(text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})"), bounds).scalar()
+
+    if stranded:
+        connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    connection.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{bounds['lower']}') TO ('{bounds['upper']}')"
+    ))
+    if stranded:
+        # Generated columns (e.g. jobs.search_vector) are computed again on insert
+        columns = ', '.join(connection.execute(text("""
+            SELECT quote_ident(column_name) FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = :table AND is_generated = 'NEVER'
+            ORDER BY ordinal_position
+        """), {'table': table}).scalars())
+        moved = connection.execute(text(f"""
+            WITH moved AS (DELETE FROM {default} WHERE {in_range} RETURNING *)
+            INSERT INTO {table} ({columns}) SELECT {columns} FROM moved
+        """), bounds).rowcount
+        connection.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+        logger.info(f"Moved {moved} rows of {month:%Y-%m} from {default} to {name}")
+    return name
+
+
+def ensure_partitions(connection, table: str, column: str, months_ahead: Optional[int] = None,
+                      months_back: int = 0, today: Optional[date] = None) -> List[str]:
+    """
+    Create the missing default and monthly partitions of a table
+
+    Args:
+        connection: SQLAlchemy connection (inside a transaction)
+        table: Partitioned table
+        column: Its partition column
+        months_ahead: Months after the current one (default: PARTITION_CONFIG['months_ahead'])
+        months_back: Months before the current one, e.g. to backfill history
+        today: Reference date (default: today)
+
+    Returns:
+        Names of the partitions created
+    """
+    if months_ahead is None:
+        months_ahead = PARTITION_CONFIG['months_ahead']
+    existing = partitions(connection, table)
+    created = []
+    if default_partition(table) not in existing:
+        connection.execute(text(f"CREATE TABLE {default_partition(table)} PARTITION OF {table} DEFAULT"))
+        created.append(default_partition(table))
+
+    first = add_months(month_start(today or date.today()), -months_back)
+    for offset in range(months_back + months_ahead + 1):
+        month = add_months(first, offset)
+        if partition_name(table, month) not in existing:
+            created.append(create_partition(connection, table, column, month))
+    return created
+
+
+def ensure_all_partitions(connection, months_back: int = 0, today: Optional[date] = None) -> List[str]:
+    """ensure_partitions() for every table in PARTITION_CONFIG['tables']"""
+    created = []
+    for table, settings in PARTITION_CONFIG['tables'].items():
+        created += ensure_partitions(connection, table, settings['column'], months_back=months_back, today=today)
+    if created:
+        logger.info(f"Created partitions {', '.join(created)}")
+    return created
+
+
+def expired_partitions(connection, table: str, retention_months: int, today: Optional[date] = None) -> List[str]:
+    """
+    Monthly partitions that end before the last `retention_months` months, oldest first
+
+    Partitions still holding live rows (LIVE_ROWS) are left out.
+    """
+    cutoff = add_months(month_start(today or date.today()), -retention_months)
+    expired = sorted(name for name, month in partitions(connection, table).items()
+                     if month is not None and add_months(month, 1) <= cutoff)
+    if table not in LIVE_ROWS:
+        return expired
+
+    result = []
+    for name in expired:
+        live = connection.execute(
+            text(f"SELECT count(*) FROM {name} WHERE {LIVE_ROWS[table]}"), {'cutoff': cutoff}
+        ).scalar()
+        if live:
+            logger.info(f"Keeping {name} past retention: {live} rows still live")
+        else:
+            result.append(name)
+    return result
+
+
+def detach_partition(connection, table: str, name: str, drop: bool = False):
+    """Delete the rows depending on a partition's rows, then detach (and drop) it"""
+    for dependent, column, key in DEPENDENT_TABLES.get(table, []):
+        connection.execute(text(f"DELETE FROM {dependent} WHERE {column} IN (SELECT {key} FROM {name})"))
+    connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+    if drop:
+        connection.execute(text(f"DROP TABLE {name}"))
+
+
+def apply_retention(connection, drop: Optional[bool] = None, today: Optional[date] = None) -> List[str]:
+    """
+    Detach the partitions past each table's retention_months
+
+    Args:
+        connection: SQLAlchemy connection (inside a transaction)
+        drop: Drop them too (default: PARTITION_CONFIG['drop_expired'])
+        today: Reference date (default: today)
+
+    Returns:
+        Names of the partitions detached
+    """
+    if drop is None:
+        drop = PARTITION_CONFIG['drop_expired']
+    detached = []
+    for table, settings in PARTITION_CONFIG['tables'].items():
+        for name in expired_partitions(connection, table, settings['retention_months'], today):
+            detach_partition(connection, table, name, drop)
+            logger.info(f"{'Dropped' if drop else 'Detached'} {name} (older than {settings['retention_months']} months)")
+            detached.append(name)
+    return detached
@@ -4,6 +4,9 @@
 -- Extension for UUID generation
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
+-- Extension for trigram (fuzzy and ILIKE) indexes
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- Drop tables if they exist (for clean setup)
 DROP TABLE IF EXISTS job_applications CASCADE;
 DROP TABLE IF EXISTS job_alerts CASCADE;
@@ -31,10 +34,11 @@ CREATE TABLE companies (
 
 CREATE INDEX idx_companies_name ON companies(name);
 
--- Jobs table
+-- Jobs table, partitioned by month of scraped_at (see pipeline/database/partitions.py).
+-- Primary key and unique constraints must include the partition column.
 CREATE TABLE jobs (
-    id SERIAL PRIMARY KEY,
-    job_id VARCHAR(255) UNIQUE NOT NULL,  -- Unique ID from source
+    id SERIAL,
+    job_id VARCHAR(255) NOT NULL,  -- Unique ID from source
     source VARCHAR(50) NOT NULL,  -- linkedin, indeed, glassdoor, etc.
     source_url VARCHAR(1000) NOT NULL,
     
@@ -66,27 +70,70 @@ CREATE TABLE jobs (
     
     -- Dates
     posted_date TIMESTAMP,
-    scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    scraped_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,  -- first seen, never updated
     expires_at TIMESTAMP,
     
     -- Status
     is_active BOOLEAN DEFAULT TRUE,
     applications_count INTEGER DEFAULT 0,
     
+    -- Liveness (see pipeline/database/liveness.py)
+    last_seen_at TIMESTAMP,  -- last run that saw the job
+    missed_runs INTEGER DEFAULT 0,  -- consecutive complete runs that did not
+    
     -- Metadata
     metadata JSONB,  -- Store additional unstructured data
     
+    -- Near-duplicate detection
+    minhash VARCHAR(512),  -- MinHash signature (hex) of title, company and description
+    cluster_id VARCHAR(255),  -- job_id of the first posting of the same job
+    
+    -- Full-text search: title weighs most, then company, then description
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(company_name, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED,
+    
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    PRIMARY KEY (id, scraped_at),
+    CONSTRAINT uq_jobs_job_id UNIQUE (job_id, scraped_at)
+) PARTITION BY RANGE (scraped_at);
+
+-- Rows outside every monthly partition
+CREATE TABLE jobs_default PARTITION OF jobs DEFAULT;
+
+-- Partitions of the current and next 3 months; scripts/manage_partitions.py
+-- creates later ones and detaches the expired ones
+DO $$
+DECLARE
+    month DATE;
+BEGIN
+    FOR i IN 0..3 LOOP
+        month := date_trunc('month', CURRENT_DATE)::DATE + make_interval(months => i);
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF jobs FOR VALUES FROM (%L) TO (%L)',
+            'jobs_' || to_char(month, '"y"YYYY"m"MM'), month, month + INTERVAL '1 month'
+        );
+    END LOOP;
+END $$;
 
 CREATE INDEX idx_jobs_title ON jobs(title);
+CREATE INDEX idx_jobs_search ON jobs USING GIN (search_vector);
+-- Trigram indexes serve similarity (%) and ILIKE '%...%' on these columns
+CREATE INDEX idx_jobs_title_trgm ON jobs USING GIN (title gin_trgm_ops);
+CREATE INDEX idx_jobs_employment_type_trgm ON jobs USING GIN (employment_type gin_trgm_ops);
 CREATE INDEX idx_jobs_company ON jobs(company_id);
 CREATE INDEX idx_jobs_location ON jobs(location);
-CREATE INDEX idx_jobs_posted_date ON jobs(posted_date DESC);
+-- BRIN: rows arrive in time order, so a few pages per partition index them
+CREATE INDEX idx_jobs_posted_date ON jobs USING BRIN (posted_date);
+CREATE INDEX idx_jobs_scraped_at ON jobs USING BRIN (scraped_at);
 CREATE INDEX idx_jobs_source ON jobs(source);
 CREATE INDEX idx_jobs_active ON jobs(is_active);
 CREATE INDEX idx_jobs_experience ON jobs(experience_level);
+CREATE INDEX idx_jobs_cluster ON jobs(cluster_id);
 
 -- Skills master table
 CREATE TABLE skills (
@@ -100,9 +147,12 @@ CREATE INDEX idx_skills_name ON skills(name);
 CREATE INDEX idx_skills_category ON skills(category);
 
 -- Job-Skills junction table
+-- job_id columns reference jobs(id) without a foreign key, which a partitioned
+-- table only supports on its whole primary key; triggers check them (below)
+-- and retention deletes these rows
 CREATE TABLE job_skills (
     id SERIAL PRIMARY KEY,
-    job_id INTEGER REFERENCES jobs(id) ON DELETE CASCADE,
+    job_id INTEGER NOT NULL,
     skill_id INTEGER REFERENCES skills(id) ON DELETE CASCADE,
     is_required BOOLEAN DEFAULT FALSE,
     years_required INTEGER,
@@ -152,7 +202,7 @@ CREATE INDEX idx_users_active ON user_profiles(is_active);
 CREATE TABLE job_alerts (
     id SERIAL PRIMARY KEY,
     user_id INTEGER REFERENCES user_profiles(id) ON DELETE CASCADE,
-    job_id INTEGER REFERENCES jobs(id) ON DELETE CASCADE,
+    job_id INTEGER NOT NULL,
     
     match_score DECIMAL(5,2),  -- 0-100 score
     match_reasons TEXT[],  -- Why this job matched
@@ -173,7 +223,7 @@ CREATE INDEX idx_alerts_sent ON job_alerts(sent_at DESC);
 CREATE TABLE job_applications (
     id SERIAL PRIMARY KEY,
     user_id INTEGER REFERENCES user_profiles(id) ON DELETE CASCADE,
-    job_id INTEGER REFERENCES jobs(id) ON DELETE CASCADE,
+    job_id INTEGER NOT NULL,
     
     applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     status VARCHAR(50) DEFAULT 'applied',  -- applied, interviewing, rejected, accepted
@@ -189,6 +239,66 @@ CREATE INDEX idx_applications_user ON job_applications(user_id);
 CREATE INDEX idx_applications_job ON job_applications(job_id);
 CREATE INDEX idx_applications_status ON job_applications(status);
 
+-- Integrity of the partitioned jobs table (see pipeline/database/integrity.py)
+-- One row per job_id with its first-seen scraped_at: jobs can only declare
+-- (job_id, scraped_at) unique, so this is what keeps a job in one partition
+CREATE TABLE job_keys (
+    job_id VARCHAR(255) PRIMARY KEY,
+    scraped_at TIMESTAMP NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION jobs_register_key() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO job_keys (job_id, scraped_at) VALUES (NEW.job_id, NEW.scraped_at)
+    ON CONFLICT (job_id) DO NOTHING;
+    IF NOT FOUND AND NOT EXISTS (
+        SELECT 1 FROM job_keys WHERE job_id = NEW.job_id AND scraped_at = NEW.scraped_at
+    ) THEN
+        RAISE EXCEPTION 'job_id % is already stored with another scraped_at', NEW.job_id
+            USING ERRCODE = 'unique_violation', HINT = 'Insert it with its first-seen scraped_at from job_keys';
+    END IF;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION jobs_pin_key() RETURNS trigger AS $$
+BEGIN
+    IF NEW.job_id IS DISTINCT FROM OLD.job_id OR NEW.scraped_at IS DISTINCT FROM OLD.scraped_at THEN
+        RAISE EXCEPTION 'job_id and scraped_at of job % cannot change', OLD.job_id
+            USING ERRCODE = 'integrity_constraint_violation';
+    END IF;
+    RETURN NEW;
+END $$ LANGUAGE plpgsql;
+
+-- ON DELETE CASCADE for the tables referencing jobs(id)
+CREATE OR REPLACE FUNCTION jobs_delete_dependents() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM job_keys WHERE job_id = OLD.job_id AND scraped_at = OLD.scraped_at;
+    DELETE FROM job_skills WHERE job_id = OLD.id;
+    DELETE FROM job_alerts WHERE job_id = OLD.id;
+    DELETE FROM job_applications WHERE job_id = OLD.id;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+-- REFERENCES jobs(id) for those tables
+CREATE OR REPLACE FUNCTION jobs_check_reference() RETURNS trigger AS $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM jobs WHERE id = NEW.job_id) THEN
+        RAISE EXCEPTION '% row references job % that does not exist', TG_TABLE_NAME, NEW.job_id
+            USING ERRCODE = 'foreign_key_violation';
+    END IF;
+    RETURN NEW;
+END $$ LANGUAGE plpgsql;
+
+CREATE TRIGGER jobs_register_key AFTER INSERT ON jobs FOR EACH ROW EXECUTE FUNCTION jobs_register_key();
+CREATE TRIGGER jobs_pin_key BEFORE UPDATE OF job_id, scraped_at ON jobs FOR EACH ROW EXECUTE FUNCTION jobs_pin_key();
+CREATE TRIGGER jobs_delete_dependents AFTER DELETE ON jobs FOR EACH ROW EXECUTE FUNCTION jobs_delete_dependents();
+CREATE TRIGGER job_skills_check_job BEFORE INSERT OR UPDATE OF job_id ON job_skills
+    FOR EACH ROW EXECUTE FUNCTION jobs_check_reference();
+CREATE TRIGGER job_alerts_check_job BEFORE INSERT OR UPDATE OF job_id ON job_alerts
+    FOR EACH ROW EXECUTE FUNCTION jobs_check_reference();
+CREATE TRIGGER job_applications_check_job BEFORE INSERT OR UPDATE OF job_id ON job_applications
+    FOR EACH ROW EXECUTE FUNCTION jobs_check_reference();
+
 -- Scraping logs table
 CREATE TABLE scraping_logs (
     id SERIAL PRIMARY KEY,
@@ -287,6 +397,10 @@ GROUP BY s.id, s.name, s.category
 ORDER BY job_count DESC
 LIMIT 50;
 
+-- Dashboard statistics: the mv_* materialized views are defined only in
+-- pipeline/database/stats_views.py (STATS_VIEWS). init_db() creates them;
+-- after loading this file by hand, run scripts/export_db_stats.py --create.
+
 -- Function to update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
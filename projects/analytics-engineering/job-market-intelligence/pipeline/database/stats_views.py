@@ -0,0 +1,167 @@
+"""
+Dashboard statistics as materialized views
+
+The skill, company, location, source and salary statistics are computed
+by PostgreSQL from jobs, job_skills and skills into materialized views,
+one row per skill, company, location, source or experience level:
+
+    mv_skill_demand          active jobs per skill
+    mv_company_hiring        active jobs, latest posting and average salary per company
+    mv_location_counts       active jobs per location
+    mv_source_counts         active jobs and jobs first seen in the last 7 days per source
+    mv_salary_by_experience  salary sums, counts and averages per experience level
+
+Each view has a unique index, which lets refresh_stats_views() use
+REFRESH MATERIALIZED VIEW CONCURRENTLY: readers keep the previous
+contents while it runs instead of waiting for it. The scrapers and the
+skill extraction refresh them after each ingest, and export_stats()
+writes the dashboard's stats files (as pipeline.storage.aggregates does
+from the job store) from a few small reads of the views instead of a
+pass over every job.
+"""
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Union
+
+from sqlalchemy import text
+
+from ..storage.aggregates import LOCATION_LENGTH, write_stats
+
+logger = logging.getLogger(__name__)
+
+# name -> (query, unique index columns)
+STATS_VIEWS = {
+    'mv_skill_demand': ("""
+        SELECT s.id AS skill_id, s.name, coalesce(s.category, 'Other') AS category, count(*) AS job_count,
+               round(count(*) * 100.0 / greatest((SELECT count(*) FROM jobs WHERE is_active), 1), 1) AS percentage
+        FROM skills s
+        JOIN job_skills js ON js.skill_id = s.id
+        JOIN jobs j ON j.id = js.job_id
+        WHERE j.is_active
+        GROUP BY s.id, s.name, s.category
+    """, ['skill_id']),
+    'mv_company_hiring': ("""
+        SELECT company_name AS company, count(*) AS job_count, max(posted_date) AS latest_posted,
+               round(avg(nullif(salary_max, 0)))::INTEGER AS avg_salary_max
+        FROM jobs
+        WHERE is_active AND company_name NOT IN ('', 'Unknown')
+        GROUP BY company_name
+    """, ['company']),
+    'mv_location_counts': (f"""
+        SELECT left(coalesce(nullif(location, ''), 'Unknown'), {LOCATION_LENGTH}) AS location, count(*) AS job_count
+        FROM jobs
+        WHERE is_active
+        GROUP BY 1
+    """, ['location']),
+    'mv_source_counts': ("""
+        SELECT coalesce(nullif(source, ''), 'unknown') AS source, count(*) AS job_count,
+               count(*) FILTER (WHERE scraped_at >= CURRENT_DATE - 7) AS recent_jobs
+        FROM jobs
+        WHERE is_active
+        GROUP BY 1
+    """, ['source']),
+    'mv_salary_by_experience': ("""
+        SELECT coalesce(nullif(experience_level, ''), 'Unknown') AS experience_level, count(*) AS job_count,
+               count(nullif(salary_min, 0)) AS salary_min_count, coalesce(sum(nullif(salary_min, 0)), 0) AS salary_min_sum,
+               count(nullif(salary_max, 0)) AS salary_max_count, coalesce(sum(nullif(salary_max, 0)), 0) AS salary_max_sum,
+               round(avg(nullif(salary_min, 0)))::INTEGER AS avg_salary_min,
+               round(avg(nullif(salary_max, 0)))::INTEGER AS avg_salary_max
+        FROM jobs
+        WHERE is_active
+        GROUP BY 1
+    """, ['experience_level']),
+}
+
+
+def create_stats_views(connection):
+    """Create the views (populated) and their unique indexes where missing"""
+    for name, (query, key) in STATS_VIEWS.items():
+        connection.execute(text(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {name} AS {query}"))
+        connection.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {name}_key ON {name} ({', '.join(key)})"))
+
+
+def drop_stats_views(connection):
+    for name in STATS_VIEWS:
+        connection.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {name}"))
+
+
+def refresh_stats_views(engine=None, concurrently: bool = True):
+    """
+    Recompute every view, each in its own transaction
+
+    Args:
+        engine: Engine to use (default: the pipeline's)
+        concurrently: Keep the views readable during the refresh
+    """
+    if engine is None:
+        from .connection import engine
+    mode = ' CONCURRENTLY' if concurrently else ''
+    started = datetime.now()
+    for name in STATS_VIEWS:
+        with engine.begin() as connection:
+            connection.execute(text(f"REFRESH MATERIALIZED VIEW{mode} {name}"))
+    logger.info(f"Refreshed {len(STATS_VIEWS)} stats views in {(datetime.now() - started).total_seconds():.1f}s")
+
+
+def read_stats(connection, skills: int = 30, companies: int = 25, locations: int = 15) -> Dict:
+    """Dashboard statistics (skill_stats, company_stats, location_stats, source_stats, summary)"""
+    def rows(sql: str, **parameters):
+        return [dict(row) for row in connection.execute(text(sql), parameters).mappings()]
+
+    skill_stats = rows("""
+        SELECT name, category, job_count, percentage::FLOAT AS percentage FROM mv_skill_demand
+        ORDER BY job_count DESC, name LIMIT :limit
+    """, limit=skills)
+    company_stats = rows("""
+        SELECT company, job_count FROM mv_company_hiring ORDER BY job_count DESC, company LIMIT :limit
+    """, limit=companies)
+    location_stats = rows("""
+        SELECT location, job_count FROM mv_location_counts ORDER BY job_count DESC, location LIMIT :limit
+    """, limit=locations)
+    source_stats = rows("SELECT source, job_count, recent_jobs FROM mv_source_counts ORDER BY job_count DESC, source")
+    salary = rows("""
+        SELECT sum(salary_min_sum) AS min_sum, sum(salary_min_count) AS min_count,
+               sum(salary_max_sum) AS max_sum, sum(salary_max_count) AS max_count
+        FROM mv_salary_by_experience
+    """)[0]
+    totals = rows("""
+        SELECT (SELECT count(*) FROM mv_company_hiring) AS companies,
+               (SELECT count(*) FROM mv_skill_demand) AS skills
+    """)[0]
+
+    total = sum(source['job_count'] for source in source_stats)
+    return {
+        'skill_stats': skill_stats,
+        'company_stats': company_stats,
+        'location_stats': location_stats,
+        'source_stats': [{'source': s['source'], 'job_count': s['job_count']} for s in source_stats],
+        'summary': {
+            'total_jobs': total,
+            'real_jobs': total,
+            'demo_jobs': 0,
+            'recent_jobs_7_days': sum(source['recent_jobs'] for source in source_stats),
+            'avg_salary_min': int(salary['min_sum'] / salary['min_count']) if salary['min_count'] else 0,
+            'avg_salary_max': int(salary['max_sum'] / salary['max_count']) if salary['max_count'] else 0,
+            'total_companies': totals['companies'],
+            'total_skills_tracked': totals['skills'],
+            'sources_count': len(source_stats),
+            'generated_at': datetime.now().isoformat(),
+        },
+    }
+
+
+def export_stats(directory: Union[str, Path], engine=None, **limits) -> Dict:
+    """
+    Write the dashboard's stats files and snapshot from the views
+
+    Args:
+        directory: Dashboard data directory (data/processed)
+        engine: Engine to use (default: the pipeline's)
+        limits: skills, companies and locations to keep (see read_stats())
+    """
+    if engine is None:
+        from .connection import engine
+    with engine.connect() as connection:
+        stats = read_stats(connection, **limits)
+    return write_stats(directory, stats)
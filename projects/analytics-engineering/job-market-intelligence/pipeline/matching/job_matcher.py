@@ -6,7 +6,8 @@ import logging
 from typing import List, Dict, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy import and_, or_
-from ..database.connection import get_db
+from ..database.connection import bulk_session, use_db
+from ..database.job_search import contains_pattern
 from ..database.models import Job, UserProfile, JobAlert, JobSkill, Skill
 
 logger = logging.getLogger(__name__)
@@ -174,7 +175,7 @@ class JobMatcher:
         return total_score, reasons
     
     def find_matches_for_user(self, user_id: int, min_score: float = 60.0, 
-                             days_back: int = 7) -> List[Dict]:
+                             days_back: int = 7, db=None) -> List[Dict]:
         """
         Find matching jobs for a user
         
@@ -182,12 +183,13 @@ class JobMatcher:
             user_id: User database ID
             min_score: Minimum match score (0-100)
             days_back: Only consider jobs from last N days
+            db: Session to use (default: a new one)
             
         Returns:
             List of matching jobs with scores
         """
         try:
-            with get_db() as db:
+            with use_db(db) as db:
                 # Get user
                 user = db.query(UserProfile).filter_by(id=user_id).first()
                 if not user or not user.is_active:
@@ -195,16 +197,20 @@ class JobMatcher:
                     return []
                 
                 # Build job query
+                # Jobs are scraped after they're posted, so the scraped_at
+                # bound holds for every match and lets PostgreSQL skip the
+                # jobs partitions of older months
                 cutoff_date = datetime.utcnow() - timedelta(days=days_back)
                 query = db.query(Job).filter(
                     Job.is_active == True,
-                    Job.posted_date >= cutoff_date
+                    Job.posted_date >= cutoff_date,
+                    Job.scraped_at >= cutoff_date
                 )
                 
-                # Filter by employment type if specified
+                # Filter by employment type if specified (served by its trigram index)
                 if user.preferred_employment_types:
                     query = query.filter(
-                        or_(*[Job.employment_type.ilike(f"%{t}%") 
+                        or_(*[Job.employment_type.ilike(contains_pattern(t), escape='\\')
                              for t in user.preferred_employment_types])
                     )
                 
@@ -236,22 +242,23 @@ class JobMatcher:
             logger.error(f"Error finding matches for user {user_id}: {e}")
             return []
     
-    def create_alerts(self, user_id: int, min_score: float = 70.0):
+    def create_alerts(self, user_id: int, min_score: float = 70.0, db=None):
         """
         Create job alerts for matching jobs
         
         Args:
             user_id: User database ID
             min_score: Minimum match score to create alert
+            db: Session to use (default: a new one, committed on return)
         """
         try:
-            matches = self.find_matches_for_user(user_id, min_score)
-            
-            if not matches:
-                logger.info(f"No matches found for user {user_id}")
-                return
-            
-            with get_db() as db:
+            with use_db(db) as db:
+                matches = self.find_matches_for_user(user_id, min_score, db=db)
+                
+                if not matches:
+                    logger.info(f"No matches found for user {user_id}")
+                    return
+                
                 for match in matches:
                     job = match['job']
                     
@@ -270,21 +277,21 @@ class JobMatcher:
                         )
                         db.add(alert)
                 
-                db.commit()
                 logger.info(f"Created {len(matches)} alerts for user {user_id}")
                 
         except Exception as e:
             logger.error(f"Error creating alerts for user {user_id}: {e}")
     
     def bulk_match_all_users(self, min_score: float = 70.0):
-        """Run matching for all active users"""
+        """Run matching for all active users, on one connection with periodic commits"""
         try:
-            with get_db() as db:
-                users = db.query(UserProfile).filter_by(is_active=True).all()
+            with bulk_session() as bulk:
+                users = bulk.session.query(UserProfile).filter_by(is_active=True).all()
                 logger.info(f"Running matching for {len(users)} active users")
                 
                 for user in users:
-                    self.create_alerts(user.id, min_score)
+                    self.create_alerts(user.id, min_score, db=bulk.session)
+                    bulk.done()
                     
         except Exception as e:
             logger.error(f"Error in bulk matching: {e}")
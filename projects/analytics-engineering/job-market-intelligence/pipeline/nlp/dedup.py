@@ -0,0 +1,432 @@
+"""
+Near-duplicate job detection with MinHash and LSH banding
+
+job_id is a hash of source and URL, so the same posting syndicated to
+several boards, or reposted under a new URL, gets several job_ids. Each
+job is fingerprinted with a MinHash signature of word 3-grams over its
+normalized title, company and the start of its description (descriptions
+are truncated differently per source, so only the first
+`description_words` words are used).
+
+Signatures use one-permutation hashing: every shingle is hashed once and
+kept in one of SIGNATURE_SIZE slots, and empty slots are filled from their
+neighbours. That makes fingerprinting linear in the length of the text
+rather than in text length times the number of hash functions. Shingle
+hashes are combined from cached word hashes, so the text is never
+re-joined into strings.
+
+Candidates are found by LSH banding instead of comparing every pair: the
+signature is cut into `bands` bands of `rows` slots, and jobs sharing any
+band are compared. A candidate is a duplicate when the signatures agree on
+at least `threshold` of their slots, the companies match and the titles
+share most of their words. Duplicates join the cluster of the first job
+seen, whose job_id becomes the cluster id, so adding a job costs a
+constant number of lookups and a whole history is clustered in one pass.
+
+Only the standard library is used so the standalone scripts can share it.
+"""
+import re
+import logging
+from hashlib import blake2b
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_SIZE = 64
+_SLOT_BITS = 6  # log2(SIGNATURE_SIZE)
+_VALUE_MASK = 0x7fffffff
+_MASK64 = (1 << 64) - 1
+
+# Distinct words whose hashes are kept between jobs
+WORD_CACHE_SIZE = 500000
+_word_hashes: Dict[str, int] = {}
+
+# Dropped from company names so "Acme Ltd" and "ACME Limited" match
+COMPANY_SUFFIXES = {
+    'inc', 'incorporated', 'ltd', 'limited', 'llc', 'plc', 'corp', 'corporation',
+    'co', 'company', 'gmbh', 'ag', 'sa', 'bv', 'pty', 'kenya',
+}
+
+# Company names scrapers use when the real one is missing
+UNKNOWN_COMPANIES = {'', 'unknown', 'n a', 'confidential', 'undisclosed'}
+
+# Jobs without a known company need at least this much description to be
+# matched; a bare title like "Senior Software Engineer" is not a posting
+MIN_DESCRIPTION_WORDS = 20
+
+# Fields add() reads from a job that was fingerprinted before
+INDEX_FIELDS = ['job_id', 'title', 'company_name', 'minhash', 'cluster_id']
+
+# New jobs are matched against the fingerprints of the jobs stored in this
+# many days; older postings are only matched by job_id and cluster id, so
+# loading an index reads the same amount however long the history grows
+DEDUP_WINDOW_DAYS = 30
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_ENTITY_RE = re.compile(r'&[a-z]+;|&#\d+;')
+_NON_WORD_RE = re.compile(r'[^a-z0-9+#]+')
+
+
+def normalize_text(text: Optional[str]) -> List[str]:
+    """Lowercased words of a text, without HTML tags or punctuation"""
+    if not text:
+        return []
+    text = _ENTITY_RE.sub(' ', _TAG_RE.sub(' ', str(text)).lower())
+    return _NON_WORD_RE.sub(' ', text).split()
+
+
+def normalize_company(name: Optional[str]) -> str:
+    """Company name without legal suffixes, for comparing jobs ('' if unknown)"""
+    name = ' '.join(word for word in normalize_text(name) if word not in COMPANY_SUFFIXES)
+    return '' if name in UNKNOWN_COMPANIES else name
+
+
+def _word_hash(word: str) -> int:
+    """Stable 64-bit hash of a word (cached: the vocabulary is small next to the text)"""
+    h = _word_hashes.get(word)
+    if h is None:
+        if len(_word_hashes) >= WORD_CACHE_SIZE:
+            _word_hashes.clear()
+        h = _word_hashes[word] = int.from_bytes(blake2b(word.encode(), digest_size=8).digest(), 'little')
+    return h
+
+
+def shingles(job: Dict, description_words: int = 200) -> set:
+    """
+    Hashed word 3-grams over a job's title, company and description
+
+    Returns:
+        Set of 64-bit ints, empty if too little is known about the job
+    """
+    company = normalize_company(job.get('company_name'))
+    description = normalize_text(job.get('description'))[:description_words]
+    if not company and len(description) < MIN_DESCRIPTION_WORDS:
+        return set()
+    words = normalize_text(job.get('title')) + ['|'] + company.split() + ['|'] + description
+    hashes = [_word_hash(word) for word in words] + [0] * max(0, 3 - len(words))
+    # Each word is hashed once; 3-grams combine the hashes by position
+    return {
+        ((a * 0x9E3779B97F4A7C15) ^ (b * 0xC2B2AE3D27D4EB4F) ^ c) & _MASK64
+        for a, b, c in zip(hashes, hashes[1:], hashes[2:])
+    }
+
+
+def minhash(features: Iterable[int]) -> Optional[List[int]]:
+    """
+    One-permutation MinHash signature of a set of 64-bit feature hashes
+
+    Returns:
+        SIGNATURE_SIZE 31-bit ints, or None for an empty set
+    """
+    signature = [None] * SIGNATURE_SIZE
+    for h in features:
+        # Finalizer so every bit of the slot and value depends on the whole hash
+        h ^= h >> 31
+        h = (h * 0xBF58476D1CE4E5B9) & _MASK64
+        h ^= h >> 29
+        slot = h & (SIGNATURE_SIZE - 1)
+        value = (h >> _SLOT_BITS) & _VALUE_MASK
+        if signature[slot] is None or value < signature[slot]:
+            signature[slot] = value
+
+    filled = [i for i, value in enumerate(signature) if value is not None]
+    if not filled:
+        return None
+    # Densify: an empty slot takes the next filled slot's value (wrapping
+    # around), offset by the distance so borrowed values rarely collide
+    for i in range(SIGNATURE_SIZE):
+        if signature[i] is None:
+            distance = 1
+            while signature[(i + distance) % SIGNATURE_SIZE] is None:
+                distance += 1
+            borrowed = signature[(i + distance) % SIGNATURE_SIZE]
+            signature[i] = (borrowed + distance * 0x9E3779B1) & _VALUE_MASK
+    return signature
+
+
+def job_signature(job: Dict, description_words: int = 200) -> Optional[List[int]]:
+    """MinHash signature of a job"""
+    return minhash(shingles(job, description_words))
+
+
+def encode_signature(signature: List[int]) -> str:
+    """Hex form stored in Job.minhash and the JSON exports"""
+    return ''.join(f"{value:08x}" for value in signature)
+
+
+def decode_signature(text: str) -> List[int]:
+    return [int(text[i:i + 8], 16) for i in range(0, len(text), 8)]
+
+
+def similarity(a: List[int], b: List[int]) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(x == y for x, y in zip(a, b)) / SIGNATURE_SIZE
+
+
+def title_overlap(a: frozenset, b: frozenset) -> float:
+    """Jaccard similarity of two titles' word sets"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class DedupIndex:
+    """
+    Incremental near-duplicate clustering
+
+    Every job added gets `minhash` (hex signature) and `cluster_id` (the
+    job_id of the first job in its cluster). Only one representative per
+    cluster is kept in the band buckets, so memory grows with the number of
+    distinct postings rather than with the number of copies.
+
+    Usage:
+        index = DedupIndex()
+        for job in jobs:
+            index.add(job)
+        unique = index.canonical(jobs)
+    """
+
+    def __init__(self, bands: int = 16, rows: int = 4, threshold: float = 0.7,
+                 title_threshold: float = 0.5, description_words: int = 200,
+                 max_bucket: int = 32):
+        """
+        Args:
+            bands: LSH bands; bands * rows must not exceed SIGNATURE_SIZE
+            rows: Signature slots per band
+            threshold: Minimum estimated Jaccard similarity of duplicates
+            title_threshold: Minimum word overlap of duplicates' titles
+            description_words: Leading description words fingerprinted
+            max_bucket: Clusters kept per bucket; bounds the comparisons per job
+                when many different postings share boilerplate text
+        """
+        if bands * rows > SIGNATURE_SIZE:
+            raise ValueError(f"bands * rows must be at most {SIGNATURE_SIZE}")
+        self.bands = bands
+        self.rows = rows
+        self.threshold = threshold
+        self.title_threshold = title_threshold
+        self.description_words = description_words
+        self.max_bucket = max_bucket
+
+        self.buckets: List[Dict[int, List[str]]] = [{} for _ in range(bands)]
+        # cluster_id -> (signature, normalized company, title words)
+        self.representatives: Dict[str, Tuple[List[int], str, frozenset]] = {}
+        self.clusters: Dict[str, str] = {}
+        self.comparisons = 0
+
+    def __len__(self) -> int:
+        return len(self.clusters)
+
+    @property
+    def cluster_count(self) -> int:
+        return len(set(self.clusters.values()))
+
+    def _band_keys(self, signature: List[int]) -> List[int]:
+        rows = self.rows
+        return [hash(tuple(signature[band * rows:(band + 1) * rows])) for band in range(self.bands)]
+
+    def _match(self, signature: List[int], band_keys: List[int], company: str,
+               title: frozenset) -> Optional[str]:
+        """Cluster of the most similar representative that passes every check"""
+        best, best_score = None, self.threshold
+        seen = set()
+        for bucket, key in zip(self.buckets, band_keys):
+            for cluster_id in bucket.get(key, ()):
+                if cluster_id in seen:
+                    continue
+                seen.add(cluster_id)
+                self.comparisons += 1
+                rep_signature, rep_company, rep_title = self.representatives[cluster_id]
+                if company and rep_company and company != rep_company:
+                    continue
+                if title_overlap(title, rep_title) < self.title_threshold:
+                    continue
+                score = similarity(signature, rep_signature)
+                if score >= best_score:
+                    best, best_score = cluster_id, score
+        return best
+
+    def add(self, job: Dict) -> str:
+        """
+        Assign a job to a cluster
+
+        A job that already has `cluster_id` and `minhash` (e.g. loaded back
+        from the database) keeps them. A job_id seen before keeps its cluster.
+
+        Returns:
+            The job's cluster id
+        """
+        job_id = job['job_id']
+        if job_id in self.clusters:
+            job['cluster_id'] = self.clusters[job_id]
+            return job['cluster_id']
+
+        if job.get('minhash'):
+            signature = decode_signature(job['minhash'])
+        else:
+            signature = job_signature(job, self.description_words)
+            if signature is None:
+                # Too little to fingerprint: the job is its own cluster
+                job['cluster_id'] = self.clusters[job_id] = job_id
+                return job_id
+            job['minhash'] = encode_signature(signature)
+
+        band_keys = self._band_keys(signature)
+        company = normalize_company(job.get('company_name'))
+        title = frozenset(normalize_text(job.get('title')))
+
+        cluster_id = job.get('cluster_id') or self._match(signature, band_keys, company, title) or job_id
+        if cluster_id not in self.representatives:
+            self.representatives[cluster_id] = (signature, company, title)
+            for bucket, key in zip(self.buckets, band_keys):
+                members = bucket.setdefault(key, [])
+                if len(members) < self.max_bucket:
+                    members.append(cluster_id)
+
+        job['cluster_id'] = self.clusters[job_id] = cluster_id
+        return cluster_id
+
+    def add_many(self, jobs: Iterable[Dict]):
+        for job in jobs:
+            self.add(job)
+
+    def canonical(self, jobs: Iterable[Dict]) -> List[Dict]:
+        """
+        One job per cluster, in order
+
+        Jobs not added yet are added first; the first job of each cluster
+        in `jobs` is kept.
+        """
+        seen = set()
+        unique = []
+        for job in jobs:
+            cluster_id = self.clusters.get(job.get('job_id')) or self.add(job)
+            if cluster_id not in seen:
+                seen.add(cluster_id)
+                unique.append(job)
+        return unique
+
+    @classmethod
+    def from_store(cls, store, days: Optional[int] = DEDUP_WINDOW_DAYS, **settings) -> 'DedupIndex':
+        """
+        Index of the jobs a JobStore (pipeline.storage.job_store) holds
+
+        Args:
+            store: The job store
+            days: Only jobs stored in the last `days` days (None: all of them)
+        """
+        index = cls(**settings)
+        index.add_many(store.jobs(columns=INDEX_FIELDS, days=days))
+        return index
+
+    @classmethod
+    def from_database(cls, days: Optional[int] = DEDUP_WINDOW_DAYS, **settings) -> 'DedupIndex':
+        """
+        Index of the fingerprinted jobs in the database, oldest first
+
+        Args:
+            days: Only jobs first or last seen in the last `days` days
+                (None: every fingerprinted job)
+        """
+        from datetime import datetime, timedelta
+        from sqlalchemy import or_, select
+        from ..database.connection import get_db
+        from ..database.models import Job
+
+        index = cls(**settings)
+        query = (
+            select(*(getattr(Job, field) for field in INDEX_FIELDS))
+            .where(Job.minhash.isnot(None))
+            .order_by(Job.id)
+            .execution_options(yield_per=10000)
+        )
+        if days is not None:
+            cutoff = datetime.utcnow() - timedelta(days=days)
+            query = query.where(or_(Job.scraped_at >= cutoff, Job.last_seen_at >= cutoff))
+        with get_db() as db:
+            for row in db.execute(query):
+                index.add(dict(row._mapping))
+        logger.info(f"Loaded {len(index)} fingerprinted jobs in {index.cluster_count} clusters")
+        return index
+
+
+def collapse_duplicates(jobs: Iterable[Dict], index: Optional[DedupIndex] = None) -> List[Dict]:
+    """
+    Keep one job per exact job_id and per near-duplicate cluster
+
+    Args:
+        jobs: Jobs in priority order (the first copy of a posting is kept)
+        index: Index to add to, e.g. one preloaded with earlier jobs
+    """
+    if index is None:
+        index = DedupIndex()
+    by_id = {}
+    for job in jobs:
+        by_id.setdefault(job.get('job_id') or str(hash(job.get('source_url', ''))), job)
+    for job_id, job in by_id.items():
+        job.setdefault('job_id', job_id)
+    unique = index.canonical(by_id.values())
+    if len(unique) < len(by_id):
+        logger.info(f"Collapsed {len(by_id) - len(unique)} near-duplicate jobs into {index.cluster_count} clusters")
+    return unique
+
+
+def cluster_database(batch_size: int = 5000, rebuild: bool = False) -> DedupIndex:
+    """
+    Fingerprint and cluster the stored jobs that have no fingerprint yet
+
+    Jobs are streamed oldest first and updated in batches, so the first
+    posting of a job becomes its cluster id and memory stays bounded by the
+    number of distinct postings.
+
+    Args:
+        batch_size: Rows read and updated per round trip
+        rebuild: Clear every fingerprint and cluster first (after changing
+            the index settings)
+
+    Returns:
+        The index, holding every stored job
+    """
+    from sqlalchemy import bindparam, select, update
+    from ..database.connection import get_db
+    from ..database.models import Job
+
+    jobs = Job.__table__
+    if rebuild:
+        with get_db() as db:
+            db.execute(update(jobs).values(minhash=None, cluster_id=None))
+
+    index = DedupIndex.from_database(days=None)
+    query = (
+        select(jobs.c.id, jobs.c.job_id, jobs.c.title, jobs.c.company_name, jobs.c.description)
+        .where(jobs.c.minhash.is_(None))
+        .order_by(jobs.c.posted_date.asc().nulls_last(), jobs.c.id)
+        .execution_options(yield_per=batch_size)
+    )
+    stmt = (
+        update(jobs)
+        .where(jobs.c.id == bindparam('row_id'))
+        .values(minhash=bindparam('signature'), cluster_id=bindparam('cluster'))
+    )
+
+    def write(batch: List[Dict]):
+        with get_db() as db:
+            db.execute(stmt, batch)
+
+    batch, processed = [], 0
+    with get_db() as db:
+        for row in db.execute(query):
+            job = dict(row._mapping)
+            index.add(job)
+            batch.append({'row_id': job['id'], 'signature': job.get('minhash'), 'cluster': job['cluster_id']})
+            if len(batch) >= batch_size:
+                write(batch)
+                processed += len(batch)
+                batch = []
+                logger.info(f"Clustered {processed} jobs")
+    if batch:
+        write(batch)
+        processed += len(batch)
+
+    logger.info(f"Clustered {processed} jobs; {len(index)} jobs in {index.cluster_count} clusters")
+    return index
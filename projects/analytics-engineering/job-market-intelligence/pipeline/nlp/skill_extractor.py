@@ -6,7 +6,7 @@ import logging
 from typing import List, Dict, Set
 import spacy
 from ..config import TARGET_SKILLS, NLP_CONFIG
-from ..database.connection import get_db
+from ..database.connection import bulk_session, use_db
 from ..database.models import Skill, Job, JobSkill
 
 logger = logging.getLogger(__name__)
@@ -165,15 +165,16 @@ class SkillExtractor:
         
         return skill_years
     
-    def process_job(self, job_id: int):
+    def process_job(self, job_id: int, db=None):
         """
         Extract and save skills for a job
         
         Args:
             job_id: Database ID of the job
+            db: Session to use (default: a new one, committed on return)
         """
         try:
-            with get_db() as db:
+            with use_db(db) as db:
                 # Get job
                 job = db.query(Job).filter_by(id=job_id).first()
                 if not job:
@@ -212,7 +213,6 @@ class SkillExtractor:
                         )
                         db.add(job_skill)
                 
-                db.commit()
                 logger.info(f"Saved skills for job {job.title}")
                 
         except Exception as e:
@@ -241,23 +241,27 @@ class SkillExtractor:
             return 'Other'
     
     def bulk_process_jobs(self, limit: int = None):
-        """Process all jobs without skills"""
+        """
+        Process all jobs without skills, on one connection with periodic commits
+        
+        The jobs are read in pages of the bulk session's fetch size, in
+        id order, so the periodic commits happen as the jobs are processed.
+        """
         try:
-            with get_db() as db:
-                # Find jobs without skills
-                query = db.query(Job).outerjoin(JobSkill).filter(
+            with bulk_session() as bulk:
+                processed = 0
+                jobs = bulk.session.query(Job.id).outerjoin(Job.skills).filter(
                     JobSkill.id == None,
                     Job.is_active == True
                 )
+                for job_id, in bulk.stream(jobs, key=Job.id):
+                    if limit is not None and processed >= limit:
+                        break
+                    self.process_job(job_id, bulk.session)
+                    bulk.done()
+                    processed += 1
                 
-                if limit:
-                    query = query.limit(limit)
-                
-                jobs = query.all()
-                logger.info(f"Processing {len(jobs)} jobs for skill extraction")
-                
-                for job in jobs:
-                    self.process_job(job.id)
+                logger.info(f"Processed {processed} jobs for skill extraction")
                     
         except Exception as e:
             logger.error(f"Error in bulk processing: {e}")
@@ -0,0 +1,192 @@
+"""
+Pooled keep-alive HTTP client for the JSON job APIs
+
+Uses httpx (with HTTP/2 when the h2 package is installed) and falls back
+to a requests.Session with a connection pool. Either way connections and
+TLS sessions are reused across calls to the same API, and responses are
+requested gzip-compressed. Requests to each host are paced adaptively and
+refused with CircuitOpenError while the host keeps failing (see
+rate_control).
+
+One client is shared by every API source in a process (see get_client()).
+stream() exposes a response body as a file-like object so large feeds can
+be decoded incrementally instead of being read into memory first.
+"""
+import os
+import time
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .rate_control import CircuitOpenError, RateController
+
+logger = logging.getLogger(__name__)
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/json',
+    'Accept-Encoding': 'gzip, deflate',
+}
+
+
+class _ChunkReader:
+    """File-like wrapper over an iterator of byte chunks"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._buffer = b''
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b''
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class ApiClient:
+    """
+    Pooled HTTP client
+
+    Responses expose status_code, json() and raise_for_status() whichever
+    backend is in use.
+
+    Usage:
+        client = ApiClient()
+        response = client.get('https://remotive.com/api/remote-jobs', params={'limit': 100})
+        data = response.json()
+    """
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, timeout: float = 30, pool_size: int = 10,
+                 rate_limit_delay: float = 1):
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self.timeout = timeout
+        self.http2 = HTTPX_AVAILABLE and HTTP2_AVAILABLE
+        self.rate_control = RateController(delay=rate_limit_delay)
+
+        if HTTPX_AVAILABLE:
+            self._client = httpx.Client(
+                http2=self.http2,
+                headers=self.headers,
+                timeout=timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            )
+        else:
+            self._client = requests.Session()
+            self._client.headers.update(self.headers)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self._client.mount('https://', adapter)
+            self._client.mount('http://', adapter)
+
+    @property
+    def backend(self) -> str:
+        if not HTTPX_AVAILABLE:
+            return 'requests'
+        return 'httpx (HTTP/2)' if self.http2 else 'httpx'
+
+    def _paced(self, url: str):
+        """Wait for the host's next request slot"""
+        control = self.rate_control.for_url(url)
+        if not control.allow():
+            raise CircuitOpenError(f"circuit open for {control.host}")
+        try:
+            time.sleep(control.reserve())
+            if control.is_open:
+                raise CircuitOpenError(f"circuit open for {control.host}")
+        except BaseException:
+            control.release_probe()
+            raise
+        return control
+
+    def get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict[str, str]] = None):
+        """GET a URL on a pooled connection"""
+        control = self._paced(url)
+        started = time.monotonic()
+        try:
+            response = self._client.get(url, params=params, headers=headers, timeout=self.timeout)
+        except Exception:
+            control.record(None)
+            raise
+        except BaseException:
+            control.release_probe()
+            raise
+        control.record(response.status_code, time.monotonic() - started, response.headers.get('Retry-After'))
+        return response
+
+    @contextmanager
+    def stream(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict[str, str]] = None):
+        """
+        GET a URL without reading the body up front
+
+        Yields:
+            (response, body) where body is a file-like object over the
+            decompressed response body, read as it arrives
+        """
+        control = self._paced(url)
+        started = time.monotonic()
+        try:
+            if HTTPX_AVAILABLE:
+                request = self._client.build_request('GET', url, params=params, headers=headers, timeout=self.timeout)
+                response = self._client.send(request, stream=True)
+            else:
+                response = self._client.get(url, params=params, headers=headers, timeout=self.timeout, stream=True)
+        except Exception:
+            control.record(None)
+            raise
+        except BaseException:
+            control.release_probe()
+            raise
+        control.record(response.status_code, time.monotonic() - started, response.headers.get('Retry-After'))
+
+        try:
+            if HTTPX_AVAILABLE:
+                body = _ChunkReader(response.iter_bytes())
+            else:
+                response.raw.decode_content = True
+                body = response.raw
+            yield response, body
+        finally:
+            response.close()
+
+    def close(self):
+        self._client.close()
+
+
+_client: Optional[ApiClient] = None
+_client_pid: Optional[int] = None
+
+
+def get_client() -> ApiClient:
+    """
+    Process-wide shared client, created on first use
+
+    A new client is created after a fork so worker processes never share
+    sockets with their parent.
+    """
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        _client = ApiClient()
+        _client_pid = os.getpid()
+        logger.debug(f"HTTP client: {_client.backend}")
+    return _client
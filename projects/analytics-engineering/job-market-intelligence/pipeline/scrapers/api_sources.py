@@ -0,0 +1,259 @@
+"""
+Source registry for the free JSON job APIs
+
+Each API is a small ApiSource subclass declaring its endpoint, query
+parameters (one entry per request, so pagination is a list of params),
+where the jobs sit in the response, an optional keyword filter and a
+field mapping. Fetching, filtering and normalization (job_id, skills,
+experience level, truncation, timestamps) are shared, and every source
+runs on the pooled client from api_client.
+
+Sources with large feeds set stream_json: the response is then decoded
+incrementally with ijson (when installed) and filtered record by record
+while it downloads, so only one raw job is held in memory at a time and
+memory no longer grows with the size of the feed.
+
+Sources are registered with @register_source; source_tasks() turns the
+registered sources of a module into tasks for the orchestrator, so adding
+a source needs no new fetch loop. Given a journal directory, each task
+appends its jobs to the source's journal as they are parsed, so a source
+that is cancelled or crashes keeps what it had fetched.
+
+Usage:
+    @register_source
+    class ExampleScraper(ApiSource):
+        name = 'example'
+        label = 'Example API'
+        api_url = 'https://example.com/api/jobs'
+        results_key = 'jobs'
+
+        def map_fields(self, job):
+            return {'source_url': job['url'], 'title': job['title'], ...}
+"""
+import hashlib
+import logging
+from datetime import datetime
+from functools import partial
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Type
+
+from .api_client import ApiClient, get_client
+from ..storage.journal import Journal, JournalWriter
+
+logger = logging.getLogger(__name__)
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Skills to detect
+TARGET_SKILLS = [
+    'Python', 'R', 'SQL', 'Excel', 'Power BI', 'Tableau',
+    'PostgreSQL', 'MySQL', 'MongoDB', 'AWS', 'Azure', 'GCP',
+    'Machine Learning', 'Statistics', 'Spark', 'Airflow',
+    'Docker', 'Git', 'Looker', 'dbt', 'Snowflake', 'TensorFlow',
+    'scikit-learn', 'Pandas', 'NumPy', 'Stata', 'SPSS',
+    'Java', 'JavaScript', 'Scala', 'Hadoop', 'Kafka',
+    'Data Analysis', 'Data Science', 'Analytics', 'ETL',
+    'Business Intelligence', 'BI', 'Visualization', 'Dashboard'
+]
+
+
+def extract_skills(text: str) -> List[str]:
+    """Extract skills from text"""
+    if not text:
+        return []
+    text_lower = text.lower()
+    return [skill for skill in TARGET_SKILLS if skill.lower() in text_lower]
+
+
+def detect_experience_level(title: str, description: str = "") -> str:
+    """Detect experience level"""
+    text = f"{title} {description}".lower()
+    if any(w in text for w in ['senior', 'sr.', 'lead', 'principal', 'staff', 'head']):
+        return 'Senior'
+    elif any(w in text for w in ['junior', 'jr.', 'entry', 'graduate', 'intern', 'trainee']):
+        return 'Entry'
+    elif any(w in text for w in ['manager', 'director', 'vp', 'chief']):
+        return 'Manager'
+    return 'Mid'
+
+
+def generate_job_id(source: str, identifier: str) -> str:
+    """Generate unique job ID"""
+    return hashlib.md5(f"{source}:{identifier}".encode()).hexdigest()[:16]
+
+
+class ApiSource:
+    """Base class for JSON API job sources"""
+
+    name = ''
+    label = ''
+    icon = '🌐'
+    api_url = ''
+    params: Dict = {}
+    headers: Dict[str, str] = {}
+    # Key holding the job list; a response that is already a list is used as is
+    results_key: Optional[str] = None
+    # Leading records that aren't jobs (e.g. a legal notice)
+    skip_records = 0
+    # Decode the response incrementally instead of loading it whole
+    stream_json = False
+    # Only keep jobs where one of filter_fields() contains one of these
+    keywords: List[str] = []
+    # Status codes that mean "skip this source" rather than an error
+    skip_statuses: Dict[int, str] = {}
+    # Sources that can't run unattended (e.g. need an API key) are not scheduled
+    enabled = True
+
+    def __init__(self, client: Optional[ApiClient] = None):
+        self.client = client or get_client()
+
+    def queries(self) -> List[Dict]:
+        """Query parameters for each request (override for pagination)"""
+        return [self.params]
+
+    def extract(self, data) -> List[Dict]:
+        """Get the raw job list out of a response"""
+        if isinstance(data, list):
+            jobs = data
+        else:
+            jobs = data.get(self.results_key, []) if self.results_key else []
+        return jobs[self.skip_records:]
+
+    def filter_fields(self, job: Dict) -> Iterable[str]:
+        """Texts matched against `keywords`, cheapest first"""
+        return (job.get('title', ''),)
+
+    def keep(self, job: Dict, params: Dict) -> bool:
+        """Whether a raw job from the request made with `params` is kept"""
+        if not self.keywords:
+            return True
+        # Stop at the first matching field so long descriptions are only
+        # lowercased for jobs the title didn't already match
+        for text in self.filter_fields(job):
+            text = text.lower()
+            if any(kw in text for kw in self.keywords):
+                return True
+        return False
+
+    def map_fields(self, job: Dict) -> Dict:
+        """Map a raw API job to job fields (source_url, title, company_name, ...)"""
+        raise NotImplementedError
+
+    def identifier(self, job: Dict, fields: Dict) -> str:
+        """Stable identifier hashed into job_id (the job URL unless overridden)"""
+        return fields.get('source_url', '')
+
+    def parse(self, job: Dict) -> Dict:
+        """Map and normalize one raw job"""
+        fields = self.map_fields(job)
+        title = fields.get('title', '')
+        description = fields.get('description') or ''
+        tags = fields.get('tags') or []
+
+        parsed = {
+            'job_id': generate_job_id(self.name, self.identifier(job, fields)),
+            'source': self.name,
+            **fields,
+            'description': description[:2000],
+        }
+        if not parsed.get('experience_level'):
+            parsed['experience_level'] = detect_experience_level(title, description)
+        if not parsed.get('skills'):
+            parsed['skills'] = extract_skills(f"{title} {description} {' '.join(tags)}")
+        if not parsed.get('posted_date'):
+            parsed['posted_date'] = datetime.now().isoformat()
+        parsed['scraped_at'] = datetime.now().isoformat()
+        parsed['is_active'] = True
+        return parsed
+
+    def _skipped(self, response) -> bool:
+        if response.status_code in self.skip_statuses:
+            logger.warning(f"   {self.label} {self.skip_statuses[response.status_code]} - skipping")
+            return True
+        response.raise_for_status()
+        return False
+
+    def fetch(self, params: Dict) -> List[Dict]:
+        """Run one request and return its raw jobs"""
+        response = self.client.get(self.api_url, params=params or None, headers=self.headers or None)
+        if self._skipped(response):
+            return []
+        return self.extract(response.json())
+
+    def stream(self, params: Dict) -> Iterator[Dict]:
+        """Run one request, yielding raw jobs as they are decoded"""
+        prefix = f"{self.results_key}.item" if self.results_key else 'item'
+        with self.client.stream(self.api_url, params=params or None, headers=self.headers or None) as (response, body):
+            if self._skipped(response):
+                return
+            yield from islice(ijson.items(body, prefix, use_float=True), self.skip_records, None)
+
+    def records(self, params: Dict) -> Iterable[Dict]:
+        """Raw jobs for one request, streamed when the source supports it"""
+        if self.stream_json and IJSON_AVAILABLE:
+            return self.stream(params)
+        return self.fetch(params)
+
+    def scrape(self, journal: Optional[JournalWriter] = None) -> List[Dict]:
+        """
+        Fetch, filter and normalize jobs from every query
+
+        Args:
+            journal: Also append each job here as soon as it is parsed
+        """
+        logger.info(f"{self.icon} Fetching from {self.label}...")
+
+        jobs = []
+        # Requests to the same API are paced by the client
+        for params in self.queries():
+            try:
+                raw_count = 0
+                for job in self.records(params):
+                    raw_count += 1
+                    if self.keep(job, params):
+                        jobs.append(self.parse(job))
+                        if journal is not None:
+                            journal.write(jobs[-1])
+                logger.info(f"   Raw jobs: {raw_count}")
+            except Exception as e:
+                logger.error(f"   ❌ {self.label} error: {e}")
+
+        logger.info(f"   ✅ Found {len(jobs)} jobs")
+        return jobs
+
+
+SOURCE_REGISTRY: Dict[str, Type[ApiSource]] = {}
+
+
+def register_source(cls: Type[ApiSource]) -> Type[ApiSource]:
+    """Class decorator adding an API source to the registry"""
+    SOURCE_REGISTRY[cls.name] = cls
+    return cls
+
+
+def scrape_source(source_class: Type[ApiSource], journal_dir: Optional[str] = None) -> List[Dict]:
+    """Run one source (picklable entry point for the orchestrator)"""
+    if journal_dir is None:
+        return source_class().scrape()
+    with Journal(journal_dir, source_class.name).writer() as journal:
+        return source_class().scrape(journal)
+
+
+def source_tasks(module: Optional[str] = None,
+                 journal_dir: Optional[str] = None) -> Dict[str, Callable[[], List[Dict]]]:
+    """
+    Orchestrator tasks for the enabled registered sources
+
+    Args:
+        module: Only include sources defined in this module
+        journal_dir: Journal every source's jobs under this directory
+    """
+    return {
+        name: partial(scrape_source, cls, journal_dir)
+        for name, cls in SOURCE_REGISTRY.items()
+        if cls.enabled and (module is None or cls.__module__ == module)
+    }
@@ -6,13 +6,22 @@ import logging
 import hashlib
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List, Dict, Optional
-import requests
-from bs4 import BeautifulSoup
+from typing import List, Dict, Optional, Tuple, Callable, Iterable, Iterator
+from bs4 import BeautifulSoup, SoupStrainer
+from sqlalchemy import select
 
 from ..config import SCRAPING_CONFIG
+from .fetcher import AsyncFetcher
+from .http_cache import HttpCache
+from .parsing import get_parser
+from .selector_profile import SelectorProfile
+from .incremental import KnownJobs, IncrementalCrawl
 from ..database.connection import get_db
-from ..database.models import Job, Company, ScrapingLog
+from ..database.models import Company, Job, ScrapingLog
+from ..database.job_writer import JobBatchWriter
+from ..database.company_resolver import CompanyResolver
+from ..database.liveness import track_liveness
+from ..nlp.dedup import DedupIndex
 
 logger = logging.getLogger(__name__)
 
@@ -22,15 +31,38 @@ class BaseScraper(ABC):
     Base class for all job board scrapers
     """
     
+    # Company cache shared by every scraper in the process
+    _company_resolver: Optional[CompanyResolver] = None
+    # Near-duplicate index shared the same way, so copies of a posting on
+    # two boards land in one cluster
+    _dedup_index: Optional[DedupIndex] = None
+    
+    # Scope for listing pages: a SoupStrainer for the BeautifulSoup backends
+    # and the equivalent CSS selector for selectolax. None parses everything.
+    card_strainer: Optional[SoupStrainer] = None
+    card_selector: Optional[str] = None
+    
+    # Card-finding strategies, (name, function(soup) -> cards), in cascade
+    # order. The selector profile tries the last successful one first.
+    card_strategies: List[Tuple[str, Callable]] = []
+    
+    # Whether parse_job_details() can enrich jobs from their detail pages
+    detail_pages = False
+    
     def __init__(self, source_name: str):
         self.source_name = source_name
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.headers = {
             'User-Agent': SCRAPING_CONFIG['user_agent']
-        })
+        }
+        self._fetcher = None
+        self._selector_profile = None
+        self.incremental: Optional[IncrementalCrawl] = None
+        self.liveness: Optional[Dict] = None
         self.rate_limit_delay = SCRAPING_CONFIG['rate_limit_delay']
         self.timeout = SCRAPING_CONFIG['timeout']
         self.retry_times = SCRAPING_CONFIG['retry_times']
+        self.db_batch_size = SCRAPING_CONFIG['db_batch_size']
+        self.parser = get_parser(SCRAPING_CONFIG['html_parser'])
         
         self.jobs_scraped = 0
         self.jobs_new = 0
@@ -45,32 +77,111 @@ class BaseScraper(ABC):
         """Apply rate limiting between requests"""
         time.sleep(self.rate_limit_delay)
     
+    @property
+    def fetcher(self) -> AsyncFetcher:
+        """Concurrent fetch engine, created on first use"""
+        if self._fetcher is None:
+            cache = None
+            if SCRAPING_CONFIG['http_cache_enabled']:
+                cache = HttpCache(SCRAPING_CONFIG['http_cache_path'])
+            self._fetcher = AsyncFetcher(
+                headers=self.headers,
+                rate_limit_delay=self.rate_limit_delay,
+                timeout=self.timeout,
+                retry_times=self.retry_times,
+                cache=cache,
+            )
+        return self._fetcher
+    
+    def close(self):
+        """Release the HTTP client, its event loop and the page cache"""
+        if self._fetcher is not None:
+            self._fetcher.close()
+            if self._fetcher.cache:
+                logger.info(f"HTTP cache for {self.source_name}: {self._fetcher.cache.stats()}")
+                self._fetcher.cache.close()
+            self._fetcher = None
+        if self._selector_profile is not None:
+            logger.info(
+                f"Card strategy for {self.source_name}: '{self._selector_profile.preferred}' "
+                f"({self._selector_profile.hits} hits, {self._selector_profile.fallbacks} fallbacks)"
+            )
+    
     def fetch_page(self, url: str) -> Optional[BeautifulSoup]:
         """
         Fetch a page with retry logic
         
+        Rate limiting and backoff are handled per host by the fetcher.
+        
         Args:
             url: URL to fetch
             
         Returns:
             BeautifulSoup object or None if failed
         """
-        for attempt in range(self.retry_times):
-            try:
-                response = self.session.get(url, timeout=self.timeout)
-                response.raise_for_status()
-                return BeautifulSoup(response.content, 'html.parser')
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"Attempt {attempt + 1}/{self.retry_times} failed for {url}: {e}")
-                if attempt < self.retry_times - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
-                else:
-                    logger.error(f"All attempts failed for {url}")
-                    return None
+        result = self.fetcher.fetch(url)
+        if result is None:
+            return None
+        return self.parser.parse(result.content)
+    
+    def fetch_pages(self, urls: List[str]) -> List[Optional[BeautifulSoup]]:
+        """
+        Fetch several pages concurrently
+        
+        Args:
+            urls: URLs to fetch
+            
+        Returns:
+            BeautifulSoup objects in the same order as `urls` (None for failures)
+        """
+        return [
+            self.parser.parse(result.content) if result else None
+            for result in self.fetcher.fetch_many(urls)
+        ]
+    
+    def parse_listing(self, content: bytes) -> BeautifulSoup:
+        """
+        Parse only the card containers of a listing page
+        
+        Scrapers should fall back to `self.parser.parse(content)` when the
+        scoped document has no cards (e.g. after a markup change).
+        """
+        return self.parser.parse(content, self.card_strainer, self.card_selector)
+    
+    @property
+    def selector_profile(self) -> SelectorProfile:
+        """Learned card strategy for this source, loaded on first use"""
+        if self._selector_profile is None:
+            self._selector_profile = SelectorProfile(
+                self.source_name,
+                self.card_strategies,
+                SCRAPING_CONFIG['selector_profile_path'],
+            )
+        return self._selector_profile
+    
+    def find_job_cards(self, soup) -> List:
+        """Find job cards, trying the strategy that last worked first"""
+        return self.selector_profile.find(soup)
+    
+    @property
+    def company_resolver(self) -> CompanyResolver:
+        """Company name -> id cache shared across scraper subclasses"""
+        if BaseScraper._company_resolver is None:
+            BaseScraper._company_resolver = CompanyResolver()
+        return BaseScraper._company_resolver
+    
+    @property
+    def dedup_index(self) -> DedupIndex:
+        """Near-duplicate index over the recently seen stored jobs, loaded on first use"""
+        if BaseScraper._dedup_index is None:
+            BaseScraper._dedup_index = DedupIndex.from_database()
+        return BaseScraper._dedup_index
     
     def save_job(self, job_data: Dict) -> bool:
         """
-        Save or update job in database
+        Save or update a single job in database
+        
+        Prefer save_jobs() for more than a handful of jobs.
         
         Args:
             job_data: Dictionary with job information
@@ -78,37 +189,122 @@ class BaseScraper(ABC):
         Returns:
             True if saved successfully, False otherwise
         """
+        return self.save_jobs([job_data])
+    
+    def save_jobs(self, jobs: Iterable[Dict]) -> bool:
+        """
+        Upsert jobs in batches of db_batch_size
+        
+        Args:
+            jobs: Job dictionaries; a generator is consumed as it yields
+            
+        Returns:
+            True if saved successfully, False otherwise
+        """
+        writer = JobBatchWriter(
+            batch_size=self.db_batch_size,
+            company_resolver=self.company_resolver,
+        )
         try:
-            with get_db() as db:
-                # Check if job exists
-                existing_job = db.query(Job).filter_by(job_id=job_data['job_id']).first()
-                
-                if existing_job:
-                    # Update existing job
-                    for key, value in job_data.items():
-                        setattr(existing_job, key, value)
-                    existing_job.updated_at = datetime.utcnow()
-                    self.jobs_updated += 1
-                    logger.info(f"Updated job: {job_data['title']} at {job_data['company_name']}")
-                else:
-                    # Create new job
-                    new_job = Job(**job_data)
-                    db.add(new_job)
-                    self.jobs_new += 1
-                    logger.info(f"Added new job: {job_data['title']} at {job_data['company_name']}")
-                
-                db.commit()
-                self.jobs_scraped += 1
-                return True
-                
+            # Loaded from the database on first use, so inside the try
+            writer.dedup_index = self.dedup_index
+            writer.add_many(jobs)
+            writer.flush()
+            return True
         except Exception as e:
-            logger.error(f"Error saving job: {e}")
+            logger.error(f"Error saving jobs: {e}")
             return False
+        finally:
+            self.jobs_scraped += writer.jobs_written
+            self.jobs_new += writer.jobs_new
+            self.jobs_updated += writer.jobs_updated
+    
+    def parse_job_details(self, soup: BeautifulSoup) -> Optional[Dict]:
+        """
+        Extract extra fields from a job's detail page
+        
+        Scrapers that set detail_pages = True override this.
+        
+        Returns:
+            Fields to merge into the job (e.g. description, requirements)
+        """
+        return None
+    
+    def detail_fingerprint(self, job_data: Dict) -> str:
+        """Hash of the card fields; a changed card means the detail page may have changed"""
+        card = '|'.join(str(job_data.get(key) or '') for key in ('title', 'company_name', 'location', 'description'))
+        return hashlib.md5(card.encode()).hexdigest()
+    
+    def stored_detail_fingerprints(self, job_ids: List[str]) -> Dict[str, str]:
+        """Detail fingerprints saved with already-enriched jobs"""
+        try:
+            with get_db() as db:
+                rows = db.execute(
+                    select(Job.job_id, Job.extra_metadata).where(Job.job_id.in_(job_ids))
+                ).all()
+        except Exception as e:
+            logger.warning(f"Could not load stored job details, fetching all: {e}")
+            return {}
+        return {
+            job_id: metadata['detail_fingerprint']
+            for job_id, metadata in rows
+            if metadata and metadata.get('detail_fingerprint')
+        }
+    
+    def enrich_jobs(self, jobs: List[Dict]) -> Iterator[Dict]:
+        """
+        Merge detail-page fields into parsed jobs, yielding each job when ready
+        
+        Jobs whose details are already stored and whose card is unchanged
+        are passed through without a request; their card description is
+        dropped so the upsert keeps the stored full one. The remaining
+        detail pages are fetched through a bounded pool (detail_workers)
+        that also respects the per-host limits, and each job is yielded as
+        soon as its page arrives.
+        
+        Args:
+            jobs: Jobs parsed from listing cards
+        """
+        if not self.detail_pages:
+            yield from jobs
+            return
+        
+        fingerprints = {job['job_id']: self.detail_fingerprint(job) for job in jobs}
+        stored = self.stored_detail_fingerprints(list(fingerprints))
+        
+        pending = {}
+        unchanged = 0
+        for job in jobs:
+            if stored.get(job['job_id']) == fingerprints[job['job_id']]:
+                unchanged += 1
+                job.pop('description', None)
+                yield job
+            else:
+                pending.setdefault(job['source_url'], []).append(job)
+        
+        logger.info(f"Fetching {len(pending)} detail pages ({unchanged} jobs unchanged)")
+        
+        for url, result in self.fetcher.fetch_as_completed(pending, SCRAPING_CONFIG['detail_workers']):
+            details = None
+            if result:
+                try:
+                    details = self.parse_job_details(self.parser.parse(result.content))
+                except Exception as e:
+                    logger.warning(f"Error parsing job details from {url}: {e}")
+            
+            for job in pending[url]:
+                if details:
+                    job.update({key: value for key, value in details.items() if value})
+                    job['metadata'] = {'detail_fingerprint': fingerprints[job['job_id']]}
+                yield job
     
     def get_or_create_company(self, company_name: str, **kwargs) -> Optional[int]:
         """
         Get existing company or create new one
         
+        Plain lookups go through the shared company resolver; the database
+        is only queried when the name has not been seen in this run.
+        
         Args:
             company_name: Name of the company
             **kwargs: Additional company attributes
@@ -117,6 +313,9 @@ class BaseScraper(ABC):
             Company ID or None if failed
         """
         try:
+            if not kwargs:
+                return self.company_resolver.resolve(company_name)
+            
             with get_db() as db:
                 company = db.query(Company).filter_by(name=company_name).first()
                 
@@ -126,11 +325,63 @@ class BaseScraper(ABC):
                     db.commit()
                     logger.info(f"Created new company: {company_name}")
                 
+                self.company_resolver.ids[company_name] = company.id
                 return company.id
         except Exception as e:
             logger.error(f"Error getting/creating company: {e}")
             return None
     
+    def start_incremental_crawl(self):
+        """Load stored jobs so paginated searches can stop once they only find known jobs"""
+        try:
+            known = KnownJobs.from_database(self.source_name)
+        except Exception as e:
+            logger.warning(f"Could not load known jobs, crawling all pages: {e}")
+            return
+        self.incremental = IncrementalCrawl(known, SCRAPING_CONFIG['incremental_stale_pages'])
+    
+    def full_crawl_due(self) -> bool:
+        """
+        Whether this run should crawl every page despite incremental crawling
+        
+        Incremental runs stop on pages of stored jobs, so they never count
+        missed jobs; without a complete run now and then nothing would
+        expire. A full crawl is due when none of the source's last
+        full_crawl_every - 1 completed runs was complete.
+        """
+        every = SCRAPING_CONFIG['full_crawl_every']
+        if every <= 0:
+            return False
+        try:
+            with get_db() as db:
+                recent = db.execute(
+                    select(ScrapingLog.extra_metadata)
+                    .where(ScrapingLog.source == self.source_name, ScrapingLog.status == 'completed')
+                    .order_by(ScrapingLog.started_at.desc())
+                    .limit(every - 1)
+                ).scalars().all()
+        except Exception as e:
+            logger.warning(f"Could not read recent runs, crawling incrementally: {e}")
+            return False
+        return not any((metadata or {}).get('crawl') == 'full' for metadata in recent)
+    
+    @property
+    def crawl_complete(self) -> bool:
+        """Whether the run fetched every results page (no incremental search stopped early)"""
+        return self.incremental is None or self.incremental.searches_stopped == 0
+    
+    def update_liveness(self, jobs: List[Dict]):
+        """
+        Mark the run's jobs as seen and expire the source's jobs it keeps missing
+        
+        Misses are only counted when no incremental search stopped early,
+        since the pages it skipped may still list the jobs.
+        """
+        try:
+            self.liveness = track_liveness(self.source_name, (job['job_id'] for job in jobs), self.crawl_complete)
+        except Exception as e:
+            logger.error(f"Error tracking job liveness: {e}")
+    
     def log_scraping_run(self, status: str, error_message: Optional[str] = None):
         """
         Log scraping run to database
@@ -150,12 +401,22 @@ class BaseScraper(ABC):
                     jobs_new=self.jobs_new,
                     jobs_updated=self.jobs_updated,
                     error_message=error_message,
+                    extra_metadata=self.run_metadata() if status != 'running' else None,
                 )
                 db.add(log)
                 db.commit()
         except Exception as e:
             logger.error(f"Error logging scraping run: {e}")
     
+    def run_metadata(self) -> Dict:
+        """Crawl type, incremental crawl and liveness stats of the run for its scraping log"""
+        metadata = {'crawl': 'full' if self.crawl_complete else 'incremental'}
+        if self.incremental:
+            metadata['incremental'] = self.incremental.stats()
+        if self.liveness:
+            metadata['liveness'] = self.liveness
+        return metadata
+    
     @abstractmethod
     def scrape_jobs(self, keywords: List[str], locations: List[str]) -> List[Dict]:
         """
@@ -181,15 +442,25 @@ class BaseScraper(ABC):
         self.start_time = datetime.utcnow()
         self.log_scraping_run('running')
         
+        if SCRAPING_CONFIG['incremental_crawl']:
+            if self.full_crawl_due():
+                logger.info(f"Full crawl of {self.source_name} due - fetching every page")
+            else:
+                self.start_incremental_crawl()
+        
         try:
             logger.info(f"Starting {self.source_name} scraper")
             jobs = self.scrape_jobs(keywords, locations)
             
             logger.info(f"Scraped {len(jobs)} jobs from {self.source_name}")
             
-            for job_data in jobs:
-                self.save_job(job_data)
-                self.rate_limit()
+            if SCRAPING_CONFIG['detail_enrichment']:
+                saved = self.save_jobs(self.enrich_jobs(jobs))
+            else:
+                saved = self.save_jobs(jobs)
+            
+            if saved and SCRAPING_CONFIG['liveness_tracking']:
+                self.update_liveness(jobs)
             
             self.log_scraping_run('completed')
             logger.info(f"Completed {self.source_name} scraper: {self.jobs_new} new, {self.jobs_updated} updated")
@@ -199,5 +470,7 @@ class BaseScraper(ABC):
             logger.error(error_msg)
             self.log_scraping_run('failed', error_msg)
             raise
+        finally:
+            self.close()
 
 
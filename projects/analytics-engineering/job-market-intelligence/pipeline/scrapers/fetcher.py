@@ -0,0 +1,252 @@
+"""
+Concurrent HTTP fetch engine shared by the scrapers
+
+Runs an asyncio event loop on a background thread so the (synchronous)
+scraper code can submit single URLs or whole batches. Every host gets its
+own in-flight limit and adaptive pacing (see rate_control), so fanning out
+many searches never exceeds the per-site politeness budget, a fast site is
+not kept waiting and a failing one is skipped. With an HttpCache
+attached, pages are revalidated with conditional requests and concurrent
+requests for the same URL share one network round trip. Cache reads and
+writes (SQLite queries, commits and zlib) run in worker threads so they
+never stall the other requests on the event loop.
+"""
+import time
+import queue
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Iterable, Iterator, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from ..config import SCRAPING_CONFIG
+from .http_cache import HttpCache, CachedResponse
+from .rate_control import HostController, RateController, is_retryable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FetchResult:
+    """Body and metadata of a completed HTTP response"""
+    url: str
+    status_code: int
+    content: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    from_cache: bool = False
+
+    @classmethod
+    def from_cached(cls, cached: CachedResponse) -> 'FetchResult':
+        return cls(
+            url=cached.url,
+            status_code=cached.status_code,
+            content=cached.content,
+            headers=cached.headers,
+            from_cache=cached.from_cache,
+        )
+
+
+class HostLimiter:
+    """In-flight cap plus adaptive pacing for one host"""
+
+    def __init__(self, max_concurrent: int, control: HostController):
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.control = control
+
+
+class AsyncFetcher:
+    """
+    Fetch pages concurrently with per-host rate limiting
+
+    Usage:
+        fetcher = AsyncFetcher(headers={'User-Agent': '...'})
+        result = fetcher.fetch('https://example.com')
+        results = fetcher.fetch_many(['https://a.com/1', 'https://b.com/1'])
+        fetcher.close()
+    """
+
+    def __init__(self,
+                 headers: Optional[Dict[str, str]] = None,
+                 max_concurrent_per_host: Optional[int] = None,
+                 rate_limit_delay: Optional[float] = None,
+                 timeout: Optional[float] = None,
+                 retry_times: Optional[int] = None,
+                 cache: Optional[HttpCache] = None):
+        self.max_concurrent_per_host = max_concurrent_per_host or SCRAPING_CONFIG['max_concurrent_requests']
+        delay = rate_limit_delay if rate_limit_delay is not None else SCRAPING_CONFIG['rate_limit_delay']
+        # Pacing starts at one request per `delay` seconds per host and
+        # adapts to how each host responds
+        self.rate_control = RateController(
+            delay=delay,
+            min_delay=SCRAPING_CONFIG['min_request_delay'],
+            max_delay=SCRAPING_CONFIG['max_request_delay'],
+            failure_threshold=SCRAPING_CONFIG['circuit_failure_threshold'],
+            cooldown=SCRAPING_CONFIG['circuit_cooldown'],
+        )
+        self.timeout = timeout or SCRAPING_CONFIG['timeout']
+        self.retry_times = retry_times or SCRAPING_CONFIG['retry_times']
+        self.headers = headers or {'User-Agent': SCRAPING_CONFIG['user_agent']}
+        self.cache = cache
+
+        self._hosts: Dict[str, HostLimiter] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='async-fetcher', daemon=True)
+        self._thread.start()
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=self.timeout,
+            follow_redirects=True,
+        )
+
+    def _limiter(self, url: str) -> HostLimiter:
+        host = urlsplit(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = HostLimiter(self.max_concurrent_per_host, self.rate_control.for_url(url))
+        return self._hosts[host]
+
+    async def _fetch(self, url: str) -> Optional[FetchResult]:
+        """Fetch one URL, sharing the request with concurrent callers"""
+        if self.cache:
+            cached = await asyncio.to_thread(self.cache.fresh, url)
+            if cached:
+                return FetchResult.from_cached(cached)
+
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_network(url))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        return await task
+
+    async def _fetch_network(self, url: str) -> Optional[FetchResult]:
+        """Fetch one URL with per-host limits, adaptive pacing and retries"""
+        limiter = self._limiter(url)
+        control = limiter.control
+        cached = await asyncio.to_thread(self.cache.lookup, url) if self.cache else None
+        headers = HttpCache.conditional_headers(cached)
+
+        for attempt in range(self.retry_times):
+            if not control.allow():
+                logger.warning(f"Circuit open for {control.host} - skipping {url}")
+                return None
+
+            try:
+                async with limiter.semaphore:
+                    # Waiting (pacing, Retry-After, backoff after failures) uses
+                    # asyncio.sleep so other hosts keep making progress
+                    await asyncio.sleep(control.reserve())
+                    if control.is_open:
+                        logger.warning(f"Circuit open for {control.host} - skipping {url}")
+                        return None
+                    started = time.monotonic()
+                    try:
+                        response = await self._client.get(url, headers=headers)
+                    except httpx.HTTPError as e:
+                        control.record(None)
+                        logger.warning(f"Attempt {attempt + 1}/{self.retry_times} failed for {url}: {e}")
+                        continue
+                    control.record(response.status_code, time.monotonic() - started,
+                                   response.headers.get('Retry-After'))
+            finally:
+                # A cancelled or crashed probe would otherwise keep the host refused
+                control.release_probe()
+
+            if response.status_code == 304 and cached:
+                return FetchResult.from_cached(await asyncio.to_thread(self.cache.revalidated_hit, url))
+            if response.is_success:
+                if self.cache:
+                    await asyncio.to_thread(
+                        self.cache.store, url, response.status_code, response.headers, response.content)
+                return FetchResult(
+                    url=str(response.url),
+                    status_code=response.status_code,
+                    content=response.content,
+                    headers=dict(response.headers),
+                )
+            if not is_retryable(response.status_code):
+                logger.warning(f"HTTP {response.status_code} for {url} - not retrying")
+                return None
+            logger.warning(f"Attempt {attempt + 1}/{self.retry_times} failed for {url}: HTTP {response.status_code}")
+
+        logger.error(f"All attempts failed for {url}")
+        return None
+
+    async def _fetch_many(self, urls: List[str]) -> List[Optional[FetchResult]]:
+        return await asyncio.gather(*(self._fetch(url) for url in urls))
+
+    async def _produce(self, urls: List[str], slots: asyncio.Semaphore, results: queue.Queue):
+        """Start fetches as slots free up and hand each result to the consumer thread"""
+        async def fetch_one(url):
+            try:
+                result = await self._fetch(url)
+            except Exception as e:
+                logger.error(f"Error fetching {url}: {e}")
+                result = None
+            results.put((url, result))
+        
+        tasks = []
+        for url in urls:
+            await slots.acquire()
+            tasks.append(asyncio.ensure_future(fetch_one(url)))
+        await asyncio.gather(*tasks)
+    
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def fetch(self, url: str) -> Optional[FetchResult]:
+        """Fetch a single URL, blocking until it completes"""
+        return self._run(self._fetch(url))
+
+    def fetch_many(self, urls: Iterable[str]) -> List[Optional[FetchResult]]:
+        """
+        Fetch many URLs concurrently
+
+        Returns:
+            Results in the same order as `urls` (None for failures)
+        """
+        urls = list(urls)
+        if not urls:
+            return []
+        return self._run(self._fetch_many(urls))
+
+    def fetch_as_completed(self, urls: Iterable[str], max_pending: int = 8) -> Iterator[Tuple[str, Optional[FetchResult]]]:
+        """
+        Fetch many URLs, yielding each result as soon as it completes
+        
+        At most `max_pending` responses are in flight or waiting to be
+        consumed, so memory stays bounded however many URLs are queued.
+        Per-host limits still apply on top of this.
+        
+        Yields:
+            (url, result) tuples in completion order (result is None for failures)
+        """
+        urls = list(urls)
+        if not urls:
+            return
+        
+        results: queue.Queue = queue.Queue()
+        slots = asyncio.Semaphore(max_pending)
+        producer = asyncio.run_coroutine_threadsafe(self._produce(urls, slots, results), self._loop)
+        try:
+            for _ in urls:
+                item = results.get()
+                self._loop.call_soon_threadsafe(slots.release)
+                yield item
+        finally:
+            # Stop queueing new requests if the consumer stops early
+            producer.cancel()
+    
+    def close(self):
+        """Close the HTTP client and stop the event loop"""
+        if self._loop.is_closed():
+            return
+        for stats in self.rate_control.stats():
+            logger.info(f"Pacing for {stats['host']}: {stats}")
+        self._run(self._client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
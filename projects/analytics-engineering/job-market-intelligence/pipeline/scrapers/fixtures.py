@@ -0,0 +1,230 @@
+"""
+Record/replay HTTP fixtures for offline scraper runs
+
+A FixtureArchive is a versioned zip of the responses one source returned:
+a manifest (format version, origin, recording time, summary of the jobs
+scraped) plus one body per request path. FixtureServer is a local
+stand-in for the source's site. Scrapers are pointed at server.url instead
+of the real origin:
+
+- recording (upstream given): every request is forwarded to the live site
+  and its response stored in the archive
+- replay: responses are served from the archive; unknown paths get a 404
+  and are counted as misses
+
+Absolute links to the real origin inside bodies are rewritten to the
+server's URL when served, so detail-page and pagination links stay local.
+GET /_fixtures/stats returns request and miss counts.
+
+Only the standard library is used so the standalone scripts can share it.
+"""
+import json
+import zipfile
+import logging
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the archive layout changes
+FIXTURE_FORMAT = 1
+
+STATS_PATH = '/_fixtures/stats'
+
+
+class FixtureArchive:
+    """
+    Responses recorded from one source, keyed by request path and query
+
+    Usage:
+        archive = FixtureArchive.latest('data/fixtures', 'fuzu')
+        status, content_type, body = archive.responses['/kenya/jobs?q=data&page=1']
+    """
+
+    def __init__(self, source: str, origin: str, path: Optional[Path] = None,
+                 recorded_at: Optional[str] = None, summary: Optional[Dict] = None):
+        self.source = source
+        self.origin = origin.rstrip('/')
+        self.path = path
+        self.recorded_at = recorded_at or datetime.utcnow().isoformat()
+        self.summary = summary or {}
+        # path?query -> (status_code, content_type, body)
+        self.responses: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: str, status_code: int, content_type: str, body: bytes):
+        with self._lock:
+            self.responses[key] = (status_code, content_type, body)
+
+    def save(self, fixtures_dir: Union[str, Path]) -> Path:
+        """
+        Write a new version of the archive
+
+        Returns:
+            <fixtures_dir>/<source>/<source>-<timestamp>.zip
+        """
+        timestamp = datetime.utcnow().strftime('%Y%m%d-%H%M%S')
+        path = Path(fixtures_dir) / self.source / f"{self.source}-{timestamp}.zip"
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        entries = []
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for i, (key, (status_code, content_type, body)) in enumerate(sorted(self.responses.items())):
+                name = f"bodies/{i:05d}"
+                zf.writestr(name, body)
+                entries.append({
+                    'key': key,
+                    'status_code': status_code,
+                    'content_type': content_type,
+                    'body': name,
+                })
+            zf.writestr('manifest.json', json.dumps({
+                'format': FIXTURE_FORMAT,
+                'source': self.source,
+                'origin': self.origin,
+                'recorded_at': self.recorded_at,
+                'summary': self.summary,
+                'entries': entries,
+            }, indent=2))
+
+        self.path = path
+        logger.info(f"Saved {len(entries)} responses to {path}")
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'FixtureArchive':
+        path = Path(path)
+        with zipfile.ZipFile(path) as zf:
+            manifest = json.loads(zf.read('manifest.json'))
+            if manifest['format'] != FIXTURE_FORMAT:
+                raise ValueError(f"{path} has fixture format {manifest['format']}, expected {FIXTURE_FORMAT}")
+            archive = cls(manifest['source'], manifest['origin'], path,
+                          manifest['recorded_at'], manifest.get('summary'))
+            for entry in manifest['entries']:
+                archive.responses[entry['key']] = (
+                    entry['status_code'], entry['content_type'], zf.read(entry['body'])
+                )
+        return archive
+
+    @staticmethod
+    def versions(fixtures_dir: Union[str, Path], source: str) -> List[Path]:
+        """Archives recorded for a source, oldest first"""
+        return sorted((Path(fixtures_dir) / source).glob(f"{source}-*.zip"))
+
+    @classmethod
+    def latest(cls, fixtures_dir: Union[str, Path], source: str) -> Optional['FixtureArchive']:
+        """Most recent archive for a source, or None if none was recorded"""
+        versions = cls.versions(fixtures_dir, source)
+        return cls.load(versions[-1]) if versions else None
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    server: 'FixtureServer'
+
+    def do_GET(self):
+        if self.path == STATS_PATH:
+            self._send(200, 'application/json', json.dumps(self.server.stats()).encode())
+            return
+
+        self.server.count(miss=False)
+        if self.server.upstream:
+            status_code, content_type, body = self.server.forward(self.path, self.headers)
+            if status_code is None:
+                self._send(502, 'text/plain', body)
+                return
+            self.server.archive.add(self.path, status_code, content_type, body)
+        else:
+            response = self.server.archive.responses.get(self.path)
+            if response is None:
+                self.server.count(miss=True)
+                logger.warning(f"No fixture for {self.path}")
+                self._send(404, 'text/plain', b'no fixture recorded for this path')
+                return
+            status_code, content_type, body = response
+
+        self._send(status_code, content_type, self.server.rewrite(body))
+
+    def _send(self, status_code: int, content_type: str, body: bytes):
+        self.send_response(status_code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"fixture server: {format % args}")
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """
+    Local stand-in for one source's site
+
+    Usage:
+        # Record
+        archive = FixtureArchive('fuzu', 'https://www.fuzu.com')
+        with FixtureServer(archive, upstream=archive.origin) as server:
+            run_scraper(base_url=server.url)
+        archive.save('data/fixtures')
+
+        # Replay
+        with FixtureServer(FixtureArchive.latest('data/fixtures', 'fuzu')) as server:
+            run_scraper(base_url=server.url)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, archive: FixtureArchive, upstream: Optional[str] = None,
+                 port: int = 0, timeout: float = 30):
+        super().__init__(('127.0.0.1', port), _FixtureHandler)
+        self.archive = archive
+        self.upstream = upstream.rstrip('/') if upstream else None
+        self.upstream_timeout = timeout
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.requests = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> 'FixtureServer':
+        self._thread = threading.Thread(target=self.serve_forever, name='fixture-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self._thread.join()
+        self.server_close()
+
+    def count(self, miss: bool):
+        with self._stats_lock:
+            if miss:
+                self.misses += 1
+            else:
+                self.requests += 1
+
+    def stats(self) -> Dict:
+        return {'requests': self.requests, 'misses': self.misses}
+
+    def rewrite(self, body: bytes) -> bytes:
+        """Point absolute links to the real origin at this server"""
+        return body.replace(self.archive.origin.encode(), self.url.encode())
+
+    def forward(self, path: str, headers) -> tuple:
+        """Fetch a path from the live site (recording mode)"""
+        request = urllib.request.Request(self.upstream + path, headers={
+            name: headers[name] for name in ('User-Agent', 'Accept', 'Accept-Language') if headers.get(name)
+        })
+        try:
+            with urllib.request.urlopen(request, timeout=self.upstream_timeout) as response:
+                return response.status, response.headers.get('Content-Type', 'text/html'), response.read()
+        except urllib.error.HTTPError as e:
+            # Error pages are recorded too so replays see the same failures
+            return e.code, e.headers.get('Content-Type', 'text/html'), e.read()
+        except (urllib.error.URLError, OSError) as e:
+            logger.warning(f"Could not record {path}: {e}")
+            return None, 'text/plain', str(e).encode()
@@ -9,11 +9,24 @@ import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 from urllib.parse import urljoin, urlencode
+from bs4 import SoupStrainer
 from .base_scraper import BaseScraper
 
 logger = logging.getLogger(__name__)
 
 
+# Pagination link: rel="next" or link text like "Next", "→", "»"
+NEXT_LINK_PATTERN = re.compile(
+    rb'<a\b[^>]*\brel=["\']?next\b|<a\b[^>]*>[^<]*(?:next|\xe2\x86\x92|\xc2\xbb|&rarr;|&raquo;)',
+    re.I
+)
+
+
+def _has_job_class(value: Optional[str]) -> bool:
+    """Strainer test for Fuzu's job container classes"""
+    return bool(value) and 'job' in value
+
+
 class FuzuScraper(BaseScraper):
     """
     Scraper for Fuzu Kenya job board (https://www.fuzu.com)
@@ -26,6 +39,21 @@ class FuzuScraper(BaseScraper):
     - Experience level detection
     """
     
+    # Keep only elements with a job-ish class
+    card_strainer = SoupStrainer(class_=_has_job_class)
+    card_selector = '[class*="job"]'
+    
+    # Fuzu uses various container classes
+    card_strategies = [
+        ('div_job_class', lambda soup: soup.find_all('div', {'class': re.compile(r'job-card|job-listing|job-item')})),
+        ('article_job', lambda soup: soup.find_all('article', {'class': re.compile(r'job')})),
+        ('li_job', lambda soup: soup.find_all('li', {'class': re.compile(r'job')})),
+        ('jobs_list', lambda soup: soup.select('.jobs-list .job')),
+        ('data_job_id', lambda soup: soup.select('[data-job-id]')),
+    ]
+    
+    detail_pages = True
+    
     def __init__(self):
         super().__init__('fuzu')
         self.base_url = 'https://www.fuzu.com'
@@ -167,34 +195,38 @@ class FuzuScraper(BaseScraper):
         jobs = []
         seen_urls = set()
         
-        for keyword in keywords:
-            logger.info(f"🔍 Scraping Fuzu for '{keyword}'...")
+        # Walk pagination for all keywords in lockstep: each round fetches
+        # the next page of every keyword that still has results concurrently
+        next_page = {keyword: 1 for keyword in keywords}
+        logger.info(f"🔍 Scraping Fuzu for {len(keywords)} keywords: {', '.join(keywords)}")
+        
+        while next_page:
+            batch = list(next_page.items())
+            results = self.fetcher.fetch_many(
+                [self.build_search_url(keyword, page) for keyword, page in batch]
+            )
             
-            for page in range(1, self.max_pages + 1):
-                url = self.build_search_url(keyword, page)
-                logger.debug(f"Fetching page {page}: {url}")
-                
-                soup = self.fetch_page(url)
-                if not soup:
+            for (keyword, page), result in zip(batch, results):
+                if not result:
                     logger.warning(f"Failed to fetch page {page} for '{keyword}'")
-                    break
+                    del next_page[keyword]
+                    continue
                 
-                # Find job listings - Fuzu uses various container classes
-                job_cards = (
-                    soup.find_all('div', {'class': re.compile(r'job-card|job-listing|job-item')}) or
-                    soup.find_all('article', {'class': re.compile(r'job')}) or
-                    soup.find_all('li', {'class': re.compile(r'job')}) or
-                    soup.select('.jobs-list .job') or
-                    soup.select('[data-job-id]')
-                )
+                # Find job listings in the scoped parse, then in the full page
+                job_cards = self.find_job_cards(self.parse_listing(result.content)) or \
+                    self.find_job_cards(self.parser.parse(result.content))
                 
                 if not job_cards:
-                    logger.info(f"No more jobs found on page {page}")
-                    break
+                    logger.info(f"No more jobs found on page {page} for '{keyword}'")
+                    del next_page[keyword]
+                    continue
                 
+                page_jobs = []
                 for card in job_cards:
                     try:
                         job_data = self.parse_job_card(card)
+                        if job_data:
+                            page_jobs.append(job_data)
                         
                         if job_data and job_data['source_url'] not in seen_urls:
                             seen_urls.add(job_data['source_url'])
@@ -205,15 +237,18 @@ class FuzuScraper(BaseScraper):
                         logger.warning(f"Error parsing job card: {e}")
                         continue
                 
-                # Rate limiting between pages
-                self.rate_limit()
+                # Results are newest first: stop once pages only hold stored jobs
+                if self.incremental and not self.incremental.record_page(keyword, page_jobs):
+                    del next_page[keyword]
+                    continue
                 
                 # Check if there's a next page
-                next_page = soup.find('a', {'rel': 'next'}) or soup.find('a', text=re.compile(r'next|→|»', re.I))
-                if not next_page:
-                    break
-            
-            logger.info(f"Found {len(jobs)} jobs so far for '{keyword}'")
+                has_next = NEXT_LINK_PATTERN.search(result.content)
+                if not has_next or page >= self.max_pages:
+                    logger.info(f"Finished '{keyword}' after {page} page(s)")
+                    del next_page[keyword]
+                else:
+                    next_page[keyword] = page + 1
         
         logger.info(f"✅ Total jobs scraped from Fuzu: {len(jobs)}")
         return jobs
@@ -306,15 +341,11 @@ class FuzuScraper(BaseScraper):
             # === Generate unique ID ===
             job_id = self.generate_job_id('fuzu', job_url)
             
-            # === Get/create company ===
-            company_id = self.get_or_create_company(company_name)
-            
             return {
                 'job_id': job_id,
                 'source': 'fuzu',
                 'source_url': job_url,
                 'title': title,
-                'company_id': company_id,
                 'company_name': company_name,
                 'location': location,
                 'country': 'Kenya',
@@ -363,6 +394,18 @@ class FuzuScraper(BaseScraper):
         if not soup:
             return None
         
+        return self.parse_job_details(soup)
+    
+    def parse_job_details(self, soup) -> Optional[Dict]:
+        """
+        Parse a job detail page
+        
+        Args:
+            soup: Parsed detail page
+            
+        Returns:
+            Dictionary with additional job details
+        """
         try:
             # Full description
             desc_elem = soup.find('div', {'class': re.compile(r'description|content|detail', re.I)})
@@ -383,7 +426,7 @@ class FuzuScraper(BaseScraper):
             }
             
         except Exception as e:
-            logger.warning(f"Error scraping job details from {job_url}: {e}")
+            logger.warning(f"Error parsing job details: {e}")
             return None
 
 
@@ -396,6 +439,7 @@ if __name__ == "__main__":
         keywords=['data analyst', 'data scientist'],
         locations=['Kenya']
     )
+    scraper.close()
     
     print(f"\n🎯 Found {len(jobs)} jobs")
     for job in jobs[:5]:
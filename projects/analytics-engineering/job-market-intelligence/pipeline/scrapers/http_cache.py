@@ -0,0 +1,183 @@
+"""
+On-disk HTTP cache with conditional revalidation
+
+Response bodies are stored in SQLite together with their ETag and
+Last-Modified validators. Later requests send If-None-Match /
+If-Modified-Since, and a 304 is answered from disk. URLs already
+validated by this cache instance are served without touching the network,
+which collapses repeated requests within one run.
+
+Only uses the standard library so the standalone scripts can share it.
+"""
+import json
+import time
+import zlib
+import sqlite3
+import logging
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedResponse:
+    """A response body together with its cache validators"""
+    url: str
+    status_code: int
+    content: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    from_cache: bool = False
+
+
+class HttpCache:
+    """
+    SQLite-backed response cache
+
+    Usage:
+        cache = HttpCache('data/cache/http_cache.sqlite')
+        response = cache.get(session, url, timeout=30)  # requests.Session
+    """
+
+    def __init__(self, path: Union[str, Path], max_age_days: Optional[float] = 30):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._fresh = set()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status_code INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                headers TEXT,
+                content BLOB,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+        if max_age_days:
+            self.prune(max_age_days)
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        """Return the stored response for a URL, if any"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status_code, etag, last_modified, headers, content FROM responses WHERE url = ?",
+                (url,)
+            ).fetchone()
+
+        if not row:
+            return None
+
+        status_code, etag, last_modified, headers, content = row
+        return CachedResponse(
+            url=url,
+            status_code=status_code,
+            content=zlib.decompress(content),
+            headers=json.loads(headers or '{}'),
+            etag=etag,
+            last_modified=last_modified,
+            from_cache=True,
+        )
+
+    def store(self, url: str, status_code: int, headers, content: bytes) -> CachedResponse:
+        """Store a full (200) response and mark it fresh for this run"""
+        headers = {k.lower(): v for k, v in dict(headers).items()}
+        entry = CachedResponse(
+            url=url,
+            status_code=status_code,
+            content=content,
+            headers=headers,
+            etag=headers.get('etag'),
+            last_modified=headers.get('last-modified'),
+        )
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, status_code, entry.etag, entry.last_modified,
+                 json.dumps(headers), zlib.compress(content), time.time())
+            )
+            self._conn.commit()
+            self._fresh.add(url)
+
+        self.misses += 1
+        return entry
+
+    def revalidated_hit(self, url: str) -> Optional[CachedResponse]:
+        """Record a 304 for a URL and return the stored body"""
+        with self._lock:
+            self._conn.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+            self._fresh.add(url)
+
+        self.revalidated += 1
+        return self.lookup(url)
+
+    def fresh(self, url: str) -> Optional[CachedResponse]:
+        """Return the stored response if it was already validated in this run"""
+        if url not in self._fresh:
+            return None
+        cached = self.lookup(url)
+        if cached:
+            self.hits += 1
+        return cached
+
+    @staticmethod
+    def conditional_headers(cached: Optional[CachedResponse]) -> Dict[str, str]:
+        """Build revalidation headers for a stored response"""
+        headers = {}
+        if cached and cached.etag:
+            headers['If-None-Match'] = cached.etag
+        if cached and cached.last_modified:
+            headers['If-Modified-Since'] = cached.last_modified
+        return headers
+
+    def get(self, session, url: str, **kwargs) -> CachedResponse:
+        """
+        GET a URL through a requests.Session using the cache
+
+        Raises:
+            requests.exceptions.RequestException on network or HTTP errors
+        """
+        cached = self.fresh(url)
+        if cached:
+            return cached
+
+        cached = self.lookup(url)
+        headers = {**kwargs.pop('headers', {}), **self.conditional_headers(cached)}
+        response = session.get(url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and cached:
+            return self.revalidated_hit(url)
+
+        response.raise_for_status()
+        return self.store(url, response.status_code, response.headers, response.content)
+
+    def prune(self, max_age_days: float):
+        """Drop entries that have not been validated for `max_age_days`"""
+        cutoff = time.time() - max_age_days * 86400
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM responses WHERE fetched_at < ?", (cutoff,))
+            self._conn.commit()
+        if cursor.rowcount:
+            logger.info(f"Pruned {cursor.rowcount} stale cache entries")
+
+    def stats(self) -> Dict[str, int]:
+        """Cache counters for this run"""
+        return {'hits': self.hits, 'revalidated': self.revalidated, 'misses': self.misses}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,188 @@
+"""
+Incremental crawling with known-job early termination
+
+Search results are sorted newest first, so once a search keeps returning
+jobs that are already stored there is nothing new further down. KnownJobs
+holds a compact set of 64-bit fingerprints of every stored job_id and
+source_url. IncrementalCrawl tracks, per search, how many consecutive pages
+brought no new jobs and tells the scraper when to stop paginating.
+
+Only the standard library is used (the database and job store loaders
+import SQLAlchemy and pyarrow lazily) so the standalone scripts can share it.
+"""
+import json
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Hashable, Iterable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+def _fingerprint(key: str) -> int:
+    """64-bit hash of a job_id or source_url"""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+
+
+class KnownJobs:
+    """
+    Set of jobs that are already stored, keyed by job_id and source_url
+
+    A job counts as known when either key matches, so jobs saved by a
+    scraper with a different job_id scheme are still recognized by URL.
+    """
+
+    def __init__(self, keys: Iterable[str] = ()):
+        self._fingerprints = {_fingerprint(key) for key in keys if key}
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def __contains__(self, job: Dict) -> bool:
+        return any(
+            job.get(field) and _fingerprint(job[field]) in self._fingerprints
+            for field in ('job_id', 'source_url')
+        )
+
+    def add(self, job: Dict):
+        """Mark a job as known"""
+        for field in ('job_id', 'source_url'):
+            if job.get(field):
+                self._fingerprints.add(_fingerprint(job[field]))
+
+    @classmethod
+    def from_json(cls, path: Union[str, Path], source: Optional[str] = None) -> 'KnownJobs':
+        """
+        Load known jobs from a JSON list of jobs (e.g. data/scraped/fuzu_latest.json)
+
+        Args:
+            path: JSON file with a list of job dicts
+            source: Only include jobs from this source
+        """
+        try:
+            with open(path) as f:
+                jobs = json.load(f)
+        except FileNotFoundError:
+            jobs = []
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load known jobs from {path}: {e}")
+            jobs = []
+
+        known = cls()
+        for job in jobs:
+            if source is None or job.get('source') == source:
+                known.add(job)
+        logger.info(f"Loaded {len(known)} known job keys from {path}")
+        return known
+
+    @classmethod
+    def from_job_store(cls, root: Union[str, Path], source: Optional[str] = None) -> 'KnownJobs':
+        """
+        Load known jobs from the Parquet job store (e.g. data/processed/jobs)
+
+        Only the job_id and source_url columns of the source's partitions
+        are read.
+
+        Args:
+            root: Job store directory
+            source: Only include jobs from this source
+        """
+        from ..storage.job_store import JobStore
+
+        table = JobStore(root).read(columns=['job_id', 'source_url'], sources=[source] if source else None)
+        known = cls()
+        for job in table.to_pylist():
+            known.add(job)
+        logger.info(f"Loaded {len(known)} known job keys from {root}")
+        return known
+
+    @classmethod
+    def from_database(cls, source: Optional[str] = None) -> 'KnownJobs':
+        """
+        Load known jobs from the jobs table
+
+        Args:
+            source: Only include jobs from this source
+        """
+        from sqlalchemy import select
+        from ..database.connection import get_db
+        from ..database.models import Job
+
+        query = select(Job.job_id, Job.source_url)
+        if source:
+            query = query.where(Job.source == source)
+
+        known = cls()
+        with get_db() as db:
+            for job_id, source_url in db.execute(query):
+                known.add({'job_id': job_id, 'source_url': source_url})
+        logger.info(f"Loaded {len(known)} known job keys from the jobs table")
+        return known
+
+
+class IncrementalCrawl:
+    """
+    Decide when to stop paginating a search
+
+    Usage:
+        crawl = IncrementalCrawl(KnownJobs.from_job_store('data/processed/jobs'), stale_pages=1)
+        for page in range(1, max_pages + 1):
+            jobs = scrape_page(keyword, page)
+            if not crawl.record_page(keyword, jobs):
+                break
+    """
+
+    def __init__(self, known: KnownJobs, stale_pages: int = 1):
+        self.known = known
+        self.found = KnownJobs()  # new jobs found so far this run
+        self.stale_pages = stale_pages
+        self.stale_streak: Dict[Hashable, int] = {}
+        self.pages = 0
+        self.jobs_seen = 0
+        self.jobs_new = 0
+        self.searches_stopped = 0
+
+    def record_page(self, search: Hashable, jobs: Iterable[Dict]) -> bool:
+        """
+        Record the jobs parsed from one results page
+
+        A page is stale when all its jobs were stored before the run. Jobs
+        found earlier in the run by another search don't make it stale,
+        as overlapping searches would otherwise stop each other, but they
+        are only counted as new once.
+
+        Args:
+            search: Key of the search being paginated (e.g. the keyword)
+            jobs: Jobs parsed from the page
+
+        Returns:
+            False once `stale_pages` consecutive pages had no new jobs
+        """
+        unstored = 0
+        for job in jobs:
+            self.jobs_seen += 1
+            if job not in self.known:
+                unstored += 1
+                if job not in self.found:
+                    self.jobs_new += 1
+                    self.found.add(job)
+
+        self.pages += 1
+        self.stale_streak[search] = 0 if unstored else self.stale_streak.get(search, 0) + 1
+
+        if self.stale_streak[search] >= self.stale_pages:
+            self.searches_stopped += 1
+            logger.info(f"No new jobs in {self.stale_streak[search]} page(s) for '{search}' - stopping early")
+            return False
+        return True
+
+    def stats(self) -> Dict:
+        """Summary for logging"""
+        return {
+            'known_keys': len(self.known),
+            'stale_pages': self.stale_pages,
+            'pages_fetched': self.pages,
+            'jobs_seen': self.jobs_seen,
+            'jobs_new': self.jobs_new,
+            'searches_stopped_early': self.searches_stopped,
+        }
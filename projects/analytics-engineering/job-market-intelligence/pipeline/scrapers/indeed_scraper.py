@@ -6,6 +6,7 @@ This scraper is for demonstration purposes
 import re
 from datetime import datetime, timedelta
 from typing import List, Dict
+from bs4 import SoupStrainer
 from .base_scraper import BaseScraper
 import logging
 
@@ -15,6 +16,15 @@ logger = logging.getLogger(__name__)
 class IndeedScraper(BaseScraper):
     """Scraper for Indeed job board"""
     
+    card_strainer = SoupStrainer('div', class_='job_seen_beacon')
+    card_selector = 'div.job_seen_beacon'
+    
+    # Indeed's structure as of 2024 (these selectors may need updates)
+    card_strategies = [
+        ('job_seen_beacon', lambda soup: soup.find_all('div', class_='job_seen_beacon')),
+        ('data_jk', lambda soup: soup.find_all('div', attrs={'data-jk': True})),
+    ]
+    
     def __init__(self):
         super().__init__('indeed')
         self.base_url = 'https://ke.indeed.com'
@@ -84,39 +94,35 @@ class IndeedScraper(BaseScraper):
         """
         jobs = []
         
+        # Build every keyword x location search up front so they can be
+        # fetched concurrently (the fetcher enforces Indeed's rate limit)
+        searches = []
         for keyword in keywords:
             for location in locations:
-                logger.info(f"Scraping Indeed for '{keyword}' in '{location}'")
-                
-                # Construct search URL
-                search_url = f"{self.base_url}/jobs"
-                params = {
-                    'q': keyword,
-                    'l': location,
-                }
-                
                 # Build URL with params
-                url = f"{search_url}?q={params['q'].replace(' ', '+')}&l={params['l'].replace(' ', '+')}"
-                
-                soup = self.fetch_page(url)
-                if not soup:
+                url = f"{self.base_url}/jobs?q={keyword.replace(' ', '+')}&l={location.replace(' ', '+')}"
+                searches.append((keyword, location, url))
+        
+        logger.info(f"Scraping Indeed: {len(searches)} searches")
+        results = self.fetcher.fetch_many([url for _, _, url in searches])
+        
+        for (keyword, location, url), result in zip(searches, results):
+            if not result:
+                logger.warning(f"Failed to fetch Indeed results for '{keyword}' in '{location}'")
+                continue
+            
+            # Find job cards in the scoped parse, then in the full page
+            job_cards = self.find_job_cards(self.parse_listing(result.content)) or \
+                       self.find_job_cards(self.parser.parse(result.content))
+            
+            for card in job_cards:
+                try:
+                    job_data = self.parse_job_card(card, location)
+                    if job_data:
+                        jobs.append(job_data)
+                except Exception as e:
+                    logger.warning(f"Error parsing job card: {e}")
                     continue
-                
-                # Find job cards (Indeed's structure as of 2024)
-                # Note: These selectors may need updates
-                job_cards = soup.find_all('div', class_='job_seen_beacon') or \
-                           soup.find_all('div', attrs={'data-jk': True})
-                
-                for card in job_cards:
-                    try:
-                        job_data = self.parse_job_card(card, location)
-                        if job_data:
-                            jobs.append(job_data)
-                    except Exception as e:
-                        logger.warning(f"Error parsing job card: {e}")
-                        continue
-                
-                self.rate_limit()
         
         return jobs
     
@@ -162,15 +168,11 @@ class IndeedScraper(BaseScraper):
             # Generate unique job ID
             job_id = self.generate_job_id('indeed', job_url)
             
-            # Get or create company
-            company_id = self.get_or_create_company(company_name)
-            
             job_data = {
                 'job_id': job_id,
                 'source': 'indeed',
                 'source_url': job_url,
                 'title': title,
-                'company_id': company_id,
                 'company_name': company_name,
                 'location': job_location,
                 'country': 'Kenya' if location.lower() == 'kenya' else location,
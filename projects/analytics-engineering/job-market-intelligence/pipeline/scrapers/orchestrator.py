@@ -0,0 +1,155 @@
+"""
+Run independent job sources concurrently
+
+Each source runs in its own process so a hung or crashed source can be
+terminated at its deadline without holding up the others. Whatever the
+finished sources returned is collected, and the wall time of a run is
+bounded by the slowest source (or its timeout) instead of the sum.
+
+Every worker sends its result over its own pipe, so stopping one in the
+middle of a send can only break that pipe, never another source's result.
+At its deadline a worker is asked to stop (SIGTERM, which it turns into
+SystemExit so open journals are flushed on the way out) and killed if it
+hasn't exited after STOP_GRACE seconds. The jobs a cancelled source had
+already journaled are then read back from the segment it wrote.
+
+Only the standard library is used so the standalone scripts can share it.
+Source functions must be picklable (module-level functions or partials of
+them) and return a list of job dicts.
+"""
+import time
+import signal
+import logging
+import multiprocessing
+from datetime import datetime
+from multiprocessing.connection import wait
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Union
+
+from ..storage.journal import Journal
+
+logger = logging.getLogger(__name__)
+
+# How often to check deadlines while waiting for results
+POLL_INTERVAL = 1.0
+
+# Seconds a worker gets to exit after being asked to stop
+STOP_GRACE = 5.0
+
+
+@dataclass
+class SourceResult:
+    """Outcome of one source"""
+    name: str
+    status: str  # ok, failed, timeout
+    jobs: List[Dict] = field(default_factory=list)
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+def _stop(signum, frame):
+    raise SystemExit(f"stopped by signal {signum}")
+
+
+def _run_source(func: Callable[[], List[Dict]], result):
+    """Worker process entry point; sends (status, jobs, error) over `result`"""
+    signal.signal(signal.SIGTERM, _stop)
+    try:
+        outcome = ('ok', func() or [], None)
+    except Exception as e:
+        outcome = ('failed', [], str(e))
+    result.send(outcome)
+    result.close()
+
+
+def _stop_worker(process: multiprocessing.Process):
+    """Ask a worker to stop, and kill it if it doesn't within STOP_GRACE"""
+    process.terminate()
+    process.join(STOP_GRACE)
+    if process.is_alive():
+        process.kill()
+        process.join()
+
+
+def journaled_jobs(journal_dir: Union[str, Path, None], name: str, pid: int, since: datetime) -> List[Dict]:
+    """Jobs a worker journaled under `name` since it started (none without a journal)"""
+    if journal_dir is None:
+        return []
+    return Journal(journal_dir, name).written_by(pid, since)
+
+
+def run_sources(sources: Dict[str, Callable[[], List[Dict]]],
+                timeout: float = 300,
+                timeouts: Optional[Dict[str, float]] = None,
+                journal_dir: Union[str, Path, None] = None) -> Dict[str, SourceResult]:
+    """
+    Run every source in its own process
+
+    Args:
+        sources: Source name -> function returning a list of jobs
+        timeout: Seconds before a source is cancelled
+        timeouts: Per-source overrides of `timeout`
+        journal_dir: Directory the sources journal their jobs in, by source
+            name; a cancelled source's jobs are recovered from there
+
+    Returns:
+        SourceResult for every source, in the order given
+    """
+    timeouts = timeouts or {}
+    started_at = datetime.now()
+    started = time.monotonic()
+
+    processes = {}
+    readers = {}
+    deadlines = {}
+    for name, func in sources.items():
+        reader, writer = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=_run_source, args=(func, writer), name=f'source-{name}')
+        process.start()
+        # Only the worker holds the sending end now, so its exit shows as EOF
+        writer.close()
+        processes[name] = process
+        readers[name] = reader
+        deadlines[name] = started + timeouts.get(name, timeout)
+
+    finished: Dict[str, SourceResult] = {}
+    while len(finished) < len(processes):
+        waiting = {readers[name]: name for name in processes if name not in finished}
+        for reader in wait(list(waiting), timeout=POLL_INTERVAL):
+            name = waiting[reader]
+            try:
+                status, jobs, error = reader.recv()
+            except EOFError:
+                processes[name].join()
+                status, jobs, error = 'failed', [], f"exit code {processes[name].exitcode}"
+                logger.error(f"{name} exited with code {processes[name].exitcode} without returning results")
+            else:
+                processes[name].join()
+                if error:
+                    logger.error(f"{name} failed: {error}")
+            finished[name] = SourceResult(name, status, jobs, time.monotonic() - started, error)
+
+        now = time.monotonic()
+        for name, process in processes.items():
+            if name in finished or now < deadlines[name]:
+                continue
+            _stop_worker(process)
+            jobs = journaled_jobs(journal_dir, name, process.pid, started_at)
+            logger.warning(f"{name} timed out after {now - started:.0f}s - cancelled, "
+                           f"{len(jobs)} journaled jobs recovered")
+            finished[name] = SourceResult(name, 'timeout', jobs, seconds=now - started,
+                                          error=f"timed out after {deadlines[name] - started:.0f}s")
+
+    for reader in readers.values():
+        reader.close()
+    return {name: finished[name] for name in sources}
+
+
+def format_timing_table(results: Dict[str, SourceResult]) -> str:
+    """Per-source timing table for the run log"""
+    lines = [f"{'Source':<16}{'Status':<10}{'Jobs':>7}{'Seconds':>10}"]
+    lines.append('-' * len(lines[0]))
+    for result in results.values():
+        lines.append(f"{result.name:<16}{result.status:<10}{len(result.jobs):>7}{result.seconds:>10.1f}")
+    return '\n'.join(lines)
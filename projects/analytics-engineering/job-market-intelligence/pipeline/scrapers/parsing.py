@@ -0,0 +1,132 @@
+"""
+HTML parsing backends for the scrapers
+
+Every backend returns a BeautifulSoup document so card parsing code stays
+the same. A backend can also parse a listing page in scoped mode, keeping
+only the card containers a scraper declares:
+
+- html.parser / lxml: BeautifulSoup with a SoupStrainer (parse_only)
+- selectolax: native CSS selection in C, then only the matched subtrees are
+  handed to BeautifulSoup
+"""
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Type
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+logger = logging.getLogger(__name__)
+
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+
+class HtmlParser(ABC):
+    """Base class for parsing backends"""
+
+    name = ''
+
+    @abstractmethod
+    def parse(self, content: bytes,
+              strainer: Optional[SoupStrainer] = None,
+              selector: Optional[str] = None) -> BeautifulSoup:
+        """
+        Parse a page
+
+        Args:
+            content: Raw HTML
+            strainer: SoupStrainer limiting which elements are kept (bs4 backends)
+            selector: CSS selector equivalent to `strainer` (native backends)
+
+        Returns:
+            BeautifulSoup document; only the matched subtrees when scoped
+        """
+        pass
+
+
+class BuiltinParser(HtmlParser):
+    """Python's html.parser, always available but the slowest"""
+
+    name = 'html.parser'
+
+    def parse(self, content, strainer=None, selector=None):
+        return BeautifulSoup(content, 'html.parser', parse_only=strainer)
+
+
+class LxmlParser(HtmlParser):
+    """libxml2 tree builder for BeautifulSoup"""
+
+    name = 'lxml'
+
+    def parse(self, content, strainer=None, selector=None):
+        return BeautifulSoup(content, 'lxml', parse_only=strainer)
+
+
+class SelectolaxParser(HtmlParser):
+    """
+    Lexbor-based parser with native CSS selection
+
+    In scoped mode only the outermost matches of `selector` are serialized
+    and rebuilt as a small BeautifulSoup fragment.
+    """
+
+    name = 'selectolax'
+
+    def parse(self, content, strainer=None, selector=None):
+        if not selector:
+            return BeautifulSoup(content, 'lxml' if LXML_AVAILABLE else 'html.parser')
+
+        tree = LexborHTMLParser(content)
+        matches = tree.css(selector)
+        matched_ids = {node.mem_id for node in matches}
+
+        fragments = []
+        for node in matches:
+            # Skip nodes nested inside another match; their outer match
+            # already carries them
+            parent = node.parent
+            while parent is not None and parent.mem_id not in matched_ids:
+                parent = parent.parent
+            if parent is None:
+                fragments.append(node.html)
+
+        return BeautifulSoup(''.join(fragments), 'html.parser')
+
+
+PARSERS: Dict[str, Type[HtmlParser]] = {
+    BuiltinParser.name: BuiltinParser,
+    LxmlParser.name: LxmlParser,
+    SelectolaxParser.name: SelectolaxParser,
+}
+
+AVAILABLE = {
+    BuiltinParser.name: True,
+    LxmlParser.name: LXML_AVAILABLE,
+    SelectolaxParser.name: SELECTOLAX_AVAILABLE,
+}
+
+
+def get_parser(name: str) -> HtmlParser:
+    """
+    Get a parsing backend by name, falling back to html.parser
+
+    Args:
+        name: One of 'html.parser', 'lxml', 'selectolax'
+    """
+    if name not in PARSERS:
+        raise ValueError(f"Unknown HTML parser '{name}'. Choose from: {', '.join(PARSERS)}")
+
+    if not AVAILABLE[name]:
+        logger.warning(f"HTML parser '{name}' is not installed - falling back to html.parser")
+        name = BuiltinParser.name
+
+    return PARSERS[name]()
@@ -0,0 +1,263 @@
+"""
+Adaptive per-host request pacing with a circuit breaker
+
+A fixed delay between requests is too slow for a site that answers quickly
+and too fast for one that is struggling. HostController paces the requests
+to one host AIMD-style: the request rate grows by a fixed step after every
+healthy response and is halved on 429/503 responses, network errors and
+server errors, or when latency climbs well above the host's baseline. A
+Retry-After header pauses the host for as long as it asks.
+
+After `failure_threshold` consecutive failures the circuit opens and the
+host's requests are refused for `cooldown` seconds, so a source that is
+down doesn't hold up the rest of the run. Then one probe request is let
+through, and its outcome closes or re-opens the circuit. A probe that ends
+without an outcome (cancelled, or an unexpected exception) must be given
+back with release_probe(), or the host would stay refused.
+
+reserve() returns how long to wait instead of sleeping, so the same
+controller works for threads (time.sleep) and asyncio (asyncio.sleep).
+Only the standard library is used so the standalone scripts can share it.
+"""
+import time
+import logging
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Responses meaning "slow down" rather than "this request is wrong"
+CONGESTION_STATUSES = {429, 503}
+
+
+class CircuitOpenError(Exception):
+    """A request was refused because its host's circuit is open"""
+
+
+def is_retryable(status_code: Optional[int]) -> bool:
+    """Whether a failed request may succeed if retried (None = network error)"""
+    return status_code is None or status_code == 429 or status_code >= 500
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostController:
+    """
+    Pacing and circuit breaker for one host
+
+    Usage:
+        control = HostController('www.fuzu.com', delay=2)
+        if control.allow():
+            try:
+                time.sleep(control.reserve())
+                started = time.monotonic()
+                response = session.get(url)
+                control.record(response.status_code, time.monotonic() - started,
+                               response.headers.get('Retry-After'))
+            finally:
+                control.release_probe()
+    """
+
+    def __init__(self, host: str, delay: float = 2.0, min_delay: float = 0.5, max_delay: float = 60.0,
+                 rate_step: float = 0.1, backoff: float = 0.5, latency_factor: float = 2.0,
+                 failure_threshold: int = 5, cooldown: float = 120.0):
+        """
+        Args:
+            host: Host name (for logging)
+            delay: Starting delay between requests; 0 starts unpaced
+            min_delay: Shortest delay pacing may speed up to
+            max_delay: Longest delay pacing may slow down to
+            rate_step: Requests/second added after each healthy response
+            backoff: Factor the rate is multiplied by when slowing down
+            latency_factor: Latency above this multiple of the baseline counts as congestion
+            failure_threshold: Consecutive failures that open the circuit
+            cooldown: Seconds the circuit stays open before a probe
+        """
+        self.host = host
+        self.min_delay = min(min_delay, delay)
+        self.max_delay = max_delay
+        # Requests per second; None while unpaced
+        self.rate: Optional[float] = 1 / delay if delay else None
+        self.rate_step = rate_step
+        self.backoff = backoff
+        self.latency_factor = latency_factor
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self.next_at = 0.0
+        self.blocked_until = 0.0
+        self.slowed_at = float('-inf')
+        self.latency: Optional[float] = None
+        self.baseline: Optional[float] = None
+        self.failures = 0
+        self.reopen_at: Optional[float] = None
+        self.probing = False
+
+        self.requests = 0
+        self.slowdowns = 0
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    @property
+    def delay(self) -> float:
+        """Current delay between requests"""
+        return 1 / self.rate if self.rate else 0.0
+
+    @property
+    def state(self) -> str:
+        if self.reopen_at is None:
+            return 'closed'
+        return 'half-open' if time.monotonic() >= self.reopen_at else 'open'
+
+    @property
+    def is_open(self) -> bool:
+        """Whether requests are currently refused (checked again after waiting for a slot)"""
+        return self.state == 'open'
+
+    def allow(self) -> bool:
+        """Whether a request may be sent (False while the circuit is open)"""
+        with self._lock:
+            if self.reopen_at is None:
+                return True
+            if time.monotonic() < self.reopen_at or self.probing:
+                return False
+            # Cooldown is over: let one probe through
+            self.probing = True
+            return True
+
+    def release_probe(self):
+        """
+        Let the next request probe again if the current probe got no outcome
+
+        Call it once a request allowed by allow() is over; after record()
+        it does nothing.
+        """
+        with self._lock:
+            self.probing = False
+
+    def reserve(self) -> float:
+        """Claim the next request slot and return the seconds to wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self.next_at, self.blocked_until)
+            self.next_at = start + self.delay
+            self.requests += 1
+            return start - now
+
+    def record(self, status_code: Optional[int], latency: Optional[float] = None,
+               retry_after: Optional[str] = None):
+        """
+        Adjust pacing and the circuit after a request
+
+        Args:
+            status_code: Response status, None for a network error
+            latency: Seconds until the response arrived
+            retry_after: The response's Retry-After header
+        """
+        with self._lock:
+            now = time.monotonic()
+            failed = is_retryable(status_code)
+            congested = failed or status_code in CONGESTION_STATUSES
+
+            if latency is not None and not failed:
+                self.latency = latency if self.latency is None else 0.7 * self.latency + 0.3 * latency
+                self.baseline = self.latency if self.baseline is None else min(self.baseline, self.latency)
+                threshold = max(self.baseline * self.latency_factor, self.baseline + 0.5)
+                congested = congested or self.latency > threshold
+
+            wait = parse_retry_after(retry_after)
+            if wait:
+                if wait > self.max_delay:
+                    # Too long to wait in line: skip the host until then
+                    self._open(now, wait, f"Retry-After {wait:.0f}s")
+                else:
+                    self.blocked_until = max(self.blocked_until, now + wait)
+
+            if congested:
+                # Responses to requests sent before the last slowdown (e.g. a
+                # burst that failed together) count as one congestion signal
+                if now - self.slowed_at >= self.delay:
+                    self.rate = max(1 / self.max_delay, (self.rate or 1.0) * self.backoff)
+                    self.slowed_at = now
+                    self.slowdowns += 1
+            elif self.rate is not None and status_code is not None and status_code < 400:
+                max_rate = 1 / self.min_delay if self.min_delay else float('inf')
+                self.rate = min(max_rate, self.rate + self.rate_step)
+
+            if failed:
+                self.failures += 1
+                if self.probing or self.failures >= self.failure_threshold:
+                    self._open(now, self.cooldown, f"{self.failures} failures")
+            elif self.reopen_at is None or self.probing:
+                # Any answer other than a failure shows the host is up
+                self.failures = 0
+                if self.reopen_at is not None:
+                    logger.info(f"{self.host}: circuit closed")
+                self.reopen_at = None
+                self.probing = False
+
+    def _open(self, now: float, seconds: float, reason: str):
+        if self.reopen_at is None or self.probing:
+            self.trips += 1
+            logger.warning(f"{self.host}: circuit open ({reason}), skipping requests for {seconds:.0f}s")
+        self.reopen_at = max(self.reopen_at or 0.0, now + seconds)
+        self.next_at = self.reopen_at
+        self.probing = False
+
+    def stats(self) -> Dict:
+        """Summary for logging"""
+        return {
+            'host': self.host,
+            'state': self.state,
+            'delay': round(self.delay, 2),
+            'requests': self.requests,
+            'slowdowns': self.slowdowns,
+            'circuit_trips': self.trips,
+        }
+
+
+class RateController:
+    """
+    HostController for every host a client talks to
+
+    Usage:
+        rate_control = RateController(delay=2)
+        control = rate_control.for_url('https://www.fuzu.com/kenya/jobs')
+    """
+
+    def __init__(self, **settings):
+        """
+        Args:
+            settings: HostController arguments shared by every host
+        """
+        self.settings = settings
+        self._hosts: Dict[str, HostController] = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url: str) -> HostController:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = HostController(host, **self.settings)
+            return self._hosts[host]
+
+    def stats(self) -> List[Dict]:
+        return [control.stats() for control in self._hosts.values()]
@@ -0,0 +1,106 @@
+"""
+Learned selector profiles for finding job cards
+
+Scrapers list their card-finding strategies in order of preference. The
+profile remembers, per source, which strategy last returned cards and tries
+it first, so a page normally costs one targeted query instead of a cascade
+of full-tree searches. The full cascade only runs when the remembered
+strategy comes back empty (e.g. after a site redesign).
+
+Profiles for all sources share one JSON file. Only the standard library is
+used so the standalone scripts can share it.
+"""
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# (name, function returning the cards found in a soup)
+Strategy = Tuple[str, Callable]
+
+# Serializes read-modify-write of the shared profile file
+_file_lock = threading.Lock()
+
+
+class SelectorProfile:
+    """
+    Remember the card strategy that last worked for one source
+
+    Usage:
+        profile = SelectorProfile('fuzu', [
+            ('job_card', lambda soup: soup.select('.job-card')),
+            ('data_job_id', lambda soup: soup.select('[data-job-id]')),
+        ], 'data/cache/selector_profiles.json')
+        cards = profile.find(soup)
+    """
+
+    def __init__(self, source: str, strategies: Sequence[Strategy], path: Union[str, Path]):
+        self.source = source
+        self.strategies: Dict[str, Callable] = dict(strategies)
+        self.order: List[str] = [name for name, _ in strategies]
+        self.path = Path(path)
+
+        self.hits = 0
+        self.fallbacks = 0
+
+        self.preferred: Optional[str] = self._load().get(source, {}).get('strategy')
+        if self.preferred not in self.strategies:
+            self.preferred = None
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable selector profiles at {self.path}: {e}")
+            return {}
+
+    def _save(self):
+        """Write this source's entry, keeping the other sources' entries"""
+        with _file_lock:
+            profiles = self._load()
+            profiles[self.source] = {
+                'strategy': self.preferred,
+                'updated_at': datetime.utcnow().isoformat(),
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(profiles, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def find(self, soup) -> List:
+        """
+        Find job cards, trying the remembered strategy first
+
+        Args:
+            soup: Parsed page
+
+        Returns:
+            Cards from the first strategy that found any (empty if none did)
+        """
+        if self.preferred:
+            cards = self.strategies[self.preferred](soup)
+            if cards:
+                self.hits += 1
+                return cards
+
+        self.fallbacks += 1
+        for name in self.order:
+            if name == self.preferred:
+                continue
+            cards = self.strategies[name](soup)
+            if cards:
+                logger.info(f"{self.source}: card strategy '{self.preferred}' -> '{name}'")
+                self.preferred = name
+                self._save()
+                return cards
+
+        return []
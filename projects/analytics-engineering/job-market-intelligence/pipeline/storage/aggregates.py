@@ -0,0 +1,284 @@
+"""
+Incremental aggregates behind the dashboard statistics
+
+The dashboard's skill, company, location and source counts and the salary
+averages used to be recomputed from every stored job on each run. The
+aggregate store keeps them as counters and sums keyed by dimension value
+and applies only what changed: add() for new jobs, remove() for expired
+ones, update() for a job replaced by a newer version. The state is saved
+to data/processed/aggregates.json between runs, and stats() formats it
+for the dashboard files in time proportional to the number of distinct
+values, whatever the number of jobs. Full computations (rebuild(),
+from_jobs()) run vectorized in pipeline.analysis.job_stats.
+
+The state records how many jobs it covers. load() compares that with the
+job store and rebuilds from the store when they disagree (e.g. a run
+stored jobs and then failed before saving the aggregates). verify()
+rebuilds from scratch and reports every counter that differs from the
+incremental result.
+"""
+import os
+import json
+import logging
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from .job_store import _to_int
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the state layout changes; older states are rebuilt
+AGGREGATES_FORMAT = 1
+
+# Job fields the aggregates read
+AGGREGATE_COLUMNS = ['skills', 'company_name', 'location', 'source', 'experience_level',
+                     'salary_min', 'salary_max', 'scraped_at']
+
+DIMENSIONS = ['skill', 'company', 'location', 'source', 'experience', 'scrape_date']
+
+SALARY_FIELDS = ['salary_min', 'salary_max']
+
+LOCATION_LENGTH = 40
+
+SKILL_CATEGORIES = {
+    'Programming': ['Python', 'R', 'SQL', 'Java', 'JavaScript', 'Scala'],
+    'Cloud': ['AWS', 'Azure', 'GCP', 'Snowflake'],
+    'ML/AI': ['Machine Learning', 'TensorFlow', 'scikit-learn'],
+    'BI Tool': ['Power BI', 'Tableau', 'Looker', 'Dashboard', 'BI'],
+    'Database': ['PostgreSQL', 'MySQL', 'MongoDB'],
+    'Analytics': ['Statistics', 'Analytics', 'Data Analysis'],
+}
+
+_CATEGORY_OF = {skill: category for category, skills in SKILL_CATEGORIES.items() for skill in skills}
+
+
+def skill_category(name: str) -> str:
+    return _CATEGORY_OF.get(name, 'Other')
+
+
+def dimension_values(job: Dict) -> Dict[str, List[str]]:
+    """The counter keys a job contributes to, per dimension"""
+    company = job.get('company_name')
+    scraped_at = job.get('scraped_at')
+    return {
+        'skill': [skill for skill in set(job.get('skills') or []) if isinstance(skill, str) and len(skill) > 1],
+        'company': [company] if company and company != 'Unknown' else [],
+        'location': [str(job.get('location') or 'Unknown')[:LOCATION_LENGTH]],
+        'source': [job.get('source') or 'unknown'],
+        'experience': [job.get('experience_level') or 'Unknown'],
+        'scrape_date': [str(scraped_at)[:10]] if scraped_at else [],
+    }
+
+
+def dashboard_data(stats: Dict) -> Dict:
+    """Everything the dashboard loads: the stats plus the company and skill lists"""
+    return {
+        **stats,
+        'companies': [{'id': i + 1, 'name': s['company']} for i, s in enumerate(stats['company_stats'])],
+        'skills': [{'id': i + 1, 'name': s['name'], 'category': s['category']}
+                   for i, s in enumerate(stats['skill_stats'])],
+    }
+
+
+def write_stats(directory: Union[str, Path], stats: Dict, job_store=None) -> Dict:
+    """
+    Publish the stats as the dashboard's snapshot, which also writes
+    skill_stats.json, company_stats.json, summary.json and the rest
+
+    Args:
+        directory: Dashboard data directory (data/processed)
+        stats: Output of AggregateStore.stats() or an equivalent
+        job_store: JobStore the stats were computed from, recorded in the snapshot
+    """
+    from .snapshot import publish_snapshot
+
+    publish_snapshot(directory, dashboard_data(stats), job_store=job_store)
+    return stats
+
+
+def _empty_state() -> Dict:
+    return {
+        'format': AGGREGATES_FORMAT,
+        'jobs': 0,
+        'counters': {dimension: {} for dimension in DIMENSIONS},
+        'salary': {field: {'sum': 0, 'count': 0} for field in SALARY_FIELDS},
+    }
+
+
+class AggregateStore:
+    """
+    Dashboard counters maintained by delta
+
+    Usage:
+        aggregates = AggregateStore.load('data/processed/aggregates.json', store)
+        new_jobs = store.unseen(jobs)
+        store.append(new_jobs)
+        aggregates.add_many(new_jobs)
+        aggregates.save()
+        stats = aggregates.stats()
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, state: Optional[Dict] = None):
+        self.path = Path(path) if path else None
+        self.state = state or _empty_state()
+
+    @classmethod
+    def load(cls, path: Union[str, Path], store=None) -> 'AggregateStore':
+        """
+        Saved aggregates, rebuilt from `store` if missing or out of step with it
+
+        Args:
+            path: State file
+            store: JobStore the aggregates describe
+        """
+        path = Path(path)
+        state = None
+        if path.exists():
+            with open(path) as f:
+                state = json.load(f)
+            if state.get('format') != AGGREGATES_FORMAT:
+                state = None
+
+        aggregates = cls(path, state)
+        if store is not None and (state is None or state['jobs'] != len(store)):
+            logger.info(f"Aggregates cover {state['jobs'] if state else 0} of {len(store)} stored jobs, rebuilding")
+            aggregates = cls.rebuild(store, path)
+        return aggregates
+
+    @classmethod
+    def rebuild(cls, store, path: Optional[Union[str, Path]] = None) -> 'AggregateStore':
+        """Aggregates computed from scratch over every stored job"""
+        from ..analysis.job_stats import compute_state
+        return cls(path, compute_state(store.read(columns=AGGREGATE_COLUMNS)))
+
+    @classmethod
+    def from_jobs(cls, jobs: Iterable[Dict]) -> 'AggregateStore':
+        """Aggregates of a list of jobs (e.g. one run's scrape)"""
+        from ..analysis.job_stats import compute_state, job_table
+        return cls(state=compute_state(job_table(jobs)))
+
+    def save(self):
+        self.state['updated_at'] = datetime.now().isoformat()
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def __len__(self) -> int:
+        return self.state['jobs']
+
+    # Deltas
+
+    def _apply(self, job: Dict, sign: int):
+        counters = self.state['counters']
+        for dimension, values in dimension_values(job).items():
+            counter = counters[dimension]
+            for value in values:
+                count = counter.get(value, 0) + sign
+                if count:
+                    counter[value] = count
+                else:
+                    counter.pop(value, None)
+        # Converted as the job store and a rebuild convert them, so values
+        # like '50k' are skipped rather than failing the run
+        for field in SALARY_FIELDS:
+            salary = _to_int(job.get(field))
+            if salary:
+                self.state['salary'][field]['sum'] += sign * salary
+                self.state['salary'][field]['count'] += sign
+        self.state['jobs'] += sign
+
+    def add(self, job: Dict):
+        self._apply(job, 1)
+
+    def add_many(self, jobs: Iterable[Dict]) -> int:
+        count = 0
+        for job in jobs:
+            self._apply(job, 1)
+            count += 1
+        return count
+
+    def remove(self, job: Dict):
+        """Take out a job that expired (pass the version that was added)"""
+        self._apply(job, -1)
+
+    def update(self, old: Dict, new: Dict):
+        """Replace the contribution of a job's old version with its new one"""
+        self._apply(old, -1)
+        self._apply(new, 1)
+
+    # Output
+
+    def top(self, dimension: str, limit: Optional[int] = None) -> List:
+        """(value, count) pairs of a dimension, most frequent first"""
+        counter = self.state['counters'][dimension]
+        ranked = sorted(counter.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit else ranked
+
+    def _average(self, field: str) -> int:
+        salary = self.state['salary'][field]
+        return int(salary['sum'] / salary['count']) if salary['count'] else 0
+
+    def recent_jobs(self, days: int = 7) -> int:
+        since = (date.today() - timedelta(days=days)).isoformat()
+        return sum(count for day, count in self.state['counters']['scrape_date'].items() if day >= since)
+
+    def stats(self, skills: int = 30, companies: int = 25, locations: int = 15) -> Dict:
+        """Dashboard statistics (skill_stats, company_stats, location_stats, source_stats, summary)"""
+        total = self.state['jobs']
+        counters = self.state['counters']
+        return {
+            'skill_stats': [
+                {
+                    'name': name,
+                    'category': skill_category(name),
+                    'job_count': count,
+                    'percentage': round(count / total * 100, 1) if total else 0,
+                }
+                for name, count in self.top('skill', skills)
+            ],
+            'company_stats': [{'company': name, 'job_count': count} for name, count in self.top('company', companies)],
+            'location_stats': [{'location': name, 'job_count': count} for name, count in self.top('location', locations)],
+            'source_stats': [{'source': name, 'job_count': count} for name, count in self.top('source')],
+            'summary': {
+                'total_jobs': total,
+                'real_jobs': total,
+                'demo_jobs': 0,
+                'recent_jobs_7_days': self.recent_jobs(7),
+                'avg_salary_min': self._average('salary_min'),
+                'avg_salary_max': self._average('salary_max'),
+                'total_companies': len(counters['company']),
+                'total_skills_tracked': len(counters['skill']),
+                'sources_count': len(counters['source']),
+                'generated_at': datetime.now().isoformat(),
+            },
+        }
+
+    def write(self, directory: Union[str, Path], stats: Optional[Dict] = None, job_store=None) -> Dict:
+        """Write the dashboard files and snapshot (see write_stats())"""
+        return write_stats(directory, stats or self.stats(), job_store)
+
+    # Verification
+
+    def verify(self, store) -> List[str]:
+        """
+        Rebuild from the store and compare with these aggregates
+
+        Returns:
+            Differences as readable lines; empty when they match
+        """
+        expected = self.rebuild(store).state
+        differences = []
+        if expected['jobs'] != self.state['jobs']:
+            differences.append(f"jobs: {self.state['jobs']} != {expected['jobs']} rebuilt")
+        for dimension in DIMENSIONS:
+            actual = self.state['counters'][dimension]
+            rebuilt = expected['counters'][dimension]
+            for value in sorted(set(actual) | set(rebuilt)):
+                if actual.get(value) != rebuilt.get(value):
+                    differences.append(f"{dimension}[{value}]: {actual.get(value)} != {rebuilt.get(value)} rebuilt")
+        for field in SALARY_FIELDS:
+            if self.state['salary'][field] != expected['salary'][field]:
+                differences.append(f"{field}: {self.state['salary'][field]} != {expected['salary'][field]} rebuilt")
+        return differences
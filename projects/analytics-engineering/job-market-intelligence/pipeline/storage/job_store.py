@@ -0,0 +1,365 @@
+"""
+Partitioned Parquet store for processed jobs
+
+Replaces the single data/processed/jobs.json that was rewritten and
+re-parsed in full on every run. Jobs are written as zstd-compressed
+Parquet files partitioned by scrape date and source:
+
+    data/processed/jobs/
+        manifest.json
+        scrape_date=2025-12-06/source=remoteok/part-20251206T210413-1a2b3c4d.parquet
+
+A run appends one file per (scrape date, source) holding only the jobs
+that are not stored yet (by job_id or near-duplicate cluster), and the
+manifest lists every file with its partition values and row count. Readers
+pick files from the manifest by date range and source without listing
+directories, and pyarrow reads only the requested columns and skips row
+groups that can't match a filter, so a dashboard that shows the last 90
+days without descriptions costs the same however long the history grows.
+
+compact() merges the small files of past days into one file per partition.
+The store assumes a single writer at a time (one scheduled run); readers
+only ever see complete files because files and the manifest are written
+under temporary names and renamed into place.
+"""
+import os
+import re
+import json
+import uuid
+import logging
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the layout or schema changes incompatibly
+STORE_FORMAT = 1
+
+MANIFEST_NAME = 'manifest.json'
+
+SCHEMA = pa.schema([
+    ('job_id', pa.string()),
+    ('source', pa.string()),
+    ('source_url', pa.string()),
+    ('title', pa.string()),
+    ('company_name', pa.string()),
+    ('company_logo', pa.string()),
+    ('location', pa.string()),
+    ('country', pa.string()),
+    ('remote_type', pa.string()),
+    ('description', pa.string()),
+    ('salary_min', pa.int64()),
+    ('salary_max', pa.int64()),
+    ('salary_currency', pa.string()),
+    ('employment_type', pa.string()),
+    ('experience_level', pa.string()),
+    ('skills', pa.list_(pa.string())),
+    ('tags', pa.list_(pa.string())),
+    ('posted_date', pa.string()),
+    ('scraped_at', pa.string()),
+    ('is_active', pa.bool_()),
+    ('minhash', pa.string()),
+    ('cluster_id', pa.string()),
+    # Any other fields, as a JSON object
+    ('extra', pa.string()),
+])
+
+_LIST_COLUMNS = {'skills', 'tags'}
+_INT_COLUMNS = {'salary_min', 'salary_max'}
+_BOOL_COLUMNS = {'is_active'}
+
+DateLike = Union[str, date, None]
+
+
+def _to_string(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return ', '.join(str(item) for item in value)
+    return str(value)
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_timestamp(value) -> Optional[str]:
+    """ISO timestamp; some APIs give epoch seconds"""
+    if isinstance(value, (int, float)):
+        return datetime.utcfromtimestamp(value).isoformat()
+    return _to_string(value)
+
+
+def to_row(job: Dict) -> Dict:
+    """Coerce a job dict to the store schema"""
+    row = {}
+    for name in SCHEMA.names:
+        value = job.get(name)
+        if name in _LIST_COLUMNS:
+            row[name] = [str(item) for item in value] if isinstance(value, (list, tuple)) else []
+        elif name in _INT_COLUMNS:
+            row[name] = _to_int(value)
+        elif name in _BOOL_COLUMNS:
+            row[name] = None if value is None else bool(value)
+        elif name in ('posted_date', 'scraped_at'):
+            row[name] = _to_timestamp(value)
+        elif name != 'extra':
+            row[name] = _to_string(value)
+    extra = {key: value for key, value in job.items() if key not in SCHEMA.names}
+    row['extra'] = json.dumps(extra, default=str) if extra else None
+    return row
+
+
+def from_row(row: Dict) -> Dict:
+    """Job dict from a stored row, with the extra fields expanded and empty fields left out"""
+    extra = row.pop('extra', None)
+    job = {key: value for key, value in row.items() if value is not None}
+    if extra:
+        job.update(json.loads(extra))
+    return job
+
+
+def scrape_date(job: Dict) -> str:
+    """Partition date of a job (YYYY-MM-DD)"""
+    scraped_at = job.get('scraped_at')
+    if isinstance(scraped_at, str) and re.match(r'\d{4}-\d{2}-\d{2}', scraped_at):
+        return scraped_at[:10]
+    return date.today().isoformat()
+
+
+def _date_string(value: DateLike) -> Optional[str]:
+    if value is None:
+        return None
+    return value.isoformat()[:10] if isinstance(value, date) else str(value)[:10]
+
+
+class JobStore:
+    """
+    Append-only job history in partitioned Parquet files
+
+    Usage:
+        store = JobStore('data/processed/jobs')
+        store.append(jobs)
+        recent = store.read(columns=['title', 'company_name', 'skills'], days=90)
+        senior = store.read(filter=ds.field('experience_level') == 'Senior')
+    """
+
+    def __init__(self, root: Union[str, Path], manifest: Optional[Dict] = None):
+        """
+        Args:
+            root: Store directory
+            manifest: A manifest recorded earlier (e.g. in a dashboard snapshot)
+                to read instead of the current one; such a store is read-only
+        """
+        self.root = Path(root)
+        self._manifest: Optional[Dict] = manifest
+        self._known: Optional[Tuple[Set[str], Set[str]]] = None
+
+    # Manifest
+
+    @property
+    def manifest(self) -> Dict:
+        if self._manifest is None:
+            path = self.root / MANIFEST_NAME
+            if path.exists():
+                with open(path) as f:
+                    manifest = json.load(f)
+                if manifest.get('format') != STORE_FORMAT:
+                    raise ValueError(f"{path} has store format {manifest.get('format')}, expected {STORE_FORMAT}")
+                self._manifest = manifest
+            else:
+                self._manifest = {'format': STORE_FORMAT, 'files': []}
+        return self._manifest
+
+    def _save_manifest(self):
+        # Every save is a new version, so a recorded manifest can be told apart
+        self.manifest['version'] = self.manifest.get('version', 0) + 1
+        self.manifest['updated_at'] = datetime.now().isoformat()
+        self.manifest['rows'] = sum(entry['rows'] for entry in self.manifest['files'])
+        path = self.root / MANIFEST_NAME
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, path)
+
+    def __len__(self) -> int:
+        return sum(entry['rows'] for entry in self.manifest['files'])
+
+    def files(self, since: DateLike = None, until: DateLike = None,
+              sources: Optional[Sequence[str]] = None, days: Optional[int] = None) -> List[Dict]:
+        """
+        Manifest entries of the partitions in a date range
+
+        Args:
+            since: First scrape date included
+            until: Last scrape date included
+            sources: Only these sources
+            days: Shortcut for since=today - days
+        """
+        if days is not None:
+            since = date.today() - timedelta(days=days)
+        since, until = _date_string(since), _date_string(until)
+        return [
+            entry for entry in self.manifest['files']
+            if (since is None or entry['scrape_date'] >= since)
+            and (until is None or entry['scrape_date'] <= until)
+            and (sources is None or entry['source'] in sources)
+        ]
+
+    # Reading
+
+    def read(self, columns: Optional[List[str]] = None, filter: Optional[ds.Expression] = None,
+             **partitions) -> pa.Table:
+        """
+        Read jobs as an Arrow table
+
+        Args:
+            columns: Columns to read (default: all)
+            filter: Row filter pushed down to the Parquet reader
+            partitions: since / until / sources / days, see files()
+        """
+        paths = [str(self.root / entry['path']) for entry in self.files(**partitions)]
+        if not paths:
+            schema = pa.schema([SCHEMA.field(name) for name in columns]) if columns else SCHEMA
+            return schema.empty_table()
+        dataset = ds.dataset(paths, schema=SCHEMA, format='parquet')
+        return dataset.to_table(columns=columns, filter=filter)
+
+    def jobs(self, columns: Optional[List[str]] = None, filter: Optional[ds.Expression] = None,
+             **partitions) -> List[Dict]:
+        """Read jobs as dicts (see read())"""
+        return [from_row(row) for row in self.read(columns, filter, **partitions).to_pylist()]
+
+    def known(self) -> Tuple[Set[str], Set[str]]:
+        """job_ids and cluster ids already stored"""
+        if self._known is None:
+            table = self.read(columns=['job_id', 'cluster_id'])
+            self._known = (
+                set(table.column('job_id').to_pylist()),
+                set(table.column('cluster_id').drop_null().to_pylist()),
+            )
+        return self._known
+
+    # Writing
+
+    def _write_file(self, relative: str, table: pa.Table):
+        path = self.root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        pq.write_table(table, tmp, compression='zstd')
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _partition_dir(day: str, source: str) -> str:
+        safe_source = re.sub(r'[^a-z0-9_-]+', '_', source.lower()) or 'unknown'
+        return f"scrape_date={day}/source={safe_source}"
+
+    def unseen(self, jobs: Iterable[Dict]) -> List[Dict]:
+        """
+        The jobs append() would store
+
+        A job is left out when its job_id, or the near-duplicate cluster it
+        belongs to, is already in the store or earlier in `jobs`.
+        """
+        job_ids, cluster_ids = (set(known) for known in self.known())
+        fresh = []
+        for job in jobs:
+            job_id = job.get('job_id')
+            cluster_id = job.get('cluster_id')
+            if not job_id or job_id in job_ids or (cluster_id and cluster_id in cluster_ids):
+                continue
+            job_ids.add(job_id)
+            if cluster_id:
+                cluster_ids.add(cluster_id)
+            fresh.append(job)
+        return fresh
+
+    def append(self, jobs: Iterable[Dict]) -> int:
+        """
+        Store the jobs that are not stored yet (see unseen())
+
+        Returns:
+            Number of jobs written
+        """
+        fresh = self.unseen(jobs)
+        job_ids, cluster_ids = self.known()
+        partitions: Dict[Tuple[str, str], List[Dict]] = {}
+        for job in fresh:
+            job_ids.add(job['job_id'])
+            if job.get('cluster_id'):
+                cluster_ids.add(job['cluster_id'])
+            key = (scrape_date(job), str(job.get('source') or 'unknown'))
+            partitions.setdefault(key, []).append(to_row(job))
+
+        stamp = datetime.now().strftime('%Y%m%dT%H%M%S')
+        written = 0
+        for (day, source), rows in sorted(partitions.items()):
+            relative = f"{self._partition_dir(day, source)}/part-{stamp}-{uuid.uuid4().hex[:8]}.parquet"
+            self._write_file(relative, pa.Table.from_pylist(rows, schema=SCHEMA))
+            self.manifest['files'].append({
+                'path': relative,
+                'scrape_date': day,
+                'source': source,
+                'rows': len(rows),
+                'created_at': datetime.now().isoformat(),
+            })
+            written += len(rows)
+
+        if written:
+            self._save_manifest()
+        logger.info(f"Stored {written} new jobs in {len(partitions)} partitions ({len(self)} total)")
+        return written
+
+    def compact(self, before: DateLike = None) -> int:
+        """
+        Merge each past partition's files into one
+
+        Args:
+            before: Only partitions scraped before this date (default: today,
+                so the current day's partitions can still be appended to)
+
+        Returns:
+            Number of files removed
+        """
+        before = _date_string(before) or date.today().isoformat()
+        groups: Dict[Tuple[str, str], List[Dict]] = {}
+        for entry in self.manifest['files']:
+            if entry['scrape_date'] < before:
+                groups.setdefault((entry['scrape_date'], entry['source']), []).append(entry)
+
+        removed = 0
+        for (day, source), entries in groups.items():
+            if len(entries) < 2:
+                continue
+            table = pa.concat_tables(pq.read_table(self.root / entry['path'], schema=SCHEMA) for entry in entries)
+            relative = f"{self._partition_dir(day, source)}/part-{day.replace('-', '')}-compacted.parquet"
+            if any(entry['path'] == relative for entry in entries):
+                relative = relative.replace('-compacted', f"-compacted-{uuid.uuid4().hex[:8]}")
+            self._write_file(relative, table)
+
+            replaced = {entry['path'] for entry in entries}
+            self.manifest['files'] = [entry for entry in self.manifest['files'] if entry['path'] not in replaced]
+            self.manifest['files'].append({
+                'path': relative,
+                'scrape_date': day,
+                'source': source,
+                'rows': table.num_rows,
+                'created_at': datetime.now().isoformat(),
+            })
+            # Readers pick files from the manifest, so save it before deleting
+            self._save_manifest()
+            for path in replaced:
+                (self.root / path).unlink(missing_ok=True)
+            removed += len(replaced)
+
+        if removed:
+            logger.info(f"Compacted {removed} files")
+        return removed
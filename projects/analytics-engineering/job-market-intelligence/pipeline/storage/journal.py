@@ -0,0 +1,335 @@
+"""
+Append-only scrape journal, one per source
+
+Scrapers used to write every run twice as pretty-printed JSON (a
+timestamped snapshot plus a *_latest.json overwrite), and only after the
+whole run had finished, so the scraped directory filled up with redundant
+full copies and a run that crashed halfway kept nothing. A journal instead
+takes records as they are scraped:
+
+    data/scraped/journal/
+        remoteok/
+            20251206T210413123456-4242.ndjson.gz  segment written by one run
+            latest.ndjson.gz                       latest state, written by compact()
+
+Each run appends to a new segment. Records are buffered and written as one
+gzip member per batch (every `batch_size` records or `flush_interval`
+seconds), followed by an fsync, so a batch is either on disk complete or
+not at all. Concatenated gzip members are still a valid .gz file
+(`zcat segment.ndjson.gz` shows the NDJSON), and every member boundary is
+a byte offset a reader can resume from. A torn member at the end of a
+segment (the run was killed mid-write) is ignored by readers.
+
+compact() folds the state and every segment into a new latest.ndjson.gz,
+keeping only the newest version of each record by key, optionally drops
+records older than a retention window, and then deletes the folded
+segments. Folding is idempotent, so a crash between writing the state and
+deleting the segments loses nothing. Consumers that follow a journal keep
+a (segment, offset) position and call tail() with it; records from
+segments that were compacted away are in latest().
+
+One writer per journal at a time, and compaction runs when no writer is
+open (end of a scheduled run), as with the job store. Only the standard
+library is used so the standalone scripts can share it.
+"""
+import os
+import json
+import gzip
+import zlib
+import time
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = '.ndjson.gz'
+STATE_NAME = 'latest' + SEGMENT_SUFFIX
+
+# zlib window bits for gzip framing
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+READ_CHUNK_SIZE = 1 << 16
+
+# Scraped records older than this are dropped from the latest state
+DEFAULT_RETENTION_DAYS = 30
+
+# Where a consumer has read up to: (segment file name, byte offset)
+Position = Tuple[str, int]
+
+Key = Union[str, Sequence[str], None]
+
+
+def encode_records(records: Iterable[Dict]) -> bytes:
+    """One gzip member holding the records as NDJSON"""
+    lines = ''.join(json.dumps(record, default=str, separators=(',', ':')) + '\n' for record in records)
+    return gzip.compress(lines.encode(), mtime=0)
+
+
+def read_batches(path: Union[str, Path], offset: int = 0) -> Iterator[Tuple[List[Dict], int]]:
+    """
+    Read a journal file from a byte offset, one gzip member at a time
+
+    Args:
+        path: Segment or state file
+        offset: Member boundary to start at (0, or an offset yielded earlier)
+
+    Yields:
+        (records of one member, offset just after that member)
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        decompressor = zlib.decompressobj(GZIP_WBITS)
+        parts: List[bytes] = []
+        member_size = 0
+        pending = b''
+        while True:
+            chunk = pending or f.read(READ_CHUNK_SIZE)
+            pending = b''
+            if not chunk:
+                if member_size:
+                    logger.warning(f"{path}: ignoring incomplete batch at byte {offset}")
+                return
+            try:
+                parts.append(decompressor.decompress(chunk))
+            except zlib.error as e:
+                logger.warning(f"{path}: corrupt batch at byte {offset} ({e}), stopping")
+                return
+            member_size += len(chunk)
+            if not decompressor.eof:
+                continue
+
+            pending = decompressor.unused_data
+            offset += member_size - len(pending)
+            records = [json.loads(line) for line in b''.join(parts).splitlines() if line]
+            yield records, offset
+
+            decompressor = zlib.decompressobj(GZIP_WBITS)
+            parts = []
+            member_size = 0
+
+
+def _record_key(record: Dict, key: Key):
+    if isinstance(key, str):
+        return record.get(key)
+    return tuple(record.get(field) for field in key)
+
+
+class JournalWriter:
+    """
+    Appends records to a new segment in batches
+
+    Usage:
+        with journal.writer() as writer:
+            for job in jobs:
+                writer.write(job)
+    """
+
+    def __init__(self, path: Union[str, Path], batch_size: int = 100, flush_interval: float = 5.0):
+        """
+        Args:
+            path: Segment file (created)
+            batch_size: Records buffered before a write and fsync
+            flush_interval: Seconds after which a partial batch is written anyway
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._file = open(self.path, 'ab')
+        self._buffer: List[Dict] = []
+        self._flushed_at = time.monotonic()
+        self.records = 0
+
+    @property
+    def offset(self) -> int:
+        """Bytes durably written"""
+        return self._file.tell()
+
+    def write(self, record: Dict):
+        self._buffer.append(record)
+        self.records += 1
+        if len(self._buffer) >= self.batch_size or time.monotonic() - self._flushed_at >= self.flush_interval:
+            self.flush()
+
+    def write_many(self, records: Iterable[Dict]):
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        """Write the buffered records as one batch and fsync"""
+        self._flushed_at = time.monotonic()
+        if not self._buffer:
+            return
+        self._file.write(encode_records(self._buffer))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._buffer = []
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Journal:
+    """
+    A source's segments and latest state
+
+    Usage:
+        journal = Journal('data/scraped/journal', 'remoteok')
+        with journal.writer() as writer:
+            writer.write_many(jobs)
+        journal.compact(retention_days=30)
+        jobs = journal.latest()
+    """
+
+    def __init__(self, root: Union[str, Path], name: str, key: Key = 'job_id',
+                 time_field: Optional[str] = 'scraped_at'):
+        """
+        Args:
+            root: Directory holding every journal
+            name: Journal (source) name
+            key: Field, or fields, identifying versions of the same record;
+                None keeps every record
+            time_field: ISO timestamp field used for retention
+        """
+        self.name = name
+        self.path = Path(root) / name
+        self.key = key
+        self.time_field = time_field
+
+    @property
+    def state_path(self) -> Path:
+        return self.path / STATE_NAME
+
+    def segments(self) -> List[Path]:
+        """Segment files, oldest first"""
+        if not self.path.exists():
+            return []
+        return sorted(path for path in self.path.glob('*' + SEGMENT_SUFFIX) if path.name != STATE_NAME)
+
+    def written_by(self, pid: int, since: Optional[datetime] = None) -> List[Dict]:
+        """
+        Records of the segments a process wrote that aren't compacted yet
+
+        Recovers what a cancelled run had written. Segment names hold the
+        writer's pid and start time; `since` rules out an earlier process
+        that had the same pid.
+        """
+        stamp = since.strftime('%Y%m%dT%H%M%S%f') if since else ''
+        return [
+            record
+            for path in self.segments()
+            if path.name.endswith(f"-{pid}{SEGMENT_SUFFIX}") and path.name >= stamp
+            for records, _ in read_batches(path)
+            for record in records
+        ]
+
+    def writer(self, batch_size: int = 100, flush_interval: float = 5.0) -> JournalWriter:
+        """Writer appending to a new segment"""
+        stamp = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        path = self.path / f"{stamp}-{os.getpid()}{SEGMENT_SUFFIX}"
+        return JournalWriter(path, batch_size, flush_interval)
+
+    # Reading
+
+    def tail(self, position: Optional[Position] = None) -> Iterator[Tuple[List[Dict], Position]]:
+        """
+        Batches written after a position, across segments
+
+        Args:
+            position: Position yielded by an earlier call; None reads every segment
+
+        Yields:
+            (records, position after them) - store the position to resume later
+        """
+        segment, offset = position or ('', 0)
+        for path in self.segments():
+            if path.name < segment:
+                continue
+            start = offset if path.name == segment else 0
+            for records, end in read_batches(path, start):
+                yield records, (path.name, end)
+
+    def _fold(self, batches: Iterable[List[Dict]], cutoff: Optional[str] = None) -> List[Dict]:
+        """Newest version of each record, in order of first appearance"""
+        folded: Dict = {}
+        kept: List[Dict] = []
+        for records in batches:
+            for record in records:
+                stamp = record.get(self.time_field) if cutoff else None
+                if stamp and str(stamp) < cutoff:
+                    continue
+                if self.key is None:
+                    kept.append(record)
+                else:
+                    folded[_record_key(record, self.key)] = record
+        return kept if self.key is None else list(folded.values())
+
+    def _batches(self, segments: List[Path]) -> Iterator[List[Dict]]:
+        if self.state_path.exists():
+            for records, _ in read_batches(self.state_path):
+                yield records
+        for path in segments:
+            for records, _ in read_batches(path):
+                yield records
+
+    def latest(self) -> List[Dict]:
+        """Latest state including segments not compacted yet"""
+        return self._fold(self._batches(self.segments()))
+
+    # Compaction
+
+    def compact(self, retention_days: Optional[int] = None) -> int:
+        """
+        Fold the segments into the latest state and delete them
+
+        Args:
+            retention_days: Also drop records whose time_field is older
+
+        Returns:
+            Number of records in the new state
+        """
+        segments = self.segments()
+        cutoff = None
+        if retention_days is not None and self.time_field:
+            cutoff = (datetime.now() - timedelta(days=retention_days)).isoformat()
+        if not segments and cutoff is None:
+            return 0
+
+        records = self._fold(self._batches(segments), cutoff)
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(encode_records(records))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.state_path)
+
+        # The state already holds their records, so losing a delete is harmless
+        for path in segments:
+            path.unlink(missing_ok=True)
+        logger.info(f"Compacted {len(segments)} segments of {self.name} into {len(records)} records")
+        return len(records)
+
+
+def journals(root: Union[str, Path], **settings) -> List[Journal]:
+    """Every journal under root (settings as for Journal)"""
+    root = Path(root)
+    if not root.exists():
+        return []
+    return [Journal(root, path.name, **settings) for path in sorted(root.iterdir()) if path.is_dir()]
+
+
+def compact_all(root: Union[str, Path], retention_days: Optional[int] = None, **settings) -> Dict[str, int]:
+    """Compact every journal under root; returns records kept per journal"""
+    return {journal.name: journal.compact(retention_days) for journal in journals(root, **settings)}
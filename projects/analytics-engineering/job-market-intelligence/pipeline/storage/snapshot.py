@@ -0,0 +1,159 @@
+"""
+Atomic, versioned snapshots of the dashboard data
+
+The stats scripts used to overwrite skill_stats.json, company_stats.json,
+summary.json and the rest one file at a time while the dashboard read
+them one file at a time, so a reader could see a half-written file or new
+summary numbers next to old skill counts. A run now publishes everything
+the dashboard reads as one snapshot:
+
+    data/processed/
+        snapshot.json                                   manifest: the current version
+        snapshots/20251206T210413123456-1a2b3c4d.json.zst  one bundle per version
+
+A bundle is written under a temporary name, fsynced and renamed into
+place, and is never modified afterwards; then the manifest is replaced
+with a rename to point at it. Readers resolve the version from the
+manifest and load the bundle with one open, one zstd decompression and
+one JSON parse. They never wait for a writer: a reader that resolved the
+old version keeps reading its unchanged bundle, and the newest `keep`
+bundles stay on disk so a slow reader isn't pulled from under.
+
+A snapshot published with its job store also records the store's manifest
+(under 'job_store'), so the dashboard lists the jobs the statistics were
+computed from rather than whatever a run appended since. A later
+compaction can still delete files such a manifest names; the dashboard's
+queries then fall back to the store's current manifest.
+
+Each entry is also written to <key>.json for readers other than the
+dashboard (the workflow's summary step, ad-hoc use). Those copies are
+replaced one file at a time, each with a rename, so a reader never sees a
+half-written file but may see files of two consecutive runs.
+
+zstd comes from pyarrow, which the job store already requires.
+"""
+import os
+import json
+import uuid
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'snapshot.json'
+SNAPSHOT_DIR = 'snapshots'
+SNAPSHOT_SUFFIX = '.json.zst'
+
+# Bundles kept besides the current one, for readers still on an older version
+DEFAULT_KEEP = 3
+
+# Bundle entry holding the job store's manifest
+JOB_STORE_KEY = 'job_store'
+
+
+def _fsync_replace(tmp: Path, path: Path):
+    fd = os.open(tmp, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp, path)
+
+
+def write_json(path: Union[str, Path], data) -> Path:
+    """Write data as JSON under a temporary name, then rename it into place"""
+    path = Path(path)
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2, default=str)
+    _fsync_replace(tmp, path)
+    return path
+
+
+def current_version(directory: Union[str, Path]) -> Optional[str]:
+    """Version the manifest points at (None before the first publish)"""
+    path = Path(directory) / MANIFEST_NAME
+    try:
+        with open(path) as f:
+            return json.load(f)['version']
+    except FileNotFoundError:
+        return None
+
+
+def load_snapshot(directory: Union[str, Path], version: Optional[str] = None) -> Dict:
+    """
+    Data of one snapshot
+
+    Args:
+        directory: Directory holding the manifest
+        version: Version to read (default: the current one)
+    """
+    directory = Path(directory)
+    version = version or current_version(directory)
+    if version is None:
+        raise FileNotFoundError(f"No snapshot published in {directory}")
+    path = directory / SNAPSHOT_DIR / f"{version}{SNAPSHOT_SUFFIX}"
+    with pa.input_stream(str(path), compression='zstd') as stream:
+        return json.loads(stream.read())
+
+
+def publish_snapshot(directory: Union[str, Path], data: Dict, keep: int = DEFAULT_KEEP,
+                     job_store=None) -> str:
+    """
+    Publish data as the new current snapshot
+
+    Args:
+        directory: Directory holding the manifest
+        data: Everything the readers load, JSON-serializable; each entry is
+            also written to <key>.json
+        keep: Older bundles to keep
+        job_store: JobStore the data was computed from; its manifest is
+            recorded in the bundle
+
+    Returns:
+        The new version
+    """
+    directory = Path(directory)
+    bundles = directory / SNAPSHOT_DIR
+    bundles.mkdir(parents=True, exist_ok=True)
+
+    version = f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+    path = bundles / f"{version}{SNAPSHOT_SUFFIX}"
+    tmp = path.with_suffix('.tmp')
+    bundle = dict(data)
+    if job_store is not None:
+        bundle[JOB_STORE_KEY] = job_store.manifest
+    payload = json.dumps(bundle, default=str).encode()
+    with pa.output_stream(str(tmp), compression='zstd') as stream:
+        stream.write(payload)
+    _fsync_replace(tmp, path)
+
+    manifest = {
+        'version': version,
+        'published_at': datetime.now().isoformat(),
+        'keys': sorted(bundle),
+        'bytes': len(payload),
+        'compressed_bytes': path.stat().st_size,
+    }
+    if job_store is not None:
+        manifest['job_store_version'] = job_store.manifest.get('version')
+    manifest_path = directory / MANIFEST_NAME
+    manifest_tmp = manifest_path.with_suffix('.tmp')
+    with open(manifest_tmp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    _fsync_replace(manifest_tmp, manifest_path)
+
+    for key, value in data.items():
+        write_json(directory / f"{key}.json", value)
+
+    # Versions sort by time; drop all but the newest `keep` older ones
+    older = sorted(p for p in bundles.glob(f"*{SNAPSHOT_SUFFIX}") if p != path)
+    for stale in older[:max(len(older) - keep, 0)]:
+        stale.unlink(missing_ok=True)
+
+    logger.info(f"Published snapshot {version} ({len(payload)} bytes, {manifest['compressed_bytes']} compressed)")
+    return version
@@ -0,0 +1,118 @@
+"""
+HTML Parser Benchmark
+
+Measures listing-page parse throughput for every installed parsing backend,
+parsing the full page and only the scraper's declared card containers.
+Pages come from the HTTP cache populated by earlier scraper runs, or from a
+directory of saved pages laid out as <pages-dir>/<source>/*.html.
+
+Usage:
+    python3 scripts/benchmark_parsers.py
+    python3 scripts/benchmark_parsers.py --pages-dir data/pages --repeat 5
+"""
+import sys
+import time
+import zlib
+import sqlite3
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+# Add pipeline to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline.config import SCRAPING_CONFIG
+from pipeline.scrapers.parsing import PARSERS, AVAILABLE
+from pipeline.scrapers.indeed_scraper import IndeedScraper
+from pipeline.scrapers.fuzu_scraper import FuzuScraper
+
+# Source name -> (scraper class, host used to pick cached pages)
+SOURCES = {
+    'indeed': (IndeedScraper, 'indeed.com'),
+    'fuzu': (FuzuScraper, 'fuzu.com'),
+}
+
+
+def load_cached_pages(cache_path: Path, host: str) -> List[bytes]:
+    """Load cached listing pages for a host from the HTTP cache"""
+    if not cache_path.exists():
+        return []
+    conn = sqlite3.connect(str(cache_path))
+    try:
+        rows = conn.execute(
+            "SELECT content FROM responses WHERE url LIKE ? AND status_code = 200",
+            (f'%{host}%',)
+        ).fetchall()
+    finally:
+        conn.close()
+    return [zlib.decompress(content) for content, in rows]
+
+
+def load_saved_pages(pages_dir: Path, source: str) -> List[bytes]:
+    """Load saved pages from <pages_dir>/<source>/*.html"""
+    return [path.read_bytes() for path in sorted((pages_dir / source).glob('*.html'))]
+
+
+def benchmark(scraper, pages: List[bytes], scoped: bool, repeat: int) -> Dict:
+    """Parse every page `repeat` times and find its cards"""
+    cards = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for content in pages:
+            if scoped:
+                soup = scraper.parse_listing(content)
+            else:
+                soup = scraper.parser.parse(content)
+            cards += len(scraper.find_job_cards(soup))
+    elapsed = time.perf_counter() - start
+
+    parsed = len(pages) * repeat
+    return {
+        'pages_per_sec': parsed / elapsed if elapsed else float('inf'),
+        'ms_per_page': elapsed * 1000 / parsed,
+        'cards_per_page': cards / parsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML parsing backends')
+    parser.add_argument('--pages-dir', type=Path, default=None,
+                        help='Directory of saved pages (<source>/*.html); defaults to the HTTP cache')
+    parser.add_argument('--cache-path', type=Path, default=Path(SCRAPING_CONFIG['http_cache_path']),
+                        help='HTTP cache database to read pages from')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Times to parse each page')
+    args = parser.parse_args()
+
+    backends = [name for name in PARSERS if AVAILABLE[name]]
+    print(f"Backends: {', '.join(backends)}")
+    skipped = [name for name in PARSERS if not AVAILABLE[name]]
+    if skipped:
+        print(f"Not installed: {', '.join(skipped)}")
+
+    for source, (scraper_class, host) in SOURCES.items():
+        if args.pages_dir:
+            pages = load_saved_pages(args.pages_dir, source)
+        else:
+            pages = load_cached_pages(args.cache_path, host)
+
+        if not pages:
+            print(f"\n{source}: no saved pages found, skipping")
+            continue
+
+        size_kb = sum(len(content) for content in pages) / len(pages) / 1024
+        print(f"\n{source}: {len(pages)} pages, {size_kb:.0f} KB average")
+        print(f"{'backend':<14}{'mode':<8}{'pages/s':>10}{'ms/page':>10}{'cards':>8}")
+
+        scraper = scraper_class()
+        for name in backends:
+            scraper.parser = PARSERS[name]()
+            for scoped in (False, True):
+                result = benchmark(scraper, pages, scoped, args.repeat)
+                print(f"{name:<14}{'scoped' if scoped else 'full':<8}"
+                      f"{result['pages_per_sec']:>10.1f}{result['ms_per_page']:>10.2f}"
+                      f"{result['cards_per_page']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
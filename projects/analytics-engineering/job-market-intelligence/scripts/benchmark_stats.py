@@ -0,0 +1,96 @@
+"""
+Stats Engine Benchmark
+
+Generates synthetic job tables of increasing size and times the dashboard
+aggregates computed three ways:
+
+- loop: walking job dicts one by one (how the stats scripts used to work,
+  and how incremental updates still apply a run's few new jobs)
+- arrow: the vectorized engine on a columnar table, as read from the job store
+- dicts: the vectorized engine including the conversion of job dicts to a table
+
+and checks that all three agree.
+
+Usage:
+    python3 scripts/benchmark_stats.py
+    python3 scripts/benchmark_stats.py --sizes 10000 1000000
+"""
+import sys
+import time
+import random
+import argparse
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add pipeline to path
+PROJECT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+import pyarrow as pa
+
+from pipeline.analysis.job_stats import STATS_SCHEMA, compute_state, job_table
+from pipeline.storage.aggregates import AggregateStore
+from pipeline.scrapers.api_sources import TARGET_SKILLS
+
+SOURCES = ['remoteok', 'remotive', 'arbeitnow', 'jobicy', 'himalayas', 'themuse', 'brightermonday', 'fuzu']
+LEVELS = ['Entry', 'Mid', 'Senior', 'Manager', None]
+CITIES = ['Nairobi', 'Mombasa', 'Kisumu', 'Remote', 'Berlin', 'London', 'Lagos', 'Kampala']
+
+
+def synthetic_jobs(count: int, seed: int = 42) -> pa.Table:
+    """Table of `count` jobs with realistic cardinalities"""
+    rng = random.Random(seed)
+    skills = TARGET_SKILLS
+    companies = [f"Company {i}" for i in range(max(count // 20, 10))] + ['Unknown']
+    days = [(date.today() - timedelta(days=day)).isoformat() for day in range(120)]
+
+    salary_min = [rng.randrange(30, 300) * 1000 if rng.random() < 0.3 else None for _ in range(count)]
+    columns = {
+        'skills': [rng.sample(skills, rng.randint(0, 8)) for _ in range(count)],
+        'company_name': [rng.choice(companies) for _ in range(count)],
+        'location': [f"{rng.choice(CITIES)}, Area {rng.randrange(50)}" for _ in range(count)],
+        'source': [rng.choice(SOURCES) for _ in range(count)],
+        'experience_level': [rng.choice(LEVELS) for _ in range(count)],
+        'salary_min': salary_min,
+        'salary_max': [value * 2 if value else None for value in salary_min],
+        'scraped_at': [f"{rng.choice(days)}T12:00:00" for _ in range(count)],
+    }
+    return pa.table(columns, schema=STATS_SCHEMA)
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def bench(sizes, repeat: int):
+    print(f"{'jobs':>10}{'loop s':>10}{'arrow s':>10}{'dicts s':>10}{'speedup':>9}  check")
+    for size in sizes:
+        table = synthetic_jobs(size)
+        jobs = table.to_pylist()
+
+        loop = arrow = dicts = float('inf')
+        for _ in range(repeat):
+            incremental = AggregateStore()
+            _, seconds = timed(lambda: incremental.add_many(jobs))
+            loop = min(loop, seconds)
+            vectorized, seconds = timed(lambda: compute_state(table))
+            arrow = min(arrow, seconds)
+            converted, seconds = timed(lambda: compute_state(job_table(jobs)))
+            dicts = min(dicts, seconds)
+
+        check = 'ok' if incremental.state == vectorized == converted else 'MISMATCH'
+        print(f"{size:>10,}{loop:>10.2f}{arrow:>10.3f}{dicts:>10.2f}{loop / arrow:>8.0f}x  {check}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the vectorized stats engine against a per-job loop')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per size (best is reported)')
+    args = parser.parse_args()
+    bench(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
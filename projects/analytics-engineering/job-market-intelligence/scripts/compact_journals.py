@@ -0,0 +1,51 @@
+"""
+Compact the scrape journals
+
+Folds each source's journal segments into its latest state, keeping the
+newest version of every job and dropping jobs older than the retention
+window. The scrapers compact after each run; this covers runs that were
+interrupted, and can be scheduled on its own.
+
+Usage:
+    python3 scripts/compact_journals.py
+    python3 scripts/compact_journals.py --retention-days 60
+    python3 scripts/compact_journals.py --status
+"""
+import sys
+import logging
+import argparse
+from pathlib import Path
+
+# Add pipeline to path
+PROJECT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+from pipeline.storage.journal import DEFAULT_RETENTION_DAYS, compact_all, journals
+
+JOURNAL_DIR = PROJECT_DIR / "data" / "scraped" / "journal"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fold scrape journal segments into the latest state')
+    parser.add_argument('--journal-dir', type=Path, default=JOURNAL_DIR)
+    parser.add_argument('--retention-days', type=int, default=DEFAULT_RETENTION_DAYS,
+                        help=f'Drop jobs scraped longer ago (default: {DEFAULT_RETENTION_DAYS})')
+    parser.add_argument('--status', action='store_true', help='Only show pending segments per source')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.status:
+        for journal in journals(args.journal_dir):
+            segments = journal.segments()
+            size = sum(path.stat().st_size for path in segments)
+            print(f"{journal.name:<16}{len(segments):>4} segments {size / 1024:>10.1f} KB")
+        return
+
+    kept = compact_all(args.journal_dir, args.retention_days)
+    for name, count in kept.items():
+        print(f"{name:<16}{count:>7} jobs")
+    print(f"✅ Compacted {len(kept)} journals in {args.journal_dir}")
+
+
+if __name__ == "__main__":
+    main()
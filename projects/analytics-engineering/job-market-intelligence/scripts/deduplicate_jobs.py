@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+CLI script to fingerprint stored jobs and group near-duplicates
+
+New jobs are clustered as they are saved; this backfills jobs stored
+before that, or re-clusters everything with --rebuild.
+"""
+import sys
+import logging
+import argparse
+from pathlib import Path
+
+# Add pipeline to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline.nlp.dedup import cluster_database
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Group near-duplicate jobs in the database')
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=5000,
+        help='Jobs read and updated per round trip'
+    )
+    parser.add_argument(
+        '--rebuild',
+        action='store_true',
+        help='Clear all fingerprints and cluster every job again'
+    )
+    
+    args = parser.parse_args()
+    
+    logger.info("Starting near-duplicate clustering")
+    
+    try:
+        cluster_database(batch_size=args.batch_size, rebuild=args.rebuild)
+        logger.info("Near-duplicate clustering completed successfully")
+        return 0
+    except Exception as e:
+        logger.error(f"Error during near-duplicate clustering: {e}")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
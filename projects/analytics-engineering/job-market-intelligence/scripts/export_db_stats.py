@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Write the dashboard statistics from the database's stats views
+
+Reads the materialized views (see pipeline.database.stats_views) and
+writes skill_stats.json, company_stats.json, location_stats.json,
+source_stats.json and summary.json with a new dashboard snapshot. The
+scrapers refresh the views after each run; --refresh recomputes them
+first. init_db() creates the views; on a database set up from schema.sql,
+--create creates them.
+
+Usage:
+    python3 scripts/export_db_stats.py
+    python3 scripts/export_db_stats.py --refresh
+    python3 scripts/export_db_stats.py --create
+"""
+import sys
+import logging
+import argparse
+from pathlib import Path
+
+# Add pipeline to path
+PROJECT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+from pipeline.database.stats_views import create_stats_views, export_stats, refresh_stats_views
+
+OUTPUT_DIR = PROJECT_DIR / "data" / "processed"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export dashboard statistics from the database')
+    parser.add_argument('--output-dir', type=Path, default=OUTPUT_DIR)
+    parser.add_argument('--refresh', action='store_true', help='Refresh the stats views first')
+    parser.add_argument('--create', action='store_true', help='Create missing stats views first')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.create:
+        from pipeline.database.connection import engine
+        with engine.begin() as connection:
+            create_stats_views(connection)
+
+    if args.refresh:
+        refresh_stats_views()
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    stats = export_stats(args.output_dir)
+    summary = stats['summary']
+    print(f"✅ Exported stats of {summary['total_jobs']} jobs, {summary['total_skills_tracked']} skills "
+          f"and {summary['total_companies']} companies to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
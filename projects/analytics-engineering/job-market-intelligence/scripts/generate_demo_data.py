@@ -4,7 +4,7 @@ Generate Demo Data for Job Market Intelligence Dashboard
 This script creates realistic sample data for demonstrating the dashboard
 without requiring a live database connection.
 """
-import json
+import sys
 import random
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -13,6 +13,11 @@ from pathlib import Path
 OUTPUT_DIR = Path(__file__).parent.parent / "data" / "processed"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline.storage.job_store import JobStore
+from pipeline.storage.snapshot import publish_snapshot
+
 # Kenyan Companies
 COMPANIES = [
     {"name": "Safaricom PLC", "industry": "Telecommunications", "size": "10000+", "location": "Nairobi"},
@@ -300,39 +305,21 @@ def main():
     }
     
     # Save all data
-    with open(OUTPUT_DIR / "jobs.json", "w") as f:
-        json.dump(jobs, f, indent=2)
-    print(f"✅ Saved jobs to {OUTPUT_DIR / 'jobs.json'}")
-    
-    with open(OUTPUT_DIR / "skill_stats.json", "w") as f:
-        json.dump(skill_stats, f, indent=2)
-    print(f"✅ Saved skill stats to {OUTPUT_DIR / 'skill_stats.json'}")
-    
-    with open(OUTPUT_DIR / "company_stats.json", "w") as f:
-        json.dump(company_stats, f, indent=2)
-    print(f"✅ Saved company stats")
-    
-    with open(OUTPUT_DIR / "source_stats.json", "w") as f:
-        json.dump(source_stats, f, indent=2)
-    print(f"✅ Saved source stats")
-    
-    with open(OUTPUT_DIR / "location_stats.json", "w") as f:
-        json.dump(location_stats, f, indent=2)
-    print(f"✅ Saved location stats")
-    
-    with open(OUTPUT_DIR / "summary.json", "w") as f:
-        json.dump(summary, f, indent=2)
-    print(f"✅ Saved summary stats")
-    
-    # Save companies
-    with open(OUTPUT_DIR / "companies.json", "w") as f:
-        json.dump([{"id": i+1, **c} for i, c in enumerate(COMPANIES)], f, indent=2)
-    print(f"✅ Saved companies")
+    store = JobStore(OUTPUT_DIR / "jobs")
+    stored = store.append(jobs)
+    print(f"✅ Stored {stored} new jobs in {OUTPUT_DIR / 'jobs'}")
     
-    # Save skills master list
-    with open(OUTPUT_DIR / "skills.json", "w") as f:
-        json.dump([{"id": i+1, **s} for i, s in enumerate(SKILLS)], f, indent=2)
-    print(f"✅ Saved skills")
+    # Also writes skill_stats.json, summary.json and the rest
+    version = publish_snapshot(OUTPUT_DIR, {
+        "skill_stats": skill_stats,
+        "company_stats": company_stats,
+        "source_stats": source_stats,
+        "location_stats": location_stats,
+        "summary": summary,
+        "companies": [{"id": i+1, **c} for i, c in enumerate(COMPANIES)],
+        "skills": [{"id": i+1, **s} for i, s in enumerate(SKILLS)],
+    }, job_store=store)
+    print(f"✅ Published snapshot {version}")
     
     print("\n🎉 Demo data generation complete!")
     print(f"\nSummary:")
@@ -3,14 +3,21 @@ Update Dashboard to Use Real + Demo Data
 
 Combines scraped data (if available) with demo data for a rich dashboard.
 """
+import sys
 import json
 from pathlib import Path
-from datetime import datetime
 
 # Directories
 PROJECT_DIR = Path(__file__).parent.parent
 SCRAPED_DIR = PROJECT_DIR / "data" / "scraped"
 PROCESSED_DIR = PROJECT_DIR / "data" / "processed"
+JOB_STORE_DIR = PROCESSED_DIR / "jobs"
+AGGREGATES_PATH = PROCESSED_DIR / "aggregates.json"
+
+sys.path.insert(0, str(PROJECT_DIR))
+
+from pipeline.storage.job_store import JobStore
+from pipeline.storage.aggregates import AggregateStore
 
 PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -42,127 +49,49 @@ def load_scraped_data():
     return jobs
 
 
-def load_demo_data():
-    """Load demo data"""
-    demo_file = PROCESSED_DIR / "jobs.json"
-    if demo_file.exists():
-        with open(demo_file) as f:
-            jobs = json.load(f)
-            print(f"Loaded {len(jobs)} demo jobs")
-            return jobs
-    return []
-
-
 def merge_and_save():
-    """Merge scraped and demo data, prioritizing scraped"""
+    """Add the scraped jobs to the store next to the demo jobs and update the stats"""
+    store = JobStore(JOB_STORE_DIR)
+    aggregates = AggregateStore.load(AGGREGATES_PATH, store)
     scraped = load_scraped_data()
-    demo = load_demo_data()
     
-    # Mark demo jobs
-    for job in demo:
-        job['is_demo'] = True
+    # Jobs already stored count as demo jobs
+    demo_count = len(store)
+    if demo_count:
+        print(f"Loaded {demo_count} demo jobs")
     
     # Mark scraped jobs
     for job in scraped:
         job['is_demo'] = False
     
-    # Combine - scraped first
-    combined = scraped + demo
+    # Store the scraped jobs next to the demo jobs
+    new_jobs = store.unseen(scraped)
+    store.append(new_jobs)
+    aggregates.add_many(new_jobs)
+    aggregates.save()
     
-    # Save combined data
-    with open(PROCESSED_DIR / "jobs.json", 'w') as f:
-        json.dump(combined, f, indent=2)
-    
-    print(f"\nSaved {len(combined)} total jobs ({len(scraped)} real, {len(demo)} demo)")
+    print(f"\nSaved {len(store)} total jobs ({len(new_jobs)} new real, {demo_count} demo)")
     
     # Generate updated stats
-    generate_stats(combined)
-    
-    return combined
+    generate_stats(aggregates, store, demo_count)
 
 
-def generate_stats(jobs):
-    """Generate statistics from jobs"""
-    skill_counts = {}
-    company_counts = {}
-    location_counts = {}
-    source_counts = {}
-    
-    for job in jobs:
-        # Skills
-        for skill in job.get('skills', []):
-            skill_counts[skill] = skill_counts.get(skill, 0) + 1
-        
-        # Company
-        company = job.get('company_name', 'Unknown')
-        company_counts[company] = company_counts.get(company, 0) + 1
-        
-        # Location
-        location = job.get('location', 'Kenya')
-        location_counts[location] = location_counts.get(location, 0) + 1
-        
-        # Source
-        source = job.get('source', 'unknown')
-        source_counts[source] = source_counts.get(source, 0) + 1
-    
-    # Convert to list format
-    skill_stats = [
-        {"name": k, "category": "Other", "job_count": v, "percentage": round(v/len(jobs)*100, 1)}
-        for k, v in sorted(skill_counts.items(), key=lambda x: -x[1])
-    ]
-    
-    company_stats = [
-        {"company": k, "job_count": v}
-        for k, v in sorted(company_counts.items(), key=lambda x: -x[1])
-    ]
-    
-    location_stats = [
-        {"location": k, "job_count": v}
-        for k, v in sorted(location_counts.items(), key=lambda x: -x[1])
-    ]
-    
-    source_stats = [
-        {"source": k, "job_count": v}
-        for k, v in source_counts.items()
-    ]
+def generate_stats(aggregates, store, demo_count):
+    """Write the stats of every stored job from the aggregates"""
+    stats = aggregates.stats(skills=None, companies=None, locations=None)
     
     # Count real vs demo
-    real_count = sum(1 for j in jobs if not j.get('is_demo', True))
-    demo_count = sum(1 for j in jobs if j.get('is_demo', True))
-    
-    summary = {
-        "total_jobs": len(jobs),
-        "real_jobs": real_count,
-        "demo_jobs": demo_count,
-        "recent_jobs_7_days": len([j for j in jobs if 'posted_date' in j]),
-        "avg_salary_min": 150000,  # Placeholder
-        "avg_salary_max": 300000,  # Placeholder
-        "total_companies": len(company_counts),
-        "total_skills_tracked": len(skill_counts),
-        "sources_count": len(source_counts),
-        "generated_at": datetime.now().isoformat(),
-    }
+    summary = stats['summary']
+    summary['demo_jobs'] = demo_count
+    summary['real_jobs'] = summary['total_jobs'] - demo_count
     
     # Save all stats
-    with open(PROCESSED_DIR / "skill_stats.json", 'w') as f:
-        json.dump(skill_stats, f, indent=2)
-    
-    with open(PROCESSED_DIR / "company_stats.json", 'w') as f:
-        json.dump(company_stats, f, indent=2)
-    
-    with open(PROCESSED_DIR / "location_stats.json", 'w') as f:
-        json.dump(location_stats, f, indent=2)
-    
-    with open(PROCESSED_DIR / "source_stats.json", 'w') as f:
-        json.dump(source_stats, f, indent=2)
-    
-    with open(PROCESSED_DIR / "summary.json", 'w') as f:
-        json.dump(summary, f, indent=2)
+    aggregates.write(PROCESSED_DIR, stats, job_store=store)
     
     print(f"Updated statistics files")
-    print(f"  - Real jobs: {real_count}")
-    print(f"  - Demo jobs: {demo_count}")
-    print(f"  - Companies: {len(company_counts)}")
+    print(f"  - Real jobs: {summary['real_jobs']}")
+    print(f"  - Demo jobs: {summary['demo_jobs']}")
+    print(f"  - Companies: {summary['total_companies']}")
 
 
 if __name__ == "__main__":
@@ -10,6 +10,7 @@ from pathlib import Path
 # Add pipeline to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from pipeline.database.stats_views import refresh_stats_views
 from pipeline.nlp.skill_extractor import SkillExtractor
 
 # Setup logging
@@ -36,6 +37,7 @@ def main():
     try:
         extractor = SkillExtractor()
         extractor.bulk_process_jobs(limit=args.limit)
+        refresh_stats_views()
         logger.info("Skill extraction completed successfully")
         return 0
     except Exception as e:
@@ -0,0 +1,58 @@
+"""
+Verify or rebuild the dashboard aggregates
+
+The scrapers update data/processed/aggregates.json with only the jobs each
+run adds. This recomputes the aggregates from every stored job and
+compares them with the incremental ones, or replaces them.
+
+Usage:
+    python3 scripts/rebuild_aggregates.py            # verify, exit 1 on differences
+    python3 scripts/rebuild_aggregates.py --rebuild  # recompute and rewrite the stats files
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add pipeline to path
+PROJECT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+from pipeline.storage.job_store import JobStore
+from pipeline.storage.aggregates import AggregateStore
+
+PROCESSED_DIR = PROJECT_DIR / "data" / "processed"
+JOB_STORE_DIR = PROCESSED_DIR / "jobs"
+AGGREGATES_PATH = PROCESSED_DIR / "aggregates.json"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verify or rebuild the incremental dashboard aggregates')
+    parser.add_argument('--rebuild', action='store_true', help='Replace the aggregates with a full rebuild')
+    args = parser.parse_args()
+
+    store = JobStore(JOB_STORE_DIR)
+
+    if args.rebuild:
+        started = time.perf_counter()
+        aggregates = AggregateStore.rebuild(store, AGGREGATES_PATH)
+        aggregates.save()
+        stats = aggregates.write(PROCESSED_DIR, job_store=store)
+        print(f"✅ Rebuilt aggregates of {len(aggregates)} jobs in {time.perf_counter() - started:.2f}s")
+        print(f"   {stats['summary']['total_companies']} companies, {stats['summary']['total_skills_tracked']} skills")
+        return
+
+    if not AGGREGATES_PATH.exists():
+        sys.exit(f"No aggregates at {AGGREGATES_PATH}; run with --rebuild")
+    aggregates = AggregateStore.load(AGGREGATES_PATH)
+    differences = aggregates.verify(store)
+    if differences:
+        print(f"❌ {len(differences)} differences between the incremental and rebuilt aggregates:")
+        for line in differences[:50]:
+            print(f"   {line}")
+        sys.exit(1)
+    print(f"✅ Incremental aggregates match a full rebuild ({len(aggregates)} jobs)")
+
+
+if __name__ == "__main__":
+    main()
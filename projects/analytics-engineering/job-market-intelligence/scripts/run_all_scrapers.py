@@ -8,27 +8,41 @@ This script combines all scrapers to maximize job data collection:
 3. BrighterMonday (Kenya-specific)
 4. LinkedIn (optional, requires Selenium)
 
+Every source runs concurrently in its own process with a timeout, so
+the run takes about as long as the slowest source.
+
 Usage:
     python3 scripts/run_all_scrapers.py
     python3 scripts/run_all_scrapers.py --with-linkedin  # Include LinkedIn
+    python3 scripts/run_all_scrapers.py --timeout 120    # Per-source timeout (seconds)
     
 Schedule with cron (every 6 hours):
     0 */6 * * * cd /path/to/job-market-intelligence && ./venv/bin/python3 scripts/run_all_scrapers.py >> logs/scraper.log 2>&1
 
 Author: Nicodemus Werre
 """
-import json
 import sys
 import argparse
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Callable
 
 # Setup paths
 PROJECT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+sys.path.insert(0, str(PROJECT_DIR / "scripts"))
+
+from pipeline.scrapers.orchestrator import run_sources, format_timing_table
+from pipeline.nlp.dedup import DedupIndex, DEDUP_WINDOW_DAYS
+from pipeline.storage.job_store import JobStore
+from pipeline.storage.aggregates import AggregateStore, write_stats
+from pipeline.storage.journal import DEFAULT_RETENTION_DAYS, compact_all
 SCRAPED_DIR = PROJECT_DIR / "data" / "scraped"
+JOURNAL_DIR = SCRAPED_DIR / "journal"
 PROCESSED_DIR = PROJECT_DIR / "data" / "processed"
+JOB_STORE_DIR = PROCESSED_DIR / "jobs"
+AGGREGATES_PATH = PROCESSED_DIR / "aggregates.json"
 LOGS_DIR = PROJECT_DIR / "logs"
 
 # Create directories
@@ -48,62 +62,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-
-def load_existing_jobs() -> Dict[str, Dict]:
-    """Load existing jobs to avoid duplicates"""
-    existing = {}
-    
-    jobs_file = PROCESSED_DIR / "jobs.json"
-    if jobs_file.exists():
-        try:
-            with open(jobs_file) as f:
-                jobs = json.load(f)
-                for job in jobs:
-                    existing[job.get('job_id', '')] = job
-        except:
-            pass
-    
-    return existing
-
-
-def run_main_scrapers() -> List[Dict]:
-    """Run main API scrapers"""
-    logger.info("=" * 60)
-    logger.info("RUNNING MAIN API SCRAPERS")
-    logger.info("=" * 60)
-    
-    try:
-        # Import the main scraper
-        sys.path.insert(0, str(PROJECT_DIR / "scripts"))
-        from scrape_all_sources import scrape_all_sources
-        
-        jobs = scrape_all_sources()
-        logger.info(f"Main scrapers returned {len(jobs)} jobs")
-        return jobs
-        
-    except Exception as e:
-        logger.error(f"Main scrapers failed: {e}")
-        return []
-
-
-def run_additional_scrapers() -> List[Dict]:
-    """Run additional API scrapers"""
-    logger.info("\n" + "=" * 60)
-    logger.info("RUNNING ADDITIONAL SCRAPERS")
-    logger.info("=" * 60)
-    
-    try:
-        sys.path.insert(0, str(PROJECT_DIR / "scripts"))
-        from scrape_additional_sources import scrape_additional_sources
-        
-        jobs = scrape_additional_sources()
-        logger.info(f"Additional scrapers returned {len(jobs)} jobs")
-        return jobs
-        
-    except Exception as e:
-        logger.error(f"Additional scrapers failed: {e}")
-        return []
-
+# Sources that need longer than the default timeout
+SOURCE_TIMEOUTS = {
+    'brightermonday': 900,
+    'linkedin': 1200,
+}
 
 def run_brightermonday_scraper() -> List[Dict]:
     """Run BrighterMonday scraper"""
@@ -159,138 +122,56 @@ def run_linkedin_scraper() -> List[Dict]:
         return []
 
 
-def merge_all_jobs(new_jobs: List[Dict], existing: Dict[str, Dict]) -> List[Dict]:
-    """Merge new jobs with existing, avoiding duplicates"""
-    merged = existing.copy()
+def build_source_tasks(quick: bool = False, with_linkedin: bool = False) -> Dict[str, Callable[[], List[Dict]]]:
+    """Collect every source to run, keyed by source name"""
+    tasks = {}
     
-    new_count = 0
-    for job in new_jobs:
-        job_id = job.get('job_id', '')
-        if job_id and job_id not in merged:
-            merged[job_id] = job
-            new_count += 1
-    
-    logger.info(f"Added {new_count} new jobs (total: {len(merged)})")
-    return list(merged.values())
-
-
-def calculate_stats(jobs: List[Dict]) -> Dict:
-    """Calculate statistics for dashboard"""
-    skill_counts = {}
-    company_counts = {}
-    location_counts = {}
-    source_counts = {}
-    
-    for job in jobs:
-        # Skills
-        for skill in job.get('skills', []):
-            if isinstance(skill, str) and len(skill) > 1:
-                skill_counts[skill] = skill_counts.get(skill, 0) + 1
-        
-        # Company
-        company = job.get('company_name', 'Unknown')
-        if company and company != 'Unknown':
-            company_counts[company] = company_counts.get(company, 0) + 1
-        
-        # Location
-        location = str(job.get('location', 'Unknown'))[:40]
-        location_counts[location] = location_counts.get(location, 0) + 1
-        
-        # Source
-        source = job.get('source', 'unknown')
-        source_counts[source] = source_counts.get(source, 0) + 1
+    # 1. Main scrapers (RemoteOK, Remotive, Arbeitnow, Jobicy)
+    try:
+        from scrape_all_sources import SOURCE_TASKS as MAIN_SOURCES
+        tasks.update(MAIN_SOURCES)
+    except Exception as e:
+        logger.error(f"Main scrapers unavailable: {e}")
     
-    # Format for dashboard
-    skill_stats = []
-    for name, count in sorted(skill_counts.items(), key=lambda x: -x[1])[:30]:
-        category = 'Other'
-        if name in ['Python', 'R', 'SQL', 'Java', 'JavaScript', 'Scala']:
-            category = 'Programming'
-        elif name in ['AWS', 'Azure', 'GCP', 'Snowflake']:
-            category = 'Cloud'
-        elif name in ['Machine Learning', 'TensorFlow', 'scikit-learn']:
-            category = 'ML/AI'
-        elif name in ['Power BI', 'Tableau', 'Looker', 'Dashboard', 'BI']:
-            category = 'BI Tool'
+    if not quick:
+        # 2. Additional scrapers (Himalayas, The Muse, Landing Jobs, DevITJobs)
+        try:
+            from scrape_additional_sources import SOURCE_TASKS as ADDITIONAL_SOURCES
+            tasks.update(ADDITIONAL_SOURCES)
+        except Exception as e:
+            logger.error(f"Additional scrapers unavailable: {e}")
         
-        skill_stats.append({
-            'name': name,
-            'category': category,
-            'job_count': count,
-            'percentage': round(count / len(jobs) * 100, 1) if jobs else 0
-        })
-    
-    company_stats = [{'company': k, 'job_count': v} 
-                     for k, v in sorted(company_counts.items(), key=lambda x: -x[1])[:25]]
-    
-    location_stats = [{'location': k, 'job_count': v}
-                      for k, v in sorted(location_counts.items(), key=lambda x: -x[1])[:15]]
-    
-    source_stats = [{'source': k, 'job_count': v} for k, v in source_counts.items()]
-    
-    # Salary averages
-    sal_min = [j.get('salary_min') for j in jobs if j.get('salary_min')]
-    sal_max = [j.get('salary_max') for j in jobs if j.get('salary_max')]
+        # 3. BrighterMonday (Kenya)
+        tasks['brightermonday'] = run_brightermonday_scraper
     
-    summary = {
-        'total_jobs': len(jobs),
-        'real_jobs': len(jobs),
-        'demo_jobs': 0,
-        'recent_jobs_7_days': len(jobs),
-        'avg_salary_min': int(sum(sal_min) / len(sal_min)) if sal_min else 0,
-        'avg_salary_max': int(sum(sal_max) / len(sal_max)) if sal_max else 0,
-        'total_companies': len(company_counts),
-        'total_skills_tracked': len(skill_counts),
-        'sources_count': len(source_counts),
-        'generated_at': datetime.now().isoformat(),
-    }
+    # 4. LinkedIn (optional)
+    if with_linkedin:
+        tasks['linkedin'] = run_linkedin_scraper
     
-    return {
-        'skill_stats': skill_stats,
-        'company_stats': company_stats,
-        'location_stats': location_stats,
-        'source_stats': source_stats,
-        'summary': summary
-    }
+    return tasks
 
 
-def save_all_data(jobs: List[Dict], stats: Dict):
-    """Save all data files for dashboard"""
-    # Jobs
-    with open(PROCESSED_DIR / "jobs.json", 'w') as f:
-        json.dump(jobs, f, indent=2, default=str)
-    
-    # Skills
-    with open(PROCESSED_DIR / "skill_stats.json", 'w') as f:
-        json.dump(stats['skill_stats'], f, indent=2)
-    
-    # Companies
-    with open(PROCESSED_DIR / "company_stats.json", 'w') as f:
-        json.dump(stats['company_stats'], f, indent=2)
-    
-    # Locations
-    with open(PROCESSED_DIR / "location_stats.json", 'w') as f:
-        json.dump(stats['location_stats'], f, indent=2)
-    
-    # Sources
-    with open(PROCESSED_DIR / "source_stats.json", 'w') as f:
-        json.dump(stats['source_stats'], f, indent=2)
-    
-    # Summary
-    with open(PROCESSED_DIR / "summary.json", 'w') as f:
-        json.dump(stats['summary'], f, indent=2)
-    
-    # Also save master lists
-    with open(PROCESSED_DIR / "companies.json", 'w') as f:
-        companies = [{'id': i+1, 'name': s['company']} 
-                     for i, s in enumerate(stats['company_stats'])]
-        json.dump(companies, f, indent=2)
+def merge_new_jobs(new_jobs: List[Dict], store: JobStore, index: DedupIndex) -> List[Dict]:
+    """The scraped jobs that are not stored yet, one per exact and near-duplicate posting"""
+    stored_ids, _ = store.known()
+    fresh = {}
+    for job in new_jobs:
+        job_id = job.get('job_id', '')
+        if job_id and job_id not in stored_ids:
+            fresh.setdefault(job_id, job)
     
-    with open(PROCESSED_DIR / "skills.json", 'w') as f:
-        skills = [{'id': i+1, 'name': s['name'], 'category': s['category']}
-                  for i, s in enumerate(stats['skill_stats'])]
-        json.dump(skills, f, indent=2)
+    # The index holds the recently stored jobs, so a new copy of a stored
+    # posting joins its cluster and unseen() drops it
+    unique = store.unseen(index.canonical(fresh.values()))
     
+    logger.info(f"Added {len(unique)} new jobs, dropped {len(fresh) - len(unique)} near-duplicates "
+                f"(total: {len(store) + len(unique)})")
+    return unique
+
+
+def save_all_data(stats: Dict, store: JobStore):
+    """Publish the stats, and the job store version they describe, for the dashboard"""
+    write_stats(PROCESSED_DIR, stats, job_store=store)
     logger.info(f"💾 Saved all data files to {PROCESSED_DIR}")
 
 
@@ -301,6 +182,8 @@ def main():
                         help='Include LinkedIn scraper (requires Selenium)')
     parser.add_argument('--quick', action='store_true',
                         help='Quick mode - only main scrapers')
+    parser.add_argument('--timeout', type=float, default=300,
+                        help='Seconds before a source is cancelled (default: 300)')
     args = parser.parse_args()
     
     start_time = datetime.now()
@@ -311,43 +194,43 @@ def main():
     print(f"Started at: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
     print()
     
-    # Load existing jobs
-    existing_jobs = load_existing_jobs()
-    logger.info(f"Loaded {len(existing_jobs)} existing jobs")
+    # Load the stored ids and the recent jobs' fingerprints
+    store = JobStore(JOB_STORE_DIR)
+    dedup_index = DedupIndex.from_store(store)
+    aggregates = AggregateStore.load(AGGREGATES_PATH, store)
+    logger.info(f"{len(store)} stored jobs, {len(dedup_index)} from the last {DEDUP_WINDOW_DAYS} days indexed")
     
-    # Collect all new jobs
-    all_new_jobs = []
-    
-    # 1. Main scrapers (RemoteOK, Remotive, Arbeitnow, Jobicy)
-    jobs = run_main_scrapers()
-    all_new_jobs.extend(jobs)
+    # Run all sources concurrently; a source that hangs is cancelled at its
+    # timeout, keeping what it journaled, and the others are still merged
+    tasks = build_source_tasks(quick=args.quick, with_linkedin=args.with_linkedin)
+    logger.info(f"Running {len(tasks)} sources concurrently: {', '.join(tasks)}")
+    results = run_sources(tasks, timeout=args.timeout, timeouts=SOURCE_TIMEOUTS, journal_dir=JOURNAL_DIR)
+    logger.info("\nSource timings:\n" + format_timing_table(results))
     
-    if not args.quick:
-        # 2. Additional scrapers (Himalayas, The Muse)
-        jobs = run_additional_scrapers()
-        all_new_jobs.extend(jobs)
-        
-        # 3. BrighterMonday (Kenya)
-        jobs = run_brightermonday_scraper()
-        all_new_jobs.extend(jobs)
+    # The API sources journaled their jobs while running; fold the segments
+    compact_all(JOURNAL_DIR, DEFAULT_RETENTION_DAYS)
     
-    # 4. LinkedIn (optional)
-    if args.with_linkedin:
-        jobs = run_linkedin_scraper()
-        all_new_jobs.extend(jobs)
+    # Collect all new jobs
+    all_new_jobs = [job for result in results.values() for job in result.jobs]
     
     # Merge with existing
     logger.info("\n" + "=" * 60)
     logger.info("MERGING AND SAVING DATA")
     logger.info("=" * 60)
     
-    all_jobs = merge_all_jobs(all_new_jobs, existing_jobs)
+    new_jobs = merge_new_jobs(all_new_jobs, store, dedup_index)
+    
+    # Store the new jobs
+    store.append(new_jobs)
+    store.compact()
     
-    # Calculate stats
-    stats = calculate_stats(all_jobs)
+    # Stats over the whole history: only the new jobs are counted in
+    aggregates.add_many(new_jobs)
+    aggregates.save()
+    stats = aggregates.stats()
     
     # Save everything
-    save_all_data(all_jobs, stats)
+    save_all_data(stats, store)
     
     # Summary
     end_time = datetime.now()
@@ -371,7 +254,7 @@ def main():
     print(f"📝 Log saved to: {log_file}")
     print("\n" + "=" * 70)
     
-    return all_jobs
+    return new_jobs
 
 
 if __name__ == "__main__":
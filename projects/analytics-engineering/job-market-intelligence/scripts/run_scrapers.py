@@ -10,7 +10,8 @@ from pathlib import Path
 # Add pipeline to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from pipeline.config import JOB_BOARDS
+from pipeline.config import JOB_BOARDS, SCRAPING_CONFIG
+from pipeline.database.stats_views import refresh_stats_views
 from pipeline.scrapers.indeed_scraper import IndeedScraper
 from pipeline.scrapers.fuzu_scraper import FuzuScraper
 
@@ -90,14 +91,28 @@ def main():
         default='all',
         help='Source to scrape (default: all)'
     )
+    parser.add_argument(
+        '--full-crawl',
+        action='store_true',
+        help='Fetch every results page instead of stopping at known jobs, so missing jobs can expire'
+    )
     
     args = parser.parse_args()
     
+    if args.full_crawl:
+        SCRAPING_CONFIG['incremental_crawl'] = False
+    
     if args.source == 'all':
         success = run_all_scrapers()
     else:
         success = run_scraper(args.source)
     
+    # Recompute the stats views over the new jobs
+    try:
+        refresh_stats_views()
+    except Exception as e:
+        logger.error(f"Error refreshing stats views: {e}")
+    
     sys.exit(0 if success else 1)
 
 
@@ -14,15 +14,18 @@ More free job APIs to maximize data collection:
 Usage:
     python3 scripts/scrape_additional_sources.py
 """
-import json
-import re
-import time
-import hashlib
+import sys
 import logging
-from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Optional
-import requests
+
+# Add pipeline to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline.scrapers.api_client import get_client
+from pipeline.scrapers.api_sources import ApiSource, register_source, source_tasks
+from pipeline.scrapers.orchestrator import run_sources, format_timing_table
+from pipeline.storage.journal import DEFAULT_RETENTION_DAYS, Journal
 
 # Configure logging
 logging.basicConfig(
@@ -34,218 +37,107 @@ logger = logging.getLogger(__name__)
 # Output directory
 OUTPUT_DIR = Path(__file__).parent.parent / "data" / "scraped"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+JOURNAL_DIR = OUTPUT_DIR / "journal"
 
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36',
-    'Accept': 'application/json',
-}
-
-TARGET_SKILLS = [
-    'Python', 'R', 'SQL', 'Excel', 'Power BI', 'Tableau',
-    'PostgreSQL', 'MySQL', 'MongoDB', 'AWS', 'Azure', 'GCP',
-    'Machine Learning', 'Statistics', 'Spark', 'Airflow',
-    'Docker', 'Git', 'Looker', 'dbt', 'Snowflake', 'TensorFlow',
-    'scikit-learn', 'Pandas', 'NumPy', 'Data Analysis', 'Analytics'
-]
-
-
-def extract_skills(text: str) -> List[str]:
-    if not text:
-        return []
-    text_lower = text.lower()
-    return [skill for skill in TARGET_SKILLS if skill.lower() in text_lower]
-
-
-def detect_experience_level(title: str, description: str = "") -> str:
-    text = f"{title} {description}".lower()
-    if any(w in text for w in ['senior', 'sr.', 'lead', 'principal']):
-        return 'Senior'
-    elif any(w in text for w in ['junior', 'jr.', 'entry', 'graduate', 'intern']):
-        return 'Entry'
-    elif any(w in text for w in ['manager', 'director', 'vp']):
-        return 'Manager'
-    return 'Mid'
-
-
-def generate_job_id(source: str, identifier: str) -> str:
-    return hashlib.md5(f"{source}:{identifier}".encode()).hexdigest()[:16]
-
-
-class HimalayasScraper:
+@register_source
+class HimalayasScraper(ApiSource):
     """Scrape from Himalayas.app - Remote jobs API (free)"""
     
-    def __init__(self):
-        self.api_url = "https://himalayas.app/jobs/api"
-        self.name = "himalayas"
+    name = "himalayas"
+    label = "Himalayas.app API"
+    icon = "🏔️"
+    api_url = "https://himalayas.app/jobs/api"
+    params = {'limit': 100}
+    results_key = 'jobs'
+    stream_json = True
+    keywords = ['data', 'analyst', 'analytics', 'scientist', 'ml', 'machine learning', 'bi']
     
-    def scrape(self) -> List[Dict]:
-        """Fetch remote data jobs"""
-        logger.info("🏔️ Fetching from Himalayas.app API...")
-        
-        try:
-            params = {'limit': 100}
-            response = requests.get(self.api_url, params=params, headers=HEADERS, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            jobs_data = data.get('jobs', [])
-            
-            logger.info(f"   Raw jobs: {len(jobs_data)}")
-            
-            # Filter for data jobs
-            keywords = ['data', 'analyst', 'analytics', 'scientist', 'ml', 'machine learning', 'bi']
-            filtered = []
-            
-            for job in jobs_data:
-                title = job.get('title', '').lower()
-                categories = ' '.join(job.get('categories', [])).lower()
-                if any(kw in f"{title} {categories}" for kw in keywords):
-                    filtered.append(self._parse_job(job))
-            
-            logger.info(f"   ✅ Found {len(filtered)} data/analytics jobs")
-            return filtered
-            
-        except Exception as e:
-            logger.error(f"   ❌ Himalayas error: {e}")
-            return []
+    def filter_fields(self, job: Dict):
+        yield job.get('title', '')
+        yield ' '.join(job.get('categories', []))
     
-    def _parse_job(self, job: dict) -> Dict:
-        url = job.get('applicationLink') or job.get('url', '')
-        description = job.get('description', '')
-        
+    def identifier(self, job: Dict, fields: Dict) -> str:
+        return str(job.get('id', ''))
+    
+    def map_fields(self, job: Dict) -> Dict:
         return {
-            'job_id': generate_job_id(self.name, str(job.get('id', ''))),
-            'source': self.name,
-            'source_url': url,
+            'source_url': job.get('applicationLink') or job.get('url', ''),
             'title': job.get('title', 'Unknown'),
             'company_name': job.get('companyName', 'Unknown'),
             'company_logo': job.get('companyLogo', ''),
             'location': job.get('location') or 'Remote',
             'country': 'Remote',
             'remote_type': 'Remote',
-            'description': description[:2000] if description else '',
+            'description': job.get('description', ''),
             'salary_min': job.get('minSalary'),
             'salary_max': job.get('maxSalary'),
             'salary_currency': 'USD',
             'employment_type': job.get('type', 'Full-time'),
-            'experience_level': detect_experience_level(job.get('title', ''), description),
-            'skills': extract_skills(f"{job.get('title', '')} {description}"),
-            'posted_date': job.get('pubDate', datetime.now().isoformat()),
-            'scraped_at': datetime.now().isoformat(),
-            'is_active': True,
+            'posted_date': job.get('pubDate'),
         }
 
 
-class TheMoseScraper:
+@register_source
+class TheMoseScraper(ApiSource):
     """Scrape from The Muse API (free)"""
     
-    def __init__(self):
-        self.api_url = "https://www.themuse.com/api/public/jobs"
-        self.name = "themuse"
+    name = "themuse"
+    label = "The Muse API"
+    icon = "🎭"
+    api_url = "https://www.themuse.com/api/public/jobs"
+    params = {'category': 'Data Science', 'page': 1, 'ascending': 'false'}
+    results_key = 'results'
     
-    def scrape(self, page: int = 1) -> List[Dict]:
-        """Fetch data jobs from The Muse"""
-        logger.info("🎭 Fetching from The Muse API...")
-        
-        try:
-            params = {
-                'category': 'Data Science',
-                'page': page,
-                'ascending': 'false'
-            }
-            response = requests.get(self.api_url, params=params, headers=HEADERS, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            jobs_data = data.get('results', [])
-            
-            logger.info(f"   Raw jobs: {len(jobs_data)}")
-            
-            jobs = [self._parse_job(job) for job in jobs_data]
-            logger.info(f"   ✅ Found {len(jobs)} jobs")
-            return jobs
-            
-        except Exception as e:
-            logger.error(f"   ❌ The Muse error: {e}")
-            return []
+    def identifier(self, job: Dict, fields: Dict) -> str:
+        return str(job.get('id', ''))
     
-    def _parse_job(self, job: dict) -> Dict:
+    def map_fields(self, job: Dict) -> Dict:
         company = job.get('company', {})
         locations = job.get('locations', [])
         location = locations[0].get('name', 'Unknown') if locations else 'Remote'
         
         return {
-            'job_id': generate_job_id(self.name, str(job.get('id', ''))),
-            'source': self.name,
             'source_url': job.get('refs', {}).get('landing_page', ''),
             'title': job.get('name', 'Unknown'),
             'company_name': company.get('name', 'Unknown'),
             'location': location,
             'country': 'International',
             'remote_type': 'Remote' if 'remote' in location.lower() else 'On-site',
-            'description': job.get('contents', '')[:2000],
+            'description': job.get('contents', ''),
             'employment_type': 'Full-time',
-            'experience_level': detect_experience_level(job.get('name', ''), job.get('contents', '')),
-            'skills': extract_skills(f"{job.get('name', '')} {job.get('contents', '')}"),
-            'posted_date': job.get('publication_date', datetime.now().isoformat()),
-            'scraped_at': datetime.now().isoformat(),
-            'is_active': True,
+            'posted_date': job.get('publication_date'),
         }
 
 
-class LandingJobsScraper:
+@register_source
+class LandingJobsScraper(ApiSource):
     """Scrape from Landing.jobs API (free, EU focused)"""
     
-    def __init__(self):
-        self.api_url = "https://landing.jobs/api/v1/jobs"
-        self.name = "landingjobs"
+    name = "landingjobs"
+    label = "Landing.jobs API"
+    icon = "🛬"
+    api_url = "https://landing.jobs/api/v1/jobs"
+    params = {'category': 'data', 'limit': 50}
+    results_key = 'jobs'
+    skip_statuses = {404: 'API endpoint changed'}
     
-    def scrape(self) -> List[Dict]:
-        """Fetch data jobs from Landing.jobs"""
-        logger.info("🛬 Fetching from Landing.jobs API...")
-        
-        try:
-            params = {
-                'category': 'data',
-                'limit': 50
-            }
-            response = requests.get(self.api_url, params=params, headers=HEADERS, timeout=30)
-            
-            if response.status_code == 404:
-                logger.warning("   Landing.jobs API endpoint changed - skipping")
-                return []
-            
-            response.raise_for_status()
-            
-            data = response.json()
-            jobs_data = data if isinstance(data, list) else data.get('jobs', [])
-            
-            logger.info(f"   ✅ Found {len(jobs_data)} jobs")
-            return [self._parse_job(job) for job in jobs_data]
-            
-        except Exception as e:
-            logger.error(f"   ❌ Landing.jobs error: {e}")
-            return []
+    def identifier(self, job: Dict, fields: Dict) -> str:
+        return str(job.get('id', job.get('slug', '')))
     
-    def _parse_job(self, job: dict) -> Dict:
+    def map_fields(self, job: Dict) -> Dict:
         return {
-            'job_id': generate_job_id(self.name, str(job.get('id', job.get('slug', '')))),
-            'source': self.name,
             'source_url': job.get('url', ''),
             'title': job.get('title', 'Unknown'),
             'company_name': job.get('company_name', 'Unknown'),
             'location': job.get('location', 'Europe'),
             'country': job.get('country', 'EU'),
-            'description': job.get('description', '')[:2000],
+            'description': job.get('description', ''),
             'salary_min': job.get('salary_from'),
             'salary_max': job.get('salary_to'),
             'salary_currency': job.get('salary_currency', 'EUR'),
             'employment_type': job.get('type', 'Full-time'),
-            'experience_level': detect_experience_level(job.get('title', '')),
-            'skills': job.get('tags', []) if job.get('tags') else extract_skills(job.get('title', '')),
-            'posted_date': job.get('created_at', datetime.now().isoformat()),
-            'scraped_at': datetime.now().isoformat(),
-            'is_active': True,
+            'skills': job.get('tags', []),
+            'posted_date': job.get('created_at'),
         }
 
 
@@ -262,10 +154,9 @@ class WellFoundScraper:
         
         try:
             # Wellfound doesn't have a public API, so we try the jobs page
-            response = requests.get(
+            response = get_client().get(
                 "https://wellfound.com/role/data-analyst",
-                headers={**HEADERS, 'Accept': 'text/html'},
-                timeout=30
+                headers={'Accept': 'text/html'},
             )
             
             if response.status_code == 200:
@@ -291,67 +182,35 @@ class ReedsJobsScraper:
         return []
 
 
-class DevITJobsScraper:
+@register_source
+class DevITJobsScraper(ApiSource):
     """Scrape from DevITJobs (free API)"""
     
-    def __init__(self):
-        self.api_url = "https://devitjobs.com/api/jobs"
-        self.name = "devitjobs"
+    name = "devitjobs"
+    label = "DevITJobs API"
+    icon = "💻"
+    api_url = "https://devitjobs.com/api/jobs"
+    results_key = 'jobs'
+    keywords = ['data', 'analyst', 'analytics', 'scientist', 'bi']
     
-    def scrape(self) -> List[Dict]:
-        """Fetch data/IT jobs"""
-        logger.info("💻 Fetching from DevITJobs API...")
-        
-        try:
-            response = requests.get(self.api_url, headers=HEADERS, timeout=30)
-            
-            if response.status_code != 200:
-                logger.warning(f"   DevITJobs returned {response.status_code}")
-                return []
-            
-            jobs_data = response.json()
-            
-            if not isinstance(jobs_data, list):
-                jobs_data = jobs_data.get('jobs', [])
-            
-            logger.info(f"   Raw jobs: {len(jobs_data)}")
-            
-            # Filter for data jobs
-            keywords = ['data', 'analyst', 'analytics', 'scientist', 'bi']
-            filtered = []
-            
-            for job in jobs_data:
-                title = job.get('title', '').lower()
-                if any(kw in title for kw in keywords):
-                    filtered.append(self._parse_job(job))
-            
-            logger.info(f"   ✅ Found {len(filtered)} data jobs")
-            return filtered
-            
-        except Exception as e:
-            logger.error(f"   ❌ DevITJobs error: {e}")
-            return []
+    def identifier(self, job: Dict, fields: Dict) -> str:
+        return str(job.get('id', job.get('slug', '')))
     
-    def _parse_job(self, job: dict) -> Dict:
+    def map_fields(self, job: Dict) -> Dict:
         return {
-            'job_id': generate_job_id(self.name, str(job.get('id', job.get('slug', '')))),
-            'source': self.name,
             'source_url': job.get('url', ''),
             'title': job.get('title', 'Unknown'),
             'company_name': job.get('company', 'Unknown'),
             'location': job.get('location', 'Unknown'),
             'country': job.get('country', 'International'),
             'remote_type': 'Remote' if job.get('remote') else 'On-site',
-            'description': job.get('description', '')[:2000],
+            'description': job.get('description', ''),
             'salary_min': job.get('salaryMin'),
             'salary_max': job.get('salaryMax'),
             'salary_currency': job.get('currency', 'USD'),
             'employment_type': job.get('type', 'Full-time'),
-            'experience_level': detect_experience_level(job.get('title', '')),
-            'skills': job.get('skills', []) or extract_skills(job.get('title', '')),
-            'posted_date': job.get('createdAt', datetime.now().isoformat()),
-            'scraped_at': datetime.now().isoformat(),
-            'is_active': True,
+            'skills': job.get('skills', []),
+            'posted_date': job.get('createdAt'),
         }
 
 
@@ -367,32 +226,21 @@ class WorkablePublicScraper:
         return []
 
 
-def scrape_additional_sources() -> List[Dict]:
-    """Run all additional scrapers"""
-    all_jobs = []
-    
-    # 1. Himalayas
-    himalayas = HimalayasScraper()
-    jobs = himalayas.scrape()
-    all_jobs.extend(jobs)
-    time.sleep(1)
-    
-    # 2. The Muse
-    muse = TheMoseScraper()
-    jobs = muse.scrape()
-    all_jobs.extend(jobs)
-    time.sleep(1)
-    
-    # 3. Landing Jobs
-    landing = LandingJobsScraper()
-    jobs = landing.scrape()
-    all_jobs.extend(jobs)
-    time.sleep(1)
+# Registered sources share no hosts, so they run concurrently; each
+# journals its jobs as they are fetched
+SOURCE_TASKS = source_tasks(__name__, str(JOURNAL_DIR))
+
+
+def scrape_additional_sources(timeout: float = 300) -> List[Dict]:
+    """
+    Run all additional scrapers concurrently
     
-    # 4. DevITJobs
-    devit = DevITJobsScraper()
-    jobs = devit.scrape()
-    all_jobs.extend(jobs)
+    Args:
+        timeout: Seconds before a source is cancelled; the others still count
+    """
+    results = run_sources(SOURCE_TASKS, timeout, journal_dir=JOURNAL_DIR)
+    logger.info("\n" + format_timing_table(results))
+    all_jobs = [job for result in results.values() for job in result.jobs]
     
     # Remove duplicates
     unique = {}
@@ -403,26 +251,11 @@ def scrape_additional_sources() -> List[Dict]:
     return list(unique.values())
 
 
-def save_results(jobs: List[Dict]) -> Path:
-    """Save to JSON"""
-    if not jobs:
-        return None
-    
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f"additional_sources_{timestamp}.json"
-    filepath = OUTPUT_DIR / filename
-    
-    with open(filepath, 'w') as f:
-        json.dump(jobs, f, indent=2, default=str)
-    
-    logger.info(f"💾 Saved {len(jobs)} jobs to {filepath}")
-    
-    # Also save as latest
-    latest = OUTPUT_DIR / "additional_sources_latest.json"
-    with open(latest, 'w') as f:
-        json.dump(jobs, f, indent=2, default=str)
-    
-    return filepath
+def save_results(jobs: List[Dict], retention_days: int = DEFAULT_RETENTION_DAYS) -> Path:
+    """Fold this run's journal segments into each source's latest state"""
+    kept = {name: Journal(JOURNAL_DIR, name).compact(retention_days) for name in SOURCE_TASKS}
+    logger.info(f"💾 Journaled {len(jobs)} jobs; latest state holds {sum(kept.values())} jobs in {JOURNAL_DIR}")
+    return JOURNAL_DIR
 
 
 def main():
@@ -6,18 +6,27 @@ Scrapes real job postings from BrighterMonday.co.ke and saves to JSON files.
 Usage:
     python3 scripts/scrape_brightermonday.py
 """
+import sys
 import json
 import re
 import time
 import hashlib
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator
 from urllib.parse import urljoin, quote_plus
 import requests
 from bs4 import BeautifulSoup
 
+# Add pipeline to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline.scrapers.http_cache import HttpCache
+from pipeline.scrapers.rate_control import RateController, is_retryable
+from pipeline.scrapers.incremental import KnownJobs, IncrementalCrawl
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -29,12 +38,20 @@ logger = logging.getLogger(__name__)
 OUTPUT_DIR = Path(__file__).parent.parent / "data" / "scraped"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+# Page cache shared with the pipeline scrapers
+HTTP_CACHE_PATH = Path(__file__).parent.parent / "data" / "cache" / "http_cache.sqlite"
+
+# Jobs already published to the dashboard, used for incremental crawls
+JOB_STORE_DIR = Path(__file__).parent.parent / "data" / "processed" / "jobs"
+
 # Configuration
 CONFIG = {
-    'rate_limit_delay': 2,
+    'rate_limit_delay': 2,  # starting delay between requests; adapts to the site's responses
     'timeout': 30,
     'retry_times': 3,
     'max_pages': 5,
+    'stale_pages': 1,  # stop a keyword after this many pages without new jobs
+    'detail_workers': 2,  # detail pages fetched concurrently
     'user_agent': (
         'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 '
         '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
@@ -64,6 +81,12 @@ TARGET_SKILLS = [
     'SurveyCTO', 'ODK', 'Shiny', 'ggplot2', 'tidyverse'
 ]
 
+# Fields filled in from a job's detail page
+DETAIL_FIELDS = [
+    'description', 'skills', 'salary_min', 'salary_max', 'salary_currency',
+    'experience_level', 'detail_fingerprint',
+]
+
 
 class BrighterMondayScraper:
     """Scraper for BrighterMonday.co.ke"""
@@ -78,29 +101,47 @@ class BrighterMondayScraper:
             'Accept-Encoding': 'gzip, deflate, br',
             'Connection': 'keep-alive',
         })
+        self.cache = HttpCache(HTTP_CACHE_PATH)
+        self.rate_control = RateController(delay=CONFIG['rate_limit_delay'])
         self.jobs_scraped = []
         self.seen_urls = set()
+        self.incremental = None
     
     def generate_job_id(self, url: str) -> str:
         """Generate unique job ID"""
         return hashlib.md5(f"brightermonday:{url}".encode()).hexdigest()[:16]
     
-    def rate_limit(self):
-        """Rate limiting"""
-        time.sleep(CONFIG['rate_limit_delay'])
-    
     def fetch_page(self, url: str) -> Optional[BeautifulSoup]:
-        """Fetch page with retries"""
+        """Fetch a page with adaptive pacing and retries, revalidating against the page cache"""
+        control = self.rate_control.for_url(url)
         for attempt in range(CONFIG['retry_times']):
+            if not control.allow():
+                logger.warning(f"Circuit open for {control.host} - skipping {url}")
+                return None
+            time.sleep(control.reserve())
+            if control.is_open:
+                logger.warning(f"Circuit open for {control.host} - skipping {url}")
+                return None
+            started = time.monotonic()
             try:
                 logger.debug(f"Fetching: {url}")
-                response = self.session.get(url, timeout=CONFIG['timeout'])
-                response.raise_for_status()
+                response = self.cache.get(self.session, url, timeout=CONFIG['timeout'])
+                control.record(response.status_code, time.monotonic() - started)
                 return BeautifulSoup(response.content, 'html.parser')
+            except requests.exceptions.HTTPError as e:
+                status_code = e.response.status_code
+                control.record(status_code, time.monotonic() - started, e.response.headers.get('Retry-After'))
+                if not is_retryable(status_code):
+                    logger.warning(f"HTTP {status_code} for {url} - not retrying")
+                    return None
+                logger.warning(f"Attempt {attempt + 1} failed for {url}: {e}")
             except requests.exceptions.RequestException as e:
-                logger.warning(f"Attempt {attempt + 1} failed: {e}")
-                if attempt < CONFIG['retry_times'] - 1:
-                    time.sleep(2 ** attempt)
+                control.record(None)
+                logger.warning(f"Attempt {attempt + 1} failed for {url}: {e}")
+            finally:
+                # Anything else leaves a probe without an outcome
+                control.release_probe()
+        logger.error(f"All attempts failed for {url}")
         return None
     
     def parse_posted_date(self, date_text: str) -> str:
@@ -235,9 +276,12 @@ class BrighterMondayScraper:
                 logger.info(f"   No jobs found on page {page}")
                 break
             
+            page_jobs = []
             for card in job_cards:
                 try:
                     job_data = self.parse_job_card(card)
+                    if job_data:
+                        page_jobs.append(job_data)
                     if job_data and job_data['source_url'] not in self.seen_urls:
                         self.seen_urls.add(job_data['source_url'])
                         jobs.append(job_data)
@@ -245,7 +289,10 @@ class BrighterMondayScraper:
                 except Exception as e:
                     logger.warning(f"   Error parsing card: {e}")
             
-            self.rate_limit()
+            # Results are newest first: stop once pages only hold known jobs
+            if self.incremental and not self.incremental.record_page(keyword, page_jobs):
+                break
+            
             
             # Check for next page
             next_btn = soup.find('a', {'rel': 'next'}) or soup.find('a', text=re.compile(r'next|→', re.I))
@@ -389,13 +436,74 @@ class BrighterMondayScraper:
         
         return job
     
-    def run(self, keywords: List[str] = None, fetch_details: bool = False) -> List[Dict]:
-        """Run the scraper"""
+    def detail_fingerprint(self, job: Dict) -> str:
+        """Hash of the card fields; a changed card means the detail page may have changed"""
+        card = '|'.join(str(job.get(key) or '') for key in ('title', 'company_name', 'location', 'description'))
+        return hashlib.md5(card.encode()).hexdigest()
+    
+    def load_stored_details(self) -> Dict[str, Dict]:
+        """Jobs enriched by the last saved run, keyed by job_id"""
+        try:
+            with open(OUTPUT_DIR / "brightermonday_latest.json") as f:
+                jobs = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {job['job_id']: job for job in jobs if job.get('detail_fingerprint')}
+    
+    def enrich_job(self, job: Dict, fingerprint: str) -> Dict:
+        """Fetch one job's details (runs on a pool worker)"""
+        card_description = job.get('description')
+        job = self.scrape_job_details(job)
+        if job.get('description') != card_description:
+            job['detail_fingerprint'] = fingerprint
+        return job
+    
+    def enrich_jobs(self, jobs: List[Dict]) -> Iterator[Dict]:
+        """
+        Add detail-page fields to jobs, yielding each job when ready
+        
+        Jobs already enriched by the last saved run whose card is unchanged
+        reuse the stored details. The rest are fetched by a pool of
+        CONFIG['detail_workers'] threads sharing the site's adaptive pacing.
+        """
+        stored = self.load_stored_details()
+        pending = []
+        for job in jobs:
+            fingerprint = self.detail_fingerprint(job)
+            previous = stored.get(job['job_id'])
+            if previous and previous['detail_fingerprint'] == fingerprint:
+                job.update({key: previous[key] for key in DETAIL_FIELDS if key in previous})
+                yield job
+            else:
+                pending.append((job, fingerprint))
+        
+        logger.info(f"   {len(pending)} detail pages to fetch, {len(jobs) - len(pending)} unchanged")
+        
+        with ThreadPoolExecutor(max_workers=CONFIG['detail_workers']) as pool:
+            futures = [pool.submit(self.enrich_job, job, fingerprint) for job, fingerprint in pending]
+            for future in as_completed(futures):
+                yield future.result()
+    
+    def run(self, keywords: List[str] = None, fetch_details: bool = False,
+            incremental: bool = True) -> List[Dict]:
+        """
+        Run the scraper
+        
+        Args:
+            keywords: Search keywords (defaults to SEARCH_KEYWORDS)
+            fetch_details: Also fetch every job's detail page
+            incremental: Stop paginating a keyword once its pages only
+                contain jobs already in the job store (data/processed/jobs)
+        """
         keywords = keywords or SEARCH_KEYWORDS
         
         logger.info(f"🚀 Starting BrighterMonday scraper...")
         logger.info(f"   Keywords: {', '.join(keywords)}")
         
+        if incremental:
+            known = KnownJobs.from_job_store(JOB_STORE_DIR, source='brightermonday')
+            self.incremental = IncrementalCrawl(known, CONFIG['stale_pages'])
+        
         all_jobs = []
         
         for keyword in keywords:
@@ -403,7 +511,6 @@ class BrighterMondayScraper:
             jobs = self.scrape_job_listings(keyword)
             all_jobs.extend(jobs)
             logger.info(f"   Found {len(jobs)} jobs")
-            self.rate_limit()
         
         # Remove duplicates
         unique_jobs = {}
@@ -416,12 +523,16 @@ class BrighterMondayScraper:
         # Optionally fetch full details
         if fetch_details and self.jobs_scraped:
             logger.info(f"\n📋 Fetching detailed info for {len(self.jobs_scraped)} jobs...")
-            for i, job in enumerate(self.jobs_scraped):
+            enriched = []
+            for i, job in enumerate(self.enrich_jobs(self.jobs_scraped)):
                 logger.info(f"   [{i+1}/{len(self.jobs_scraped)}] {job['title'][:40]}...")
-                self.jobs_scraped[i] = self.scrape_job_details(job)
-                self.rate_limit()
+                enriched.append(job)
+            self.jobs_scraped = enriched
         
         logger.info(f"\n✅ Scraping complete! Total unique jobs: {len(self.jobs_scraped)}")
+        logger.info(f"   HTTP cache: {self.cache.stats()}")
+        if self.incremental:
+            logger.info(f"   Incremental crawl: {self.incremental.stats()}")
         
         return self.jobs_scraped
     
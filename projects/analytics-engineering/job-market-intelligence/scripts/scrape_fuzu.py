@@ -7,6 +7,7 @@ This version works independently without PostgreSQL.
 Usage:
     python3 scripts/scrape_fuzu.py
 """
+import sys
 import json
 import re
 import time
@@ -19,6 +20,12 @@ from urllib.parse import urljoin, urlencode, quote_plus
 import requests
 from bs4 import BeautifulSoup
 
+# Add pipeline to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pipeline.scrapers.http_cache import HttpCache
+from pipeline.scrapers.rate_control import RateController, is_retryable
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -30,9 +37,12 @@ logger = logging.getLogger(__name__)
 OUTPUT_DIR = Path(__file__).parent.parent / "data" / "scraped"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+# Page cache shared with the pipeline scrapers
+HTTP_CACHE_PATH = Path(__file__).parent.parent / "data" / "cache" / "http_cache.sqlite"
+
 # Configuration
 CONFIG = {
-    'rate_limit_delay': 2,  # seconds between requests
+    'rate_limit_delay': 2,  # starting delay between requests; adapts to the site's responses
     'timeout': 30,
     'retry_times': 3,
     'max_pages': 3,  # pages per keyword
@@ -79,6 +89,8 @@ class FuzuScraper:
             'Accept-Encoding': 'gzip, deflate, br',
             'Connection': 'keep-alive',
         })
+        self.cache = HttpCache(HTTP_CACHE_PATH)
+        self.rate_control = RateController(delay=CONFIG['rate_limit_delay'])
         self.jobs_scraped = []
         self.seen_urls = set()
     
@@ -86,25 +98,37 @@ class FuzuScraper:
         """Generate unique job ID from URL"""
         return hashlib.md5(f"fuzu:{url}".encode()).hexdigest()[:16]
     
-    def rate_limit(self):
-        """Apply rate limiting between requests"""
-        time.sleep(CONFIG['rate_limit_delay'])
-    
     def fetch_page(self, url: str) -> Optional[BeautifulSoup]:
-        """Fetch a page with retry logic"""
+        """Fetch a page with adaptive pacing and retries, revalidating against the page cache"""
+        control = self.rate_control.for_url(url)
         for attempt in range(CONFIG['retry_times']):
+            if not control.allow():
+                logger.warning(f"Circuit open for {control.host} - skipping {url}")
+                return None
+            time.sleep(control.reserve())
+            if control.is_open:
+                logger.warning(f"Circuit open for {control.host} - skipping {url}")
+                return None
+            started = time.monotonic()
             try:
                 logger.debug(f"Fetching: {url}")
-                response = self.session.get(url, timeout=CONFIG['timeout'])
-                response.raise_for_status()
+                response = self.cache.get(self.session, url, timeout=CONFIG['timeout'])
+                control.record(response.status_code, time.monotonic() - started)
                 return BeautifulSoup(response.content, 'html.parser')
+            except requests.exceptions.HTTPError as e:
+                status_code = e.response.status_code
+                control.record(status_code, time.monotonic() - started, e.response.headers.get('Retry-After'))
+                if not is_retryable(status_code):
+                    logger.warning(f"HTTP {status_code} for {url} - not retrying")
+                    return None
+                logger.warning(f"Attempt {attempt + 1} failed for {url}: {e}")
             except requests.exceptions.RequestException as e:
+                control.record(None)
                 logger.warning(f"Attempt {attempt + 1} failed for {url}: {e}")
-                if attempt < CONFIG['retry_times'] - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
-                else:
-                    logger.error(f"All attempts failed for {url}")
-                    return None
+            finally:
+                # Anything else leaves a probe without an outcome
+                control.release_probe()
+        logger.error(f"All attempts failed for {url}")
         return None
     
     def parse_posted_date(self, date_text: str) -> str:
@@ -260,7 +284,6 @@ class FuzuScraper:
                         job_data = self.scrape_job_page(job_url)
                         if job_data:
                             jobs.append(job_data)
-                            self.rate_limit()
             else:
                 for card in job_cards:
                     try:
@@ -272,7 +295,6 @@ class FuzuScraper:
                         logger.warning(f"   Error parsing card: {e}")
                         continue
             
-            self.rate_limit()
             
             # Check for next page
             next_btn = soup.find('a', {'rel': 'next'}) or soup.find('a', text=re.compile(r'next|→|»', re.I))
@@ -429,7 +451,6 @@ class FuzuScraper:
             jobs = self.scrape_job_list(keyword)
             all_jobs.extend(jobs)
             logger.info(f"   Found {len(jobs)} jobs for '{keyword}'")
-            self.rate_limit()
         
         # Deduplicate by job_id
         unique_jobs = {}
@@ -441,6 +462,7 @@ class FuzuScraper:
         
         logger.info(f"\n✅ Scraping complete!")
         logger.info(f"   Total unique jobs: {len(self.jobs_scraped)}")
+        logger.info(f"   HTTP cache: {self.cache.stats()}")
         
         return self.jobs_scraped
     
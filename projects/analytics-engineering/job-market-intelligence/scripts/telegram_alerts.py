@@ -21,6 +21,7 @@ Environment Variables:
 Or create a .env file with these values.
 """
 import os
+import sys
 import json
 import requests
 import logging
@@ -40,6 +41,13 @@ PROJECT_DIR = Path(__file__).parent.parent
 PROCESSED_DIR = PROJECT_DIR / "data" / "processed"
 ALERTS_FILE = PROJECT_DIR / "data" / "last_alerts.json"
 
+# Only recently scraped partitions of the job store are read
+ALERT_WINDOW_DAYS = 7
+
+sys.path.insert(0, str(PROJECT_DIR))
+
+from pipeline.storage.job_store import JobStore
+
 
 def load_env_file():
     """Load environment variables from .env file"""
@@ -181,12 +189,8 @@ def save_last_alerts(data: Dict):
 
 
 def load_jobs() -> List[Dict]:
-    """Load current jobs"""
-    jobs_file = PROCESSED_DIR / "jobs.json"
-    if jobs_file.exists():
-        with open(jobs_file) as f:
-            return json.load(f)
-    return []
+    """Load the jobs scraped in the last ALERT_WINDOW_DAYS days"""
+    return JobStore(PROCESSED_DIR / "jobs").jobs(days=ALERT_WINDOW_DAYS)
 
 
 def filter_relevant_jobs(jobs: List[Dict], keywords: List[str] = None) -> List[Dict]:
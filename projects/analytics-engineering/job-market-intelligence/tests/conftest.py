@@ -0,0 +1,39 @@
+"""
+Shared pytest setup
+
+Tests import the pipeline and scripts the same way the scripts do, from
+the project directory.
+"""
+import os
+import sys
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+PROJECT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+# Database tests run only against a throwaway database named here; the
+# pipeline reads DATABASE_URL when pipeline.config is first imported
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+if TEST_DATABASE_URL:
+    os.environ['DATABASE_URL'] = TEST_DATABASE_URL
+
+needs_database = pytest.mark.skipif(not TEST_DATABASE_URL, reason='TEST_DATABASE_URL not set')
+
+
+@pytest.fixture
+def database():
+    """Engine of the test database, with the schema created"""
+    from pipeline.database.connection import engine, init_db
+    init_db()
+    return engine
+
+
+def load_script(name: str):
+    """Import scripts/<name>.py as a module"""
+    spec = importlib.util.spec_from_file_location(name, PROJECT_DIR / 'scripts' / f'{name}.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,25 @@
+"""Tests for the incremental dashboard aggregates"""
+from pipeline.storage.aggregates import AggregateStore
+
+JOBS = [
+    {'job_id': 'a', 'source': 'remoteok', 'salary_min': 60000, 'salary_max': '90000', 'scraped_at': '2025-12-06T10:00:00'},
+    {'job_id': 'b', 'source': 'remoteok', 'salary_min': '50k', 'salary_max': '95000.5', 'scraped_at': '2025-12-06T10:00:00'},
+    {'job_id': 'c', 'source': 'jobicy', 'salary_min': 70000.0, 'salary_max': None, 'scraped_at': '2025-12-06T10:00:00'},
+]
+
+
+def test_malformed_salaries_are_skipped():
+    aggregates = AggregateStore()
+
+    assert aggregates.add_many(JOBS) == 3
+    assert aggregates.state['salary'] == {
+        'salary_min': {'sum': 130000, 'count': 2},
+        'salary_max': {'sum': 90000, 'count': 1},
+    }
+
+
+def test_incremental_salaries_match_a_rebuild():
+    aggregates = AggregateStore()
+    aggregates.add_many(JOBS)
+
+    assert aggregates.state['salary'] == AggregateStore.from_jobs(JOBS).state['salary']
@@ -0,0 +1,18 @@
+"""Tests for the API sources' keyword filters"""
+from conftest import load_script
+
+scrape_all_sources = load_script('scrape_all_sources')
+
+
+def test_arbeitnow_keeps_job_matching_only_on_a_tag():
+    source = scrape_all_sources.ArbeitnowScraper(client=object())
+    job = {'title': 'Werkstudent (m/w/d)', 'tags': ['Marketing', 'Data Analysis']}
+
+    assert source.keep(job, {})
+
+
+def test_arbeitnow_drops_job_matching_no_field():
+    source = scrape_all_sources.ArbeitnowScraper(client=object())
+    job = {'title': 'Werkstudent (m/w/d)', 'tags': ['Marketing', 'Sales']}
+
+    assert not source.keep(job, {})
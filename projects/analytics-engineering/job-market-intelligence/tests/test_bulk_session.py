@@ -0,0 +1,59 @@
+"""Tests for the bulk session's paged streams (needs TEST_DATABASE_URL)"""
+import pytest
+from sqlalchemy import select, text
+
+from conftest import needs_database
+from pipeline.database.connection import bulk_session
+from pipeline.database.models import Company, Job
+
+pytestmark = needs_database
+
+PREFIX = 'bulk_session_test'
+
+
+@pytest.fixture
+def db(database):
+    def clean():
+        with database.begin() as connection:
+            connection.execute(text("DELETE FROM companies WHERE name LIKE :prefix"), {'prefix': f'{PREFIX}-%'})
+
+    clean()
+    with database.begin() as connection:
+        for n in range(5):
+            connection.execute(text("INSERT INTO companies (name) VALUES (:name)"), {'name': f'{PREFIX}-{n}'})
+    yield database
+    clean()
+
+
+def committed(database):
+    with database.connect() as connection:
+        return connection.execute(text(
+            "SELECT count(*) FROM companies WHERE name LIKE :prefix AND industry = 'done'"
+        ), {'prefix': f'{PREFIX}-%'}).scalar()
+
+
+def test_stream_commits_between_pages(db):
+    seen = []
+    with bulk_session(commit_every=2, fetch_size=2) as bulk:
+        companies = bulk.session.query(Company).filter(Company.name.like(f'{PREFIX}-%'))
+        for company in bulk.stream(companies):
+            seen.append(company.name)
+            company.industry = 'done'
+            bulk.done()
+            # Other connections see each batch as soon as it is done
+            assert committed(db) == len(seen) // 2 * 2
+        assert bulk.commits == 2
+
+    assert seen == [f'{PREFIX}-{n}' for n in range(5)]
+    assert committed(db) == 5
+
+
+def test_stream_pages_statements_by_the_given_key(db):
+    with bulk_session(fetch_size=2) as bulk:
+        statement = select(Company.id, Company.name).where(Company.name.like(f'{PREFIX}-%'))
+        names = [name for _, name in bulk.stream(statement)]
+        assert names == [f'{PREFIX}-{n}' for n in range(5)]
+
+        # jobs has a composite primary key (id, scraped_at)
+        with pytest.raises(ValueError):
+            next(bulk.stream(bulk.session.query(Job)))
@@ -0,0 +1,65 @@
+"""Tests for the run-scoped company resolver (needs TEST_DATABASE_URL)"""
+import pytest
+from sqlalchemy import event, text
+
+from conftest import needs_database
+from pipeline.database.company_resolver import CompanyResolver
+
+pytestmark = needs_database
+
+PREFIX = 'resolver_test'
+
+
+@pytest.fixture
+def db(database):
+    def clean():
+        with database.begin() as connection:
+            connection.execute(text("DELETE FROM companies WHERE name LIKE :prefix"), {'prefix': f'{PREFIX}-%'})
+
+    clean()
+    yield database
+    clean()
+
+
+@pytest.fixture
+def statements(db):
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(db, 'before_cursor_execute', record)
+    yield executed
+    event.remove(db, 'before_cursor_execute', record)
+
+
+def company_ids(database):
+    with database.connect() as connection:
+        return dict(connection.execute(text("SELECT name, id FROM companies WHERE name LIKE :prefix"),
+                                       {'prefix': f'{PREFIX}-%'}).all())
+
+
+def test_resolve_many_creates_missing_companies_in_one_insert(db, statements):
+    resolver = CompanyResolver()
+    names = [f'{PREFIX}-a', f'{PREFIX}-b', f'{PREFIX}-a', '', None]
+
+    ids = resolver.resolve_many(names)
+
+    assert ids == company_ids(db) and set(ids) == {f'{PREFIX}-a', f'{PREFIX}-b'}
+    assert sum(statement.lstrip().upper().startswith('INSERT') for statement in statements) == 1
+
+    # Known names are answered from the cache
+    statements.clear()
+    assert resolver.resolve(f'{PREFIX}-b') == ids[f'{PREFIX}-b']
+    assert statements == []
+
+
+def test_resolve_picks_up_companies_created_by_another_writer(db):
+    resolver = CompanyResolver()
+    resolver.load()
+    other = CompanyResolver().resolve_many([f'{PREFIX}-shared'])
+
+    ids = resolver.resolve_many([f'{PREFIX}-shared', f'{PREFIX}-new'])
+
+    assert ids[f'{PREFIX}-shared'] == other[f'{PREFIX}-shared']
+    assert ids == company_ids(db)
@@ -0,0 +1,95 @@
+"""Tests for near-duplicate job detection"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from conftest import needs_database
+from pipeline.nlp.dedup import (
+    DedupIndex, collapse_duplicates, decode_signature, encode_signature, job_signature, similarity,
+)
+
+DESCRIPTION = ("We are looking for a data analyst to build dashboards in Power BI, write SQL "
+               "against our warehouse and report weekly sales figures to the leadership team. "
+               "You will work closely with finance and operations to automate recurring reports.")
+
+
+def job(job_id, title='Data Analyst', company='Acme Ltd', description=DESCRIPTION):
+    return {'job_id': job_id, 'title': title, 'company_name': company, 'description': description}
+
+
+def test_syndicated_copy_joins_the_first_postings_cluster():
+    index = DedupIndex()
+    original = job('remoteok-1')
+    # Another board: company suffix spelled out, HTML and a truncated tail
+    copy = job('jobicy-7', company='ACME Limited', description='<p>' + DESCRIPTION.rsplit(' ', 3)[0] + '</p>')
+
+    assert index.add(original) == 'remoteok-1'
+    assert index.add(copy) == 'remoteok-1'
+    assert index.canonical([original, copy]) == [original]
+
+
+def test_same_text_at_another_company_is_not_a_duplicate():
+    index = DedupIndex()
+    index.add(job('a'))
+    assert index.add(job('b', company='Globex')) == 'b'
+
+
+def test_different_posting_at_the_same_company_is_not_a_duplicate():
+    index = DedupIndex()
+    index.add(job('a'))
+    other = job('b', title='Registered Nurse', description=(
+        "Our ward needs a registered nurse for night shifts, caring for patients after surgery, "
+        "giving medication and keeping charts up to date with the doctors on duty."))
+    assert index.add(other) == 'b'
+    assert index.cluster_count == 2
+
+
+def test_job_without_company_or_description_is_its_own_cluster():
+    index = DedupIndex()
+    bare = {'job_id': 'a', 'title': 'Senior Software Engineer'}
+    assert index.add(bare) == 'a'
+    assert index.add({'job_id': 'b', 'title': 'Senior Software Engineer'}) == 'b'
+    assert 'minhash' not in bare
+
+
+def test_stored_fingerprint_round_trips():
+    signature = job_signature(job('a'))
+    assert decode_signature(encode_signature(signature)) == signature
+    assert similarity(signature, job_signature(job('b'))) == 1.0
+
+
+def test_collapse_duplicates_keeps_the_first_copy():
+    jobs = [job('a'), job('a'), job('b', company='Acme Limited'), job('c', company='Globex')]
+    assert [kept['job_id'] for kept in collapse_duplicates(jobs)] == ['a', 'c']
+
+
+@pytest.fixture
+def db(database):
+    def clean():
+        with database.begin() as connection:
+            connection.execute(text("DELETE FROM jobs WHERE source = 'dedup_test'"))
+
+    clean()
+    yield database
+    clean()
+
+
+@needs_database
+def test_database_index_only_holds_recently_seen_jobs(db):
+    now = datetime.utcnow()
+    signature = encode_signature(job_signature(job('a')))
+    with db.begin() as connection:
+        for job_id, scraped_at, last_seen_at in [
+            ('dedup_test-new', now, None),
+            ('dedup_test-old', now - timedelta(days=90), None),
+            ('dedup_test-still-posted', now - timedelta(days=90), now),
+        ]:
+            connection.execute(text("""
+                INSERT INTO jobs (job_id, source, source_url, title, scraped_at, last_seen_at, minhash, cluster_id)
+                VALUES (:job_id, 'dedup_test', :job_id, 'Data Analyst', :scraped_at, :last_seen_at, :minhash, :job_id)
+            """), {'job_id': job_id, 'scraped_at': scraped_at, 'last_seen_at': last_seen_at, 'minhash': signature})
+
+    indexed = {job_id for job_id in DedupIndex.from_database().clusters if job_id.startswith('dedup_test')}
+    assert indexed == {'dedup_test-new', 'dedup_test-still-posted'}
+    assert 'dedup_test-old' in DedupIndex.from_database(days=None).clusters
@@ -0,0 +1,111 @@
+"""Tests for the concurrent fetch engine"""
+import asyncio
+from collections import Counter
+
+import httpx
+import pytest
+
+from pipeline.config import SCRAPING_CONFIG
+from pipeline.scrapers.fetcher import AsyncFetcher
+from pipeline.scrapers.http_cache import HttpCache
+
+
+class Site:
+    """Mock transport handler recording requests and per-host concurrency"""
+
+    def __init__(self, statuses=None):
+        self.statuses = statuses or {}
+        self.requests = Counter()
+        self.in_flight = Counter()
+        self.max_in_flight = Counter()
+        self.max_total = 0
+
+    async def __call__(self, request):
+        host, url = request.url.host, str(request.url)
+        self.requests[url] += 1
+        self.in_flight[host] += 1
+        self.max_in_flight[host] = max(self.max_in_flight[host], self.in_flight[host])
+        self.max_total = max(self.max_total, sum(self.in_flight.values()))
+        await asyncio.sleep(0.05)
+        self.in_flight[host] -= 1
+
+        statuses = self.statuses.get(url, [200])
+        status = statuses[min(self.requests[url], len(statuses)) - 1]
+        if request.headers.get('If-None-Match') == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(status, content=url.encode(), headers={'ETag': '"v1"'})
+
+
+@pytest.fixture
+def make_fetcher(monkeypatch):
+    # No pacing floor, so the tests don't wait between requests
+    monkeypatch.setitem(SCRAPING_CONFIG, 'min_request_delay', 0)
+    fetchers = []
+
+    def make(site, **settings):
+        fetcher = AsyncFetcher(rate_limit_delay=0, max_concurrent_per_host=2, **settings)
+        fetcher._run(fetcher._client.aclose())
+        fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(site))
+        fetchers.append(fetcher)
+        return fetcher
+
+    yield make
+    for fetcher in fetchers:
+        fetcher.close()
+
+
+def test_fetch_many_keeps_order_and_per_host_limits(make_fetcher):
+    site = Site()
+    fetcher = make_fetcher(site)
+    urls = [f'https://{host}.example.com/jobs/{n}' for n in range(4) for host in ['a', 'b', 'c']]
+
+    results = fetcher.fetch_many(urls)
+
+    assert [result.content.decode() for result in results] == urls
+    assert max(site.max_in_flight.values()) <= 2
+    # Hosts are fetched concurrently with each other
+    assert site.max_total > 2
+
+
+def test_concurrent_requests_for_one_url_share_a_round_trip(make_fetcher):
+    site = Site()
+    fetcher = make_fetcher(site)
+    url = 'https://a.example.com/jobs/1'
+
+    results = fetcher.fetch_many([url, url, url])
+
+    assert all(result.content == url.encode() for result in results)
+    assert site.requests[url] == 1
+
+
+def test_retries_retryable_statuses_only(make_fetcher):
+    flaky, missing = 'https://a.example.com/flaky', 'https://a.example.com/missing'
+    site = Site({flaky: [503, 200], missing: [404]})
+    fetcher = make_fetcher(site, retry_times=3)
+
+    assert fetcher.fetch(flaky).status_code == 200
+    assert fetcher.fetch(missing) is None
+    assert site.requests[flaky] == 2 and site.requests[missing] == 1
+
+
+def test_fetch_as_completed_yields_every_url(make_fetcher):
+    site = Site()
+    fetcher = make_fetcher(site)
+    urls = [f'https://a.example.com/jobs/{n}' for n in range(10)]
+
+    results = dict(fetcher.fetch_as_completed(urls, max_pending=3))
+
+    assert set(results) == set(urls)
+    assert all(result.content == url.encode() for url, result in results.items())
+
+
+def test_cached_pages_are_revalidated(make_fetcher, tmp_path):
+    site = Site()
+    url = 'https://a.example.com/jobs/1'
+    make_fetcher(site, cache=HttpCache(tmp_path / 'cache.sqlite')).fetch(url)
+
+    # A later run sends the ETag and gets the stored body back on a 304
+    result = make_fetcher(site, cache=HttpCache(tmp_path / 'cache.sqlite')).fetch(url)
+
+    assert result.from_cache and result.content == url.encode()
+    assert site.requests[url] == 2
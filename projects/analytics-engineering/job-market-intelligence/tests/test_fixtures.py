@@ -0,0 +1,62 @@
+"""Replay tests running every scraper against its recorded fixture archive"""
+from pathlib import Path
+
+import pytest
+
+from conftest import load_script
+from pipeline.config import SCRAPING_CONFIG
+from pipeline.scrapers.fixtures import FixtureArchive, FixtureServer
+
+benchmark_scrapers = load_script('benchmark_scrapers')
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+# Sources whose jobs are completed from their detail pages
+DETAIL_PAGE_SOURCES = ['fuzu', 'brightermonday']
+
+
+@pytest.fixture(autouse=True)
+def offline_settings(monkeypatch, tmp_path):
+    # No pacing floor, and learned selector profiles stay out of the project
+    monkeypatch.setitem(SCRAPING_CONFIG, 'min_request_delay', 0)
+    monkeypatch.setitem(SCRAPING_CONFIG, 'selector_profile_path', str(tmp_path / 'selector_profiles.json'))
+
+
+def replay(name):
+    archive = FixtureArchive.latest(FIXTURES_DIR, name)
+    runner = benchmark_scrapers.SOURCES[name][1]
+    with FixtureServer(archive) as server:
+        jobs = runner(server.url, False)
+        return archive, server, jobs
+
+
+@pytest.mark.parametrize('name', list(benchmark_scrapers.SOURCES))
+def test_every_source_has_a_fixture_archive(name):
+    archive = FixtureArchive.latest(FIXTURES_DIR, name)
+
+    assert archive is not None and archive.responses
+    assert archive.origin == benchmark_scrapers.SOURCES[name][0]
+    assert archive.summary['jobs'] > 0
+
+
+@pytest.mark.parametrize('name', list(benchmark_scrapers.SOURCES))
+def test_replay_finds_the_recorded_jobs(name):
+    archive, server, jobs = replay(name)
+
+    assert server.misses == 0
+    assert server.requests >= len(archive.responses)
+    assert benchmark_scrapers.summarize(jobs) == archive.summary
+    assert len({job['job_id'] for job in jobs}) == len(jobs)
+    for job in jobs:
+        assert job['source'] == name
+        assert job['title'] and job['company_name']
+        assert not job['title'].startswith('Unknown') and not job['company_name'].startswith('Unknown')
+        # Links to the real origin were rewritten to the replay server
+        assert job['source_url'].startswith(server.url)
+
+
+@pytest.mark.parametrize('name', DETAIL_PAGE_SOURCES)
+def test_replay_fills_in_detail_pages(name):
+    _, _, jobs = replay(name)
+
+    assert all('SQL' in job['description'] for job in jobs)
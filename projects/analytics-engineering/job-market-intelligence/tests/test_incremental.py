@@ -0,0 +1,28 @@
+"""Tests for incremental crawling's early termination"""
+from pipeline.scrapers.incremental import IncrementalCrawl, KnownJobs
+
+
+def page(*numbers):
+    return [{'job_id': f'job-{n}', 'source_url': f'https://example.com/jobs/{n}'} for n in numbers]
+
+
+def test_overlapping_searches_do_not_stop_each_other():
+    crawl = IncrementalCrawl(KnownJobs(), stale_pages=1)
+
+    # Keywords paged in lockstep; 'data analyst' page 1 only repeats 'data' results
+    assert crawl.record_page('data', page(1, 2, 3))
+    assert crawl.record_page('data analyst', page(1, 2))
+    assert crawl.record_page('data', page(4, 5))
+    assert crawl.record_page('data analyst', page(6))
+
+    assert crawl.searches_stopped == 0
+    assert crawl.jobs_new == 6
+
+
+def test_search_stops_on_a_page_of_stored_jobs():
+    crawl = IncrementalCrawl(KnownJobs(['job-1', 'job-2']), stale_pages=1)
+
+    assert crawl.record_page('data', page(3, 1))
+    assert not crawl.record_page('data', page(2, 1))
+    assert crawl.searches_stopped == 1
+    assert crawl.jobs_new == 1
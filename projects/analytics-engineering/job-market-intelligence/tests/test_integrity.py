@@ -0,0 +1,102 @@
+"""Tests for the integrity triggers of the partitioned jobs table (needs TEST_DATABASE_URL)"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from conftest import needs_database
+from pipeline.database.integrity import delete_orphans
+
+pytestmark = needs_database
+
+SOURCE = 'integrity_test'
+FIRST_SEEN = datetime.now().replace(microsecond=0)
+
+
+@pytest.fixture
+def db(database):
+    def clean():
+        with database.begin() as connection:
+            connection.execute(text("DELETE FROM jobs WHERE source = :source"), {'source': SOURCE})
+            connection.execute(text("DELETE FROM skills WHERE name = :name"), {'name': SOURCE})
+
+    clean()
+    yield database
+    clean()
+
+
+def insert_job(connection, job_id, scraped_at=FIRST_SEEN):
+    return connection.execute(text("""
+        INSERT INTO jobs (job_id, source, source_url, title, scraped_at)
+        VALUES (:job_id, :source, 'https://example.com', 'Data Analyst', :scraped_at)
+        RETURNING id
+    """), {'job_id': f'{SOURCE}-{job_id}', 'source': SOURCE, 'scraped_at': scraped_at}).scalar()
+
+
+def insert_skill(connection, job_id):
+    skill_id = connection.execute(text("""
+        INSERT INTO skills (name) VALUES (:name)
+        ON CONFLICT (name) DO UPDATE SET name = excluded.name RETURNING id
+    """), {'name': SOURCE}).scalar()
+    connection.execute(text("INSERT INTO job_skills (job_id, skill_id) VALUES (:job_id, :skill_id)"),
+                       {'job_id': job_id, 'skill_id': skill_id})
+
+
+def pgcode(error):
+    return getattr(error.value.orig, 'pgcode', None)
+
+
+def test_job_id_is_unique_across_partitions(db):
+    with db.begin() as connection:
+        insert_job(connection, 1)
+        first_seen = connection.execute(text("SELECT scraped_at FROM job_keys WHERE job_id = :job_id"),
+                                        {'job_id': f'{SOURCE}-1'}).scalar()
+    assert first_seen == FIRST_SEEN
+
+    with pytest.raises(IntegrityError) as error, db.begin() as connection:
+        insert_job(connection, 1, FIRST_SEEN + timedelta(days=40))
+    assert pgcode(error) == '23505'
+
+
+def test_job_id_and_scraped_at_cannot_change(db):
+    with db.begin() as connection:
+        insert_job(connection, 1)
+
+    with pytest.raises(IntegrityError) as error, db.begin() as connection:
+        connection.execute(text("UPDATE jobs SET scraped_at = scraped_at + interval '40 days' WHERE job_id = :job_id"),
+                           {'job_id': f'{SOURCE}-1'})
+    assert pgcode(error) == '23000'
+
+
+def test_child_rows_must_reference_a_job(db):
+    with pytest.raises(IntegrityError) as error, db.begin() as connection:
+        insert_skill(connection, -1)
+    assert pgcode(error) == '23503'
+
+
+def test_deleting_a_job_deletes_its_key_and_child_rows(db):
+    with db.begin() as connection:
+        job_id = insert_job(connection, 1)
+        insert_skill(connection, job_id)
+        connection.execute(text("DELETE FROM jobs WHERE id = :id"), {'id': job_id})
+
+        assert connection.execute(text("SELECT count(*) FROM job_keys WHERE job_id = :job_id"),
+                                  {'job_id': f'{SOURCE}-1'}).scalar() == 0
+        assert connection.execute(text("SELECT count(*) FROM job_skills WHERE job_id = :id"),
+                                  {'id': job_id}).scalar() == 0
+
+
+def test_delete_orphans(db):
+    with db.begin() as connection:
+        job_id = insert_job(connection, 1)
+        insert_skill(connection, job_id)
+        # As if the job's partition had been dropped by hand: no triggers fire
+        connection.execute(text("SET LOCAL session_replication_role = replica"))
+        connection.execute(text("DELETE FROM jobs WHERE id = :id"), {'id': job_id})
+        connection.execute(text("SET LOCAL session_replication_role = origin"))
+
+        assert delete_orphans(connection)['job_skills'] >= 1
+        assert connection.execute(text("SELECT count(*) FROM job_skills WHERE job_id = :id"),
+                                  {'id': job_id}).scalar() == 0
+        connection.execute(text("DELETE FROM job_keys WHERE job_id = :job_id"), {'job_id': f'{SOURCE}-1'})
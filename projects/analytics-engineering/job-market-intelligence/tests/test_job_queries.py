@@ -0,0 +1,76 @@
+"""Tests for the dashboard's DuckDB queries over the job store"""
+import os
+from datetime import date, timedelta
+
+from pipeline.analysis.job_queries import JobQueries
+from pipeline.storage.job_store import JobStore
+
+
+def job(job_id, days_ago, source='remoteok', **fields):
+    scraped = (date.today() - timedelta(days=days_ago)).isoformat()
+    return {'job_id': job_id, 'source': source, 'title': 'Data Analyst', 'company_name': 'Acme',
+            'scraped_at': f'{scraped}T08:00:00', **fields}
+
+
+def make_store(tmp_path):
+    store = JobStore(tmp_path / 'jobs')
+    store.append([
+        job('new-1', 1, salary_max=90000, experience_level='Senior', skills=['Python', 'SQL']),
+        job('new-2', 5, source='jobicy', location='Nairobi'),
+        job('old-1', 400, salary_max=50000),
+    ])
+    return store
+
+
+def test_queries_read_only_the_windows_files(tmp_path):
+    make_store(tmp_path)
+    queries = JobQueries(tmp_path / 'jobs')
+    queries.refresh()
+
+    assert len(queries.paths(30)) == 2
+    assert len(queries.paths()) == 3
+    assert queries.metrics(30)['jobs'] == 2
+    assert queries.metrics()['jobs'] == 3
+    assert queries.salaries(30) == [90000]
+    assert queries.options('source', 30) == ['jobicy', 'remoteok']
+
+
+def test_filters_and_search(tmp_path):
+    make_store(tmp_path)
+    queries = JobQueries(tmp_path / 'jobs')
+    queries.refresh()
+
+    assert queries.metrics(30, {'source': 'jobicy'})['jobs'] == 1
+    rows, total = queries.search('python', 30)
+    assert [row['job_id'] for row in rows] == ['new-1'] and total == 2
+    assert queries.experience_counts(30).set_index('level')['count'].to_dict() == {'Senior': 1, 'Unknown': 1}
+
+
+def test_empty_window_and_store(tmp_path):
+    queries = JobQueries(tmp_path / 'jobs')
+    queries.refresh()
+    assert queries.metrics(30)['jobs'] == 0
+    assert queries.search('', 30) == ([], 0)
+
+
+def test_refresh_picks_up_new_files(tmp_path):
+    store = make_store(tmp_path)
+    queries = JobQueries(tmp_path / 'jobs')
+    queries.refresh()
+
+    store.append([job('new-3', 0)])
+    assert queries.refresh()
+    assert queries.metrics(30)['jobs'] == 3
+    assert not queries.refresh()
+
+
+def test_query_after_compaction_deleted_its_files(tmp_path):
+    store = make_store(tmp_path)
+    store.append([job('new-4', 5, source='jobicy')])
+    queries = JobQueries(tmp_path / 'jobs')
+    queries.refresh()
+    paths = queries.paths(30)
+
+    store.compact()
+    assert not all(os.path.exists(path) for path in paths)
+    assert queries.metrics(30)['jobs'] == 3
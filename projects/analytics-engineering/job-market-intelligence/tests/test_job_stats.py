@@ -0,0 +1,56 @@
+"""Tests for the vectorized stats engine against the incremental aggregates"""
+from pipeline.analysis.job_stats import compute_state, job_table
+from pipeline.storage.aggregates import AggregateStore
+from pipeline.storage.job_store import JobStore
+
+JOBS = [
+    {'job_id': 'a', 'source': 'remoteok', 'company_name': 'Acme', 'location': 'Remote',
+     'experience_level': 'Senior', 'skills': ['Python', 'SQL', 'Python'],
+     'salary_min': 60000, 'salary_max': '90000', 'scraped_at': '2025-12-06T10:00:00'},
+    {'job_id': 'b', 'source': 'remoteok', 'company_name': '', 'location': None,
+     'experience_level': None, 'skills': [], 'salary_min': '50k', 'salary_max': '95000.5',
+     'scraped_at': '2025-12-07T09:30:00'},
+    {'job_id': 'c', 'source': 'jobicy', 'company_name': 'Unknown',
+     'location': 'Nairobi, Nairobi County, Kenya (Hybrid, 3 days in office)',
+     'experience_level': 'Entry', 'skills': ['Excel'], 'salary_min': 70000.0, 'salary_max': None,
+     'scraped_at': '2025-12-07T11:00:00'},
+    {'job_id': 'd', 'source': None, 'company_name': 'Acme', 'location': 'Remote',
+     'skills': None, 'scraped_at': '2025-12-08T08:00:00'},
+]
+
+
+def comparable(stats):
+    return {**stats, 'summary': {key: value for key, value in stats['summary'].items() if key != 'generated_at'}}
+
+
+def test_vectorized_state_matches_the_incremental_one():
+    incremental = AggregateStore()
+    incremental.add_many(JOBS)
+
+    vectorized = compute_state(job_table(JOBS))
+
+    assert vectorized == incremental.state
+    assert comparable(AggregateStore(state=vectorized).stats()) == comparable(incremental.stats())
+
+
+def test_rebuild_from_the_store_matches(tmp_path):
+    store = JobStore(tmp_path / 'jobs')
+    store.append(JOBS)
+    incremental = AggregateStore()
+    incremental.add_many(JOBS)
+
+    assert AggregateStore.rebuild(store).state == incremental.state
+    assert incremental.verify(store) == []
+
+
+def test_removing_jobs_matches_a_rebuild_without_them():
+    aggregates = AggregateStore()
+    aggregates.add_many(JOBS)
+    for job in JOBS[2:]:
+        aggregates.remove(job)
+
+    assert aggregates.state == compute_state(job_table(JOBS[:2]))
+
+
+def test_empty_table():
+    assert compute_state(job_table([])) == AggregateStore().state
@@ -0,0 +1,80 @@
+"""Tests for batched job upserts (needs TEST_DATABASE_URL)"""
+import pytest
+from sqlalchemy import text
+
+from conftest import needs_database
+from pipeline.database.job_writer import JobBatchWriter
+
+pytestmark = needs_database
+
+SOURCE = 'writer_test'
+
+
+def job(n, title='Data Analyst'):
+    return {'job_id': f'{SOURCE}-{n}', 'source': SOURCE, 'source_url': f'https://example.com/{n}', 'title': title}
+
+
+@pytest.fixture
+def db(database):
+    def clean():
+        with database.begin() as connection:
+            connection.execute(text("DELETE FROM jobs WHERE source = :source"), {'source': SOURCE})
+
+    clean()
+    yield database
+    clean()
+
+
+def test_counts_new_and_updated_jobs_from_returned_rows(db):
+    writer = JobBatchWriter()
+    writer.add_many([job(1), job(2)])
+    assert writer.flush() == (2, 0)
+
+    writer.add_many([job(2, 'Senior Data Analyst'), job(3)])
+    assert writer.flush() == (1, 1)
+    assert (writer.jobs_new, writer.jobs_updated) == (3, 1)
+
+    with db.connect() as connection:
+        rows = connection.execute(
+            text("SELECT job_id, title FROM jobs WHERE source = :source ORDER BY job_id"), {'source': SOURCE}
+        ).all()
+    assert rows == [(f'{SOURCE}-1', 'Data Analyst'), (f'{SOURCE}-2', 'Senior Data Analyst'), (f'{SOURCE}-3', 'Data Analyst')]
+
+
+def test_concurrent_writers_insert_the_same_job(db):
+    import threading
+    from datetime import datetime, timedelta
+
+    # Another writer has inserted the job but not committed yet
+    other = db.connect()
+    transaction = other.begin()
+    first_seen = datetime.utcnow() - timedelta(days=1)
+    other.execute(text("""
+        INSERT INTO jobs (job_id, source, source_url, title, scraped_at, created_at, updated_at)
+        VALUES (:job_id, :source, 'https://example.com/1', 'Data Analyst', :first_seen, :first_seen, :first_seen)
+    """), {'job_id': f'{SOURCE}-1', 'source': SOURCE, 'first_seen': first_seen})
+
+    writer = JobBatchWriter()
+    writer.add(job(1, 'Senior Data Analyst'))
+    results = []
+    flush = threading.Thread(target=lambda: results.append(writer.flush()))
+    flush.start()
+
+    # Commit once the writer is waiting on the job's key
+    with db.connect() as monitor:
+        for _ in range(100):
+            if monitor.execute(text(
+                "SELECT count(*) FROM pg_stat_activity WHERE wait_event_type = 'Lock' AND datname = current_database()"
+            )).scalar():
+                break
+            flush.join(0.05)
+    transaction.commit()
+    other.close()
+    flush.join(10)
+
+    assert results == [(0, 1)]
+    with db.connect() as connection:
+        rows = connection.execute(
+            text("SELECT title, scraped_at FROM jobs WHERE source = :source"), {'source': SOURCE}
+        ).all()
+    assert rows == [('Senior Data Analyst', first_seen)]
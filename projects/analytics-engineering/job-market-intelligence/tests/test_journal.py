@@ -0,0 +1,115 @@
+"""Tests for the append-only scrape journal"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+from conftest import load_script
+from pipeline.storage import journal as journal_module
+from pipeline.storage.journal import Journal, read_batches
+
+
+def job(job_id, title='Data Analyst', days_ago=0):
+    return {'job_id': job_id, 'title': title,
+            'scraped_at': (datetime.now() - timedelta(days=days_ago)).isoformat()}
+
+
+def count_fsyncs(monkeypatch):
+    calls = []
+    fsync = journal_module.os.fsync
+    monkeypatch.setattr(journal_module.os, 'fsync', lambda fd: (calls.append(fd), fsync(fd)))
+    return calls
+
+
+def test_writer_appends_one_fsynced_batch_per_batch_size(tmp_path, monkeypatch):
+    fsyncs = count_fsyncs(monkeypatch)
+    journal = Journal(tmp_path, 'remoteok')
+
+    with journal.writer(batch_size=2, flush_interval=60) as writer:
+        writer.write_many(job(f'job-{n}') for n in range(5))
+        # Two full batches are on disk, the fifth record is still buffered
+        assert [len(records) for records, _ in read_batches(writer.path)] == [2, 2]
+        assert len(fsyncs) == 2
+
+    assert [len(records) for records, _ in read_batches(writer.path)] == [2, 2, 1]
+    assert len(fsyncs) == 3
+    assert [record['job_id'] for record in journal.latest()] == [f'job-{n}' for n in range(5)]
+
+
+def test_flush_interval_writes_partial_batches(tmp_path, monkeypatch):
+    fsyncs = count_fsyncs(monkeypatch)
+    with Journal(tmp_path, 'remoteok').writer(batch_size=100, flush_interval=0) as writer:
+        writer.write(job('a'))
+        writer.write(job('b'))
+        assert len(fsyncs) == 2
+
+
+def test_readers_ignore_a_torn_last_batch(tmp_path):
+    journal = Journal(tmp_path, 'remoteok')
+    with journal.writer() as writer:
+        writer.write(job('a'))
+    complete = writer.path.read_bytes()
+    with open(writer.path, 'ab') as f:
+        f.write(journal_module.encode_records([job('b')])[:-8])
+
+    assert [record['job_id'] for record in journal.latest()] == ['a']
+    assert [end for _, end in read_batches(writer.path)] == [len(complete)]
+
+
+def test_compaction_keeps_the_newest_version_of_each_record(tmp_path):
+    journal = Journal(tmp_path, 'remoteok')
+    with journal.writer() as writer:
+        writer.write_many([job('a', 'Old title'), job('b'), job('stale', days_ago=40)])
+    with journal.writer() as writer:
+        writer.write(job('a', 'New title'))
+
+    assert journal.compact(retention_days=30) == 2
+    assert journal.segments() == []
+    assert {record['job_id']: record['title'] for record in journal.latest()} == {
+        'a': 'New title', 'b': 'Data Analyst'}
+    # Compacting again changes nothing
+    assert journal.compact() == 0 and len(journal.latest()) == 2
+
+
+def test_tail_resumes_from_a_byte_offset(tmp_path):
+    journal = Journal(tmp_path, 'remoteok')
+    with journal.writer(batch_size=1) as writer:
+        writer.write_many([job('a'), job('b')])
+
+    batches = list(journal.tail())
+    assert [records[0]['job_id'] for records, _ in batches] == ['a', 'b']
+    after_a = batches[0][1]
+    assert after_a[0] == writer.path.name and 0 < after_a[1] < writer.path.stat().st_size
+
+    assert [records[0]['job_id'] for records, _ in journal.tail(after_a)] == ['b']
+    end = batches[-1][1]
+    assert list(journal.tail(end)) == []
+
+    with journal.writer() as writer:
+        writer.write(job('c'))
+    assert [records[0]['job_id'] for records, _ in journal.tail(end)] == ['c']
+
+
+def test_written_by_reads_one_process_segments(tmp_path):
+    journal = Journal(tmp_path, 'remoteok')
+    started = datetime.now()
+    with journal.writer() as writer:
+        writer.write(job('a'))
+    pid = os.getpid()
+
+    assert [record['job_id'] for record in journal.written_by(pid, started)] == ['a']
+    assert journal.written_by(pid + 1, started) == []
+    assert journal.written_by(pid, datetime.now() + timedelta(seconds=1)) == []
+
+
+def test_compact_journals_script(tmp_path, monkeypatch, capsys):
+    for name in ['remoteok', 'jobicy']:
+        with Journal(tmp_path, name).writer() as writer:
+            writer.write_many([job('a'), job('a', 'Newer'), job('b')])
+
+    monkeypatch.setattr(sys, 'argv', ['compact_journals.py', '--journal-dir', str(tmp_path)])
+    load_script('compact_journals').main()
+
+    assert 'Compacted 2 journals' in capsys.readouterr().out
+    for name in ['remoteok', 'jobicy']:
+        journal = Journal(tmp_path, name)
+        assert journal.segments() == [] and len(journal.latest()) == 2
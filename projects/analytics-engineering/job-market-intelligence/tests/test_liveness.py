@@ -0,0 +1,81 @@
+"""Tests for job expiry across scraper runs (needs TEST_DATABASE_URL)"""
+import pytest
+from sqlalchemy import text
+
+from conftest import needs_database
+from pipeline.config import SCRAPING_CONFIG
+from pipeline.scrapers.base_scraper import BaseScraper
+
+pytestmark = needs_database
+
+SOURCE = 'liveness_test'
+PAGE_SIZE = 5
+
+
+class BoardScraper(BaseScraper):
+    """Pages through a fake board listing job numbers newest first"""
+
+    def __init__(self, board):
+        super().__init__(SOURCE)
+        self.board = board
+
+    def scrape_jobs(self, keywords, locations):
+        jobs = []
+        for start in range(0, len(self.board), PAGE_SIZE):
+            page = [job(n) for n in self.board[start:start + PAGE_SIZE]]
+            jobs.extend(page)
+            if self.incremental and not self.incremental.record_page('data', page):
+                break
+        return jobs
+
+
+def job(n):
+    return {
+        'job_id': f'{SOURCE}-{n}',
+        'source': SOURCE,
+        'source_url': f'https://example.com/jobs/{n}',
+        'title': 'Data Analyst',
+        'company_name': f'Liveness Test Company {n}',
+    }
+
+
+@pytest.fixture
+def db(database):
+    def clean():
+        with database.begin() as connection:
+            connection.execute(text("DELETE FROM jobs WHERE source = :source"), {'source': SOURCE})
+            connection.execute(text("DELETE FROM scraping_logs WHERE source = :source"), {'source': SOURCE})
+            connection.execute(text("DELETE FROM companies WHERE name LIKE 'Liveness Test Company %'"))
+
+    clean()
+    yield database
+    clean()
+
+
+def is_active(engine, n):
+    with engine.connect() as connection:
+        return connection.execute(
+            text("SELECT is_active FROM jobs WHERE job_id = :job_id"), {'job_id': f'{SOURCE}-{n}'}
+        ).scalar()
+
+
+def test_default_config_expires_missing_jobs(db):
+    assert SCRAPING_CONFIG['incremental_crawl'] and SCRAPING_CONFIG['incremental_stale_pages'] == 1
+    every = SCRAPING_CONFIG['full_crawl_every']
+    expire_after = SCRAPING_CONFIG['expire_after_missed_runs']
+
+    board = list(range(30, 0, -1))
+    BoardScraper(board).run(['data'], [])
+
+    # Job 20 (page 3) is taken down; every later run finds one new job on page 1
+    # and stops at page 2, so only the periodic full crawls see page 3 and beyond
+    board.remove(20)
+    runs = every * expire_after
+    for run in range(1, runs + 1):
+        board.insert(0, 30 + run)
+        BoardScraper(board).run(['data'], [])
+        if run < runs:
+            assert is_active(db, 20)
+
+    assert not is_active(db, 20)
+    assert is_active(db, 10)
@@ -0,0 +1,49 @@
+"""Tests for running sources concurrently with deadlines"""
+import os
+import time
+from functools import partial
+
+from pipeline.scrapers.orchestrator import run_sources
+from pipeline.storage.journal import Journal
+
+
+def returns_jobs(count):
+    return [{'job_id': f'job-{n}', 'title': 'Data Analyst'} for n in range(count)]
+
+
+def raises():
+    raise RuntimeError('feed changed')
+
+
+def crashes():
+    os._exit(3)
+
+
+def hangs_after_journaling(journal_dir):
+    # Batches are larger than what is written, so only stopping flushes them
+    with Journal(journal_dir, 'slow').writer(batch_size=100, flush_interval=60) as writer:
+        writer.write_many(returns_jobs(3))
+        time.sleep(60)
+
+
+def test_results_of_every_kind_of_source(tmp_path):
+    results = run_sources({
+        'big': partial(returns_jobs, 20000),
+        'broken': raises,
+        'crashed': crashes,
+        'slow': partial(hangs_after_journaling, str(tmp_path)),
+    }, timeout=30, timeouts={'slow': 2}, journal_dir=tmp_path)
+
+    assert list(results) == ['big', 'broken', 'crashed', 'slow']
+    assert results['big'].status == 'ok' and len(results['big'].jobs) == 20000
+    assert results['broken'].status == 'failed' and results['broken'].error == 'feed changed'
+    assert results['crashed'].status == 'failed' and results['crashed'].error == 'exit code 3'
+
+    slow = results['slow']
+    assert slow.status == 'timeout' and slow.seconds < 10
+    assert [job['job_id'] for job in slow.jobs] == ['job-0', 'job-1', 'job-2']
+
+
+def test_timed_out_source_without_journal(tmp_path):
+    results = run_sources({'slow': partial(time.sleep, 60)}, timeout=1, journal_dir=tmp_path)
+    assert results['slow'].status == 'timeout' and results['slow'].jobs == []
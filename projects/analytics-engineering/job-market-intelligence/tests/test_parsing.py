@@ -0,0 +1,49 @@
+"""Tests for the HTML parsing backends"""
+import pytest
+from bs4 import SoupStrainer
+
+from pipeline.scrapers import parsing
+from pipeline.scrapers.parsing import AVAILABLE, BuiltinParser, PARSERS, get_parser
+
+PAGE = b"""
+<html><body>
+  <nav><a href="/login">Log in</a></nav>
+  <div class="job-card" data-id="1"><h2>Data Analyst</h2><span>Nairobi</span></div>
+  <div class="job-card" data-id="2">
+    <h2>Data Engineer</h2>
+    <div class="job-card nested" data-id="2b"><span>Remote</span></div>
+  </div>
+  <footer>Contact</footer>
+</body></html>
+"""
+
+BACKENDS = [pytest.param(name, marks=pytest.mark.skipif(not AVAILABLE[name], reason=f'{name} not installed'))
+            for name in PARSERS]
+
+
+@pytest.mark.parametrize('name', BACKENDS)
+def test_full_parse(name):
+    soup = get_parser(name).parse(PAGE)
+    assert soup.find('nav') is not None
+    assert [h2.get_text() for h2 in soup.find_all('h2')] == ['Data Analyst', 'Data Engineer']
+
+
+@pytest.mark.parametrize('name', BACKENDS)
+def test_scoped_parse_keeps_only_the_cards(name):
+    soup = get_parser(name).parse(PAGE, strainer=SoupStrainer('div', class_='job-card'), selector='div.job-card')
+
+    assert soup.find('nav') is None and soup.find('footer') is None
+    titles = [h2.get_text() for h2 in soup.find_all('h2')]
+    assert titles == ['Data Analyst', 'Data Engineer']
+    # A card nested in another is kept once, inside its outer card
+    assert len(soup.find_all(attrs={'data-id': '2b'})) == 1
+
+
+def test_unknown_parser():
+    with pytest.raises(ValueError):
+        get_parser('html5lib')
+
+
+def test_missing_backend_falls_back_to_html_parser(monkeypatch):
+    monkeypatch.setitem(parsing.AVAILABLE, 'selectolax', False)
+    assert isinstance(get_parser('selectolax'), BuiltinParser)
@@ -0,0 +1,68 @@
+"""Tests for the jobs retention policy (needs TEST_DATABASE_URL)"""
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import text
+
+from conftest import needs_database
+from pipeline.database.partitions import apply_retention, create_partition, partition_name, partitions
+
+pytestmark = needs_database
+
+SOURCE = 'retention_test'
+LIVE_MONTH = date(2020, 1, 1)
+DEAD_MONTH = date(2020, 2, 1)
+
+
+@pytest.fixture
+def db(database):
+    def clean():
+        with database.begin() as connection:
+            connection.execute(text("DELETE FROM jobs WHERE source = :source"), {'source': SOURCE})
+            connection.execute(text("DELETE FROM skills WHERE name = :name"), {'name': SOURCE})
+
+    clean()
+    yield database
+    clean()
+
+
+def insert_job(connection, n, month, is_active, last_seen_at=None):
+    return connection.execute(text("""
+        INSERT INTO jobs (job_id, source, source_url, title, scraped_at, is_active, last_seen_at)
+        VALUES (:job_id, :source, :url, 'Data Analyst', :scraped_at, :is_active, :last_seen_at)
+        RETURNING id
+    """), {
+        'job_id': f'{SOURCE}-{n}', 'source': SOURCE, 'url': f'https://example.com/{n}',
+        'scraped_at': datetime(month.year, month.month, 15), 'is_active': is_active, 'last_seen_at': last_seen_at,
+    }).scalar()
+
+
+def test_retention_keeps_partitions_with_live_jobs(db):
+    with db.begin() as connection:
+        for month in (LIVE_MONTH, DEAD_MONTH):
+            if partition_name('jobs', month) not in partitions(connection, 'jobs'):
+                create_partition(connection, 'jobs', 'scraped_at', month)
+
+        # First seen in January 2020 and still posted
+        live_id = insert_job(connection, 1, LIVE_MONTH, True, datetime.utcnow())
+        insert_job(connection, 2, LIVE_MONTH, False)
+        insert_job(connection, 3, DEAD_MONTH, False)
+        skill_id = connection.execute(
+            text("INSERT INTO skills (name) VALUES (:name) RETURNING id"), {'name': SOURCE}).scalar()
+        connection.execute(
+            text("INSERT INTO job_skills (job_id, skill_id) VALUES (:job_id, :skill_id)"),
+            {'job_id': live_id, 'skill_id': skill_id})
+
+    with db.begin() as connection:
+        dropped = apply_retention(connection, drop=True)
+
+    assert partition_name('jobs', DEAD_MONTH) in dropped
+    assert partition_name('jobs', LIVE_MONTH) not in dropped
+    with db.connect() as connection:
+        assert connection.execute(
+            text("SELECT job_id FROM jobs WHERE source = :source ORDER BY job_id"), {'source': SOURCE}
+        ).scalars().all() == [f'{SOURCE}-1', f'{SOURCE}-2']
+        assert connection.execute(
+            text("SELECT count(*) FROM job_keys WHERE job_id = :job_id"), {'job_id': f'{SOURCE}-1'}).scalar() == 1
+        assert connection.execute(
+            text("SELECT count(*) FROM job_skills WHERE job_id = :job_id"), {'job_id': live_id}).scalar() == 1
@@ -0,0 +1,97 @@
+"""Tests for adaptive pacing and the per-host circuit breaker"""
+import time
+
+import httpx
+
+from pipeline.scrapers.fetcher import AsyncFetcher
+from pipeline.scrapers.rate_control import HostController, parse_retry_after
+
+
+def open_circuit(control):
+    for _ in range(control.failure_threshold):
+        control.record(None)
+    assert control.state == 'open'
+
+
+def end_cooldown(control):
+    control.reopen_at = control.next_at = time.monotonic() - 1
+
+
+def test_circuit_opens_after_consecutive_failures_and_refuses_requests():
+    control = HostController('example.com', delay=0, failure_threshold=3, cooldown=60)
+    open_circuit(control)
+    assert not control.allow()
+    assert control.trips == 1
+
+
+def test_half_open_circuit_lets_one_probe_through():
+    control = HostController('example.com', delay=0, failure_threshold=3, cooldown=60)
+    open_circuit(control)
+    end_cooldown(control)
+
+    assert control.allow()
+    assert not control.allow()
+    control.record(200, 0.1)
+    assert control.state == 'closed'
+    assert control.allow()
+
+
+def test_failed_probe_reopens_the_circuit():
+    control = HostController('example.com', delay=0, failure_threshold=3, cooldown=60)
+    open_circuit(control)
+    end_cooldown(control)
+
+    assert control.allow()
+    control.record(503)
+    assert control.state == 'open'
+    assert control.trips == 2
+
+
+def test_probe_without_outcome_is_released():
+    control = HostController('example.com', delay=0, failure_threshold=3, cooldown=60)
+    open_circuit(control)
+    end_cooldown(control)
+
+    assert control.allow()
+    control.release_probe()
+    assert control.allow()
+
+
+def test_release_after_record_keeps_the_outcome():
+    control = HostController('example.com', delay=0, failure_threshold=3, cooldown=60)
+    open_circuit(control)
+    end_cooldown(control)
+
+    assert control.allow()
+    control.record(200, 0.1)
+    control.release_probe()
+    assert control.state == 'closed'
+
+
+def test_congestion_halves_the_rate():
+    control = HostController('example.com', delay=1, min_delay=0.5)
+    control.record(429)
+    assert control.delay == 2
+
+
+def test_retry_after_seconds():
+    assert parse_retry_after('30') == 30
+    assert parse_retry_after('soon') is None
+
+
+def test_fetcher_releases_a_probe_that_crashed():
+    def crash(request):
+        raise RuntimeError('parser blew up')
+
+    fetcher = AsyncFetcher(rate_limit_delay=0, retry_times=1)
+    fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(crash))
+    url = 'https://jobs.example.com/1'
+    control = fetcher.rate_control.for_url(url)
+    try:
+        open_circuit(control)
+        end_cooldown(control)
+        assert list(fetcher.fetch_as_completed([url])) == [(url, None)]
+        assert not control.probing
+        assert control.allow()
+    finally:
+        fetcher.close()
@@ -0,0 +1,35 @@
+"""Tests for merging scraped jobs into the job store"""
+from datetime import datetime
+
+from conftest import load_script
+from pipeline.nlp.dedup import DedupIndex
+from pipeline.storage.job_store import JobStore
+
+run_all_scrapers = load_script('run_all_scrapers')
+
+DESCRIPTION = ("We are looking for a data analyst to build dashboards in Power BI, write SQL "
+               "against our warehouse and report weekly sales figures to the leadership team.")
+
+
+def job(job_id, source, title='Data Analyst', company='Acme Ltd', description=DESCRIPTION):
+    return {'job_id': job_id, 'source': source, 'source_url': f'https://{source}.example/{job_id}',
+            'title': title, 'company_name': company, 'description': description,
+            'scraped_at': datetime.now().isoformat()}
+
+
+def test_merge_new_jobs_skips_stored_and_near_duplicate_jobs(tmp_path):
+    store = JobStore(tmp_path / 'jobs')
+    store.append(DedupIndex.from_store(store).canonical([job('a1', 'remoteok')]))
+
+    store = JobStore(tmp_path / 'jobs')
+    index = DedupIndex.from_store(store)
+    scraped = [
+        job('a1', 'remoteok'),  # stored
+        job('b1', 'jobicy'),  # the stored posting, from another source
+        job('c1', 'jobicy', title='Nurse', company='City Hospital', description='Night shifts on the ward.'),
+        job('c1', 'jobicy', title='Nurse', company='City Hospital', description='Night shifts on the ward.'),
+    ]
+
+    new_jobs = run_all_scrapers.merge_new_jobs(scraped, store, index)
+
+    assert [new['job_id'] for new in new_jobs] == ['c1']
@@ -0,0 +1,68 @@
+"""Tests for the learned card selector profiles"""
+import json
+
+from bs4 import BeautifulSoup
+
+from pipeline.scrapers.selector_profile import SelectorProfile
+
+OLD_LAYOUT = BeautifulSoup('<div class="job-card">A</div><div class="job-card">B</div>', 'html.parser')
+NEW_LAYOUT = BeautifulSoup('<article data-job-id="1">A</article>', 'html.parser')
+
+
+def counting_strategies(calls):
+    def strategy(name, selector):
+        def find(soup):
+            calls.append(name)
+            return soup.select(selector)
+        return name, find
+
+    return [strategy('job_card', '.job-card'), strategy('data_job_id', '[data-job-id]')]
+
+
+def test_remembered_strategy_is_tried_alone(tmp_path):
+    path = tmp_path / 'profiles.json'
+    calls = []
+    profile = SelectorProfile('fuzu', counting_strategies(calls), path)
+
+    # The first page runs the cascade and remembers what worked
+    assert len(profile.find(NEW_LAYOUT)) == 1
+    assert calls == ['job_card', 'data_job_id']
+    assert json.loads(path.read_text())['fuzu']['strategy'] == 'data_job_id'
+
+    # A new run starts with the remembered strategy: one query per page
+    calls.clear()
+    profile = SelectorProfile('fuzu', counting_strategies(calls), path)
+    assert len(profile.find(NEW_LAYOUT)) == 1
+    assert calls == ['data_job_id'] and (profile.hits, profile.fallbacks) == (1, 0)
+
+
+def test_redesign_falls_back_and_relearns(tmp_path):
+    path = tmp_path / 'profiles.json'
+    calls = []
+    profile = SelectorProfile('fuzu', counting_strategies(calls), path)
+    profile.find(NEW_LAYOUT)
+
+    calls.clear()
+    assert len(profile.find(OLD_LAYOUT)) == 2
+    assert calls == ['data_job_id', 'job_card']
+    assert profile.preferred == 'job_card' and profile.fallbacks == 2
+    assert profile.find(BeautifulSoup('<p>No jobs</p>', 'html.parser')) == []
+
+
+def test_sources_share_the_file(tmp_path):
+    path = tmp_path / 'profiles.json'
+    SelectorProfile('fuzu', counting_strategies([]), path).find(NEW_LAYOUT)
+    SelectorProfile('brightermonday', counting_strategies([]), path).find(OLD_LAYOUT)
+
+    profiles = json.loads(path.read_text())
+    assert {source: entry['strategy'] for source, entry in profiles.items()} == {
+        'fuzu': 'data_job_id', 'brightermonday': 'job_card'}
+
+
+def test_unknown_or_unreadable_profiles_are_ignored(tmp_path):
+    path = tmp_path / 'profiles.json'
+    path.write_text(json.dumps({'fuzu': {'strategy': 'removed_strategy'}}))
+    assert SelectorProfile('fuzu', counting_strategies([]), path).preferred is None
+
+    path.write_text('{not json')
+    assert SelectorProfile('fuzu', counting_strategies([]), path).preferred is None
@@ -0,0 +1,70 @@
+"""Tests for the dashboard's versioned snapshots"""
+import json
+from datetime import date
+
+from pipeline.analysis.job_queries import JobQueries
+from pipeline.storage.job_store import JobStore
+from pipeline.storage.snapshot import (
+    JOB_STORE_KEY, MANIFEST_NAME, SNAPSHOT_DIR, current_version, load_snapshot, publish_snapshot,
+)
+
+
+def data(total):
+    return {'summary': {'total_jobs': total}, 'skill_stats': [{'name': 'Python', 'count': total}]}
+
+
+def job(job_id):
+    return {'job_id': job_id, 'source': 'remoteok', 'title': 'Data Analyst',
+            'scraped_at': f'{date.today().isoformat()}T08:00:00'}
+
+
+def test_publish_and_load(tmp_path):
+    assert current_version(tmp_path) is None
+
+    version = publish_snapshot(tmp_path, data(3))
+
+    assert current_version(tmp_path) == version
+    assert load_snapshot(tmp_path) == data(3)
+    with open(tmp_path / MANIFEST_NAME) as f:
+        assert json.load(f)['keys'] == ['skill_stats', 'summary']
+    # Loose copies for other readers, with no temporary files left behind
+    with open(tmp_path / 'summary.json') as f:
+        assert json.load(f) == {'total_jobs': 3}
+    assert not list(tmp_path.rglob('*.tmp'))
+
+
+def test_publish_keeps_only_the_newest_bundles(tmp_path):
+    versions = [publish_snapshot(tmp_path, data(total), keep=2) for total in range(5)]
+
+    bundles = sorted(path.name for path in (tmp_path / SNAPSHOT_DIR).iterdir())
+    assert bundles == [f"{version}.json.zst" for version in versions[-3:]]
+    assert load_snapshot(tmp_path) == data(4)
+
+
+def test_reader_keeps_its_version_after_a_new_publish(tmp_path):
+    old = publish_snapshot(tmp_path, data(1))
+    version = current_version(tmp_path)
+
+    publish_snapshot(tmp_path, data(2))
+
+    assert version == old and current_version(tmp_path) != old
+    assert load_snapshot(tmp_path, version) == data(1)
+    assert load_snapshot(tmp_path) == data(2)
+
+
+def test_snapshot_pins_the_job_store_version(tmp_path):
+    store = JobStore(tmp_path / 'jobs')
+    store.append([job('a'), job('b')])
+    publish_snapshot(tmp_path, data(2), job_store=store)
+    store.append([job('c')])
+
+    snapshot = load_snapshot(tmp_path)
+    with open(tmp_path / MANIFEST_NAME) as f:
+        assert json.load(f)['job_store_version'] == snapshot[JOB_STORE_KEY]['version']
+    assert not (tmp_path / f'{JOB_STORE_KEY}.json').exists()
+
+    queries = JobQueries(tmp_path / 'jobs')
+    queries.refresh(snapshot[JOB_STORE_KEY])
+    assert queries.metrics()['jobs'] == 2
+    assert queries.refresh()
+    assert queries.metrics()['jobs'] == 3
@@ -0,0 +1,50 @@
+"""Tests for the dashboard stats views (needs TEST_DATABASE_URL)"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from conftest import needs_database
+from pipeline.database.stats_views import STATS_VIEWS, create_stats_views, read_stats, refresh_stats_views
+from pipeline.storage.aggregates import LOCATION_LENGTH
+
+pytestmark = needs_database
+
+SOURCE = 'stats_views_test'
+LOCATION = 'Nairobi, Nairobi County, Kenya (Hybrid, 3 days in office)'
+
+
+@pytest.fixture
+def db(database):
+    def clean():
+        with database.begin() as connection:
+            connection.execute(text("DELETE FROM jobs WHERE source = :source"), {'source': SOURCE})
+        refresh_stats_views(database)
+
+    clean()
+    yield database
+    clean()
+
+
+def test_views_follow_the_python_definitions(db):
+    with db.begin() as connection:
+        # Creating again is a no-op
+        create_stats_views(connection)
+        for n in range(2):
+            connection.execute(text("""
+                INSERT INTO jobs (job_id, source, source_url, title, location, salary_max, scraped_at, is_active)
+                VALUES (:job_id, :source, :url, 'Data Analyst', :location, 90000, :scraped_at, true)
+            """), {'job_id': f'{SOURCE}-{n}', 'source': SOURCE, 'url': f'https://example.com/{n}',
+                   'location': LOCATION, 'scraped_at': datetime.now()})
+    refresh_stats_views(db)
+
+    with db.connect() as connection:
+        views = {name for name, in connection.execute(text("SELECT matviewname FROM pg_matviews"))}
+        assert set(STATS_VIEWS) <= views
+        count = connection.execute(text("SELECT job_count FROM mv_location_counts WHERE location = :location"),
+                                   {'location': LOCATION[:LOCATION_LENGTH]}).scalar()
+        assert count == 2
+        stats = read_stats(connection, locations=1000)
+
+    assert {'source': SOURCE, 'job_count': 2} in stats['source_stats']
+    assert {'location': LOCATION[:LOCATION_LENGTH], 'job_count': 2} in stats['location_stats']
@@ -29,6 +29,7 @@ class WebScraperTemplate:
     
     Features:
     - Rate limiting
+    - Optional conditional-request page cache
     - Error handling
     - Data validation
     - JSON/CSV export
@@ -39,7 +40,8 @@ class WebScraperTemplate:
                  base_url: str,
                  output_dir: str = "data",
                  delay: float = 1.0,
-                 headers: Optional[Dict] = None):
+                 headers: Optional[Dict] = None,
+                 cache=None):
         """
         Initialize the scraper.
         
@@ -48,6 +50,10 @@ class WebScraperTemplate:
             output_dir: Directory to save scraped data
             delay: Delay between requests (seconds)
             headers: HTTP headers to use
+            cache: Optional page cache exposing get(session, url, **kwargs),
+                such as HttpCache from job-market-intelligence/pipeline/scrapers/http_cache.py.
+                Pages are then revalidated with If-None-Match/If-Modified-Since
+                and 304 responses are served from disk.
         """
         self.base_url = base_url
         self.output_dir = Path(output_dir)
@@ -58,6 +64,7 @@ class WebScraperTemplate:
         }
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        self.cache = cache
         
     def fetch_page(self, url: str) -> Optional[BeautifulSoup]:
         """
@@ -71,8 +78,11 @@ class WebScraperTemplate:
         """
         try:
             logger.info(f"Fetching: {url}")
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
+            if self.cache is not None:
+                response = self.cache.get(self.session, url, timeout=10)
+            else:
+                response = self.session.get(url, timeout=10)
+                response.raise_for_status()
             time.sleep(self.delay)  # Rate limiting
             return BeautifulSoup(response.content, 'html.parser')
         except requests.RequestException as e: